@@ -1,11 +1,15 @@
+import dataclasses
 import json
 import logging
-from typing import AsyncGenerator, Optional, List, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, AsyncGenerator, FrozenSet, Mapping, Optional, List, Callable, Tuple
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import DateTime, select, or_
 
 from app.db.session import AsyncSessionLocal
 from app.core.config import settings
@@ -17,8 +21,9 @@ from app.schemas.token import TokenPayload
 
 logger = logging.getLogger("churnvision.deps")
 
-# Permission cache TTL (5 minutes)
-PERMISSIONS_CACHE_TTL = CacheTTL.MEDIUM
+# Principal cache TTL (1 minute); bounds how long a missed invalidation can
+# keep serving stale user, role or permission data
+PRINCIPAL_CACHE_TTL = CacheTTL.SHORT
 
 # Allow graceful handling when Authorization header is absent so we can fall back to cookies
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
@@ -44,6 +49,91 @@ async def get_db_session():
         yield session
 
 
+# User columns kept in a cached principal (never the password hash)
+_PRINCIPAL_USER_FIELDS = tuple(c.name for c in User.__table__.columns if c.name != "hashed_password")
+_PRINCIPAL_DATETIME_FIELDS = frozenset(
+    c.name for c in User.__table__.columns if isinstance(c.type, DateTime)
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    An authenticated user's row, role and permissions as one immutable value.
+
+    Cached per user so that authenticated requests need no auth queries.
+    role_id and permissions are None until the first permission check loads
+    them; updates replace the cached principal rather than mutate it.
+    """
+    user_id: int
+    user_fields: Mapping[str, Any]
+    role_id: Optional[str] = None
+    permissions: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        fields = {name: getattr(user, name, None) for name in _PRINCIPAL_USER_FIELDS}
+        return cls(user_id=user.id, user_fields=MappingProxyType(fields))
+
+    def to_user(self) -> User:
+        """A detached User for this request (not bound to any session)."""
+        return User(**self.user_fields)
+
+    def with_access(self, role_id: Optional[str], permissions: List[str]) -> "Principal":
+        return dataclasses.replace(self, role_id=role_id, permissions=frozenset(permissions))
+
+    def to_json(self) -> str:
+        fields = {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in self.user_fields.items()
+        }
+        return json.dumps({
+            "user_id": self.user_id,
+            "user": fields,
+            "role_id": self.role_id,
+            "permissions": sorted(self.permissions) if self.permissions is not None else None,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        fields = {
+            name: datetime.fromisoformat(value) if name in _PRINCIPAL_DATETIME_FIELDS and value else value
+            for name, value in data["user"].items()
+        }
+        permissions = data["permissions"]
+        return cls(
+            user_id=data["user_id"],
+            user_fields=MappingProxyType(fields),
+            role_id=data["role_id"],
+            permissions=frozenset(permissions) if permissions is not None else None,
+        )
+
+
+def _principal_key(user_id: int) -> str:
+    return f"principal:user:{user_id}"
+
+
+async def get_cached_principal(user_id: int) -> Optional[Principal]:
+    """Cached principal for a user, or None on a miss or cache error."""
+    try:
+        cache = await get_cache()
+        cached = await cache.get(_principal_key(user_id))
+        if cached:
+            return Principal.from_json(cached)
+    except Exception as e:
+        logger.warning(f"Principal cache read error: {e}")
+    return None
+
+
+async def cache_principal(principal: Principal) -> None:
+    try:
+        cache = await get_cache()
+        await cache.set(_principal_key(principal.user_id), principal.to_json(), PRINCIPAL_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Principal cache write error: {e}")
+
+
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(get_db),
@@ -96,11 +186,17 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    result = await db.execute(select(User).filter(User.id == token_data.sub))
-    user = result.scalar_one_or_none()
+    principal = await get_cached_principal(token_data.sub)
+    if principal is not None:
+        user = principal.to_user()
+    else:
+        result = await db.execute(select(User).filter(User.id == token_data.sub))
+        user = result.scalar_one_or_none()
 
-    if user is None:
-        raise credentials_exception
+        if user is None:
+            raise credentials_exception
+
+        await cache_principal(Principal.from_user(user))
 
     if not user.is_active:
         raise HTTPException(
@@ -157,18 +253,8 @@ async def get_current_superuser(
 
 # ============ RBAC Permission Helpers ============
 
-async def get_user_permissions(db: AsyncSession, user: User) -> List[str]:
-    """
-    Get all permissions for a user based on their assigned roles.
-
-    Args:
-        db: Database session
-        user: Current user (from legacy User model)
-
-    Returns:
-        List of permission IDs the user has
-    """
-    # First try to find user in RBAC users table
+async def _find_user_account(db: AsyncSession, user: User) -> Optional[UserAccount]:
+    """The RBAC account for a legacy user, matched by ID or username."""
     result = await db.execute(
         select(UserAccount).where(
             or_(
@@ -177,13 +263,10 @@ async def get_user_permissions(db: AsyncSession, user: User) -> List[str]:
             )
         )
     )
-    user_account = result.scalar_one_or_none()
+    return result.scalar_one_or_none()
 
-    if not user_account:
-        # User not in RBAC system, return empty permissions
-        # They can still access the app but won't have RBAC permissions
-        return []
 
+async def _get_account_permissions(db: AsyncSession, user_account: UserAccount) -> List[str]:
     # If super admin, return all permissions
     if user_account.is_super_admin == 1:
         perm_result = await db.execute(select(Permission.permission_id))
@@ -199,15 +282,50 @@ async def get_user_permissions(db: AsyncSession, user: User) -> List[str]:
     return [row[0] for row in result.fetchall()]
 
 
+async def get_user_permissions(db: AsyncSession, user: User) -> List[str]:
+    """
+    Get all permissions for a user based on their assigned roles.
+
+    Args:
+        db: Database session
+        user: Current user (from legacy User model)
+
+    Returns:
+        List of permission IDs the user has
+    """
+    # First try to find user in RBAC users table
+    user_account = await _find_user_account(db, user)
+
+    if not user_account:
+        # User not in RBAC system, return empty permissions
+        # They can still access the app but won't have RBAC permissions
+        return []
+
+    return await _get_account_permissions(db, user_account)
+
+
+async def _load_access(db: AsyncSession, user: User) -> Tuple[Optional[str], List[str]]:
+    """Role and permissions for a user, looking the RBAC account up once."""
+    user_account = await _find_user_account(db, user)
+    if not user_account:
+        return None, []
+
+    role_result = await db.execute(
+        select(UserRole.role_id).where(UserRole.user_id == user_account.user_id)
+    )
+    role_id = role_result.scalars().first()
+    return role_id, await _get_account_permissions(db, user_account)
+
+
 async def get_cached_user_permissions(db: AsyncSession, user: User) -> List[str]:
     """
-    Get user permissions with Redis caching.
+    Get user permissions from the cached principal.
 
-    This function wraps get_user_permissions with a cache layer to reduce
-    database queries on permission-protected endpoints.
+    The first permission check after a principal is cached loads the role and
+    permissions and stores them with it, so later checks need no queries.
 
-    Cache key: permissions:user:{user_id}
-    TTL: 5 minutes (PERMISSIONS_CACHE_TTL)
+    Cache key: principal:user:{user_id}
+    TTL: 1 minute (PRINCIPAL_CACHE_TTL)
 
     Args:
         db: Database session
@@ -216,40 +334,35 @@ async def get_cached_user_permissions(db: AsyncSession, user: User) -> List[str]
     Returns:
         List of permission IDs the user has
     """
-    cache_key = f"permissions:user:{user.id}"
+    _, permissions = await _get_cached_access(db, user)
+    return permissions
 
-    # Try cache first
-    try:
-        cache = await get_cache()
-        cached = await cache.get(cache_key)
-        if cached:
-            permissions = json.loads(cached)
-            logger.debug(f"Permission cache hit for user {user.id}")
-            return permissions
-    except Exception as e:
-        logger.warning(f"Permission cache read error: {e}")
+
+async def _get_cached_access(db: AsyncSession, user: User) -> Tuple[Optional[str], List[str]]:
+    """Role and permissions from the cached principal, loading and caching them on a miss."""
+    principal = await get_cached_principal(user.id)
+    if principal is not None and principal.permissions is not None:
+        logger.debug(f"Access cache hit for user {user.id}")
+        return principal.role_id, sorted(principal.permissions)
 
     # Fall back to database query
-    permissions = await get_user_permissions(db, user)
+    role_id, permissions = await _load_access(db, user)
 
-    # Cache the result
-    try:
-        cache = await get_cache()
-        await cache.set(cache_key, json.dumps(permissions), PERMISSIONS_CACHE_TTL)
-        logger.debug(f"Cached permissions for user {user.id}")
-    except Exception as e:
-        logger.warning(f"Permission cache write error: {e}")
+    if principal is None:
+        principal = Principal.from_user(user)
+    await cache_principal(principal.with_access(role_id, permissions))
 
-    return permissions
+    return role_id, permissions
 
 
-async def invalidate_user_permissions_cache(user_id: int) -> bool:
+async def invalidate_user_principal(user_id: int) -> bool:
     """
-    Invalidate cached permissions for a user.
+    Drop a user's cached principal (user row, role and permissions).
 
     Call this when:
+    - User details or active status change
     - User roles are changed
-    - Role permissions are modified
+    - User logs out or has their password reset
     - User is deleted
 
     Args:
@@ -258,18 +371,27 @@ async def invalidate_user_permissions_cache(user_id: int) -> bool:
     Returns:
         True if cache was invalidated, False otherwise
     """
-    cache_key = f"permissions:user:{user_id}"
     try:
         cache = await get_cache()
-        result = await cache.delete(cache_key)
+        result = await cache.delete(_principal_key(user_id))
         if result:
-            logger.info(f"Invalidated permission cache for user {user_id}")
+            logger.info(f"Invalidated principal cache for user {user_id}")
         return result
     except Exception as e:
-        logger.warning(f"Failed to invalidate permission cache: {e}")
+        logger.warning(f"Failed to invalidate principal cache: {e}")
         return False
 
 
+async def invalidate_user_permissions_cache(user_id: int) -> bool:
+    """
+    Invalidate cached permissions for a user.
+
+    Permissions are cached with the user's principal, so this drops the
+    whole principal (see invalidate_user_principal).
+    """
+    return await invalidate_user_principal(user_id)
+
+
 async def invalidate_all_permissions_cache() -> int:
     """
     Invalidate all cached permissions.
@@ -283,7 +405,7 @@ async def invalidate_all_permissions_cache() -> int:
     """
     try:
         cache = await get_cache()
-        count = await cache.clear_pattern("permissions:user:*")
+        count = await cache.clear_pattern("principal:user:*")
         logger.info(f"Invalidated {count} permission cache entries")
         return count
     except Exception as e:
@@ -318,6 +440,9 @@ async def get_user_role(db: AsyncSession, user: User) -> Optional[str]:
     """
     Get the primary role for a user.
 
+    Read from the cached principal; loaded together with the permissions on
+    a miss (see get_cached_user_permissions).
+
     Args:
         db: Database session
         user: Current user
@@ -325,24 +450,8 @@ async def get_user_role(db: AsyncSession, user: User) -> Optional[str]:
     Returns:
         Role ID or None
     """
-    result = await db.execute(
-        select(UserAccount).where(
-            or_(
-                UserAccount.user_id == str(user.id),
-                UserAccount.username == user.username
-            )
-        )
-    )
-    user_account = result.scalar_one_or_none()
-
-    if not user_account:
-        return None
-
-    role_result = await db.execute(
-        select(UserRole.role_id).where(UserRole.user_id == user_account.user_id)
-    )
-    role = role_result.scalar_one_or_none()
-    return role
+    role_id, _ = await _get_cached_access(db, user)
+    return role_id
 
 
 def require_permission(*permissions: str) -> Callable:
@@ -13,6 +13,8 @@ from app.api.deps import get_db, get_current_user, get_user_permissions_by_id, i
 from app.models.user import User
 from app.models.auth import UserAccount, Role, Permission, UserRole, RolePermission
 from app.core.audit import AuditLog, AuditLogger
+from app.core.executors import run_cpu
+from app.core.query_monitor import query_monitor
 from app.core.security import get_password_hash
 from app.schemas.admin import (
     RoleResponse,
@@ -30,6 +32,8 @@ from app.schemas.admin import (
     AuditLogResponse,
     AuditLogListResponse,
     AdminStats,
+    SlowQueryResponse,
+    SlowQueryListResponse,
 )
 
 router = APIRouter()
@@ -303,7 +307,7 @@ async def create_user(
         if existing_legacy_email.scalar_one_or_none():
             raise HTTPException(status_code=400, detail="Email already exists")
 
-    password_hash = get_password_hash(user_data.password)
+    password_hash = await run_cpu(get_password_hash, user_data.password)
 
     # Create user in legacy_users table (for authentication/login)
     legacy_user = User(
@@ -434,13 +438,13 @@ async def update_user(
         # Update super admin flag
         user.is_super_admin = 1 if user_data.role_id == 'super_admin' else 0
 
-        # Invalidate permission cache since role changed
-        await invalidate_user_permissions_cache(int(user_id) if user_id.isdigit() else 0)
-
     user.updated_at = datetime.utcnow()
     await db.commit()
     await db.refresh(user)
 
+    # Invalidate cached principal (details, active status or role changed)
+    await invalidate_user_permissions_cache(int(user_id) if user_id.isdigit() else 0)
+
     # Get current role if not updated
     if not role:
         role_result = await db.execute(
@@ -526,10 +530,13 @@ async def reset_user_password(
     if user.is_super_admin == 1 and admin_user.is_super_admin != 1:
         raise HTTPException(status_code=403, detail="Cannot reset Super Admin password")
 
-    user.password_hash = get_password_hash(password_data.new_password)
+    user.password_hash = await run_cpu(get_password_hash, password_data.new_password)
     user.updated_at = datetime.utcnow()
     await db.commit()
 
+    # Drop the cached principal so the next request reloads the user
+    await invalidate_user_permissions_cache(int(user_id) if user_id.isdigit() else 0)
+
     # Log action
     await log_admin_action(db, admin_user, "password_reset", "user", user_id, f"Reset password for {user.username}")
 
@@ -743,3 +750,31 @@ async def list_audit_logs(
         page_size=page_size,
         total_pages=total_pages
     )
+
+
+# ============ Slow Queries ============
+
+@router.get("/slow-queries", response_model=SlowQueryListResponse)
+async def list_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List the slowest recent SQL statements seen by this worker, newest first"""
+    await check_admin_access(db, current_user)
+
+    return SlowQueryListResponse(
+        threshold_ms=query_monitor.threshold_ms,
+        explain_enabled=query_monitor.explain,
+        queries=[SlowQueryResponse.model_validate(entry) for entry in query_monitor.slow_queries(limit)],
+    )
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Clear this worker's slow query log"""
+    await check_admin_access(db, current_user)
+    query_monitor.clear()
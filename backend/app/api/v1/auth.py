@@ -5,8 +5,17 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 
-from app.api.deps import get_db, get_current_user, get_current_active_user, oauth2_scheme, get_user_permissions, get_user_role
+from app.api.deps import (
+    get_db,
+    get_current_user,
+    get_current_active_user,
+    oauth2_scheme,
+    get_cached_user_permissions,
+    get_user_role,
+    invalidate_user_principal,
+)
 from app.core.config import settings
+from app.core.executors import run_cpu
 from app.core.security import (
     create_access_token,
     verify_password,
@@ -201,7 +210,8 @@ async def _authenticate_user(
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(password, user.hashed_password):
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not user or not await run_cpu(verify_password, password, user.hashed_password):
         await _register_failed_attempt(key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -337,7 +347,7 @@ async def register(
     user = User(
         email=user_in.email,
         username=user_in.username,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await run_cpu(get_password_hash, user_in.password),
         full_name=user_in.full_name,
         is_active=user_in.is_active,
         tenant_id=user_in.tenant_id,
@@ -388,6 +398,7 @@ async def logout(
 
     # Revoke all refresh tokens for this user
     await _revoke_all_user_tokens(db, current_user.id)
+    await invalidate_user_principal(current_user.id)
 
     response.delete_cookie("access_token", path="/")
     response.delete_cookie("churnvision_access_token", path="/")
@@ -523,7 +534,7 @@ async def read_users_me_extended(
     """
     Get current authenticated user with role and permissions.
     """
-    # Get role
+    # Role and permissions come from the cached principal
     role_id = await get_user_role(db, current_user)
     role_info = None
 
@@ -540,21 +551,21 @@ async def read_users_me_extended(
             }
 
     # Get permissions
-    permissions = await get_user_permissions(db, current_user)
+    permissions = await get_cached_user_permissions(db, current_user)
 
     # Check if user is super admin in RBAC system
-    is_admin = False
-    result = await db.execute(
-        select(UserAccount).where(
-            or_(
-                UserAccount.user_id == str(current_user.id),
-                UserAccount.username == current_user.username
+    is_admin = 'admin:access' in permissions
+    if not is_admin:
+        result = await db.execute(
+            select(UserAccount).where(
+                or_(
+                    UserAccount.user_id == str(current_user.id),
+                    UserAccount.username == current_user.username
+                )
             )
         )
-    )
-    user_account = result.scalar_one_or_none()
-    if user_account:
-        is_admin = user_account.is_super_admin == 1 or 'admin:access' in permissions
+        user_account = result.scalar_one_or_none()
+        is_admin = user_account is not None and user_account.is_super_admin == 1
 
     return {
         "id": current_user.id,
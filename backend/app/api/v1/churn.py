@@ -1,6 +1,5 @@
 import asyncio
 import io
-import json
 import logging
 import time
 from datetime import datetime
@@ -16,11 +15,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user, get_db
 from app.db.session import AsyncSessionLocal
 from app.core.security_utils import sanitize_error_message
+from app.core.cache import bump_dataset_version
+from app.core.executors import run_cpu
 
 logger = logging.getLogger("churnvision")
 from app.core.audit import AuditLogger
 from app.models.dataset import Dataset as DatasetModel
-from app.models.churn import ChurnModel, ChurnOutput, ChurnReasoning, TrainingJob
+from app.models.churn import ChurnModel, TrainingJob
 from app.models.hr_data import HRDataInput
 from app.models.user import User
 from app.schemas.churn import (
@@ -36,7 +37,11 @@ from app.schemas.churn import (
     RoutingInfoResponse,
 )
 from app.services.ml.churn_prediction_service import ChurnPredictionService
+from app.services.ml.model_registry import ModelArtifactsMissingError
+from app.services.ml.prediction_persistence import persist_predictions
+from app.services.ml.training_executor import TrainingCancelledError, training_executor
 from app.services.data.dataset_service import get_active_dataset, get_active_dataset_id, get_active_dataset_entry
+from app.services.data.columnar_cache import load_dataset_frame
 
 router = APIRouter()
 
@@ -126,10 +131,10 @@ async def predict_batch_churn(
 
 
 async def _load_active_dataset_with_mapping(db: AsyncSession) -> tuple[pd.DataFrame, Optional[Dict[str, Any]], DatasetModel]:
-    """Load the active dataset CSV and return it with any stored column mapping."""
+    """Load the active dataset and return it with any stored column mapping."""
     dataset = await get_active_dataset(db)
     mapping = dataset.column_mapping
-    df = pd.read_csv(dataset.file_path)
+    df = await load_dataset_frame(dataset.file_path)
     return df, mapping, dataset
 
 
@@ -467,7 +472,16 @@ async def _run_training_background(
                 use_existing_data=False
             )
 
-            result = await churn_service.train_model(training_request, df_features, dataset_id)
+            # Training runs in the training process pool; worker progress (0-100)
+            # is mapped onto the 15-60% band of the overall job
+            def on_progress(progress: int, message: str) -> None:
+                churn_service.update_training_progress(
+                    dataset_id, "in_progress", 15 + int(progress * 0.45), message, job_id
+                )
+
+            result = await churn_service.train_model_isolated(
+                training_request, df_features, dataset_id, progress_callback=on_progress
+            )
 
             # Get the model type that was selected by the router
             model_type = result.selected_model or result.model_type
@@ -599,132 +613,31 @@ async def _run_training_background(
                 hr_codes_list = hr_codes_series[valid_mask].tolist()
                 feature_frame = df_features.loc[valid_mask].reset_index(drop=True)
 
-                total_employees = len(hr_codes_list)
-                predictions = await churn_service.predict_frame_batch(
+                batch = await churn_service.predict_frame_columnar(
                     feature_frame=feature_frame,
                     dataset_id=dataset_id,
                     hr_codes=hr_codes_list,
-                    batch_size=256,
                 )
 
-                # Preload existing rows to avoid per-row queries
-                existing_outputs_result = await db.execute(
-                    select(ChurnOutput).where(ChurnOutput.dataset_id == dataset_used.dataset_id)
-                )
-                existing_outputs = {row.hr_code: row for row in existing_outputs_result.scalars().all()}
-
-                existing_reasonings: Dict[str, ChurnReasoning] = {}
-                if hr_codes_list:
-                    existing_reasonings_result = await db.execute(
-                        select(ChurnReasoning).where(ChurnReasoning.hr_code.in_(hr_codes_list))
+                def on_persist_progress(written: int, total: int) -> None:
+                    churn_service.update_training_progress(
+                        dataset_id,
+                        "in_progress",
+                        60 + int((written / max(total, 1)) * 35),
+                        f"Generating predictions ({written}/{total})",
+                        job_id,
                     )
-                    existing_reasonings = {row.hr_code: row for row in existing_reasonings_result.scalars().all()}
-
-                to_add_outputs = []
-                to_add_reasonings = []
-
-                for idx, (hr_code, prediction) in enumerate(zip(hr_codes_list, predictions)):
-                    try:
-                        features = feature_frame.iloc[idx]
-                        shap_dict = {}
-                        if prediction.contributing_factors:
-                            for factor in prediction.contributing_factors:
-                                feature_name = factor.get("feature", "unknown")
-                                impact_value = factor.get("impact", 0)
-                                shap_dict[feature_name] = impact_value
-
-                        confidence_pct = (prediction.confidence_score or 0) * 100
-                        existing_output_row = existing_outputs.get(hr_code)
-
-                        if existing_output_row:
-                            existing_output_row.resign_proba = prediction.churn_probability
-                            existing_output_row.shap_values = shap_dict
-                            existing_output_row.model_version = model_version
-                            existing_output_row.generated_at = datetime.utcnow()
-                            existing_output_row.confidence_score = confidence_pct
-                        else:
-                            to_add_outputs.append(ChurnOutput(
-                                hr_code=hr_code,
-                                dataset_id=dataset_used.dataset_id,
-                                resign_proba=prediction.churn_probability,
-                                shap_values=shap_dict,
-                                model_version=model_version,
-                                confidence_score=confidence_pct,
-                            ))
-                        predictions_made += 1
-
-                        stage = _determine_stage(float(features.get("time_spend_company", 3)))
-
-                        reasoning_parts = []
-                        if prediction.contributing_factors:
-                            for factor in prediction.contributing_factors[:3]:
-                                feature_name = factor.get("feature", "unknown")
-                                description = factor.get("description", factor.get("impact", ""))
-                                reasoning_parts.append(f"{feature_name}: {description}")
-                        reasoning_text = "; ".join(reasoning_parts) if reasoning_parts else "No significant factors identified."
-
-                        recommendations = "; ".join(prediction.recommendations[:3]) if prediction.recommendations else ""
-
-                        ml_contributors_list = []
-                        if prediction.contributing_factors:
-                            for factor in prediction.contributing_factors:
-                                ml_contributors_list.append({
-                                    "feature": factor.get("feature", "unknown"),
-                                    "value": factor.get("value"),
-                                    "importance": factor.get("impact", 0) if isinstance(factor.get("impact"), (int, float)) else 0.5,
-                                    "message": factor.get("message", "")
-                                })
-
-                        existing_reasoning_row = existing_reasonings.get(hr_code)
-                        ml_contributors_json = json.dumps(ml_contributors_list) if ml_contributors_list else "[]"
-                        heuristic_alerts_json = "[]"
-
-                        if existing_reasoning_row:
-                            existing_reasoning_row.churn_risk = prediction.churn_probability
-                            existing_reasoning_row.stage = stage
-                            existing_reasoning_row.stage_score = 0.5
-                            existing_reasoning_row.ml_score = prediction.churn_probability
-                            existing_reasoning_row.heuristic_score = 0.0
-                            existing_reasoning_row.ml_contributors = ml_contributors_json
-                            existing_reasoning_row.heuristic_alerts = heuristic_alerts_json
-                            existing_reasoning_row.reasoning = reasoning_text
-                            existing_reasoning_row.recommendations = recommendations
-                            existing_reasoning_row.confidence_level = prediction.confidence_score
-                        else:
-                            to_add_reasonings.append(ChurnReasoning(
-                                hr_code=hr_code,
-                                churn_risk=prediction.churn_probability,
-                                stage=stage,
-                                stage_score=0.5,
-                                ml_score=prediction.churn_probability,
-                                heuristic_score=0.0,
-                                ml_contributors=ml_contributors_json,
-                                heuristic_alerts=heuristic_alerts_json,
-                                reasoning=reasoning_text,
-                                recommendations=recommendations,
-                                confidence_level=prediction.confidence_score,
-                            ))
-                        reasoning_made += 1
-
-                        if predictions_made % 50 == 0 or predictions_made == total_employees:
-                            progress_pct = 60 + int((predictions_made / max(total_employees, 1)) * 35)
-                            churn_service.update_training_progress(
-                                dataset_id,
-                                "in_progress",
-                                progress_pct,
-                                f"Generating predictions ({predictions_made}/{total_employees})",
-                                job_id,
-                            )
-                            await asyncio.sleep(0.01)
-
-                    except Exception as e:
-                        logger.warning(f"[TRAINING] Error predicting for {hr_code}: {e}")
-                        continue
-
-                if to_add_outputs:
-                    db.add_all(to_add_outputs)
-                if to_add_reasonings:
-                    db.add_all(to_add_reasonings)
+
+                summary = await persist_predictions(
+                    db,
+                    batch,
+                    hr_codes_list,
+                    dataset_used.dataset_id,
+                    model_version,
+                    progress_callback=on_persist_progress,
+                )
+                predictions_made = summary.predictions_written
+                reasoning_made = summary.reasoning_written
 
                 await db.commit()
                 logger.info(f"[TRAINING] Completed: {predictions_made} predictions, {reasoning_made} reasoning records generated")
@@ -740,6 +653,9 @@ async def _run_training_background(
             )
             await db.commit()
 
+            # New model and predictions: retire cached results for the dataset
+            await bump_dataset_version(dataset_id)
+
             # Update predictions count in metrics
             churn_service.model_metrics["predictions_made"] = predictions_made
             if cache_key in churn_service.model_metrics_by_dataset:
@@ -761,6 +677,16 @@ async def _run_training_background(
 
             logger.info(f"[TRAINING] Total time: {duration_ms}ms")
 
+        except TrainingCancelledError:
+            logger.info(f"[TRAINING] Training cancelled for dataset {dataset_id}")
+            churn_service.update_training_progress(dataset_id, "cancelled", 0, "Training cancelled", job_id)
+            await db.execute(
+                update(TrainingJob)
+                .where(TrainingJob.job_id == job_id)
+                .values(status="cancelled", finished_at=datetime.utcnow())
+            )
+            await db.commit()
+
         except Exception as e:
             logger.error(f"[TRAINING] Background training failed: {e}")
             churn_service.update_training_progress(dataset_id, "error", 0, str(e), job_id)
@@ -842,6 +768,13 @@ async def train_churn_model(
             # Training must be tied to an active dataset so results stay isolated per upload
             dataset_used = await get_active_dataset(db)
 
+        # Checked before dataset_id_for_training is set so the running job's progress is left intact
+        if training_executor.is_running(dataset_used.dataset_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Training is already running for this dataset"
+            )
+
         dataset_id_for_training = dataset_used.dataset_id
 
         # Create training job with "queued" status
@@ -929,6 +862,35 @@ async def train_churn_model(
         )
 
 
+@router.post("/train/cancel")
+async def cancel_training(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel the running training job for the active dataset.
+
+    The training worker stops at its next progress checkpoint; poll /train/status
+    until it reports "cancelled".
+    """
+    dataset_id = await get_active_dataset_id(db)
+    if not dataset_id or not training_executor.cancel(dataset_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No training job is running for the active dataset"
+        )
+
+    progress = churn_service.training_progress.get(dataset_id, {})
+    churn_service.update_training_progress(
+        dataset_id,
+        "in_progress",
+        progress.get("progress", 0),
+        "Cancelling training...",
+        progress.get("job_id"),
+    )
+    return {"success": True, "status": "cancelling", "dataset_id": dataset_id}
+
+
 @router.get("/model/metrics", response_model=ModelMetricsResponse)
 async def get_model_metrics(
     current_user: User = Depends(get_current_user),
@@ -1154,11 +1116,14 @@ async def churn_service_health():
 
     Returns service status and model availability.
     """
+    registry_stats = churn_service.registry.stats()
+    trained = [entry for entry in registry_stats["resident"] if not entry["is_default"]]
     return {
         "status": "healthy",
         "service": "churn-prediction",
-        "model_loaded": churn_service.model is not None,
-        "model_type": type(churn_service.model).__name__ if churn_service.model else "None"
+        "model_loaded": bool(trained),
+        "model_type": type(churn_service.model).__name__ if churn_service.model else "None",
+        "model_registry": registry_stats,
     }
 
 
@@ -1180,17 +1145,21 @@ async def predict_all_employees(
     """
     start_time = time.time()
 
-    if not churn_service.model:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Model not trained. Please train the model first."
-        )
-
     try:
-        # Get active dataset
+        # Get active dataset and load its model on demand
         dataset = await get_active_dataset(db)
+        try:
+            # Decrypting and unpickling artifacts is CPU-bound; keep it off the loop
+            bundle = await run_cpu(churn_service.ensure_model_for_dataset, dataset.dataset_id)
+        except ModelArtifactsMissingError:
+            bundle = None
+        if bundle is None or not bundle.is_fitted:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Model not trained. Please train the model first."
+            )
+
         df, mapping, _ = await _load_active_dataset_with_mapping(db)
-        churn_service.ensure_model_for_dataset(dataset.dataset_id)
 
         # Apply column mapping to get hr_code
         if mapping and isinstance(mapping, dict):
@@ -1213,112 +1182,24 @@ async def predict_all_employees(
             model_metrics = churn_service.model_metrics
         model_version = model_metrics.get("model_version", "unknown") if model_metrics else "unknown"
 
-        predictions_made = 0
-        reasoning_made = 0
-
         hr_codes_series = df["hr_code"].fillna("").astype(str)
         valid_mask = hr_codes_series != ""
         hr_codes_list = hr_codes_series[valid_mask].tolist()
         feature_frame = df_features.loc[valid_mask].reset_index(drop=True)
 
-        predictions = await churn_service.predict_frame_batch(
+        batch = await churn_service.predict_frame_columnar(
             feature_frame=feature_frame,
             dataset_id=dataset.dataset_id,
             hr_codes=hr_codes_list,
-            batch_size=256,
         )
-
-        existing_outputs_result = await db.execute(
-            select(ChurnOutput).where(ChurnOutput.dataset_id == dataset.dataset_id)
+        summary = await persist_predictions(
+            db, batch, hr_codes_list, dataset.dataset_id, model_version
         )
-        existing_outputs = {row.hr_code: row for row in existing_outputs_result.scalars().all()}
-
-        existing_reasonings: Dict[str, ChurnReasoning] = {}
-        if hr_codes_list:
-            existing_reasonings_result = await db.execute(
-                select(ChurnReasoning).where(ChurnReasoning.hr_code.in_(hr_codes_list))
-            )
-            existing_reasonings = {row.hr_code: row for row in existing_reasonings_result.scalars().all()}
-
-        to_add_outputs = []
-        to_add_reasonings = []
-
-        for idx, (hr_code, prediction) in enumerate(zip(hr_codes_list, predictions)):
-            try:
-                features = feature_frame.iloc[idx]
-                shap_dict = {}
-                if prediction.contributing_factors:
-                    for factor in prediction.contributing_factors:
-                        feature_name = factor.get("feature", "unknown")
-                        impact_value = factor.get("impact", 0)
-                        shap_dict[feature_name] = impact_value
-
-                raw_confidence = getattr(prediction, 'confidence_score', None)
-                confidence_score = (raw_confidence * 100 if raw_confidence is not None else 70.0)
-
-                existing_row = existing_outputs.get(hr_code)
-                if existing_row:
-                    existing_row.resign_proba = prediction.churn_probability
-                    existing_row.shap_values = shap_dict
-                    existing_row.model_version = model_version
-                    existing_row.generated_at = datetime.utcnow()
-                    existing_row.confidence_score = confidence_score
-                else:
-                    to_add_outputs.append(ChurnOutput(
-                        hr_code=hr_code,
-                        dataset_id=dataset.dataset_id,
-                        resign_proba=prediction.churn_probability,
-                        shap_values=shap_dict,
-                        model_version=model_version,
-                        confidence_score=confidence_score,
-                    ))
-                predictions_made += 1
-
-                stage = _determine_stage(float(features.get("time_spend_company", 3)))
-
-                reasoning_parts = []
-                if prediction.contributing_factors:
-                    for factor in prediction.contributing_factors[:3]:
-                        feature_name = factor.get("feature", "unknown")
-                        description = factor.get("description", factor.get("impact", ""))
-                        reasoning_parts.append(f"{feature_name}: {description}")
-                reasoning_text = "; ".join(reasoning_parts) if reasoning_parts else "No significant factors identified."
-
-                recommendations = "; ".join(prediction.recommendations[:3]) if prediction.recommendations else ""
-
-                existing_reasoning_row = existing_reasonings.get(hr_code)
-                if existing_reasoning_row:
-                    existing_reasoning_row.churn_risk = prediction.churn_probability
-                    existing_reasoning_row.stage = stage
-                    existing_reasoning_row.ml_score = prediction.churn_probability
-                    existing_reasoning_row.ml_contributors = json.dumps(shap_dict) if shap_dict else None
-                    existing_reasoning_row.reasoning = reasoning_text
-                    existing_reasoning_row.recommendations = recommendations
-                    existing_reasoning_row.confidence_level = getattr(prediction, 'confidence_score', None) or 0.7
-                else:
-                    to_add_reasonings.append(ChurnReasoning(
-                        hr_code=hr_code,
-                        churn_risk=prediction.churn_probability,
-                        stage=stage,
-                        ml_score=prediction.churn_probability,
-                        heuristic_score=0.0,
-                        ml_contributors=json.dumps(shap_dict) if shap_dict else None,
-                        reasoning=reasoning_text,
-                        recommendations=recommendations,
-                        confidence_level=getattr(prediction, 'confidence_score', None) or 0.7,
-                    ))
-                reasoning_made += 1
-
-            except Exception as e:
-                print(f"Error predicting for {hr_code}: {e}")
-                continue
-
-        if to_add_outputs:
-            db.add_all(to_add_outputs)
-        if to_add_reasonings:
-            db.add_all(to_add_reasonings)
+        predictions_made = summary.predictions_written
+        reasoning_made = summary.reasoning_written
 
         await db.commit()
+        await bump_dataset_version(dataset.dataset_id)
 
         duration_ms = int((time.time() - start_time) * 1000)
 
@@ -1339,20 +1220,6 @@ async def predict_all_employees(
         )
 
 
-def _determine_stage(tenure: float) -> str:
-    """Determine behavioral stage based on tenure."""
-    if tenure < 1:
-        return "Onboarding"
-    elif tenure < 2:
-        return "Growth"
-    elif tenure < 4:
-        return "Established"
-    elif tenure < 7:
-        return "Senior"
-    else:
-        return "Veteran"
-
-
 # ============================================================================
 # MODEL INTELLIGENCE ENDPOINTS
 # ============================================================================
@@ -12,8 +12,16 @@ from sqlalchemy import select, delete, update, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.core.cache import bump_dataset_version
+from app.core.executors import run_cpu
 from app.core.security_utils import sanitize_filename, sanitize_error_message
 from app.services.data.data_quality_service import assess_data_quality, DataQualityReport
+from app.services.data.columnar_cache import (
+    build_columnar_cache,
+    load_dataset_frame,
+    remove_columnar_cache,
+    stream_upload_to_disk,
+)
 
 logger = logging.getLogger(__name__)
 from app.models.user import User
@@ -210,18 +218,12 @@ async def get_active_dataset_quality(
 
     try:
         # Read FULL dataset for accurate assessment
-        file_path = Path(dataset.file_path)
-        if file_path.suffix.lower() in [".csv", ".txt"]:
-            df = pd.read_csv(file_path)
-        elif file_path.suffix.lower() in [".xlsx", ".xls"]:
-            df = pd.read_excel(file_path)
-        else:
-            df = pd.read_csv(file_path)
+        df = await load_dataset_frame(dataset.file_path)
 
         logger.info(
             f"Quality check for active dataset {dataset.dataset_id}: {len(df)} rows"
         )
-        report = assess_data_quality(df, source="upload")
+        report = await run_cpu(assess_data_quality, df, "upload")
         return DataQualityResponse(**report.to_dict())
 
     except Exception as e:
@@ -268,6 +270,7 @@ async def delete_dataset(
     if dataset.file_path:
         try:
             Path(dataset.file_path).unlink(missing_ok=True)
+            remove_columnar_cache(dataset.file_path)
         except Exception as e:
             logger.warning(f"Failed to delete file {dataset.file_path}: {e}")
 
@@ -278,6 +281,7 @@ async def delete_dataset(
         )
     )
     await db.commit()
+    await bump_dataset_version(dataset_id)
 
     return OperationResult(success=True)
 
@@ -509,17 +513,17 @@ async def upload_file(
         # Sanitize filename to prevent path traversal attacks
         safe_filename = sanitize_filename(file.filename)
         dest = project_dir / safe_filename
-        content = await file.read()
-        dest.write_bytes(content)
+        size = await stream_upload_to_disk(file, dest)
 
-        # Count rows for metadata (best-effort, using chunks to avoid memory spikes)
+        # Parse once, off the event loop, into the columnar sidecar that all
+        # later reads use; the same frame feeds the quality assessment below
         row_count = None
+        df_for_quality: Optional[pd.DataFrame] = None
         try:
-            row_count = 0
-            for chunk in pd.read_csv(dest, chunksize=50000):
-                row_count += len(chunk)
-        except Exception:
-            row_count = None
+            df_for_quality, cache_info = await run_cpu(build_columnar_cache, dest)
+            row_count = len(df_for_quality)
+        except Exception as e:
+            logger.warning(f"Failed to parse uploaded file {safe_filename}: {e}")
 
         # Parse column mapping (optional) sent by the UI
         parsed_mapping = None
@@ -540,22 +544,18 @@ async def upload_file(
 
         # Run data quality assessment on FULL dataset
         quality_report: Optional[Dict[str, Any]] = None
-        try:
-            # Read full file for accurate assessment (use row_count if available to log)
-            df_for_quality = pd.read_csv(dest)
-            logger.info(
-                f"Data quality assessment: reading {len(df_for_quality)} rows "
-                f"(file row_count={row_count})"
-            )
-            report = assess_data_quality(df_for_quality, source="upload")
-            quality_report = report.to_dict()
-            logger.info(
-                f"Data quality assessment complete: score={report.ml_readiness_score}, "
-                f"can_train={report.can_train_model}, issues={len(report.critical_issues)}"
-            )
-        except Exception as e:
-            logger.warning(f"Data quality assessment failed: {e}")
-            quality_report = None
+        if df_for_quality is not None:
+            try:
+                logger.info(f"Data quality assessment: {row_count} rows")
+                report = await run_cpu(assess_data_quality, df_for_quality, "upload")
+                quality_report = report.to_dict()
+                logger.info(
+                    f"Data quality assessment complete: score={report.ml_readiness_score}, "
+                    f"can_train={report.can_train_model}, issues={len(report.critical_issues)}"
+                )
+            except Exception as e:
+                logger.warning(f"Data quality assessment failed: {e}")
+                quality_report = None
 
         dataset = DatasetModel(
             dataset_id=dataset_id,
@@ -563,7 +563,7 @@ async def upload_file(
             upload_date=datetime.utcnow(),
             row_count=row_count,
             file_type=file.content_type or "unknown",
-            size=len(content),
+            size=size,
             is_active=1,
             is_snapshot=0,
             snapshot_group=None,
@@ -575,6 +575,7 @@ async def upload_file(
         )
         db.add(dataset)
         await db.commit()
+        await bump_dataset_version(dataset_id)
 
         return OperationResult(
             success=True,
@@ -626,16 +627,10 @@ async def get_dataset_quality(
 
     try:
         # Read FULL dataset for accurate assessment
-        file_path = Path(dataset.file_path)
-        if file_path.suffix.lower() in [".csv", ".txt"]:
-            df = pd.read_csv(file_path)
-        elif file_path.suffix.lower() in [".xlsx", ".xls"]:
-            df = pd.read_excel(file_path)
-        else:
-            df = pd.read_csv(file_path)
+        df = await load_dataset_frame(dataset.file_path)
 
         logger.info(f"Quality check for dataset {dataset_id}: {len(df)} rows")
-        report = assess_data_quality(df, source="upload")
+        report = await run_cpu(assess_data_quality, df, "upload")
         return DataQualityResponse(**report.to_dict())
 
     except Exception as e:
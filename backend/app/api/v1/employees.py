@@ -1,5 +1,4 @@
 from typing import Any, List, Optional, Dict
-from datetime import datetime
 from pathlib import Path
 from typing import Optional, Any, Dict, List
 
@@ -13,7 +12,9 @@ from app.api.deps import get_current_user, get_db
 from app.models.churn import ChurnOutput, ChurnReasoning
 from app.models.hr_data import HRDataInput
 from app.models.user import User
-from app.services.data.dataset_service import get_active_dataset_entry
+from app.services.data.dataset_service import get_active_dataset_entry, get_active_dataset_id
+from app.services.data.columnar_cache import load_dataset_frame
+from app.services.data.hr_data_loader import HRDataMappingError, hr_data_hydration_service, prepare_hr_records
 
 router = APIRouter()
 
@@ -41,8 +42,11 @@ class EmployeeRecord(BaseModel):
 
 async def _hydrate_hr_data_from_active_dataset(db: AsyncSession) -> Optional[str]:
     """
-    If the HR data table is empty for the active dataset, hydrate it from the
-    dataset file so the Home page has something to display.
+    If the HR data table is empty for the active dataset, start hydrating it
+    from the dataset file so the Home page has something to display.
+
+    The file is read and validated here, so bad datasets still fail the
+    request; the bulk load itself runs in the background.
     """
     dataset_entry = await get_active_dataset_entry(db)
     if not dataset_entry or not dataset_entry.file_path:
@@ -60,10 +64,14 @@ async def _hydrate_hr_data_from_active_dataset(db: AsyncSession) -> Optional[str
     if existing_count.scalar_one() > 0:
         return dataset_id
 
+    job = hr_data_hydration_service.get_job(dataset_id)
+    if job and job.running:
+        return dataset_id
+
     # Use the stored column mapping (if any) to rename columns
     mapping = dataset_entry.column_mapping or {}
     try:
-        df = pd.read_csv(path_obj)
+        df = await load_dataset_frame(path_obj)
     except pd.errors.EmptyDataError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -93,86 +101,45 @@ async def _hydrate_hr_data_from_active_dataset(db: AsyncSession) -> Optional[str
             detail="Failed to read dataset due to an internal error"
         )
 
-    rename_map = {}
-    canonical_fields = {
-        "hr_code": "hr_code",
-        "full_name": "full_name",
-        "structure_name": "structure_name",
-        "position": "position",
-        "status": "status",
-        "manager_id": "manager_id",
-        "tenure": "tenure",
-        "employee_cost": "employee_cost",
-        "termination_date": "termination_date",
-    }
-    for target, default_col in canonical_fields.items():
-        source_col = mapping.get(target) or default_col
-        if source_col in df.columns:
-            rename_map[source_col] = target
-
-    required = {"hr_code", "full_name", "structure_name", "position", "status", "manager_id", "tenure"}
-    missing = [field for field in required if field not in rename_map.values()]
-    if missing:
+    try:
+        records = prepare_hr_records(df, mapping, dataset_id)
+    except HRDataMappingError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Active dataset is missing required columns: {missing}"
+            detail=str(e)
         )
 
-    df = df.rename(columns=rename_map)
-    df["status"] = df.get("status", "Active").fillna("Active")
-
-    # Helper to parse date strings to date objects
-    def parse_date(val):
-        if pd.isnull(val) or val is None or val == '':
-            return None
-        if isinstance(val, datetime):
-            return val.date()
-        if hasattr(val, 'date'):  # datetime-like
-            return val.date()
-        try:
-            return datetime.strptime(str(val), '%Y-%m-%d').date()
-        except (ValueError, TypeError):
-            return None
-
-    records: List[dict] = []
-    for _, row in df.iterrows():
-        report_date_val = row.get("report_date") if "report_date" in df.columns else None
-        report_date = parse_date(report_date_val) or datetime.utcnow().date()
-
-        termination_date_val = row.get("termination_date") if "termination_date" in df.columns else None
-        termination_date = parse_date(termination_date_val)
-
-        records.append({
-            "hr_code": str(row.get("hr_code")),
-            "dataset_id": dataset_id,
-            "full_name": row.get("full_name"),
-            "structure_name": row.get("structure_name"),
-            "position": row.get("position"),
-            "status": row.get("status", "Active"),
-            "manager_id": str(row.get("manager_id")) if pd.notnull(row.get("manager_id")) else None,
-            "tenure": float(row.get("tenure")) if pd.notnull(row.get("tenure")) else 0,
-            "employee_cost": float(row.get("employee_cost")) if pd.notnull(row.get("employee_cost")) else None,
-            "report_date": report_date,
-            "termination_date": termination_date,
-            "additional_data": row.get("additional_data") if isinstance(row.get("additional_data"), dict) else None,
-        })
+    # The database load runs as a tracked job; poll /employees/hydration/status
+    hr_data_hydration_service.start(dataset_id, records)
+    return dataset_id
 
-    if records:
-        # Use PostgreSQL INSERT ... ON CONFLICT DO NOTHING to handle duplicates gracefully
-        # Batch inserts to avoid exceeding PostgreSQL's parameter limit (32,767)
-        from sqlalchemy.dialects.postgresql import insert as pg_insert
-        BATCH_SIZE = 500  # 500 records * ~12 columns = ~6000 params per batch (safe margin)
 
-        for i in range(0, len(records), BATCH_SIZE):
-            batch = records[i:i + BATCH_SIZE]
-            stmt = pg_insert(HRDataInput).values(batch).on_conflict_do_nothing(
-                index_elements=['hr_code', 'dataset_id']
-            )
-            await db.execute(stmt)
+@router.get("/hydration/status")
+async def get_hydration_status(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Progress of loading the active dataset into the HR data table.
+    """
+    dataset_id = await get_active_dataset_id(db)
+    if not dataset_id:
+        return {"dataset_id": None, "status": "idle", "progress": 0}
 
-        await db.commit()
+    job = hr_data_hydration_service.get_job(dataset_id)
+    if job:
+        return job.to_dict()
 
-    return dataset_id
+    existing_count = await db.execute(
+        select(func.count()).select_from(HRDataInput).where(HRDataInput.dataset_id == dataset_id)
+    )
+    rows = existing_count.scalar_one()
+    return {
+        "dataset_id": dataset_id,
+        "status": "complete" if rows > 0 else "idle",
+        "progress": 100 if rows > 0 else 0,
+        "rows_total": rows,
+    }
 
 
 @router.get("/", response_model=List[EmployeeRecord])
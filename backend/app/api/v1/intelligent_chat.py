@@ -104,7 +104,7 @@ async def websocket_chat(
 
     Receive streaming responses as JSON:
     - {"type": "thinking", "content": "Thinking..."} - AI is processing
-    - {"type": "token", "content": "word"} - Streamed token
+    - {"type": "token", "content": "text"} - Text delta, sent as the model generates it
     - {"type": "done"} - Response complete
     - {"type": "error", "error": "message"} - Error occurred
     """
@@ -154,7 +154,7 @@ async def websocket_chat(
                     # Send thinking indicator
                     await ws_manager.send_thinking(websocket)
 
-                    # Stream the response
+                    # Forward deltas as the model generates them
                     async for chunk in service.stream_chat(
                         message=message,
                         session_id=validated_session_id,
@@ -163,8 +163,6 @@ async def websocket_chat(
                     ):
                         if chunk:
                             await ws_manager.send_token(websocket, chunk)
-                            # Small delay to prevent overwhelming the client
-                            await asyncio.sleep(0.01)
 
                     await ws_manager.send_done(websocket)
 
@@ -206,6 +204,7 @@ async def websocket_chat_with_tools(
     - {"type": "state", "state": "thinking"} - Agent state change
     - {"type": "tool_call", "tool": "count_employees", "arguments": {...}} - Tool being called
     - {"type": "tool_result", "tool": "count_employees", "success": true, "preview": "..."} - Tool result
+    - {"type": "tool_batch", "tools": 3, "parallel": true, "wall_time_ms": 120, "serial_time_ms": 310} - Timing of one iteration's tool calls
     - {"type": "token", "content": "word"} - Streamed response token
     - {"type": "done", "full_response": "..."} - Response complete
     - {"type": "error", "error": "message"} - Error occurred
@@ -14,6 +14,7 @@ from sqlalchemy import select, desc, func
 from typing import List, Dict, Any, Optional
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
+import numpy as np
 
 from app.api.deps import get_current_user, get_db
 from app.api.helpers import get_latest_employee_by_hr_code, get_latest_churn_output, extract_employee_values
@@ -560,7 +561,8 @@ async def compare_treatment_scenarios(
     """
     Compare multiple treatment scenarios for an employee.
 
-    Useful for side-by-side comparison of different treatment options.
+    Useful for side-by-side comparison of different treatment options. The
+    baseline and all treatments are scored by the ML model in a single pass.
     """
 
     if len(treatment_ids) > 5:
@@ -569,30 +571,33 @@ async def compare_treatment_scenarios(
             detail="Maximum 5 treatments can be compared at once"
         )
 
-    scenarios = []
+    try:
+        results = await treatment_validation_service.compare_treatments_ml(
+            db=db,
+            employee_hr_code=employee_id,
+            treatment_ids=treatment_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-    for treatment_id in treatment_ids:
-        try:
-            result = await treatment_validation_service.apply_treatment_simulation(
-                db=db,
-                employee_hr_code=employee_id,
-                treatment_id=treatment_id
-            )
-            scenarios.append({
-                "treatment_id": treatment_id,
-                "treatment_name": result['treatment_name'],
-                "treatment_cost": result['treatment_cost'],
-                "eltv_gain": result['treatment_effect_eltv'],
-                "churn_reduction": result['pre_churn_probability'] - result['post_churn_probability'],
-                "roi": result['roi'] if isinstance(result['roi'], (int, float)) else 0,
-                "post_eltv": result['eltv_post_treatment'],
-                "survival_probabilities": result['new_survival_probabilities']
-            })
-        except ValueError:
+    scenarios = []
+    for result in results:
+        if 'error' in result:
             scenarios.append({
-                "treatment_id": treatment_id,
+                "treatment_id": result['treatment_id'],
                 "error": "Treatment not found"
             })
+            continue
+        scenarios.append({
+            "treatment_id": result['treatment_id'],
+            "treatment_name": result['treatment_name'],
+            "treatment_cost": result['treatment_cost'],
+            "eltv_gain": result['treatment_effect_eltv'],
+            "churn_reduction": result['pre_churn_probability'] - result['post_churn_probability'],
+            "roi": result['roi'],
+            "post_eltv": result['eltv_post_treatment'],
+            "survival_probabilities": result['new_survival_probabilities']
+        })
 
     # Sort by ROI (highest first)
     scenarios.sort(key=lambda x: x.get('roi', 0), reverse=True)
@@ -774,15 +779,11 @@ async def get_roi_dashboard(
     early_effectiveness = await roi_dashboard_service.get_realized_effectiveness(db)
     early_effectiveness_rate = early_effectiveness if early_effectiveness is not None else DEFAULT_EFFECTIVENESS_RATE
 
-    # Calculate metrics per employee
-    employee_metrics = []
-    department_data = {}
-
+    # Collect per-employee inputs, applying the risk level filter
+    selected = []
     for emp in employees:
         churn_data = churn_outputs.get(emp.hr_code)
         churn_prob = float(churn_data.resign_proba) if churn_data else 0.3
-        salary = float(emp.employee_cost) if emp.employee_cost else 50000
-        tenure = float(emp.tenure) if emp.tenure else 0
 
         # Apply risk level filter
         if risk_level_filter:
@@ -793,49 +794,45 @@ async def get_roi_dashboard(
             elif risk_level_filter == 'low' and churn_prob >= MEDIUM_RISK_THRESHOLD:
                 continue
 
-        # Determine risk level
-        if churn_prob >= HIGH_RISK_THRESHOLD:
-            risk_level = 'high'
-        elif churn_prob >= MEDIUM_RISK_THRESHOLD:
-            risk_level = 'medium'
-        else:
-            risk_level = 'low'
+        selected.append((emp, churn_prob))
 
-        # Calculate ELTV
-        position_level = eltv_service.estimate_position_level(
-            position=emp.position,
-            salary=salary,
-            tenure=tenure
-        )
+    churn_probs = np.array([churn_prob for _, churn_prob in selected], dtype=float)
+    salaries = np.array([float(emp.employee_cost) if emp.employee_cost else 50000 for emp, _ in selected], dtype=float)
+    tenures = np.array([float(emp.tenure) if emp.tenure else 0 for emp, _ in selected], dtype=float)
+    position_levels = eltv_service.estimate_position_levels(
+        [emp.position for emp, _ in selected], salaries.tolist()
+    )
 
-        eltv_result = eltv_service.calculate_eltv(
-            annual_salary=salary,
-            churn_probability=churn_prob,
-            tenure_years=tenure,
-            position_level=position_level
-        )
+    # ELTV for the whole workforce, with and without treatment, in two matrix passes
+    # Potential recovery uses the data-driven effectiveness rate
+    eltv_batch = eltv_service.calculate_eltv_batch(salaries, churn_probs, tenures, position_levels)
+    treated_churn = np.maximum(0.05, churn_probs * (1 - early_effectiveness_rate))
+    eltv_treated = eltv_service.calculate_eltv_batch(salaries, treated_churn, tenures, position_levels)
+    recovery_potential = eltv_treated.eltv - eltv_batch.eltv
+    risk_levels = np.select(
+        [churn_probs >= HIGH_RISK_THRESHOLD, churn_probs >= MEDIUM_RISK_THRESHOLD],
+        ['high', 'medium'],
+        default='low'
+    )
 
-        # Calculate potential recovery using data-driven effectiveness rate
-        treated_churn = max(0.05, churn_prob * (1 - early_effectiveness_rate))
-        eltv_treated = eltv_service.calculate_eltv(
-            annual_salary=salary,
-            churn_probability=treated_churn,
-            tenure_years=tenure,
-            position_level=position_level
-        )
+    # Calculate metrics per employee
+    employee_metrics = []
+    department_data = {}
 
-        recovery_potential = eltv_treated.eltv - eltv_result.eltv
+    for idx, (emp, churn_prob) in enumerate(selected):
+        risk_level = str(risk_levels[idx])
+        eltv = float(eltv_batch.eltv[idx])
+        recovery = float(recovery_potential[idx])
 
         employee_metrics.append({
             'hr_code': emp.hr_code,
             'department': emp.structure_name or 'Unknown',
             'churn_prob': churn_prob,
             'risk_level': risk_level,
-            'eltv': eltv_result.eltv,
-            'eltv_at_risk': eltv_result.eltv if risk_level == 'high' else 0,
-            'recovery_potential': recovery_potential if risk_level in ('high', 'medium') else 0,
-            'salary': salary,
-            'survival_probs': eltv_result.survival_probabilities
+            'eltv': eltv,
+            'eltv_at_risk': eltv if risk_level == 'high' else 0,
+            'recovery_potential': recovery if risk_level in ('high', 'medium') else 0,
+            'salary': float(salaries[idx]),
         })
 
         # Aggregate by department
@@ -851,9 +848,9 @@ async def get_roi_dashboard(
         department_data[dept]['employees'].append(emp.hr_code)
         department_data[dept]['churn_probs'].append(churn_prob)
         if risk_level == 'high':
-            department_data[dept]['total_eltv_at_risk'] += eltv_result.eltv
+            department_data[dept]['total_eltv_at_risk'] += eltv
         if risk_level in ('high', 'medium'):
-            department_data[dept]['total_recovery'] += recovery_potential
+            department_data[dept]['total_recovery'] += recovery
 
     # Build portfolio summary
     total_employees = len(employee_metrics)
@@ -941,46 +938,37 @@ async def get_roi_dashboard(
     timeline_projections = []
     current_date = date.today()
 
-    # Get average survival probabilities across high-risk employees
-    high_risk_employees = [e for e in employee_metrics if e['risk_level'] == 'high']
+    # Survival of every employee per month comes straight from the float32 survival matrix
+    eltv_values = eltv_batch.eltv
+    treatable = np.isin(risk_levels, ('high', 'medium'))
+    total_eltv = float(eltv_values.sum())
 
     for month_idx in range(projection_months):
-        month_key = f"month_{month_idx + 1}"
         month_date = current_date + relativedelta(months=month_idx)
         month_str = month_date.strftime("%Y-%m")
 
-        # Calculate baseline ELTV (without treatment)
-        baseline_eltv = 0
-        treated_eltv = 0
-        expected_departures_baseline = 0
-        expected_departures_treated = 0
-
-        for emp in employee_metrics:
-            survival_prob = emp['survival_probs'].get(month_key, 0.5)
-            emp_eltv = emp['eltv']
-
-            baseline_eltv += emp_eltv * survival_prob
-
-            # With treatment: use data-driven effectiveness rate
-            if emp['risk_level'] in ('high', 'medium'):
-                improved_survival = min(1.0, survival_prob + (1 - survival_prob) * effectiveness_rate)
-                treated_eltv += emp_eltv * improved_survival
-            else:
-                treated_eltv += emp_eltv * survival_prob
-
-            # Expected departures
-            if survival_prob < 0.5:
-                expected_departures_baseline += 1
-            if emp['risk_level'] in ('high', 'medium'):
-                improved_survival = min(1.0, survival_prob + (1 - survival_prob) * effectiveness_rate)
-                if improved_survival < 0.5:
-                    expected_departures_treated += 1
-            else:
-                if survival_prob < 0.5:
-                    expected_departures_treated += 1
+        if month_idx < eltv_batch.horizon_months:
+            survival_prob = eltv_batch.survival_at(month_idx + 1).astype(float)
+        else:
+            survival_prob = np.full(len(eltv_values), 0.5)
+
+        # With treatment: use data-driven effectiveness rate
+        improved_survival = np.where(
+            treatable,
+            np.minimum(1.0, survival_prob + (1 - survival_prob) * effectiveness_rate),
+            survival_prob
+        )
+
+        # Calculate baseline ELTV (without treatment) and treated ELTV
+        baseline_eltv = float(eltv_values @ survival_prob)
+        treated_eltv = float(eltv_values @ improved_survival)
+
+        # Expected departures
+        expected_departures_baseline = int(np.count_nonzero(survival_prob < 0.5))
+        expected_departures_treated = int(np.count_nonzero(improved_survival < 0.5))
 
         # Cumulative metrics
-        cumulative_loss = sum(e['eltv'] for e in employee_metrics) - baseline_eltv
+        cumulative_loss = total_eltv - baseline_eltv
         cumulative_recovery = treated_eltv - baseline_eltv
 
         timeline_projections.append(MonthlyProjection(
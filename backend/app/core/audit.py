@@ -1,7 +1,10 @@
 """
 Audit Logging System for ChurnVision Enterprise
 
-Tracks all sensitive operations for compliance and security.
+Tracks all sensitive operations for compliance and security. While the
+application is running, entries are queued to the background audit sink
+(app/core/audit_sink.py) and written in batches; otherwise (scripts, tests)
+they are committed on the caller's session.
 """
 
 import json
@@ -11,6 +14,7 @@ from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.audit_sink import audit_sink
 from app.db.base_class import Base
 
 
@@ -45,6 +49,27 @@ class AuditLog(Base):
         return f"<AuditLog {self.id}: {self.username} - {self.action}>"
 
 
+def _audit_row(entry: AuditLog) -> Dict[str, Any]:
+    """Column values of an unsaved entry, keyed by audit_logs column name."""
+    return {
+        "timestamp": entry.timestamp,
+        "user_id": entry.user_id,
+        "username": entry.username,
+        "tenant_id": entry.tenant_id,
+        "action": entry.action,
+        "resource_type": entry.resource_type,
+        "resource_id": entry.resource_id,
+        "method": entry.method,
+        "endpoint": entry.endpoint,
+        "ip_address": entry.ip_address,
+        "user_agent": entry.user_agent,
+        "status_code": entry.status_code,
+        "duration_ms": entry.duration_ms,
+        "metadata": entry.log_metadata,
+        "error_message": entry.error_message,
+    }
+
+
 class AuditLogger:
     """Service for creating audit log entries"""
 
@@ -87,7 +112,7 @@ class AuditLogger:
             error_message: Error message if action failed
 
         Returns:
-            Created AuditLog instance
+            Created AuditLog instance (not yet flushed when queued to the sink)
         """
         log_entry = AuditLog(
             timestamp=datetime.utcnow(),
@@ -107,6 +132,10 @@ class AuditLogger:
             error_message=error_message
         )
 
+        if audit_sink.running:
+            await audit_sink.submit(_audit_row(log_entry))
+            return log_entry
+
         try:
             db.add(log_entry)
             await db.commit()
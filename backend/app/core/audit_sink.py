@@ -0,0 +1,216 @@
+"""
+Background audit log sink for ChurnVision Enterprise.
+
+AuditLogger.log hands rows to this sink instead of committing on the
+caller's session, so request paths no longer pay an extra commit per audit
+event and an audit failure can no longer roll back the caller's work.
+
+Rows wait in a bounded in-memory queue and are written by one task in
+multi-row INSERT batches, flushed when AUDIT_BATCH_SIZE rows are waiting or
+AUDIT_FLUSH_INTERVAL_SECONDS after the first one arrived. When the queue is
+full the caller is held for up to AUDIT_ENQUEUE_TIMEOUT_MS (backpressure),
+after which the event overflows. Overflowing events, and batches that fail
+to insert, are appended to a JSON-lines spill file (replayed on the next
+start) or dropped, per AUDIT_OVERFLOW_POLICY. The shutdown manager flushes
+the queue before the database engine is disposed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.metrics import AUDIT_EVENTS, AUDIT_FLUSH_SECONDS, AUDIT_QUEUE_DEPTH
+
+logger = logging.getLogger("churnvision.audit")
+
+# Stops the writer once everything queued before it has been written
+_STOP = object()
+
+OVERFLOW_SPILL = "spill"
+OVERFLOW_DROP = "drop"
+
+
+def _encode_row(row: Dict[str, Any]) -> str:
+    return json.dumps({
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row.items()
+    })
+
+
+def _decode_row(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    if row.get("timestamp"):
+        row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+class AuditSink:
+    """Bounded queue of audit rows written in batches by a background task."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        enqueue_timeout: Optional[float] = None,
+        overflow_policy: Optional[str] = None,
+        spill_path: Optional[str] = None,
+    ):
+        self._session_factory = session_factory
+        self.max_queue = max_queue or settings.AUDIT_QUEUE_MAX_SIZE
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        self.enqueue_timeout = (
+            enqueue_timeout if enqueue_timeout is not None else settings.AUDIT_ENQUEUE_TIMEOUT_MS / 1000
+        )
+        self.overflow_policy = overflow_policy or settings.AUDIT_OVERFLOW_POLICY
+        self.spill_path = Path(spill_path or settings.AUDIT_SPILL_PATH)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+
+    @property
+    def running(self) -> bool:
+        """Whether submit() currently accepts rows."""
+        return self._accepting
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.session import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    def start(self) -> None:
+        """Start the writer task (replays any spill file first)."""
+        if self._accepting:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._accepting = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Audit sink started (batch={self.batch_size}, interval={self.flush_interval}s, "
+            f"queue={self.max_queue}, overflow={self.overflow_policy})"
+        )
+
+    async def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue one audit row (audit_logs column names as keys).
+
+        Returns False if the row overflowed and was spilled or dropped.
+        """
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self._overflow([row], "queue full")
+                return False
+        AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    async def close(self) -> None:
+        """Stop accepting rows and write everything already queued."""
+        if not self._accepting:
+            return
+        self._accepting = False
+        await self._queue.put(_STOP)
+        try:
+            await self._task
+        except Exception as e:
+            logger.error(f"Audit sink writer failed during shutdown: {e}")
+        self._task = None
+        logger.info("Audit sink flushed and stopped")
+
+    async def _run(self) -> None:
+        await self._replay_spill()
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if row is _STOP:
+                    stop = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+            if stop:
+                return
+
+    async def _flush(self, batch: List[Dict[str, Any]], outcome: str = "written") -> bool:
+        from app.core.audit import AuditLog
+
+        start = time.perf_counter()
+        try:
+            async with self._new_session() as db:
+                # executemany: sent as multi-row INSERTs by the driver
+                await db.execute(insert(AuditLog.__table__), batch)
+                await db.commit()
+            AUDIT_EVENTS.labels(outcome=outcome).inc(len(batch))
+            return True
+        except Exception as e:
+            logger.error(f"Audit batch of {len(batch)} rows failed to insert: {e}")
+            self._overflow(batch, "insert failed")
+            return False
+        finally:
+            AUDIT_FLUSH_SECONDS.observe(time.perf_counter() - start)
+            if self._queue is not None:
+                AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _overflow(self, rows: List[Dict[str, Any]], reason: str) -> None:
+        if self.overflow_policy == OVERFLOW_SPILL:
+            try:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    f.writelines(_encode_row(row) + "\n" for row in rows)
+                AUDIT_EVENTS.labels(outcome="spilled").inc(len(rows))
+                logger.warning(f"Spilled {len(rows)} audit events to {self.spill_path} ({reason})")
+                return
+            except OSError as e:
+                logger.error(f"Could not spill audit events to {self.spill_path}: {e}")
+        AUDIT_EVENTS.labels(outcome="dropped").inc(len(rows))
+        logger.warning(f"Dropped {len(rows)} audit events ({reason})")
+
+    async def _replay_spill(self) -> None:
+        """Insert events spilled by an earlier run; failures are spilled again."""
+        if not self.spill_path.exists():
+            return
+        replay_path = self.spill_path.with_suffix(self.spill_path.suffix + ".replay")
+        try:
+            os.replace(self.spill_path, replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                rows = [_decode_row(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read audit spill file: {e}")
+            return
+
+        logger.info(f"Replaying {len(rows)} spilled audit events")
+        for start in range(0, len(rows), self.batch_size):
+            await self._flush(rows[start:start + self.batch_size], outcome="replayed")
+        replay_path.unlink(missing_ok=True)
+
+
+audit_sink = AuditSink()
@@ -1,25 +1,50 @@
 """
 Caching layer for ChurnVision Enterprise.
-Uses Redis for distributed caching with fallback to in-memory cache.
+Uses a per-worker in-memory L1 in front of Redis for distributed caching,
+with fallback to the in-memory cache alone when Redis is unavailable.
 """
 
 import asyncio
+import fnmatch
 import functools
 import hashlib
+import heapq
 import json
 import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any, Callable, Optional, TypeVar, Union
+from typing import Any, Awaitable, Callable, Optional, TypeVar, Union
 
 from app.core.config import settings
+from app.core.metrics import CACHE_INVALIDATIONS, TierHitRatio
 
 logger = logging.getLogger("churnvision.cache")
 
+# Per-dataset version counters embedded in dataset-scoped keys
+DATASET_VERSION_PREFIX = "cache_version:dataset"
+
+# Keys per SCAN page and per UNLINK call in RedisCache.clear_pattern
+SCAN_BATCH_SIZE = 500
+
 T = TypeVar("T")
 
 
 class CacheBackend:
-    """Base class for cache backends."""
+    """
+    Base class for cache backends.
+
+    Backends implement string get/set; get_or_compute layers single-flight
+    loading and stale-while-revalidate on top of them, so it works the same
+    for every backend.
+    """
+
+    def __init__(self) -> None:
+        # key -> in-flight load, shared by every concurrent caller
+        self._inflight: dict[str, asyncio.Task] = {}
 
     async def get(self, key: str) -> Optional[str]:
         raise NotImplementedError
@@ -36,78 +61,235 @@ class CacheBackend:
     async def clear_pattern(self, pattern: str) -> int:
         raise NotImplementedError
 
+    async def incr(self, key: str) -> int:
+        """Atomically increment an integer counter (created at 0) and return it."""
+        raise NotImplementedError
+
+    async def lru_touch(self, index: str, key: str) -> None:
+        """Mark key as just used in the named LRU index."""
+        raise NotImplementedError
+
+    async def lru_evict(self, index: str, max_entries: int) -> list[str]:
+        """
+        Delete the least recently touched keys of an LRU index beyond
+        max_entries and return them.
+        """
+        raise NotImplementedError
+
     async def close(self) -> None:
         pass
 
+    async def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int = 0,
+        refresh_loader: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, computing it with loader on a miss.
+
+        Concurrent misses for the same key share one loader call. For stale_ttl
+        seconds after the value stops being fresh it is still returned
+        immediately while a single background refresh recomputes it (using
+        refresh_loader if given, e.g. one that opens its own DB session).
+
+        Values are stored as JSON, so loader must return JSON-serialisable data.
+        """
+        raw = await self.get(key)
+        if raw is not None:
+            try:
+                envelope = json.loads(raw)
+                value, fresh_until = envelope["v"], envelope["f"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                logger.warning(f"Invalid cached value for {key}")
+            else:
+                stale = fresh_until is not None and time.time() >= fresh_until
+                if stale and key not in self._inflight:
+                    self._start_load(key, refresh_loader or loader, ttl, stale_ttl)
+                return value
+
+        task = self._inflight.get(key) or self._start_load(key, loader, ttl, stale_ttl)
+        # A cancelled caller must not cancel the load other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _start_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+    ) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, loader, ttl, stale_ttl))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish_load(key, t))
+        return task
+
+    def _finish_load(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache load for {key} failed: {task.exception()}")
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+    ) -> Any:
+        value = await loader()
+        envelope = {"v": value, "f": time.time() + ttl if ttl else None}
+        try:
+            await self.set(key, json.dumps(envelope, default=str), ttl + stale_ttl)
+        except Exception as e:
+            logger.warning(f"Failed to cache result for {key}: {e}")
+        return value
+
+
+@dataclass
+class _Entry:
+    value: str
+    expires_at: Optional[float]
+
+
+class _Shard:
+    """One LRU partition: an OrderedDict in recency order plus an expiry heap."""
+
+    __slots__ = ("lock", "entries", "expiries", "capacity")
+
+    def __init__(self, capacity: int):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # (expires_at, key); entries whose key was rewritten or deleted are
+        # skipped when popped
+        self.expiries: list[tuple[float, str]] = []
+        self.capacity = capacity
+
+    def purge_expired(self, now: float) -> None:
+        expiries = self.expiries
+        while expiries and expiries[0][0] <= now:
+            expires_at, key = heapq.heappop(expiries)
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                del self.entries[key]
+        # Rewrites leave dead heap items behind; rebuild when they dominate
+        if len(expiries) > 2 * len(self.entries) + 64:
+            self.expiries = [
+                (entry.expires_at, key) for key, entry in self.entries.items()
+                if entry.expires_at is not None
+            ]
+            heapq.heapify(self.expiries)
+
 
 class InMemoryCache(CacheBackend):
     """
-    Simple in-memory cache for single-instance deployments.
-    Not suitable for production multi-instance deployments.
+    In-process LRU cache with per-key TTL for single-instance deployments.
+    Not suitable for production multi-instance deployments on its own.
+
+    Keys are spread over shards, each an OrderedDict kept in recency order
+    with its own lock and expiry heap, so get/set/delete are O(1) (expiry is
+    amortised O(log n)) and never scan the whole cache. Critical sections
+    never await, so plain locks are enough and also make the cache safe to
+    use from worker threads. max_size is split evenly between shards, which
+    makes the LRU order per shard.
+
+    Counters from incr() are kept apart from the LRU entries so that eviction
+    can never reset them.
     """
 
-    def __init__(self, max_size: int = 1000):
-        self._cache: dict[str, tuple[str, Optional[float]]] = {}
+    def __init__(self, max_size: int = 1000, shards: int = 16):
+        super().__init__()
         self._max_size = max_size
-        self._lock = asyncio.Lock()
-
-    async def _cleanup_expired(self) -> None:
-        """Remove expired entries."""
-        current_time = asyncio.get_event_loop().time()
-        expired_keys = [
-            key for key, (_, expiry) in self._cache.items()
-            if expiry and expiry < current_time
-        ]
-        for key in expired_keys:
-            del self._cache[key]
+        n_shards = max(1, min(shards, max_size))
+        capacity = -(-max_size // n_shards)
+        self._shards = [_Shard(capacity) for _ in range(n_shards)]
+        self._counters: dict[str, int] = {}
+        self._counter_lock = threading.Lock()
+        self._lru_indexes: dict[str, "OrderedDict[str, None]"] = {}
+        self._lru_lock = threading.Lock()
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
 
     async def get(self, key: str) -> Optional[str]:
-        async with self._lock:
-            await self._cleanup_expired()
-            if key in self._cache:
-                value, expiry = self._cache[key]
-                current_time = asyncio.get_event_loop().time()
-                if expiry is None or expiry > current_time:
-                    return value
-                del self._cache[key]
-            return None
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                counter = self._counters.get(key)
+                return str(counter) if counter is not None else None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                del shard.entries[key]
+                return None
+            shard.entries.move_to_end(key)
+            return entry.value
 
     async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
-        async with self._lock:
-            # Enforce max size
-            if len(self._cache) >= self._max_size:
-                await self._cleanup_expired()
-                if len(self._cache) >= self._max_size:
-                    # Remove oldest entry
-                    oldest_key = next(iter(self._cache))
-                    del self._cache[oldest_key]
-
-            expiry = None
-            if ttl:
-                expiry = asyncio.get_event_loop().time() + ttl
-
-            self._cache[key] = (value, expiry)
-            return True
+        shard = self._shard(key)
+        now = time.monotonic()
+        expires_at = now + ttl if ttl else None
+        with shard.lock:
+            shard.entries[key] = _Entry(value, expires_at)
+            shard.entries.move_to_end(key)
+            if expires_at is not None:
+                heapq.heappush(shard.expiries, (expires_at, key))
+            shard.purge_expired(now)
+            while len(shard.entries) > shard.capacity:
+                shard.entries.popitem(last=False)
+        return True
 
     async def delete(self, key: str) -> bool:
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+        shard = self._shard(key)
+        with self._counter_lock:
+            had_counter = self._counters.pop(key, None) is not None
+        with shard.lock:
+            return (shard.entries.pop(key, None) is not None) or had_counter
 
     async def exists(self, key: str) -> bool:
         return await self.get(key) is not None
 
     async def clear_pattern(self, pattern: str) -> int:
-        """Clear keys matching a pattern (simple prefix matching)."""
-        async with self._lock:
-            # Convert Redis pattern to simple prefix (e.g., "user:*" -> "user:")
-            prefix = pattern.rstrip("*")
-            keys_to_delete = [k for k in self._cache if k.startswith(prefix)]
-            for key in keys_to_delete:
-                del self._cache[key]
-            return len(keys_to_delete)
+        """Clear keys matching a Redis-style glob pattern (e.g. "user:*")."""
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                matches = [k for k in shard.entries if fnmatch.fnmatchcase(k, pattern)]
+                for key in matches:
+                    del shard.entries[key]
+                removed += len(matches)
+        with self._counter_lock:
+            matches = [k for k in self._counters if fnmatch.fnmatchcase(k, pattern)]
+            for key in matches:
+                del self._counters[key]
+            removed += len(matches)
+        return removed
+
+    async def incr(self, key: str) -> int:
+        with self._counter_lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+    async def lru_touch(self, index: str, key: str) -> None:
+        with self._lru_lock:
+            keys = self._lru_indexes.setdefault(index, OrderedDict())
+            keys[key] = None
+            keys.move_to_end(key)
+
+    async def lru_evict(self, index: str, max_entries: int) -> list[str]:
+        with self._lru_lock:
+            keys = self._lru_indexes.get(index)
+            evicted = []
+            while keys and len(keys) > max_entries:
+                evicted.append(keys.popitem(last=False)[0])
+        for key in evicted:
+            await self.delete(key)
+        return evicted
 
 
 class RedisCache(CacheBackend):
@@ -116,6 +298,7 @@ class RedisCache(CacheBackend):
     """
 
     def __init__(self, url: str):
+        super().__init__()
         self._url = url
         self._redis = None
         self._connected = False
@@ -191,21 +374,231 @@ class RedisCache(CacheBackend):
     async def clear_pattern(self, pattern: str) -> int:
         if not await self._ensure_connected():
             return 0
+        # SCAN walks the keyspace incrementally and UNLINK frees memory off
+        # the main thread, so neither blocks Redis the way KEYS/DEL do
+        removed = 0
+        batch: list[str] = []
         try:
-            keys = await self._redis.keys(pattern)
-            if keys:
-                return await self._redis.delete(*keys)
-            return 0
+            async for key in self._redis.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    removed += await self._redis.unlink(*batch)
+                    batch = []
+            if batch:
+                removed += await self._redis.unlink(*batch)
+            return removed
         except Exception as e:
             logger.error(f"Redis clear_pattern error: {e}")
+            return removed
+
+    async def incr(self, key: str) -> int:
+        if not await self._ensure_connected():
+            return 0
+        try:
+            return await self._redis.incr(key)
+        except Exception as e:
+            logger.error(f"Redis INCR error: {e}")
             return 0
 
+    async def lru_touch(self, index: str, key: str) -> None:
+        # A sorted set scored by last use; ZPOPMIN yields the coldest keys
+        if not await self._ensure_connected():
+            return
+        try:
+            await self._redis.zadd(index, {key: time.time()})
+        except Exception as e:
+            logger.error(f"Redis ZADD error: {e}")
+
+    async def lru_evict(self, index: str, max_entries: int) -> list[str]:
+        if not await self._ensure_connected():
+            return []
+        try:
+            excess = await self._redis.zcard(index) - max_entries
+            if excess <= 0:
+                return []
+            evicted = [key for key, _ in await self._redis.zpopmin(index, excess)]
+            if evicted:
+                await self._redis.unlink(*evicted)
+            return evicted
+        except Exception as e:
+            logger.error(f"Redis LRU eviction error: {e}")
+            return []
+
+    async def publish(self, channel: str, message: str) -> bool:
+        if not await self._ensure_connected():
+            return False
+        try:
+            await self._redis.publish(channel, message)
+            return True
+        except Exception as e:
+            logger.error(f"Redis PUBLISH error: {e}")
+            return False
+
+    async def pubsub(self):
+        """A new pub/sub connection, or None if Redis is unavailable."""
+        if not await self._ensure_connected():
+            return None
+        return self._redis.pubsub(ignore_subscribe_messages=True)
+
     async def close(self) -> None:
         if self._redis:
             await self._redis.close()
             self._connected = False
 
 
+class TieredCache(CacheBackend):
+    """
+    Per-worker L1 (InMemoryCache) in front of a shared L2 (Redis).
+
+    Reads are served from L1 when possible and fill it from L2 otherwise.
+    Every write, delete or pattern clear is published on a Redis channel so
+    the other workers drop their L1 copies; L1 entries also expire after
+    l1_ttl so a missed message cannot keep a value stale for long. If Redis
+    is unavailable the cache keeps working as L1 only.
+    """
+
+    def __init__(
+        self,
+        l2: "RedisCache",
+        l1: Optional[InMemoryCache] = None,
+        l1_ttl: int = 30,
+        channel: str = "churnvision:cache:invalidate",
+    ):
+        super().__init__()
+        self.l1 = l1 or InMemoryCache()
+        self.l2 = l2
+        self._l1_ttl = l1_ttl
+        self._channel = channel
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._closed = False
+        self.l1_stats = TierHitRatio("l1")
+        self.l2_stats = TierHitRatio("l2")
+
+    def _l1_ttl_for(self, ttl: Optional[int]) -> int:
+        return min(ttl, self._l1_ttl) if ttl else self._l1_ttl
+
+    async def get(self, key: str) -> Optional[str]:
+        self._ensure_listener()
+        value = await self.l1.get(key)
+        self.l1_stats.record(value is not None)
+        if value is not None:
+            return value
+
+        value = await self.l2.get(key)
+        self.l2_stats.record(value is not None)
+        if value is not None:
+            await self.l1.set(key, value, self._l1_ttl)
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        self._ensure_listener()
+        await self.l1.set(key, value, self._l1_ttl_for(ttl))
+        stored = await self.l2.set(key, value, ttl)
+        await self._publish({"k": key})
+        return stored
+
+    async def delete(self, key: str) -> bool:
+        in_l1 = await self.l1.delete(key)
+        in_l2 = await self.l2.delete(key)
+        CACHE_INVALIDATIONS.labels(origin="local").inc()
+        await self._publish({"k": key})
+        return in_l1 or in_l2
+
+    async def exists(self, key: str) -> bool:
+        return await self.get(key) is not None
+
+    async def clear_pattern(self, pattern: str) -> int:
+        cleared_l1 = await self.l1.clear_pattern(pattern)
+        cleared_l2 = await self.l2.clear_pattern(pattern)
+        CACHE_INVALIDATIONS.labels(origin="local").inc()
+        await self._publish({"p": pattern})
+        return max(cleared_l1, cleared_l2)
+
+    async def incr(self, key: str) -> int:
+        value = await self.l2.incr(key)
+        if value:
+            await self.l1.set(key, str(value), self._l1_ttl)
+        else:
+            await self.l1.delete(key)
+        await self._publish({"k": key})
+        return value
+
+    async def lru_touch(self, index: str, key: str) -> None:
+        await self.l2.lru_touch(index, key)
+
+    async def lru_evict(self, index: str, max_entries: int) -> list[str]:
+        evicted = await self.l2.lru_evict(index, max_entries)
+        for key in evicted:
+            await self.l1.delete(key)
+            await self._publish({"k": key})
+        return evicted
+
+    async def _publish(self, message: dict) -> None:
+        message["o"] = self._origin
+        await self.l2.publish(self._channel, json.dumps(message))
+
+    async def apply_invalidation(self, raw: Any) -> None:
+        """Drop the L1 entries named by a pub/sub message from another worker."""
+        try:
+            message = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            logger.warning(f"Ignoring malformed cache invalidation: {raw!r}")
+            return
+        if message.get("o") == self._origin:
+            return
+        if "k" in message:
+            await self.l1.delete(message["k"])
+        elif "p" in message:
+            await self.l1.clear_pattern(message["p"])
+        CACHE_INVALIDATIONS.labels(origin="pubsub").inc()
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None and not self._closed:
+            self._listener = asyncio.ensure_future(self._listen())
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while not self._closed:
+            pubsub = None
+            try:
+                pubsub = await self.l2.pubsub()
+                if pubsub is None:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                    continue
+                await pubsub.subscribe(self._channel)
+                # Messages may have been missed while unsubscribed
+                await self.l1.clear_pattern("*")
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self.apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        await self.l2.close()
+
+
 # Global cache instance
 _cache: Optional[CacheBackend] = None
 
@@ -216,11 +609,16 @@ async def get_cache() -> CacheBackend:
     if _cache is None:
         redis_url = getattr(settings, "REDIS_URL", None)
         if redis_url:
-            _cache = RedisCache(redis_url)
+            redis_cache = RedisCache(redis_url)
             # Test connection
-            try:
-                await _cache._ensure_connected()
-            except Exception:
+            if await redis_cache._ensure_connected():
+                _cache = TieredCache(
+                    redis_cache,
+                    l1=InMemoryCache(max_size=settings.CACHE_L1_MAX_SIZE),
+                    l1_ttl=settings.CACHE_L1_TTL_SECONDS,
+                    channel=settings.CACHE_INVALIDATION_CHANNEL,
+                )
+            else:
                 logger.warning("Redis unavailable, using in-memory cache")
                 _cache = InMemoryCache()
         else:
@@ -229,6 +627,14 @@ async def get_cache() -> CacheBackend:
     return _cache
 
 
+async def close_cache() -> None:
+    """Close the global cache (stops the invalidation listener)."""
+    global _cache
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
+
+
 def cache_key(*args, **kwargs) -> str:
     """Generate a cache key from arguments."""
     key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
@@ -239,24 +645,28 @@ def cached(
     ttl: Union[int, timedelta] = 300,
     prefix: str = "",
     key_builder: Optional[Callable[..., str]] = None,
+    stale_ttl: Union[int, timedelta] = 0,
 ):
     """
     Decorator to cache function results.
 
+    Concurrent calls that miss the cache share a single execution of the
+    function. With stale_ttl, an expired result keeps being served for that
+    long while one background call refreshes it.
+
     Args:
         ttl: Time to live in seconds (or timedelta)
         prefix: Key prefix for namespacing
         key_builder: Custom function to build cache key
+        stale_ttl: Seconds (or timedelta) to serve a stale result while revalidating
 
     Usage:
-        @cached(ttl=60, prefix="dashboard")
+        @cached(ttl=60, prefix="dashboard", stale_ttl=300)
         async def get_dashboard_stats():
             ...
     """
-    if isinstance(ttl, timedelta):
-        ttl_seconds = int(ttl.total_seconds())
-    else:
-        ttl_seconds = ttl
+    ttl_seconds = int(ttl.total_seconds()) if isinstance(ttl, timedelta) else ttl
+    stale_seconds = int(stale_ttl.total_seconds()) if isinstance(stale_ttl, timedelta) else stale_ttl
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @functools.wraps(func)
@@ -269,28 +679,55 @@ def cached(
 
             full_key = f"{prefix}:{func.__name__}:{key}" if prefix else f"{func.__name__}:{key}"
 
-            # Try to get from cache
             cache = await get_cache()
-            cached_value = await cache.get(full_key)
+            return await cache.get_or_compute(
+                full_key,
+                lambda: func(*args, **kwargs),
+                ttl_seconds,
+                stale_ttl=stale_seconds,
+            )
 
-            if cached_value is not None:
-                try:
-                    return json.loads(cached_value)
-                except json.JSONDecodeError:
-                    logger.warning(f"Invalid cached value for {full_key}")
+        return wrapper
+    return decorator
 
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
 
-            try:
-                await cache.set(full_key, json.dumps(result, default=str), ttl_seconds)
-            except Exception as e:
-                logger.warning(f"Failed to cache result: {e}")
+async def get_dataset_version(dataset_id: str) -> int:
+    """Current cache version of a dataset (0 until first bumped)."""
+    cache = await get_cache()
+    value = await cache.get(f"{DATASET_VERSION_PREFIX}:{dataset_id}")
+    try:
+        return int(value) if value is not None else 0
+    except ValueError:
+        return 0
 
-            return result
 
-        return wrapper
-    return decorator
+async def bump_dataset_version(dataset_id: str) -> int:
+    """
+    Move a dataset to a new cache version.
+
+    Every key built by dataset_cache_key embeds the version, so this drops
+    all of the dataset's cached results at once without touching them; the
+    old entries are never read again and expire on their TTL. Call it after
+    the data or predictions behind a dataset have been committed.
+    """
+    cache = await get_cache()
+    version = await cache.incr(f"{DATASET_VERSION_PREFIX}:{dataset_id}")
+    logger.info(f"Dataset {dataset_id} cache version is now {version}")
+    return version
+
+
+async def dataset_cache_key(prefix: str, dataset_id: str, *args, **kwargs) -> str:
+    """
+    Cache key scoped to the current version of a dataset.
+
+    Usage:
+        key = await dataset_cache_key("dept_snapshot", dataset_id, department)
+    """
+    version = await get_dataset_version(dataset_id)
+    key = f"{prefix}:{dataset_id}:v{version}"
+    if args or kwargs:
+        key = f"{key}:{cache_key(*args, **kwargs)}"
+    return key
 
 
 async def invalidate_cache(pattern: str) -> int:
@@ -192,6 +192,37 @@ class Settings(BaseSettings):
     # Optional: Path to CA certificate for Redis TLS verification
     REDIS_TLS_CA_CERT: Optional[str] = None
 
+    # Per-worker L1 cache in front of Redis; invalidations fan out over pub/sub
+    CACHE_L1_MAX_SIZE: int = Field(default=2000, description="Max entries in each worker's in-process cache")
+    CACHE_L1_TTL_SECONDS: int = Field(default=30, description="Longest an entry stays in L1 (bounds staleness if an invalidation is missed)")
+    CACHE_INVALIDATION_CHANNEL: str = Field(default="churnvision:cache:invalidate", description="Redis pub/sub channel for L1 invalidations")
+
+    # Audit log writes are queued and inserted in batches by a background sink
+    AUDIT_QUEUE_MAX_SIZE: int = Field(default=10000, description="Audit events buffered in memory before overflow")
+    AUDIT_BATCH_SIZE: int = Field(default=500, description="Max audit rows per INSERT")
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0, description="Longest an audit event waits before being flushed")
+    AUDIT_ENQUEUE_TIMEOUT_MS: int = Field(default=50, description="How long a full queue blocks the caller before overflowing")
+    AUDIT_OVERFLOW_POLICY: str = Field(default="spill", description="What to do with events that overflow the queue or fail to insert: 'spill' to disk or 'drop'")
+    AUDIT_SPILL_PATH: str = Field(default="/app/churnvision_data/audit_spill.jsonl", description="JSON-lines file for spilled audit events, replayed on startup")
+
+    # Per-request stage timings (always exported as churnvision_stage_seconds)
+    SERVER_TIMING_ENABLED: bool = Field(default=False, description="Send each request's stage timings back in a Server-Timing response header")
+
+    # Statement timing; slow statements are kept for /admin/slow-queries
+    SLOW_QUERY_THRESHOLD_MS: float = Field(default=200, description="Statements at least this slow are recorded as slow queries")
+    SLOW_QUERY_BUFFER_SIZE: int = Field(default=200, description="Most recent slow queries kept per worker")
+    SLOW_QUERY_EXPLAIN: bool = Field(default=False, description="Fetch the EXPLAIN plan of each new slow SELECT (once per statement)")
+
+    # Event loop health and the shared off-loop executors
+    LOOP_MONITOR_ENABLED: bool = Field(default=True, description="Record event loop lag and log stacks of blocking calls")
+    LOOP_MONITOR_INTERVAL_SECONDS: float = Field(default=0.25, description="Heartbeat interval of the loop lag monitor")
+    LOOP_BLOCK_THRESHOLD_MS: float = Field(default=100, description="Loop stalls at least this long are logged with the blocking stack")
+    EXECUTOR_CPU_WORKERS: Optional[int] = Field(default=None, description="Threads in the shared CPU pool (default: CPU count)")
+    EXECUTOR_IO_WORKERS: int = Field(default=32, description="Threads in the shared blocking I/O pool")
+
+    # Heavy ML libraries load on first use; the default model loads during startup warmup
+    MODEL_WARMUP_ON_STARTUP: bool = Field(default=True, description="Load the default churn model (and xgboost/sklearn) before serving requests")
+
     # Field-level encryption key (for sensitive data like salaries)
     # Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
     ENCRYPTION_KEY: Optional[str] = None
@@ -200,6 +231,19 @@ class Settings(BaseSettings):
     MODELS_DIR: str = Field(default="models", validation_alias=AliasChoices("MODELS_DIR", "CHURNVISION_MODELS_DIR"))
     ARTIFACT_ENCRYPTION_REQUIRED: bool = False
 
+    # Model registry residency (several per-dataset models kept in memory, LRU evicted)
+    MODEL_REGISTRY_MAX_MODELS: int = Field(default=8, description="Max per-dataset model bundles resident per worker")
+    MODEL_REGISTRY_MAX_MEMORY_MB: int = Field(default=1024, description="Memory budget for resident model bundles")
+
+    # Model training runs in a dedicated process pool so it never blocks the event loop
+    TRAINING_USE_PROCESS_POOL: bool = Field(default=True, description="Train models in a separate process (False = in-process)")
+    TRAINING_PROCESS_POOL_WORKERS: int = Field(default=1, description="Concurrent training worker processes")
+
+    # Batch scoring explanations are exact TreeSHAP by default. Opt-in: XGBoost batches
+    # at least this large use approximate (Saabas) contributions, whose top factors can
+    # differ from the exact ones. 0 = always exact.
+    BATCH_APPROX_CONTRIBS_MIN_ROWS: int = Field(default=0, description="Row count at which batch explanations switch to approximate contributions (0 = never)")
+
     # Chatbot / LLM settings
     # Default (local): Gemma 3 4B via Ollama - on-premise, data stays local
     OLLAMA_BASE_URL: str = "http://127.0.0.1:11434"
@@ -209,6 +253,7 @@ class Settings(BaseSettings):
     # OpenAI GPT-5 Mini - most capable general-purpose model
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-5-mini-2025-08-07"
+    OPENAI_BASE_URL: Optional[str] = None  # OpenAI-compatible gateway; None = api.openai.com
 
     # Anthropic Claude Haiku 4.5 - fast and cost-effective for enterprise
     ANTHROPIC_API_KEY: Optional[str] = None
@@ -222,6 +267,29 @@ class Settings(BaseSettings):
     CHATBOT_SYSTEM_PROMPT: str = "You are a helpful AI assistant for ChurnVision Enterprise, an employee churn prediction platform. You help users understand their workforce data, analyze employee turnover patterns, and make data-driven HR decisions."
     LLM_REQUEST_TIMEOUT: int = 300  # seconds - 5min for dev (Gemma 3 slow in Docker, fast on prod with GPU)
 
+    # Pooled provider clients (app/services/ai/llm_clients.py)
+    LLM_MAX_CONCURRENCY_OLLAMA: int = Field(default=4, description="Concurrent generations sent to Ollama (match OLLAMA_NUM_PARALLEL on the server)")
+    LLM_MAX_CONCURRENCY_OPENAI: int = Field(default=16, description="Concurrent requests to OpenAI")
+    LLM_MAX_CONCURRENCY_ANTHROPIC: int = Field(default=16, description="Concurrent requests to Anthropic")
+    LLM_MAX_CONCURRENCY_GOOGLE: int = Field(default=16, description="Concurrent requests to Gemini")
+    LLM_MAX_RETRIES: int = Field(default=2, description="Retries of connection errors and 408/429/5xx responses")
+    LLM_RETRY_BACKOFF_SECONDS: float = Field(default=0.5, description="Base delay of the jittered exponential retry backoff")
+    LLM_RETRY_BACKOFF_MAX_SECONDS: float = Field(default=8.0, description="Longest delay between retries")
+    LLM_KEEPALIVE_SECONDS: float = Field(default=60.0, description="How long idle Ollama connections are kept open")
+
+    # Cached one-off generations (treatments, retention emails, meeting proposals)
+    GENERATION_CACHE_ENABLED: bool = Field(default=True, description="Reuse LLM generations for an unchanged prompt, model and temperature")
+    GENERATION_CACHE_TTL_SECONDS: int = Field(default=7 * 24 * 3600, description="How long a cached generation is kept")
+    GENERATION_CACHE_MAX_ENTRIES: int = Field(default=5000, description="Cached generations kept before the least recently used are evicted")
+
+    # Chat context is gathered concurrently; slow optional pieces (RAG, interview patterns) are dropped
+    CHAT_CONTEXT_BUDGET_SECONDS: float = Field(default=1.5, description="Latency budget for gathering a chat turn's context (0 disables)")
+    CHAT_CONTEXT_PIECE_TIMEOUT_SECONDS: float = Field(default=1.0, description="Longest an optional context piece may take (0 disables)")
+    CHAT_CONTEXT_MAX_SESSIONS: int = Field(default=4, description="Database sessions one chat turn may use at once while gathering context")
+
+    # Tool calls requested in one agent iteration run concurrently, each on its own session
+    AGENT_TOOL_MAX_PARALLEL: int = Field(default=3, description="Tool calls of one agent iteration run at once (1 runs them one after another)")
+
     # PII Masking for Cloud LLM Providers (GDPR/Privacy Compliance)
     # When enabled, employee names, IDs, salaries are masked before sending to cloud LLMs
     # and unmasked in the response. Local providers (Ollama) are never masked.
@@ -3,14 +3,28 @@ CSRF (Cross-Site Request Forgery) protection middleware.
 
 Implements double-submit cookie pattern for API protection.
 Works alongside SameSite cookies for defense-in-depth.
+
+How it works:
+1. On safe requests (GET, HEAD, ...), set a CSRF token in a cookie
+2. On state-changing requests (POST, PUT, DELETE, PATCH):
+   - Verify the CSRF header matches the cookie value
+   - Reject if mismatch or missing
+
+This works because:
+- Same-origin scripts can read the cookie and set the header
+- Cross-origin attackers can't read the cookie (same-origin policy)
+- Even if they can forge a request, they can't set the header value
+
+The checks, and the request body size limits below, are enforced by
+EdgeMiddleware in app/core/http_middleware.py.
 """
 
 import logging
 import secrets
-from typing import Optional, Callable
+from typing import Dict, Optional, Tuple
 
-from fastapi import Request, Response, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request, Response
+from starlette.datastructures import Headers
 
 from app.core.config import settings
 
@@ -47,10 +61,8 @@ def generate_csrf_token() -> str:
     return secrets.token_urlsafe(CSRF_TOKEN_LENGTH)
 
 
-def _is_csrf_exempt(request: Request) -> bool:
-    """Check if request path is exempt from CSRF protection."""
-    path = request.url.path
-
+def is_csrf_exempt(path: str, headers: Headers) -> bool:
+    """Check if a request is exempt from CSRF protection."""
     # Check exempt paths
     if path in CSRF_EXEMPT_PATHS:
         return True
@@ -61,131 +73,49 @@ def _is_csrf_exempt(request: Request) -> bool:
 
     # API calls with Authorization header (Bearer tokens) don't need CSRF
     # as they're not vulnerable to CSRF attacks
-    auth_header = request.headers.get("authorization", "")
+    auth_header = headers.get("authorization", "")
     if auth_header.lower().startswith("bearer "):
         return True
 
     return False
 
 
-class CSRFMiddleware(BaseHTTPMiddleware):
-    """
-    CSRF protection using double-submit cookie pattern.
-
-    How it works:
-    1. On GET requests, set a CSRF token in a cookie
-    2. On state-changing requests (POST, PUT, DELETE, PATCH):
-       - Verify the CSRF header matches the cookie value
-       - Reject if mismatch or missing
-
-    This works because:
-    - Same-origin scripts can read the cookie and set the header
-    - Cross-origin attackers can't read the cookie (same-origin policy)
-    - Even if they can forge a request, they can't set the header value
-    """
+def validate_csrf(headers: Headers, cookies: Dict[str, str]) -> bool:
+    """Validate CSRF token from header matches cookie."""
+    cookie_token = cookies.get(CSRF_COOKIE_NAME)
+    header_token = headers.get(CSRF_HEADER_NAME)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip CSRF for safe methods
-        if request.method in SAFE_METHODS:
-            response = await call_next(request)
-            # Set CSRF cookie on safe requests (so client can use it)
-            self._ensure_csrf_cookie(request, response)
-            return response
-
-        # Skip CSRF for exempt paths
-        if _is_csrf_exempt(request):
-            return await call_next(request)
-
-        # Validate CSRF for state-changing methods in all environments
-        # This is critical security - don't skip even in development
-        if not self._validate_csrf(request):
-            client_host = request.client.host if request.client else 'unknown'
-            logger.warning(
-                f"CSRF validation failed: {request.method} {request.url.path} "
-                f"from {client_host}"
-            )
-            # In development, log but still reject to catch issues early
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="CSRF token validation failed"
-            )
-
-        response = await call_next(request)
-        return response
-
-    def _ensure_csrf_cookie(self, request: Request, response: Response) -> None:
-        """Set CSRF cookie if not already present."""
-        if CSRF_COOKIE_NAME not in request.cookies:
-            token = generate_csrf_token()
-            response.set_cookie(
-                key=CSRF_COOKIE_NAME,
-                value=token,
-                httponly=False,  # Must be readable by JavaScript
-                secure=settings.COOKIE_SECURE,
-                samesite="lax",
-                max_age=3600 * 24,  # 24 hours
-                path="/",
-            )
-
-    def _validate_csrf(self, request: Request) -> bool:
-        """Validate CSRF token from header matches cookie."""
-        cookie_token = request.cookies.get(CSRF_COOKIE_NAME)
-        header_token = request.headers.get(CSRF_HEADER_NAME)
-
-        if not cookie_token or not header_token:
-            return False
-
-        # Constant-time comparison to prevent timing attacks
-        return secrets.compare_digest(cookie_token, header_token)
-
-
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to limit request body size.
+    if not cookie_token or not header_token:
+        return False
+
+    # Constant-time comparison to prevent timing attacks
+    return secrets.compare_digest(cookie_token, header_token)
+
+
+def csrf_cookie_header() -> Tuple[bytes, bytes]:
+    """A raw Set-Cookie header carrying a fresh CSRF token."""
+    response = Response()
+    set_csrf_cookie(response)
+    return response.raw_headers[-1]
+
+
+# Request body limits in bytes (prevents DoS via large payloads)
+DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024  # 10 MB default
+UPLOAD_MAX_BODY_SIZE = 100 * 1024 * 1024  # 100 MB for file uploads
+
+# Paths with larger limits (file uploads)
+LARGE_UPLOAD_PATHS = (
+    "/api/v1/churn/upload",
+    "/api/v1/rag/upload",
+    "/api/v1/data/upload",
+)
 
-    Prevents DoS attacks via large payloads and memory exhaustion.
-    """
 
-    # Default limits in bytes
-    DEFAULT_MAX_SIZE = 10 * 1024 * 1024  # 10 MB default
-    UPLOAD_MAX_SIZE = 100 * 1024 * 1024  # 100 MB for file uploads
-
-    # Paths with larger limits (file uploads)
-    LARGE_UPLOAD_PATHS = {
-        "/api/v1/churn/upload",
-        "/api/v1/rag/upload",
-        "/api/v1/data/upload",
-    }
-
-    def __init__(self, app, max_size: int = DEFAULT_MAX_SIZE):
-        super().__init__(app)
-        self.max_size = max_size
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Determine max size based on path
-        max_size = self.max_size
-        for path in self.LARGE_UPLOAD_PATHS:
-            if request.url.path.startswith(path):
-                max_size = self.UPLOAD_MAX_SIZE
-                break
-
-        # Check Content-Length header
-        content_length = request.headers.get("content-length")
-        if content_length:
-            try:
-                if int(content_length) > max_size:
-                    logger.warning(
-                        f"Request too large: {content_length} bytes "
-                        f"(max: {max_size}) from {request.client.host if request.client else 'unknown'}"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                        detail=f"Request body too large. Maximum size is {max_size // (1024*1024)} MB"
-                    )
-            except ValueError:
-                pass
-
-        return await call_next(request)
+def max_body_size(path: str, default: int = DEFAULT_MAX_BODY_SIZE) -> int:
+    """Largest request body accepted for a path."""
+    if path.startswith(LARGE_UPLOAD_PATHS):
+        return UPLOAD_MAX_BODY_SIZE
+    return default
 
 
 def get_csrf_token(request: Request) -> Optional[str]:
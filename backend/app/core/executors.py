@@ -0,0 +1,104 @@
+"""
+Shared off-loop executors for ChurnVision Enterprise.
+
+Blocking calls made from async code (bcrypt, pandas parsing, SHAP and model
+scoring, vector store queries, file I/O) stall every other request on the
+worker's event loop. Services hand them to one of two shared thread pools
+instead:
+
+    hashed = await run_cpu(get_password_hash, password)
+    results = await run_io(vector_store.search, query=query)
+
+- cpu: sized to the CPU count, for native code that releases the GIL
+  (bcrypt, numpy/pandas, xgboost, SHAP); more threads would only contend
+- io:  larger, for calls that mostly wait (files, ChromaDB, sync clients)
+
+Calls keep the caller's contextvars, so spans and slow-query attribution
+still land on the request that made them. Queue depth, active workers and
+time spent waiting for a worker are exported per pool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import EXECUTOR_ACTIVE, EXECUTOR_QUEUE_DEPTH, EXECUTOR_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class OffloadPool:
+    """A lazily started thread pool with queue-depth metrics."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queued = EXECUTOR_QUEUE_DEPTH.labels(pool=name)
+        self._active = EXECUTOR_ACTIVE.labels(pool=name)
+        self._wait = EXECUTOR_WAIT_SECONDS.labels(pool=name)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f"churnvision-{self.name}",
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run func(*args, **kwargs) on the pool and await its result."""
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        submitted = time.perf_counter()
+
+        def job() -> T:
+            self._queued.dec()
+            self._wait.observe(time.perf_counter() - submitted)
+            self._active.inc()
+            try:
+                return call()
+            finally:
+                self._active.dec()
+
+        self._queued.inc()
+        try:
+            future = self._get_executor().submit(job)
+        except Exception:
+            self._queued.dec()
+            raise
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+cpu_pool = OffloadPool("cpu", settings.EXECUTOR_CPU_WORKERS or os.cpu_count() or 4)
+io_pool = OffloadPool("io", settings.EXECUTOR_IO_WORKERS)
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run CPU-bound, GIL-releasing work off the event loop."""
+    return await cpu_pool.run(func, *args, **kwargs)
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking I/O off the event loop."""
+    return await io_pool.run(func, *args, **kwargs)
+
+
+async def shutdown_executors() -> None:
+    """Wait for running jobs and stop both pools (shutdown callback)."""
+    await asyncio.to_thread(cpu_pool.shutdown)
+    await asyncio.to_thread(io_pool.shutdown)
+    logger.info("Shared executors stopped")
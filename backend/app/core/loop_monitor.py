@@ -0,0 +1,116 @@
+"""
+Event loop lag monitor for ChurnVision Enterprise.
+
+A heartbeat task sleeps for LOOP_MONITOR_INTERVAL_SECONDS and records how
+late it woke up: the scheduling delay every coroutine on the worker saw at
+that moment. A watchdog thread checks the heartbeat; when the loop has not
+come back for LOOP_BLOCK_THRESHOLD_MS it captures the loop thread's stack,
+so the log shows which call was blocking (something that should go through
+app.core.executors).
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import LOOP_BLOCKED, LOOP_LAG_SECONDS
+
+logger = logging.getLogger("churnvision.loop")
+
+# Deepest frames kept from a blocked loop's stack
+STACK_LIMIT = 30
+RECENT_BLOCKS = 20
+
+
+@dataclass
+class BlockedLoop:
+    detected_at: datetime
+    blocked_ms: float
+    stack: str
+
+
+class LoopLagMonitor:
+    """Heartbeat on the event loop plus a watchdog thread outside it."""
+
+    def __init__(self, interval: Optional[float] = None, block_threshold_ms: Optional[float] = None):
+        self.interval = interval or settings.LOOP_MONITOR_INTERVAL_SECONDS
+        self.block_threshold = (block_threshold_ms or settings.LOOP_BLOCK_THRESHOLD_MS) / 1000
+        self.recent_blocks: Deque[BlockedLoop] = deque(maxlen=RECENT_BLOCKS)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._beat = 0
+        self._reported_beat = -1
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="churnvision-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Loop lag monitor started (interval={self.interval}s, block threshold={self.block_threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self._watchdog.join, 1.0)
+        self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            LOOP_LAG_SECONDS.observe(max(0.0, now - expected))
+            self._last_beat = now
+            self._beat += 1
+
+    def _watch(self) -> None:
+        check_every = min(self.block_threshold / 2, self.interval)
+        while not self._stop.wait(check_every):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            beat = self._beat
+            if overdue >= self.block_threshold and beat != self._reported_beat:
+                self._reported_beat = beat
+                self._report(overdue)
+
+    def _report(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else "<no frame>"
+        blocked = BlockedLoop(datetime.now(timezone.utc), round(overdue * 1000, 1), stack)
+        self.recent_blocks.append(blocked)
+        LOOP_BLOCKED.inc()
+        logger.warning(f"Event loop blocked for at least {blocked.blocked_ms:.0f}ms:\n{stack}")
+
+    def blocks(self) -> List[BlockedLoop]:
+        """Recently detected blocks, newest first."""
+        return list(reversed(self.recent_blocks))
+
+
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,160 @@
+"""
+Application Prometheus metrics.
+
+Metrics are registered on the default prometheus_client registry, which the
+Instrumentator in main.py exposes at /metrics alongside the HTTP metrics.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+CACHE_REQUESTS = Counter(
+    "churnvision_cache_requests_total",
+    "Cache lookups by tier and result",
+    ["tier", "result"],
+)
+
+CACHE_HIT_RATIO = Gauge(
+    "churnvision_cache_hit_ratio",
+    "Hit ratio of each cache tier since worker start",
+    ["tier"],
+)
+
+CACHE_INVALIDATIONS = Counter(
+    "churnvision_cache_invalidations_total",
+    "L1 cache invalidations by origin (local or pubsub)",
+    ["origin"],
+)
+
+
+class TierHitRatio:
+    """Hit/miss counters for one cache tier, kept in sync with the Prometheus series."""
+
+    __slots__ = ("tier", "hits", "misses", "_hit_counter", "_miss_counter", "_ratio")
+
+    def __init__(self, tier: str):
+        self.tier = tier
+        self.hits = 0
+        self.misses = 0
+        self._hit_counter = CACHE_REQUESTS.labels(tier=tier, result="hit")
+        self._miss_counter = CACHE_REQUESTS.labels(tier=tier, result="miss")
+        self._ratio = CACHE_HIT_RATIO.labels(tier=tier)
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+            self._hit_counter.inc()
+        else:
+            self.misses += 1
+            self._miss_counter.inc()
+        self._ratio.set(self.hits / (self.hits + self.misses))
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+AUDIT_QUEUE_DEPTH = Gauge(
+    "churnvision_audit_queue_depth",
+    "Audit events waiting to be written",
+)
+
+AUDIT_FLUSH_SECONDS = Histogram(
+    "churnvision_audit_flush_seconds",
+    "Time to insert one batch of audit events",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+AUDIT_EVENTS = Counter(
+    "churnvision_audit_events_total",
+    "Audit events by outcome (written, spilled, dropped, replayed)",
+    ["outcome"],
+)
+
+STAGE_SECONDS = Histogram(
+    "churnvision_stage_seconds",
+    "Time spent in each stage of request handling, by route template",
+    ["stage", "endpoint"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+QUERY_SECONDS = Histogram(
+    "churnvision_query_seconds",
+    "SQL statement latency by normalized statement fingerprint (see /admin/slow-queries)",
+    ["statement"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+LOOP_LAG_SECONDS = Histogram(
+    "churnvision_event_loop_lag_seconds",
+    "How late the event loop heartbeat woke up",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+LOOP_BLOCKED = Counter(
+    "churnvision_event_loop_blocked_total",
+    "Times the event loop was blocked past LOOP_BLOCK_THRESHOLD_MS",
+)
+
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "churnvision_executor_queue_depth",
+    "Jobs waiting for a worker in each shared executor",
+    ["pool"],
+)
+
+EXECUTOR_ACTIVE = Gauge(
+    "churnvision_executor_active",
+    "Jobs running in each shared executor",
+    ["pool"],
+)
+
+EXECUTOR_WAIT_SECONDS = Histogram(
+    "churnvision_executor_wait_seconds",
+    "Time jobs waited for a worker in each shared executor",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "churnvision_llm_time_to_first_token_seconds",
+    "Time from sending a streamed LLM request to its first text delta, by provider",
+    ["provider"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+
+LLM_QUEUE_DEPTH = Gauge(
+    "churnvision_llm_queue_depth",
+    "LLM calls waiting for a provider concurrency slot",
+    ["provider"],
+)
+
+LLM_ACTIVE = Gauge(
+    "churnvision_llm_active",
+    "LLM calls holding a provider concurrency slot",
+    ["provider"],
+)
+
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "churnvision_llm_queue_wait_seconds",
+    "Time LLM calls waited for a provider concurrency slot",
+    ["provider"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+LLM_RETRIES = Counter(
+    "churnvision_llm_retries_total",
+    "Retried LLM calls after a transient provider failure",
+    ["provider"],
+)
+
+GENERATION_CACHE_REQUESTS = Counter(
+    "churnvision_generation_cache_requests_total",
+    "Cacheable LLM generations by kind and whether they were served from the cache",
+    ["kind", "result"],
+)
+
+CHAT_CONTEXT_DROPPED = Counter(
+    "churnvision_chat_context_dropped_total",
+    "Optional chat context pieces left out of a turn because they were too slow or failed",
+    ["piece", "reason"],
+)
@@ -0,0 +1,224 @@
+"""
+SQL statement monitor for ChurnVision Enterprise.
+
+Engine event hooks time every statement and:
+
+- count it towards the "db" span stage of the current request
+- observe it in churnvision_query_seconds{statement}, keyed by the
+  fingerprint of the normalized SQL (literals and placeholders replaced,
+  IN lists and multi-row VALUES collapsed)
+- keep statements slower than SLOW_QUERY_THRESHOLD_MS in a ring buffer,
+  with the route template and agent tool that issued them, for the
+  /admin/slow-queries endpoint
+
+Parameter values are never kept, only a fingerprint of them, so repeated
+identical calls (N+1 patterns) can be spotted without storing employee data.
+With SLOW_QUERY_EXPLAIN set, the plan of each new slow SELECT is fetched
+once per statement on a separate connection.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import QUERY_SECONDS
+from app.core.spans import current_endpoint, record
+
+logger = logging.getLogger("churnvision.db")
+
+DB_STAGE = "db"
+OTHER_STATEMENT = "other"
+# Distinct statement fingerprints exported before the rest share "other"
+MAX_STATEMENT_LABELS = 500
+MAX_STATEMENT_LENGTH = 2000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(\(\?(?:, \?)*\))(?:, \(\?(?:, \?)*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+_current_tool: ContextVar[Optional[str]] = ContextVar("churnvision_current_tool", default=None)
+_explaining: ContextVar[bool] = ContextVar("churnvision_explaining", default=False)
+
+
+@contextmanager
+def tool_context(tool_name: str) -> Iterator[None]:
+    """Attribute statements run inside the block to an agent tool."""
+    token = _current_tool.set(tool_name)
+    try:
+        yield
+    finally:
+        _current_tool.reset(token)
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """SQL with literals and bind parameters replaced by ?, on one line."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    normalized = _VALUES_ROWS.sub(r"\1, ...", normalized)
+    return normalized[:MAX_STATEMENT_LENGTH]
+
+
+def fingerprint(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8", "replace")).hexdigest()[:12]
+
+
+@dataclass
+class SlowQuery:
+    id: int
+    recorded_at: datetime
+    statement: str
+    fingerprint: str
+    params_fingerprint: Optional[str]
+    duration_ms: float
+    rows: Optional[int]
+    endpoint: str
+    tool: Optional[str]
+    plan: Optional[str] = None
+
+
+class QueryMonitor:
+    """Times statements on installed engines and keeps the slow ones."""
+
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        buffer_size: Optional[int] = None,
+        explain: Optional[bool] = None,
+    ):
+        self.threshold_ms = threshold_ms if threshold_ms is not None else settings.SLOW_QUERY_THRESHOLD_MS
+        self.explain = explain if explain is not None else settings.SLOW_QUERY_EXPLAIN
+        self._slow: Deque[SlowQuery] = deque(maxlen=buffer_size or settings.SLOW_QUERY_BUFFER_SIZE)
+        self._ids = itertools.count(1)
+        self._labels: Set[str] = set()
+        self._plans: Dict[str, Optional[str]] = {}
+        self._explain_tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._engine = None
+
+    def install(self, engine: Any) -> None:
+        """
+        Hook the statement events of engine.
+
+        Works for async engines too: the cursor events fire inside the greenlet
+        that runs the statement, which carries the awaiting task's context.
+        """
+        self._engine = engine
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def slow_queries(self, limit: Optional[int] = None) -> List[SlowQuery]:
+        """Recorded slow statements, newest first."""
+        entries = list(reversed(self._slow))
+        return entries[:limit] if limit else entries
+
+    def clear(self) -> None:
+        self._slow.clear()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_monitor_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        starts = conn.info.get("query_monitor_start")
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if _explaining.get():
+            return
+
+        record(DB_STAGE, duration)
+        normalized = normalize_sql(statement)
+        statement_id = fingerprint(normalized)
+        QUERY_SECONDS.labels(statement=self._label(statement_id)).observe(duration)
+
+        duration_ms = duration * 1000
+        if duration_ms >= self.threshold_ms:
+            rowcount = getattr(cursor, "rowcount", -1)
+            entry = SlowQuery(
+                id=next(self._ids),
+                recorded_at=datetime.now(timezone.utc),
+                statement=normalized,
+                fingerprint=statement_id,
+                params_fingerprint=fingerprint(repr(parameters)) if parameters else None,
+                duration_ms=round(duration_ms, 2),
+                rows=rowcount if isinstance(rowcount, int) and rowcount >= 0 else None,
+                endpoint=current_endpoint(),
+                tool=_current_tool.get(),
+                plan=self._plans.get(statement_id),
+            )
+            self._slow.append(entry)
+            logger.warning(
+                f"Slow query {duration_ms:.0f}ms [{entry.endpoint}"
+                f"{' tool=' + entry.tool if entry.tool else ''}] {normalized[:200]}"
+            )
+            if self.explain and statement_id not in self._plans and not executemany:
+                self._schedule_explain(entry, statement, parameters)
+
+    def _handle_error(self, exception_context) -> None:
+        # A failed statement never reaches after_cursor_execute
+        conn = exception_context.connection
+        starts = conn.info.get("query_monitor_start") if conn is not None else None
+        if starts and exception_context.cursor is not None:
+            starts.pop()
+
+    def _label(self, statement_id: str) -> str:
+        if statement_id in self._labels:
+            return statement_id
+        with self._lock:
+            if len(self._labels) >= MAX_STATEMENT_LABELS:
+                return OTHER_STATEMENT
+            self._labels.add(statement_id)
+        return statement_id
+
+    def _schedule_explain(self, entry: SlowQuery, statement: str, parameters: Any) -> None:
+        if not entry.statement.lstrip("( ").upper().startswith(("SELECT", "WITH")):
+            return
+        if self._engine is None or len(self._plans) >= MAX_STATEMENT_LABELS:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # statement ran on a worker thread
+        self._plans[entry.fingerprint] = None  # claimed; later repeats don't queue again
+        task = loop.create_task(self._explain(entry, statement, parameters))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, entry: SlowQuery, statement: str, parameters: Any) -> None:
+        token = _explaining.set(True)
+        try:
+            prefix = "EXPLAIN QUERY PLAN " if self._engine.dialect.name == "sqlite" else "EXPLAIN "
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(prefix + statement, parameters)
+                plan = "\n".join(" ".join(str(value) for value in row) for row in result)
+            self._plans[entry.fingerprint] = plan
+            entry.plan = plan
+        except Exception as e:
+            logger.warning(f"Could not EXPLAIN slow query {entry.fingerprint}: {e}")
+        finally:
+            _explaining.reset(token)
+
+
+query_monitor = QueryMonitor()
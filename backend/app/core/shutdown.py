@@ -147,6 +147,7 @@ async def lifespan_manager(app):
     Usage:
         app = FastAPI(lifespan=lifespan_manager)
     """
+    from app.core.config import settings
     from app.db.session import engine
 
     logger.info("Application starting up...")
@@ -159,6 +160,40 @@ async def lifespan_manager(app):
     except Exception as e:
         logger.warning(f"Could not setup signal handlers: {e}")
 
+    # Start the batched audit writer; its flush is registered first so that
+    # queued audit events are written before the database engine is disposed
+    from app.core.audit_sink import audit_sink
+
+    audit_sink.start()
+    shutdown_manager.add_shutdown_callback(audit_sink.close)
+
+    # Watch for callbacks that block the event loop
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.core.loop_monitor import loop_monitor
+
+        loop_monitor.start()
+        shutdown_manager.add_shutdown_callback(loop_monitor.stop)
+
+    # Stop the shared CPU/IO offload pools (after in-flight jobs finish)
+    from app.core.executors import shutdown_executors
+
+    shutdown_manager.add_shutdown_callback(shutdown_executors)
+
+    # Stop the model training process pool (started lazily on first training job)
+    from app.services.ml.training_executor import training_executor
+
+    shutdown_manager.add_shutdown_callback(training_executor.shutdown)
+
+    # Stop the cache invalidation listener and close Redis
+    from app.core.cache import close_cache
+
+    shutdown_manager.add_shutdown_callback(close_cache)
+
+    # Close the pooled LLM provider clients
+    from app.services.ai.llm_clients import llm_clients
+
+    shutdown_manager.add_shutdown_callback(llm_clients.aclose)
+
     # Register database cleanup callback
     async def cleanup_database():
         logger.info("Closing database connections...")
@@ -167,6 +202,12 @@ async def lifespan_manager(app):
 
     shutdown_manager.add_shutdown_callback(cleanup_database)
 
+    # Load the default model before serving (importing the service no longer does)
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        from app.services.ml.churn_prediction_service import warmup_models
+
+        await warmup_models()
+
     logger.info("Application startup complete")
 
     try:
@@ -0,0 +1,151 @@
+"""
+Per-request performance spans for ChurnVision Enterprise.
+
+A span times one stage of work (database, inference, SHAP, retrieval, LLM
+call, ...) inside whatever request is being served:
+
+    with span("inference"):
+        probabilities = model.predict_proba(matrix)
+
+    @timed("retrieval")
+    async def retrieve(...): ...
+
+Every span is observed in the churnvision_stage_seconds{stage,endpoint}
+histogram, labelled with the route template of the current request (or
+"background" outside one). EdgeMiddleware also totals the stages of each
+request so they can be sent back as a Server-Timing header, which browser
+devtools show next to the request's network timing.
+"""
+
+import functools
+import inspect
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.metrics import STAGE_SECONDS
+
+BACKGROUND_ENDPOINT = "background"
+UNMATCHED_ENDPOINT = "unmatched"
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Route template of a routed request, e.g. /api/v1/employees/{hr_code}."""
+    path = getattr(scope.get("route"), "path", None)
+    return path or UNMATCHED_ENDPOINT
+
+
+class RequestTimings:
+    """Stage totals for one request."""
+
+    __slots__ = ("scope", "stages", "_endpoint")
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None):
+        self.scope = scope
+        self.stages: Dict[str, List[float]] = {}
+        self._endpoint: Optional[str] = None
+
+    @property
+    def endpoint(self) -> str:
+        # Routing happens after the middleware has created this object, so the
+        # label is resolved on first use and only cached once a route matched
+        if self._endpoint is not None:
+            return self._endpoint
+        if self.scope is None:
+            return BACKGROUND_ENDPOINT
+        endpoint = _route_template(self.scope)
+        if endpoint != UNMATCHED_ENDPOINT:
+            self._endpoint = endpoint
+        return endpoint
+
+    def add(self, stage: str, seconds: float) -> None:
+        totals = self.stages.get(stage)
+        if totals is None:
+            self.stages[stage] = [seconds, 1]
+        else:
+            totals[0] += seconds
+            totals[1] += 1
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        entries = [
+            f"{stage};dur={seconds * 1000:.1f};desc=\"{count}x\""
+            for stage, (seconds, count) in self.stages.items()
+        ]
+        if total_seconds is not None:
+            entries.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("churnvision_request_timings", default=None)
+
+
+def start_request(scope: Dict[str, Any]) -> Tuple[RequestTimings, Token]:
+    """Begin collecting stage timings for the request in scope."""
+    timings = RequestTimings(scope)
+    return timings, _current.set(timings)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def current_endpoint() -> str:
+    """Route template of the request being served, or "background"."""
+    timings = _current.get()
+    return timings.endpoint if timings is not None else BACKGROUND_ENDPOINT
+
+
+def record(stage: str, seconds: float) -> None:
+    """Record a stage duration measured elsewhere."""
+    timings = _current.get()
+    endpoint = timings.endpoint if timings is not None else BACKGROUND_ENDPOINT
+    STAGE_SECONDS.labels(stage=stage, endpoint=endpoint).observe(seconds)
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+class span:
+    """Time a block as one stage; works with both `with` and `async with`."""
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        record(self.stage, time.perf_counter() - self._start)
+
+    async def __aenter__(self) -> "span":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.__exit__(*exc_info)
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of span() for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
@@ -0,0 +1,119 @@
+"""
+Import-time profiler for ChurnVision Enterprise.
+
+Imports a module (app.main by default) in a fresh interpreter with
+``-X importtime`` and reports where the time went, per module and per
+top-level package:
+
+    python -m app.core.startup_profiler --top 25
+
+Used by tests/test_cold_start.py to keep heavy ML/RAG libraries (xgboost,
+scikit-learn, SHAP, torch, ChromaDB, provider SDKs) out of worker start-up.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ModuleImport:
+    name: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    target: str
+    total_ms: float
+    modules: List[ModuleImport] = field(default_factory=list)
+
+    @property
+    def module_names(self) -> set:
+        return {m.name for m in self.modules}
+
+    def loaded(self, package: str) -> bool:
+        """Whether package (or any of its submodules) was imported."""
+        prefix = package + "."
+        return any(m.name == package or m.name.startswith(prefix) for m in self.modules)
+
+    def slowest(self, limit: int = 25) -> List[ModuleImport]:
+        """Modules with the highest cumulative import time."""
+        return sorted(self.modules, key=lambda m: m.cumulative_ms, reverse=True)[:limit]
+
+    def by_package(self) -> Dict[str, float]:
+        """Self time summed per top-level package, slowest first."""
+        totals: Dict[str, float] = {}
+        for m in self.modules:
+            package = m.name.split(".", 1)[0]
+            totals[package] = totals.get(package, 0.0) + m.self_ms
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def parse_importtime(output: str, target: str) -> ImportProfile:
+    """Build a profile from ``-X importtime`` stderr."""
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append(ModuleImport(
+                name=name,
+                self_ms=int(self_us) / 1000,
+                cumulative_ms=int(cumulative_us) / 1000,
+                depth=len(indent) // 2,
+            ))
+    total = sum(m.cumulative_ms for m in modules if m.depth == 0)
+    return ImportProfile(target=target, total_ms=round(total, 1), modules=modules)
+
+
+def profile_imports(target: str = "app.main", timeout: float = 300) -> ImportProfile:
+    """Import target in a fresh interpreter and return its import profile."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr, target)
+
+
+def format_report(profile: ImportProfile, top: int = 25) -> str:
+    lines = [f"import {profile.target}: {profile.total_ms / 1000:.2f}s", "", "Slowest modules (cumulative):"]
+    for m in profile.slowest(top):
+        lines.append(f"  {m.cumulative_ms:9.1f} ms  {m.name}")
+    lines += ["", "Packages (self time):"]
+    for package, ms in list(profile.by_package().items())[:top]:
+        lines.append(f"  {ms:9.1f} ms  {package}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report per-module import time of the backend")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Rows to show per table")
+    args = parser.parse_args(argv)
+
+    print(format_report(profile_imports(args.module), args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text
 from app.core.config import settings
+from app.core.query_monitor import query_monitor
 
 # Production-ready connection pooling configuration
 # - pool_size: Number of persistent connections to maintain
@@ -19,6 +20,9 @@ engine = create_async_engine(
     pool_timeout=30,
 )
 
+# Time every statement (db span stage, per-statement histograms, slow query log)
+query_monitor.install(engine)
+
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
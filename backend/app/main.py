@@ -7,21 +7,19 @@ from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from starlette.middleware.base import BaseHTTPMiddleware
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings, ADMIN_API_URL
 from app.api.v1 import api_router
 from app.db.session import check_db_connection
-from app.core.logging_config import setup_logging, RequestLoggingMiddleware
+from app.core.logging_config import setup_logging
 from app.core.rate_limiter import limiter, rate_limit_exceeded_handler
 from app.core.shutdown import (
     lifespan_manager,
-    RequestTrackingMiddleware,
     get_shutdown_manager,
 )
 from app.core.data_retention import get_retention_service
-from app.core.csrf import CSRFMiddleware, RequestSizeLimitMiddleware
+from app.core.http_middleware import EdgeMiddleware
 from app.api.deps import get_current_superuser
 from app.models.user import User
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -31,45 +29,6 @@ setup_logging()
 logger = logging.getLogger("churnvision")
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to add security headers to all responses.
-    Helps prevent XSS, clickjacking, and other common attacks.
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # Enable XSS filter in browsers
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Referrer policy - don't leak full URL to external sites
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Permissions policy - restrict browser features
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), microphone=(), camera=()"
-        )
-
-        # Content Security Policy (relaxed for API, stricter for HTML responses)
-        if "text/html" in response.headers.get("content-type", ""):
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'self'; "
-                "script-src 'self'; "
-                "style-src 'self' 'unsafe-inline'; "
-                "img-src 'self' data:; "
-                "connect-src 'self'"
-            )
-
-        return response
-
-
 class ErrorResponse(BaseModel):
     """Standardized error response format."""
 
@@ -190,6 +149,12 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
     )
 
 
+# Security headers, CSRF protection, request size limits (10 MB default,
+# larger for uploads), in-flight tracking for graceful shutdown and request
+# logging with timing and request IDs, fused into one pure-ASGI pass.
+# Registered before CORS so that CORS headers also reach its 403/413 responses.
+app.add_middleware(EdgeMiddleware, max_size=10 * 1024 * 1024)
+
 # CORS Middleware (env-driven)
 # When credentials are needed, we must specify exact origins (not "*")
 # Restrict methods to only those needed for security
@@ -201,23 +166,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Security Headers Middleware
-app.add_middleware(SecurityHeadersMiddleware)
-
-# CSRF Protection Middleware (validates tokens on state-changing requests)
-app.add_middleware(CSRFMiddleware)
-
-# Request Size Limit Middleware (prevents large payload DoS)
-app.add_middleware(
-    RequestSizeLimitMiddleware, max_size=10 * 1024 * 1024
-)  # 10 MB default
-
-# Request tracking middleware for graceful shutdown
-app.add_middleware(RequestTrackingMiddleware)
-
-# Request logging middleware with timing and request IDs
-app.add_middleware(RequestLoggingMiddleware)
-
 # License validation middleware (validates on every request)
 # Import and register conditionally to avoid startup issues
 from app.core.license_middleware import (
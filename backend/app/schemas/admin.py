@@ -189,3 +189,27 @@ class AdminStats(BaseModel):
     active_users: int
     inactive_users: int
     users_by_role: dict
+
+
+# ============ Slow Queries ============
+
+class SlowQueryResponse(BaseModel):
+    id: int
+    recorded_at: datetime
+    statement: str
+    fingerprint: str
+    params_fingerprint: Optional[str] = None
+    duration_ms: float
+    rows: Optional[int] = None
+    endpoint: str
+    tool: Optional[str] = None
+    plan: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SlowQueryListResponse(BaseModel):
+    threshold_ms: float
+    explain_enabled: bool
+    queries: List[SlowQueryResponse]
@@ -19,11 +19,16 @@ from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.ai.base_generation_service import BaseAIGenerationService
+from app.services.ai.generation_cache import GenerationScope
 from app.services.utils.json_helpers import parse_json_response
 from app.models.hr_data import HRDataInput
 
 logger = logging.getLogger(__name__)
 
+# Bump when the email or meeting prompts change, so cached generations from
+# the old prompts are not reused
+ACTION_PROMPT_VERSION = "1"
+
 
 class ActionGenerationService(BaseAIGenerationService):
     """
@@ -40,6 +45,18 @@ class ActionGenerationService(BaseAIGenerationService):
     def __init__(self, db: AsyncSession):
         super().__init__(db)
 
+    def _action_scope(self, kind: str, ctx: Dict[str, Any]) -> GenerationScope:
+        """Generation cache scope of an action drafted from ctx."""
+        emp = ctx.get("employee") or {}
+        return GenerationScope(
+            kind=kind,
+            template_version=ACTION_PROMPT_VERSION,
+            dataset_id=emp.get("dataset_id"),
+            hr_code=emp.get("hr_code"),
+            model_version=(ctx.get("churn") or {}).get("model_version"),
+            expect_json="object",
+        )
+
     async def generate_retention_email(
         self,
         hr_code: str,
@@ -115,7 +132,8 @@ Return ONLY a JSON object:
                 ],
                 model=effective_model,
                 temperature=0.7,
-                max_tokens=700
+                max_tokens=700,
+                cache_scope=self._action_scope("retention_email", ctx),
             )
 
             email_data = parse_json_response(response_text, expect_type="object")
@@ -228,7 +246,8 @@ Return ONLY a JSON object:
                 ],
                 model=effective_model,
                 temperature=0.7,
-                max_tokens=500
+                max_tokens=500,
+                cache_scope=self._action_scope("meeting_proposal", ctx),
             )
 
             meeting_data = parse_json_response(response_text, expect_type="object")
@@ -1,16 +1,14 @@
-from typing import List, Optional, Dict, Any, Literal, Tuple, Union
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Dict, Any, Literal, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
-from openai import AsyncOpenAI
-from anthropic import AsyncAnthropic
-from google import genai
-from google.genai import types as genai_types
-from ollama import AsyncClient
 import asyncio
 import json
+import time
 
 from app.core.config import settings
+from app.core.metrics import LLM_TIME_TO_FIRST_TOKEN
+from app.core.spans import record, timed
 from app.models.chatbot import Conversation, Message
 from app.schemas.chatbot import (
     ChatRequest,
@@ -26,8 +24,15 @@ from app.services.compliance.pii_masking_service import (
     SalaryPercentiles,
     calculate_salary_percentiles_from_db
 )
+from app.services.ai.generation_cache import GenerationScope, cached_generation
+from app.services.ai.llm_clients import llm_clients
 from app.services.ai.llm_config import get_provider_api_key
 
+# Provider SDKs are imported by the call that uses them: together they add
+# seconds to worker start-up and most deployments only talk to one provider.
+if TYPE_CHECKING:
+    from google.genai import types as genai_types
+
 # Provider type for routing
 ProviderType = Literal["ollama", "openai", "anthropic", "google"]
 
@@ -50,6 +55,22 @@ MODEL_PROVIDER_MAP: Dict[str, ProviderType] = {
 }
 
 
+async def _with_idle_timeout(stream: AsyncIterator[str], timeout: float) -> AsyncIterator[str]:
+    """Re-yield stream, raising asyncio.TimeoutError if the next chunk takes longer than timeout."""
+    iterator = stream.__aiter__()
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            yield chunk
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
 class ChatbotService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -106,7 +127,7 @@ class ChatbotService:
         if not api_key:
             raise ValueError("OPENAI_API_KEY not configured")
 
-        client = AsyncOpenAI(api_key=api_key, timeout=settings.LLM_REQUEST_TIMEOUT)
+        client = llm_clients.client("openai", api_key)
 
         # Build request kwargs
         request_kwargs = {
@@ -120,7 +141,9 @@ class ChatbotService:
             request_kwargs["tools"] = tools
             request_kwargs["tool_choice"] = "auto"
 
-        response = await client.chat.completions.create(**request_kwargs)
+        response = await llm_clients.call(
+            "openai", lambda: client.chat.completions.create(**request_kwargs)
+        )
 
         message = response.choices[0].message
         content = message.content or ""
@@ -166,43 +189,18 @@ class ChatbotService:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not configured")
 
-        client = AsyncAnthropic(
-            api_key=api_key,
-            timeout=settings.LLM_REQUEST_TIMEOUT
-        )
+        client = llm_clients.client("anthropic", api_key)
 
-        # Anthropic requires system message as separate parameter
-        system_content = None
-        filtered_messages = []
-        for msg in messages:
-            if msg.get("role") == "system":
-                system_content = msg.get("content", "")
-            else:
-                filtered_messages.append({
-                    "role": msg.get("role"),
-                    "content": msg.get("content")
-                })
-
-        # Build request kwargs
-        request_kwargs = {
-            "model": model or settings.CLAUDE_MODEL,
-            "max_tokens": max_tokens or 1024,
-            "messages": filtered_messages,
-        }
-
-        # Add temperature (Claude uses 0-1 range like OpenAI)
-        if temperature is not None:
-            request_kwargs["temperature"] = temperature
-
-        if system_content:
-            request_kwargs["system"] = system_content
+        request_kwargs = self._build_claude_request(messages, model, temperature, max_tokens)
 
         # Convert OpenAI tool format to Anthropic format if tools provided
         if tools:
             anthropic_tools = self._convert_tools_to_anthropic_format(tools)
             request_kwargs["tools"] = anthropic_tools
 
-        response = await client.messages.create(**request_kwargs)
+        response = await llm_clients.call(
+            "anthropic", lambda: client.messages.create(**request_kwargs)
+        )
 
         # Extract content
         content = ""
@@ -234,6 +232,41 @@ class ChatbotService:
 
         return content, metadata, tool_calls
 
+    def _build_claude_request(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int]
+    ) -> Dict[str, Any]:
+        """Request kwargs for the Anthropic messages API."""
+        # Anthropic requires system message as separate parameter
+        system_content = None
+        filtered_messages = []
+        for msg in messages:
+            if msg.get("role") == "system":
+                system_content = msg.get("content", "")
+            else:
+                filtered_messages.append({
+                    "role": msg.get("role"),
+                    "content": msg.get("content")
+                })
+
+        request_kwargs = {
+            "model": model or settings.CLAUDE_MODEL,
+            "max_tokens": max_tokens or 1024,
+            "messages": filtered_messages,
+        }
+
+        # Add temperature (Claude uses 0-1 range like OpenAI)
+        if temperature is not None:
+            request_kwargs["temperature"] = temperature
+
+        if system_content:
+            request_kwargs["system"] = system_content
+
+        return request_kwargs
+
     def _convert_tools_to_anthropic_format(
         self,
         openai_tools: List[Dict[str, Any]]
@@ -288,40 +321,21 @@ class ChatbotService:
         if not api_key:
             raise ValueError("GOOGLE_API_KEY not configured")
 
-        # Create client with API key
-        client = genai.Client(api_key=api_key)
+        client = llm_clients.client("google", api_key)
 
-        # Convert messages to Gemini format
-        gemini_contents, system_instruction = self._convert_messages_to_gemini_format(
-            messages
+        gemini_contents, config = self._build_gemini_request(
+            messages, temperature, max_tokens, tools
         )
 
-        # Build generation config
-        config_kwargs = {
-            "temperature": temperature,
-            "max_output_tokens": max_tokens or 1024,
-        }
-
-        if system_instruction:
-            config_kwargs["system_instruction"] = system_instruction
-
-        # Convert tools if provided (disable auto function calling)
-        if tools:
-            config_kwargs["tools"] = self._convert_tools_to_gemini_format(tools)
-            # Disable automatic function calling - we handle tool calls manually
-            config_kwargs["automatic_function_calling"] = {"disable": True}
-
-        config = genai_types.GenerateContentConfig(**config_kwargs)
-
         # Use async API
-        response = await asyncio.wait_for(
+        response = await llm_clients.call("google", lambda: asyncio.wait_for(
             client.aio.models.generate_content(
                 model=model or settings.GEMINI_MODEL,
                 contents=gemini_contents,
                 config=config
             ),
             timeout=settings.LLM_REQUEST_TIMEOUT
-        )
+        ))
 
         # Parse response
         content = ""
@@ -368,15 +382,49 @@ class ChatbotService:
 
         return content, metadata, tool_calls
 
+    def _build_gemini_request(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> tuple[List["genai_types.Content"], "genai_types.GenerateContentConfig"]:
+        """Contents and generation config for a Gemini request."""
+        from google.genai import types as genai_types
+
+        # Convert messages to Gemini format
+        gemini_contents, system_instruction = self._convert_messages_to_gemini_format(
+            messages
+        )
+
+        # Build generation config
+        config_kwargs = {
+            "temperature": temperature,
+            "max_output_tokens": max_tokens or 1024,
+        }
+
+        if system_instruction:
+            config_kwargs["system_instruction"] = system_instruction
+
+        # Convert tools if provided (disable auto function calling)
+        if tools:
+            config_kwargs["tools"] = self._convert_tools_to_gemini_format(tools)
+            # Disable automatic function calling - we handle tool calls manually
+            config_kwargs["automatic_function_calling"] = {"disable": True}
+
+        return gemini_contents, genai_types.GenerateContentConfig(**config_kwargs)
+
     def _convert_messages_to_gemini_format(
         self,
         messages: List[Dict[str, str]]
-    ) -> tuple[List[genai_types.Content], Optional[str]]:
+    ) -> tuple[List["genai_types.Content"], Optional[str]]:
         """
         Convert OpenAI-style messages to Gemini format.
 
         Returns (contents, system_instruction) tuple.
         """
+        from google.genai import types as genai_types
+
         gemini_contents = []
         system_instruction = None
 
@@ -404,8 +452,10 @@ class ChatbotService:
     def _convert_tools_to_gemini_format(
         self,
         openai_tools: List[Dict[str, Any]]
-    ) -> List[genai_types.Tool]:
+    ) -> List["genai_types.Tool"]:
         """Convert OpenAI tool format to Gemini Tool format."""
+        from google.genai import types as genai_types
+
         function_declarations = []
 
         for tool in openai_tools:
@@ -433,10 +483,10 @@ class ChatbotService:
         max_tokens: Optional[int]
     ) -> tuple[str, Dict[str, Any]]:
         """Call local Ollama API"""
-        client = AsyncClient(host=settings.OLLAMA_BASE_URL)
-        
+        client = llm_clients.client("ollama")
+
         # Wrap Ollama call in timeout to prevent indefinite hanging
-        response = await asyncio.wait_for(
+        response = await llm_clients.call("ollama", lambda: asyncio.wait_for(
             client.chat(
                 model=model or settings.OLLAMA_MODEL,
                 messages=messages,
@@ -446,7 +496,7 @@ class ChatbotService:
                 }
             ),
             timeout=settings.LLM_REQUEST_TIMEOUT
-        )
+        ))
 
         # Handle both dict (older ollama versions) and ChatResponse object (newer versions)
         if isinstance(response, dict):
@@ -470,26 +520,192 @@ class ChatbotService:
             "completion_tokens": eval_count
         }
 
+    # ------------------------------------------------------------------
+    # Streaming provider calls: yield text deltas as they are generated and
+    # fill `usage` with token counts once the provider reports them.
+    # ------------------------------------------------------------------
+
+    async def _stream_openai(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        usage: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Stream an OpenAI chat completion"""
+        api_key = get_provider_api_key("openai")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not configured")
+
+        client = llm_clients.client("openai", api_key)
+
+        request_kwargs = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        if max_tokens:
+            request_kwargs["max_tokens"] = max_tokens
+
+        stream = await client.chat.completions.create(**request_kwargs)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.usage:
+                usage.update({
+                    "tokens_used": chunk.usage.total_tokens,
+                    "prompt_tokens": chunk.usage.prompt_tokens,
+                    "completion_tokens": chunk.usage.completion_tokens
+                })
+
+    async def _stream_claude(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        usage: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Stream a Claude (Anthropic) message"""
+        api_key = get_provider_api_key("anthropic")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY not configured")
+
+        client = llm_clients.client("anthropic", api_key)
+
+        request_kwargs = self._build_claude_request(messages, model, temperature, max_tokens)
+
+        async with client.messages.stream(**request_kwargs) as stream:
+            async for text in stream.text_stream:
+                if text:
+                    yield text
+            final = await stream.get_final_message()
+
+        if final.usage:
+            usage.update({
+                "tokens_used": final.usage.input_tokens + final.usage.output_tokens,
+                "prompt_tokens": final.usage.input_tokens,
+                "completion_tokens": final.usage.output_tokens
+            })
+
+    async def _stream_gemini(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        usage: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Stream a Gemini (Google) response"""
+        api_key = get_provider_api_key("google")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY not configured")
+
+        client = llm_clients.client("google", api_key)
+
+        gemini_contents, config = self._build_gemini_request(messages, temperature, max_tokens)
+
+        stream = await client.aio.models.generate_content_stream(
+            model=model or settings.GEMINI_MODEL,
+            contents=gemini_contents,
+            config=config
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+            usage_metadata = getattr(chunk, 'usage_metadata', None)
+            if usage_metadata:
+                prompt_tokens = getattr(usage_metadata, 'prompt_token_count', None)
+                completion_tokens = getattr(usage_metadata, 'candidates_token_count', None)
+                usage.update({
+                    "tokens_used": (prompt_tokens + completion_tokens)
+                    if prompt_tokens and completion_tokens else None,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens
+                })
+
+    async def _stream_ollama(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        usage: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Stream from the local Ollama API"""
+        client = llm_clients.client("ollama")
+
+        stream = await client.chat(
+            model=model or settings.OLLAMA_MODEL,
+            messages=messages,
+            options={
+                "temperature": temperature,
+                "num_predict": max_tokens if max_tokens else -1
+            },
+            stream=True
+        )
+        # Chunks are dicts (older ollama versions) or ChatResponse objects; both support .get
+        async for chunk in stream:
+            message = chunk.get("message") or {}
+            content = message.get("content") or ""
+            if content:
+                yield content
+            if chunk.get("done"):
+                eval_count = chunk.get("eval_count") or 0
+                prompt_eval_count = chunk.get("prompt_eval_count") or 0
+                usage.update({
+                    "tokens_used": eval_count + prompt_eval_count,
+                    "prompt_tokens": prompt_eval_count,
+                    "completion_tokens": eval_count
+                })
+
     async def generate_response(
         self,
         messages: List[Dict[str, str]],
         model: str = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        cache_scope: Optional[GenerationScope] = None
     ) -> str:
         """
         Generate a response from the LLM without persisting conversation history.
         Useful for one-off generation tasks.
+
+        With a cache_scope the response is reused for identical inputs (see
+        generation_cache); the key covers the messages as the provider would
+        receive them, i.e. after PII masking.
         """
         model = model or settings.OLLAMA_MODEL
-        content, _ = await self._get_llm_response(
-            messages=messages,
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens
+        if cache_scope is None or not settings.GENERATION_CACHE_ENABLED:
+            content, _ = await self._get_llm_response(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            return content
+
+        provider = self._determine_provider(model)
+        messages_to_send, masking_context = await self._prepare_messages(messages, provider, None, {})
+
+        async def generate() -> str:
+            content, _ = await self._get_llm_response(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                masking_context=masking_context
+            )
+            return content
+
+        return await cached_generation(
+            cache_scope, messages_to_send, model, temperature, max_tokens, generate
         )
-        return content
 
+    @timed("llm")
     async def _get_llm_response(
         self,
         messages: List[Dict[str, str]],
@@ -527,26 +743,10 @@ class ChatbotService:
             "pii_masked": False
         }
 
-        # Apply PII masking for cloud providers
-        should_mask = (
-            provider in CLOUD_PROVIDERS and
-            settings.PII_MASKING_ENABLED
+        messages_to_send, masking_context = await self._prepare_messages(
+            messages, provider, masking_context, metadata
         )
 
-        if should_mask:
-            # Ensure salary percentiles are loaded for accurate masking
-            await self._ensure_salary_percentiles()
-            masking_context = masking_context or MaskingContext()
-            masked_messages = self._mask_messages(messages, masking_context)
-            metadata["pii_masked"] = True
-            metadata["pii_tokens_masked"] = len(masking_context.name_map) + len(masking_context.id_map)
-            messages_to_send = masked_messages
-            print(f"[LLM] PII masking applied for {provider}: {len(masking_context.name_map)} names, {len(masking_context.id_map)} IDs masked", flush=True)
-        else:
-            messages_to_send = messages
-            if provider in CLOUD_PROVIDERS and not settings.PII_MASKING_ENABLED:
-                print(f"[LLM] WARNING: Cloud provider {provider} used without PII masking!", flush=True)
-
         try:
             if provider == "openai":
                 content, usage, _ = await self._call_openai(
@@ -566,7 +766,7 @@ class ChatbotService:
                 )
 
             # Unmask response for cloud providers
-            if should_mask and masking_context:
+            if masking_context:
                 content = self._pii_masking_service.unmask_text(content, masking_context)
 
             metadata.update(usage)
@@ -581,6 +781,125 @@ class ChatbotService:
             error_type = type(e).__name__
             raise Exception(f"LLM API error ({provider}): [{error_type}] {str(e)}")
 
+    async def _prepare_messages(
+        self,
+        messages: List[Dict[str, str]],
+        provider: ProviderType,
+        masking_context: Optional[MaskingContext],
+        metadata: Dict[str, Any]
+    ) -> tuple[List[Dict[str, str]], Optional[MaskingContext]]:
+        """
+        Mask PII in messages bound for a cloud provider.
+
+        Returns (messages_to_send, masking_context); the context is None when
+        nothing was masked, i.e. the response needs no unmasking.
+        """
+        # Apply PII masking for cloud providers
+        should_mask = (
+            provider in CLOUD_PROVIDERS and
+            settings.PII_MASKING_ENABLED
+        )
+
+        if not should_mask:
+            if provider in CLOUD_PROVIDERS and not settings.PII_MASKING_ENABLED:
+                print(f"[LLM] WARNING: Cloud provider {provider} used without PII masking!", flush=True)
+            return messages, None
+
+        # Ensure salary percentiles are loaded for accurate masking
+        await self._ensure_salary_percentiles()
+        masking_context = masking_context or MaskingContext()
+        masked_messages = self._mask_messages(messages, masking_context)
+        metadata["pii_masked"] = True
+        metadata["pii_tokens_masked"] = len(masking_context.name_map) + len(masking_context.id_map)
+        print(f"[LLM] PII masking applied for {provider}: {len(masking_context.name_map)} names, {len(masking_context.id_map)} IDs masked", flush=True)
+        return masked_messages, masking_context
+
+    async def stream_llm_response(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        masking_context: Optional[MaskingContext] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the LLM provider, yielding text as it is generated.
+
+        Masking works as in _get_llm_response; for cloud providers each delta
+        is unmasked before it is yielded (a placeholder split across deltas is
+        held back until it is complete). Each delta must arrive within
+        LLM_REQUEST_TIMEOUT of the previous one.
+
+        Args:
+            messages: Chat messages to send
+            model: Model name
+            temperature: Generation temperature
+            max_tokens: Max tokens to generate
+            masking_context: Optional pre-populated MaskingContext for consistent masking
+            metadata: Optional dict that receives provider, masking and token
+                usage details when the stream ends
+        """
+        provider = self._determine_provider(model)
+
+        metadata = metadata if metadata is not None else {}
+        metadata.update({
+            "model": model,
+            "provider": provider,
+            "temperature": temperature,
+            "pii_masked": False
+        })
+
+        messages_to_send, masking_context = await self._prepare_messages(
+            messages, provider, masking_context, metadata
+        )
+        unmasker = (
+            self._pii_masking_service.stream_unmasker(masking_context)
+            if masking_context else None
+        )
+
+        if provider == "openai":
+            stream_call = self._stream_openai
+        elif provider == "anthropic":
+            stream_call = self._stream_claude
+        elif provider == "google":
+            stream_call = self._stream_gemini
+        else:  # ollama (default)
+            stream_call = self._stream_ollama
+
+        usage: Dict[str, Any] = {}
+        started = time.perf_counter()
+        first_delta = True
+        try:
+            async for delta in llm_clients.stream(provider, lambda: _with_idle_timeout(
+                stream_call(messages_to_send, model, temperature, max_tokens, usage),
+                settings.LLM_REQUEST_TIMEOUT
+            )):
+                if first_delta:
+                    LLM_TIME_TO_FIRST_TOKEN.labels(provider=provider).observe(time.perf_counter() - started)
+                    first_delta = False
+                text = unmasker.feed(delta) if unmasker else delta
+                if text:
+                    yield text
+
+            if unmasker:
+                tail = unmasker.flush()
+                if tail:
+                    yield tail
+
+        except asyncio.TimeoutError:
+            raise Exception(
+                f"LLM API error ({provider}): "
+                f"No response data for {settings.LLM_REQUEST_TIMEOUT}s"
+            )
+        except Exception as e:
+            error_type = type(e).__name__
+            raise Exception(f"LLM API error ({provider}): [{error_type}] {str(e)}")
+        finally:
+            record("llm", time.perf_counter() - started)
+
+        metadata.update(usage)
+
     async def get_response_with_tools(
         self,
         messages: List[Dict[str, Any]],
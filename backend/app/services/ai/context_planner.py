@@ -0,0 +1,153 @@
+"""
+Concurrent context assembly for chat turns.
+
+gather_context used to await a dozen lookups (company overview, employee,
+churn, reasoning, ELTV, interviews, treatments, RAG, ...) one after another,
+so a chat turn spent hundreds of milliseconds on serial round-trips before
+the LLM was called. A ContextPlan declares each piece of context with the
+pieces it needs; run() starts every piece as soon as its requirements have
+finished, each on its own pooled session, at most max_sessions at a time.
+
+- A piece that returns None is absent: pieces that require it are skipped.
+- Required pieces are never cut short and their errors propagate.
+- Optional pieces (RAG retrieval, interview patterns) get the shorter of
+  their own timeout and what is left of the turn's budget; if they time out
+  or fail they are dropped (churnvision_chat_context_dropped_total) instead
+  of delaying the answer.
+
+    plan = ContextPlan()
+    plan.add("employee", lambda db, _: load_employee(db))
+    plan.add("churn", lambda db, found: load_churn(db, found["employee"]), requires=("employee",))
+    plan.add("rag", lambda _, found: retrieve(...), optional=True, uses_db=False)
+    found = await plan.run()
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import CHAT_CONTEXT_DROPPED
+
+logger = logging.getLogger(__name__)
+
+# (session, results of the pieces finished so far) -> value; None means absent
+Loader = Callable[[Optional[AsyncSession], Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class ContextPiece:
+    """One lookup in a ContextPlan."""
+    name: str
+    load: Loader
+    requires: Tuple[str, ...] = ()
+    optional: bool = False
+    timeout: Optional[float] = None
+    uses_db: bool = True
+
+
+class ContextPlan:
+    """Pieces of chat context with their dependencies, run concurrently."""
+
+    def __init__(
+        self,
+        budget: Optional[float] = None,
+        piece_timeout: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.budget = budget if budget is not None else settings.CHAT_CONTEXT_BUDGET_SECONDS
+        self.piece_timeout = piece_timeout if piece_timeout is not None else settings.CHAT_CONTEXT_PIECE_TIMEOUT_SECONDS
+        self.max_sessions = max_sessions if max_sessions is not None else settings.CHAT_CONTEXT_MAX_SESSIONS
+        self._session_factory = session_factory
+        self.pieces: Dict[str, ContextPiece] = {}
+        # name -> why an optional piece was left out ("timeout", "error")
+        self.dropped: Dict[str, str] = {}
+
+    def add(
+        self,
+        name: str,
+        load: Loader,
+        requires: Tuple[str, ...] = (),
+        optional: bool = False,
+        timeout: Optional[float] = None,
+        uses_db: bool = True,
+    ) -> None:
+        """
+        Declare a piece. Requirements must already be in the plan, which
+        keeps the plan acyclic.
+        """
+        if name in self.pieces:
+            raise ValueError(f"Context piece {name} is already planned")
+        unknown = [r for r in requires if r not in self.pieces]
+        if unknown:
+            raise ValueError(f"Context piece {name} requires unplanned pieces: {', '.join(unknown)}")
+        self.pieces[name] = ContextPiece(name, load, tuple(requires), optional, timeout, uses_db)
+
+    def _sessions(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from app.db.session import AsyncSessionLocal
+
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every piece; returns the values of those that are present."""
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        slots = asyncio.Semaphore(max(1, self.max_sessions))
+        deadline = time.monotonic() + self.budget if self.budget else None
+
+        async def load(piece: ContextPiece) -> Any:
+            async with slots:
+                if not piece.uses_db:
+                    return await piece.load(None, results)
+                async with self._sessions()() as db:
+                    return await piece.load(db, results)
+
+        async def run_piece(piece: ContextPiece) -> None:
+            for name in piece.requires:
+                await tasks[name]
+                if name not in results:
+                    return
+
+            if not piece.optional:
+                value = await load(piece)
+            else:
+                timeout = piece.timeout if piece.timeout is not None else self.piece_timeout
+                timeout = timeout or None  # 0 means no per-piece limit
+                if deadline is not None:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                try:
+                    value = await asyncio.wait_for(load(piece), timeout)
+                except asyncio.TimeoutError:
+                    self._drop(piece, "timeout")
+                    return
+                except Exception as e:
+                    logger.warning(f"Optional context piece {piece.name} failed: {type(e).__name__}: {e}")
+                    self._drop(piece, "error")
+                    return
+
+            if value is not None:
+                results[piece.name] = value
+
+        for piece in self.pieces.values():
+            tasks[piece.name] = asyncio.ensure_future(run_piece(piece))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return results
+
+    def _drop(self, piece: ContextPiece, reason: str) -> None:
+        self.dropped[piece.name] = reason
+        CHAT_CONTEXT_DROPPED.labels(piece=piece.name, reason=reason).inc()
+        logger.info(f"Dropped optional context piece {piece.name} ({reason})")
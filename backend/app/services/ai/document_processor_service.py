@@ -11,8 +11,6 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 import logging
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -57,13 +55,21 @@ class DocumentProcessor:
         """
         self.chunk_size = chunk_size or settings.RAG_CHUNK_SIZE
         self.chunk_overlap = chunk_overlap or settings.RAG_CHUNK_OVERLAP
-
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
+        self._text_splitter = None
+
+    @property
+    def text_splitter(self):
+        """Text splitter, created on first use (langchain is slow to import)."""
+        if self._text_splitter is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+            self._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len,
+                separators=["\n\n", "\n", ". ", " ", ""]
+            )
+        return self._text_splitter
 
     def get_mime_type(self, file_path: str) -> Optional[str]:
         """Determine MIME type from file extension."""
@@ -0,0 +1,197 @@
+"""
+Cache for one-off LLM generations in ChurnVision Enterprise.
+
+Treatments, retention emails and meeting proposals used to be generated from
+scratch every time an employee was reopened. A generation is now stored under
+a key made of:
+
+- the dataset and its cache version, so bump_dataset_version (after
+  retraining, prediction writes or uploads) retires every generation for it
+- the employee and their generation version, so
+  invalidate_employee_generations (called when the employee's reasoning row
+  is rewritten) retires theirs
+- the kind of generation and a SHA-256 of the prompt template version, the
+  messages as sent to the provider (PII-masked for cloud providers), model,
+  temperature and max_tokens
+
+The prompts embed the employee's prediction and reasoning, so a changed row
+also changes the hash. Hits skip the LLM entirely and concurrent misses share
+one call. Every stored key is tracked in an LRU index that is trimmed to
+GENERATION_CACHE_MAX_ENTRIES after each new generation.
+
+    scope = GenerationScope("treatments", "v1", dataset_id, hr_code)
+    text = await chatbot_service.generate_response(messages, model, cache_scope=scope)
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.cache import get_cache, get_dataset_version
+from app.core.config import settings
+from app.core.metrics import GENERATION_CACHE_REQUESTS
+from app.services.utils.json_helpers import parse_json_response
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY_PREFIX = "generation"
+EMPLOYEE_VERSION_PREFIX = "cache_version:employee"
+LRU_INDEX = "generation:lru"
+
+
+@dataclass(frozen=True)
+class GenerationScope:
+    """What a cacheable generation is for (one per prompt template)."""
+    kind: str
+    template_version: str
+    dataset_id: Optional[str] = None
+    hr_code: Optional[str] = None
+    model_version: Optional[str] = None
+    # "array" or "object": only responses that parse as this JSON type are kept
+    expect_json: Optional[str] = None
+
+
+class _Uncacheable(Exception):
+    """A generation that must be returned but not stored."""
+
+    def __init__(self, text: str):
+        super().__init__("generation not cacheable")
+        self.text = text
+
+
+def generation_digest(
+    scope: GenerationScope,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int],
+) -> str:
+    """SHA-256 of the canonical JSON of everything that shapes a generation."""
+    payload: Dict[str, Any] = {
+        "template_version": scope.template_version,
+        "model_version": scope.model_version,
+        "messages": messages,
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def get_employee_generation_version(hr_code: str) -> int:
+    """Current generation version of an employee (0 until first invalidated)."""
+    cache = await get_cache()
+    value = await cache.get(f"{EMPLOYEE_VERSION_PREFIX}:{hr_code}")
+    try:
+        return int(value) if value is not None else 0
+    except ValueError:
+        return 0
+
+
+async def invalidate_employee_generations(hr_code: str) -> int:
+    """
+    Retire every cached generation for an employee.
+
+    Call it after the employee's prediction or reasoning row has been
+    committed. Returns the new version.
+    """
+    cache = await get_cache()
+    version = await cache.incr(f"{EMPLOYEE_VERSION_PREFIX}:{hr_code}")
+    logger.debug(f"Employee {hr_code} generation version is now {version}")
+    return version
+
+
+def _glob_literal(value: str) -> str:
+    """Escape glob wildcards with brackets, which Redis and fnmatch both understand."""
+    return "".join(f"[{c}]" if c in "*?[" else c for c in value)
+
+
+async def purge_employee_generations(hr_code: str) -> int:
+    """
+    Retire and delete every cached generation for an employee.
+
+    Used by GDPR erasure: bumping the version alone would leave the old
+    generations, which name the employee, in the cache until they expire.
+    Returns the number of entries deleted.
+    """
+    await invalidate_employee_generations(hr_code)
+    cache = await get_cache()
+    pattern = f"{GENERATION_KEY_PREFIX}:*:*:{_glob_literal(hr_code)}:e*"
+    removed = await cache.clear_pattern(pattern)
+    logger.info(f"Purged {removed} cached generations for employee {hr_code}")
+    return removed
+
+
+async def generation_key(
+    scope: GenerationScope,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int],
+) -> str:
+    """Cache key of a generation under the current dataset and employee versions."""
+    dataset_version = await get_dataset_version(scope.dataset_id) if scope.dataset_id else 0
+    employee_version = await get_employee_generation_version(scope.hr_code) if scope.hr_code else 0
+    digest = generation_digest(scope, messages, model, temperature, max_tokens)
+    return (
+        f"{GENERATION_KEY_PREFIX}:{scope.dataset_id or '-'}:v{dataset_version}:"
+        f"{scope.hr_code or '-'}:e{employee_version}:{scope.kind}:{digest}"
+    )
+
+
+def _cacheable(text: Optional[str], expect_json: Optional[str]) -> bool:
+    if not text or not text.strip():
+        return False
+    if expect_json is None:
+        return True
+    try:
+        parse_json_response(text, expect_type=expect_json)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+async def cached_generation(
+    scope: GenerationScope,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int],
+    generate: Callable[[], Awaitable[str]],
+) -> str:
+    """
+    Return the cached generation for these inputs, calling generate() on a miss.
+
+    messages should be what the provider receives (masked for cloud
+    providers), so keys never depend on raw PII. Empty responses, and
+    responses that do not parse as scope.expect_json, are returned but not
+    stored; errors from generate() propagate and are not stored either.
+    """
+    cache = await get_cache()
+    key = await generation_key(scope, messages, model, temperature, max_tokens)
+    generated = False
+
+    async def load() -> str:
+        nonlocal generated
+        generated = True
+        text = await generate()
+        if not _cacheable(text, scope.expect_json):
+            raise _Uncacheable(text)
+        return text
+
+    try:
+        text = await cache.get_or_compute(key, load, settings.GENERATION_CACHE_TTL_SECONDS)
+    except _Uncacheable as e:
+        GENERATION_CACHE_REQUESTS.labels(kind=scope.kind, result="uncacheable").inc()
+        return e.text
+
+    GENERATION_CACHE_REQUESTS.labels(kind=scope.kind, result="miss" if generated else "hit").inc()
+    await cache.lru_touch(LRU_INDEX, key)
+    if generated:
+        evicted = await cache.lru_evict(LRU_INDEX, settings.GENERATION_CACHE_MAX_ENTRIES)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} least recently used generations")
+    return text
@@ -5,7 +5,7 @@ Provides context-aware AI responses for ChurnVision-specific queries.
 Returns structured JSON data that matches frontend renderer expectations.
 """
 
-from typing import List, Optional, Dict, Any, Tuple, AsyncGenerator
+from typing import Callable, List, Optional, Dict, Any, Tuple, AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, desc, case
 from sqlalchemy.orm import selectinload
@@ -13,6 +13,7 @@ import re
 import json
 
 from app.core.config import settings
+from app.core.spans import timed
 from app.services.ai.llm_config import resolve_llm_provider_and_model
 from app.models.chatbot import ChatMessage
 from app.models.hr_data import HRDataInput, InterviewData
@@ -20,6 +21,7 @@ from app.models.churn import ChurnOutput, ChurnReasoning, ELTVOutput, Behavioral
 from app.models.treatment import TreatmentDefinition, TreatmentApplication
 from app.models.rag import KnowledgeBaseSettings, CustomHRRule
 from app.services.ai.chatbot_service import ChatbotService
+from app.services.ai.context_planner import ContextPlan
 from app.models.dataset import Dataset
 from app.services.data.project_service import ensure_default_project, get_active_project
 from app.services.data.cached_queries_service import (
@@ -39,6 +41,11 @@ import app.services.tools.aggregation_tools  # noqa: F401
 import app.services.tools.flexible_query  # noqa: F401
 
 
+async def _absent() -> None:
+    """Loader result for a context piece that does not apply."""
+    return None
+
+
 class PatternType:
     """Pattern types for intelligent routing"""
     CHURN_RISK_DIAGNOSIS = "churn_risk_diagnosis"
@@ -64,10 +71,12 @@ class IntelligentChatbotService:
     Returns structured JSON data for frontend renderers.
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, session_factory: Optional[Callable[[], AsyncSession]] = None):
         self.db = db
         self.chatbot_service = ChatbotService(db)
         self.rag_service = RAGService(db)
+        # Sessions for concurrent context lookups (defaults to the app's pool)
+        self.session_factory = session_factory
 
     async def detect_pattern(self, message: str, employee_id: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
         """
@@ -302,20 +311,29 @@ class IntelligentChatbotService:
                 return {}
         return {}
 
+    @timed("context")
     async def gather_context(
         self,
         pattern_type: str,
         entities: Dict[str, Any],
         dataset_id: str
     ) -> Dict[str, Any]:
-        """Gather relevant context from database based on pattern type"""
+        """
+        Gather relevant context from database based on pattern type.
+
+        The lookups are declared on a ContextPlan and run concurrently, each on
+        its own session. RAG retrieval and exit interview patterns are optional:
+        they are left out if they would exceed the turn's latency budget.
+        """
         context = {"pattern": pattern_type, "dataset_id": dataset_id}
+        plan = ContextPlan(session_factory=self.session_factory)
+        hr_code = entities.get("hr_code")
 
         # Always include company-level overview so general/company queries are grounded
-        context["company_overview"] = await self._get_company_overview(dataset_id)
+        plan.add("company_overview", lambda db, _: self._get_company_overview(dataset_id, db=db))
 
         # Include company context from Knowledge Base settings (for AI personalization)
-        context["company_context"] = await self._get_company_context()
+        plan.add("company_context", lambda db, _: self._get_company_context(db=db))
 
         # Employee-specific patterns OR when employee_id is provided (user selected an employee)
         # Always fetch employee context when employee is selected, regardless of pattern
@@ -328,139 +346,72 @@ class IntelligentChatbotService:
             PatternType.EMAIL_ACTION,
             PatternType.MEETING_ACTION,
             PatternType.EMPLOYEE_INFO
-        ] or entities.get("hr_code")  # Also fetch if employee is selected
+        ] or hr_code  # Also fetch if employee is selected
 
         if needs_employee_context:
-            employee = await self._get_employee_data(
-                hr_code=entities.get("hr_code"),
+            plan.add("employee", lambda db, _: self._get_employee_data(
+                hr_code=hr_code,
                 full_name=entities.get("employee_name"),
-                dataset_id=dataset_id
+                dataset_id=dataset_id,
+                db=db
+            ))
+
+            # Lookups keyed by hr_code start alongside the employee lookup when the
+            # code is already known; their results are discarded if it finds nobody
+            by_code = () if hr_code else ("employee",)
+
+            def code(found: Dict[str, Any]) -> str:
+                return hr_code or found["employee"].hr_code
+
+            plan.add("churn", lambda db, found: self._get_churn_data(code(found), dataset_id, db=db), requires=by_code)
+            plan.add("reasoning", lambda db, found: self._get_churn_reasoning(code(found), dataset_id, db=db), requires=by_code)
+            plan.add("eltv", lambda db, found: self._get_eltv_data(code(found), db=db), requires=by_code)
+            plan.add("interviews", lambda db, found: self._get_interview_insights(code(found), dataset_id, db=db), requires=by_code)
+            plan.add("treatment_history", lambda db, found: self._get_treatment_history(code(found), db=db), requires=by_code)
+            plan.add("treatments", lambda db, _: self._get_available_treatments(db=db))
+
+            # Manager/team and department rollups for richer context
+            plan.add(
+                "manager_team",
+                lambda db, found: self._get_manager_team_summary(found["employee"].manager_id, dataset_id, db=db)
+                if found["employee"].manager_id else _absent(),
+                requires=("employee",)
+            )
+            plan.add(
+                "department_snapshot",
+                lambda db, found: self._get_department_snapshot(found["employee"].structure_name, dataset_id, db=db)
+                if found["employee"].structure_name else _absent(),
+                requires=("employee",)
             )
 
-            if employee:
-                additional_data = self._parse_additional_data(getattr(employee, "additional_data", None))
+            # Behavioral stage details if the stage is known
+            plan.add(
+                "stage_details",
+                lambda db, found: self._get_behavioral_stage_details(found["reasoning"].stage, db=db)
+                if found["reasoning"].stage else _absent(),
+                requires=("reasoning",)
+            )
 
-                context["employee"] = {
-                    "hr_code": employee.hr_code,
-                    "full_name": employee.full_name,
-                    "position": employee.position,
-                    "structure_name": employee.structure_name,
-                    "tenure": float(employee.tenure) if employee.tenure else 0,
-                    "status": employee.status,
-                    "employee_cost": float(employee.employee_cost) if employee.employee_cost else 50000,
-                    "report_date": str(employee.report_date) if employee.report_date else None,
-                    "termination_date": str(employee.termination_date) if getattr(employee, "termination_date", None) else None,
-                    "manager_id": employee.manager_id,
-                    "additional_data": additional_data,
-                    "performance_rating_latest": additional_data.get("performance_rating_latest") or additional_data.get("performance_rating")
-                }
+            # Exit interview patterns from similar employees (optional)
+            plan.add(
+                "exit_interview_patterns",
+                lambda db, found: self._get_similar_employee_interview_patterns(
+                    found["employee"].position, found["employee"].structure_name, dataset_id, db=db
+                ) if found["employee"].position and found["employee"].structure_name else _absent(),
+                requires=("employee",),
+                optional=True
+            )
 
-                # Also add additional_data at top level for easier LLM context access
-                context["additional_data"] = additional_data
-
-                # Manager/team and department rollups for richer context
-                if employee.manager_id:
-                    context["manager_team"] = await self._get_manager_team_summary(employee.manager_id, dataset_id)
-
-                if employee.structure_name:
-                    context["department_snapshot"] = await self._get_department_snapshot(employee.structure_name, dataset_id)
-
-                # Get churn prediction (now returns dict with counterfactuals/uncertainty)
-                churn_data = await self._get_churn_data(employee.hr_code, dataset_id)
-                if churn_data:
-                    context["churn"] = churn_data  # Already a dict with all fields
-
-                # Get churn reasoning
-                reasoning = await self._get_churn_reasoning(employee.hr_code, dataset_id)
-                ml_contributors = []
-                if reasoning:
-                    # Parse ml_contributors and heuristic_alerts from JSON strings
-                    heuristic_alerts = []
-                    if reasoning.ml_contributors:
-                        try:
-                            ml_contributors = json.loads(reasoning.ml_contributors) if isinstance(reasoning.ml_contributors, str) else reasoning.ml_contributors
-                        except (json.JSONDecodeError, TypeError):
-                            ml_contributors = []
-                    if reasoning.heuristic_alerts:
-                        try:
-                            heuristic_alerts = json.loads(reasoning.heuristic_alerts) if isinstance(reasoning.heuristic_alerts, str) else reasoning.heuristic_alerts
-                        except (json.JSONDecodeError, TypeError):
-                            heuristic_alerts = []
-
-                    context["reasoning"] = {
-                        "churn_risk": float(reasoning.churn_risk) if reasoning.churn_risk else 0,
-                        "stage": reasoning.stage or "Unknown",
-                        "stage_score": float(reasoning.stage_score) if reasoning.stage_score else 0,
-                        "ml_score": float(reasoning.ml_score) if reasoning.ml_score else 0,
-                        "heuristic_score": float(reasoning.heuristic_score) if reasoning.heuristic_score else 0,
-                        "ml_contributors": ml_contributors,
-                        "heuristic_alerts": heuristic_alerts,
-                        "reasoning": reasoning.reasoning or "",
-                        "recommendations": reasoning.recommendations or "",
-                        "confidence_level": float(reasoning.confidence_level) if reasoning.confidence_level else 0.7,
-                        "calculation_breakdown": reasoning.calculation_breakdown
-                    }
-
-                    # Get behavioral stage details if stage is known
-                    if reasoning.stage:
-                        stage_details = await self._get_behavioral_stage_details(reasoning.stage)
-                        if stage_details:
-                            context["stage_details"] = stage_details
-
-                # ===== NEW: COMPREHENSIVE CONTEXT GATHERING =====
-
-                # Get ELTV (Employee Lifetime Value) for business impact
-                eltv_data = await self._get_eltv_data(employee.hr_code)
-                if eltv_data:
-                    context["eltv"] = eltv_data
-
-                # Get interview insights for this employee
-                interviews = await self._get_interview_insights(employee.hr_code, dataset_id)
-                if interviews:
-                    context["interviews"] = interviews
-
-                # Get exit interview patterns from similar employees
-                if employee.position and employee.structure_name:
-                    interview_patterns = await self._get_similar_employee_interview_patterns(
-                        employee.position, employee.structure_name, dataset_id
-                    )
-                    if interview_patterns.get("total_analyzed", 0) > 0:
-                        context["exit_interview_patterns"] = interview_patterns
-
-                # Get treatment history for this employee
-                treatment_history = await self._get_treatment_history(employee.hr_code)
-                if treatment_history:
-                    context["treatment_history"] = treatment_history
-
-                # Extract employee risk factors for treatment matching
-                employee_risk_factors = []
-                if ml_contributors and isinstance(ml_contributors, list):
-                    employee_risk_factors = [c.get("feature", "") for c in ml_contributors if isinstance(c, dict)]
-
-                # Get treatments for retention plans (with relevance scoring)
-                if pattern_type == PatternType.RETENTION_PLAN:
-                    treatments = await self._get_available_treatments(employee_risk_factors)
-                    context["treatments"] = treatments
-                else:
-                    # Still fetch treatments for general context but without deep matching
-                    treatments = await self._get_available_treatments()
-                    context["available_treatments"] = treatments[:5]  # Top 5 for reference
-
-                # Get similar employees for comparison
-                if pattern_type == PatternType.EMPLOYEE_COMPARISON:
-                    similar = await self._get_similar_employees(employee, dataset_id, resigned=True)
-                    context["similar_employees"] = similar
-                elif pattern_type == PatternType.EMPLOYEE_COMPARISON_STAYED:
-                    similar = await self._get_similar_employees(employee, dataset_id, resigned=False)
-                    context["similar_employees"] = similar
-
-                # Pass through email/meeting context for action patterns
-                if pattern_type == PatternType.EMAIL_ACTION:
-                    context["email_context"] = entities.get("email_context")
-                elif pattern_type == PatternType.MEETING_ACTION:
-                    context["meeting_context"] = entities.get("meeting_context")
-
-        # ===== RAG CONTEXT: Fetch documents and custom rules =====
+            # Similar employees for comparison
+            if pattern_type in (PatternType.EMPLOYEE_COMPARISON, PatternType.EMPLOYEE_COMPARISON_STAYED):
+                resigned = pattern_type == PatternType.EMPLOYEE_COMPARISON
+                plan.add(
+                    "similar_employees",
+                    lambda db, found: self._get_similar_employees(found["employee"], dataset_id, resigned=resigned, db=db),
+                    requires=("employee",)
+                )
+
+        # ===== RAG CONTEXT: Fetch documents and custom rules (optional) =====
         # Retrieve RAG context for all patterns that might benefit from company policies
         if pattern_type in [
             PatternType.GENERAL_CHAT,
@@ -468,42 +419,158 @@ class IntelligentChatbotService:
             PatternType.CHURN_RISK_DIAGNOSIS,
             PatternType.EMPLOYEE_INFO
         ]:
-            rag_context = await self._get_rag_context(
-                entities.get("original_message", "employee retention policies benefits"),
-                context.get("employee")
+            # The RAG service queries on the request's session, which no other piece uses
+            plan.add(
+                "rag_context",
+                lambda _, found: self._get_rag_context(
+                    entities.get("original_message", "employee retention policies benefits"),
+                    self._employee_summary(found.get("employee"))
+                ),
+                requires=("employee",) if needs_employee_context else (),
+                optional=True,
+                uses_db=False
             )
-            if rag_context.get("documents") or rag_context.get("custom_rules"):
-                context["rag_context"] = rag_context
 
-        # Workforce trends
-        if pattern_type == PatternType.WORKFORCE_TRENDS:
-            context["workforce_stats"] = await self._get_workforce_statistics(dataset_id)
+        # Workforce trends; general chat also gets lightweight org stats for grounded responses
+        if pattern_type in (PatternType.WORKFORCE_TRENDS, PatternType.GENERAL_CHAT):
+            plan.add("workforce_stats", lambda db, _: self._get_workforce_statistics(dataset_id, db=db))
 
         # Department analysis
         if pattern_type == PatternType.DEPARTMENT_ANALYSIS:
             dept = entities.get("department")
             if dept:
-                context["department_data"] = await self._get_department_analysis(dept, dataset_id)
+                plan.add("department_data", lambda db, _: self._get_department_analysis(dept, dataset_id, db=db))
             else:
-                context["departments"] = await self._get_all_departments_overview(dataset_id)
+                plan.add("departments", lambda db, _: self._get_all_departments_overview(dataset_id, db=db))
 
         # Exit pattern mining
         if pattern_type == PatternType.EXIT_PATTERN_MINING:
-            context["exit_data"] = await self._analyze_exit_patterns_enhanced(dataset_id)
+            plan.add("exit_data", lambda db, _: self._analyze_exit_patterns_enhanced(dataset_id, db=db))
+
+        found = await plan.run()
+
+        context["company_overview"] = found.get("company_overview")
+        context["company_context"] = found.get("company_context")
+
+        employee = found.get("employee")
+        if employee:
+            additional_data = self._parse_additional_data(getattr(employee, "additional_data", None))
+            context["employee"] = self._employee_summary(employee, additional_data)
+
+            # Also add additional_data at top level for easier LLM context access
+            context["additional_data"] = additional_data
+
+            for key in ("manager_team", "department_snapshot", "churn"):
+                if key in found:
+                    context[key] = found[key]
+
+            reasoning = found.get("reasoning")
+            ml_contributors = []
+            if reasoning:
+                # Parse ml_contributors and heuristic_alerts from JSON strings
+                heuristic_alerts = []
+                if reasoning.ml_contributors:
+                    try:
+                        ml_contributors = json.loads(reasoning.ml_contributors) if isinstance(reasoning.ml_contributors, str) else reasoning.ml_contributors
+                    except (json.JSONDecodeError, TypeError):
+                        ml_contributors = []
+                if reasoning.heuristic_alerts:
+                    try:
+                        heuristic_alerts = json.loads(reasoning.heuristic_alerts) if isinstance(reasoning.heuristic_alerts, str) else reasoning.heuristic_alerts
+                    except (json.JSONDecodeError, TypeError):
+                        heuristic_alerts = []
+
+                context["reasoning"] = {
+                    "churn_risk": float(reasoning.churn_risk) if reasoning.churn_risk else 0,
+                    "stage": reasoning.stage or "Unknown",
+                    "stage_score": float(reasoning.stage_score) if reasoning.stage_score else 0,
+                    "ml_score": float(reasoning.ml_score) if reasoning.ml_score else 0,
+                    "heuristic_score": float(reasoning.heuristic_score) if reasoning.heuristic_score else 0,
+                    "ml_contributors": ml_contributors,
+                    "heuristic_alerts": heuristic_alerts,
+                    "reasoning": reasoning.reasoning or "",
+                    "recommendations": reasoning.recommendations or "",
+                    "confidence_level": float(reasoning.confidence_level) if reasoning.confidence_level else 0.7,
+                    "calculation_breakdown": reasoning.calculation_breakdown
+                }
+
+                if "stage_details" in found:
+                    context["stage_details"] = found["stage_details"]
+
+            # ===== COMPREHENSIVE CONTEXT =====
+            for key in ("eltv", "interviews", "treatment_history"):
+                if found.get(key):
+                    context[key] = found[key]
+
+            interview_patterns = found.get("exit_interview_patterns")
+            if interview_patterns and interview_patterns.get("total_analyzed", 0) > 0:
+                context["exit_interview_patterns"] = interview_patterns
+
+            # Extract employee risk factors for treatment matching
+            employee_risk_factors = []
+            if ml_contributors and isinstance(ml_contributors, list):
+                employee_risk_factors = [c.get("feature", "") for c in ml_contributors if isinstance(c, dict)]
+
+            # Treatments for retention plans (with relevance scoring)
+            treatments = found.get("treatments", [])
+            if pattern_type == PatternType.RETENTION_PLAN:
+                context["treatments"] = self._rank_treatments(treatments, employee_risk_factors)
+            else:
+                # Still include treatments for general context but without deep matching
+                context["available_treatments"] = treatments[:5]  # Top 5 for reference
+
+            if "similar_employees" in found:
+                context["similar_employees"] = found["similar_employees"]
+
+            # Pass through email/meeting context for action patterns
+            if pattern_type == PatternType.EMAIL_ACTION:
+                context["email_context"] = entities.get("email_context")
+            elif pattern_type == PatternType.MEETING_ACTION:
+                context["meeting_context"] = entities.get("meeting_context")
+
+        rag_context = found.get("rag_context") or {}
+        if rag_context.get("documents") or rag_context.get("custom_rules"):
+            context["rag_context"] = rag_context
 
-        # For general chat we still want lightweight org stats for grounded responses
-        if pattern_type == PatternType.GENERAL_CHAT and "workforce_stats" not in context:
-            context["workforce_stats"] = await self._get_workforce_statistics(dataset_id)
+        for key in ("workforce_stats", "department_data", "departments", "exit_data"):
+            if key in found:
+                context[key] = found[key]
 
         return context
 
+    def _employee_summary(
+        self,
+        employee: Optional[HRDataInput],
+        additional_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """The employee fields placed in chat context."""
+        if employee is None:
+            return None
+        if additional_data is None:
+            additional_data = self._parse_additional_data(getattr(employee, "additional_data", None))
+        return {
+            "hr_code": employee.hr_code,
+            "full_name": employee.full_name,
+            "position": employee.position,
+            "structure_name": employee.structure_name,
+            "tenure": float(employee.tenure) if employee.tenure else 0,
+            "status": employee.status,
+            "employee_cost": float(employee.employee_cost) if employee.employee_cost else 50000,
+            "report_date": str(employee.report_date) if employee.report_date else None,
+            "termination_date": str(employee.termination_date) if getattr(employee, "termination_date", None) else None,
+            "manager_id": employee.manager_id,
+            "additional_data": additional_data,
+            "performance_rating_latest": additional_data.get("performance_rating_latest") or additional_data.get("performance_rating")
+        }
+
     # ===== Database Query Methods =====
 
     async def _get_employee_data(
         self,
         hr_code: Optional[str],
         full_name: Optional[str],
-        dataset_id: str
+        dataset_id: str,
+        db: Optional[AsyncSession] = None
     ) -> Optional[HRDataInput]:
         """Fetch employee data from database"""
         query = select(HRDataInput).where(HRDataInput.dataset_id == dataset_id)
@@ -516,16 +583,16 @@ class IntelligentChatbotService:
             return None
 
         query = query.order_by(desc(HRDataInput.report_date)).limit(1)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         return result.scalar_one_or_none()
 
-    async def _get_churn_data(self, hr_code: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_churn_data(self, hr_code: str, dataset_id: str, db: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
         """Fetch churn prediction data including counterfactuals and uncertainty."""
         query = select(ChurnOutput).where(
             ChurnOutput.hr_code == hr_code,
             ChurnOutput.dataset_id == dataset_id
         ).order_by(desc(ChurnOutput.generated_at)).limit(1)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         churn = result.scalar_one_or_none()
 
         if not churn:
@@ -549,7 +616,7 @@ class IntelligentChatbotService:
             "prediction_date": churn.prediction_date
         }
 
-    async def _get_churn_reasoning(self, hr_code: str, dataset_id: str) -> Optional[ChurnReasoning]:
+    async def _get_churn_reasoning(self, hr_code: str, dataset_id: str, db: Optional[AsyncSession] = None) -> Optional[ChurnReasoning]:
         """Fetch churn reasoning data scoped to dataset via HR data join."""
         query = select(ChurnReasoning).join(
             HRDataInput, HRDataInput.hr_code == ChurnReasoning.hr_code
@@ -557,13 +624,13 @@ class IntelligentChatbotService:
             ChurnReasoning.hr_code == hr_code,
             HRDataInput.dataset_id == dataset_id
         ).order_by(desc(ChurnReasoning.updated_at)).limit(1)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         return result.scalar_one_or_none()
 
-    async def _get_available_treatments(self, employee_risk_factors: List[str] = None) -> List[Dict[str, Any]]:
+    async def _get_available_treatments(self, employee_risk_factors: List[str] = None, db: Optional[AsyncSession] = None) -> List[Dict[str, Any]]:
         """Get all active treatment definitions with full metadata for context-aware matching."""
         query = select(TreatmentDefinition).where(TreatmentDefinition.is_active == 1)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         treatments = result.scalars().all()
 
         treatment_list = []
@@ -598,12 +665,6 @@ class IntelligentChatbotService:
                 except (json.JSONDecodeError, TypeError):
                     impact_factors = []
 
-            # Calculate relevance score if employee risk factors provided
-            relevance_score = 0
-            if employee_risk_factors and targeted_variables:
-                matching_factors = set(str(v).lower() for v in targeted_variables) & set(str(f).lower() for f in employee_risk_factors)
-                relevance_score = len(matching_factors) / max(len(employee_risk_factors), 1)
-
             treatment_list.append({
                 "id": t.id,
                 "name": t.name,
@@ -618,21 +679,39 @@ class IntelligentChatbotService:
                 "llm_prompt": t.llm_prompt,
                 "llm_reasoning": t.llm_reasoning,
                 "is_custom": t.is_custom == 1,
-                "relevance_score": relevance_score
+                "relevance_score": 0
             })
 
-        # Sort by relevance score if employee context provided
-        if employee_risk_factors:
-            treatment_list.sort(key=lambda x: x["relevance_score"], reverse=True)
+        return self._rank_treatments(treatment_list, employee_risk_factors)
+
+    def _rank_treatments(
+        self,
+        treatments: List[Dict[str, Any]],
+        employee_risk_factors: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        """Score treatments by how many of the employee's risk factors they target, best first."""
+        if not employee_risk_factors:
+            return treatments
+
+        risk_factors = set(str(f).lower() for f in employee_risk_factors)
+        ranked = []
+        for treatment in treatments:
+            relevance_score = 0
+            if treatment["targeted_variables"]:
+                matching_factors = set(str(v).lower() for v in treatment["targeted_variables"]) & risk_factors
+                relevance_score = len(matching_factors) / max(len(employee_risk_factors), 1)
+            ranked.append({**treatment, "relevance_score": relevance_score})
 
-        return treatment_list
+        ranked.sort(key=lambda x: x["relevance_score"], reverse=True)
+        return ranked
 
     async def _get_similar_employees(
         self,
         employee: HRDataInput,
         dataset_id: str,
         resigned: bool = True,
-        limit: int = 5
+        limit: int = 5,
+        db: Optional[AsyncSession] = None
     ) -> List[Dict[str, Any]]:
         """Find similar employees (resigned or active)"""
         # Match "Terminated" for resigned and "Active" for active (case-insensitive)
@@ -654,7 +733,7 @@ class IntelligentChatbotService:
             )
         ).limit(limit)
 
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         similar = result.all()
 
         return [
@@ -674,26 +753,26 @@ class IntelligentChatbotService:
             for e, r in similar
         ]
 
-    async def _get_workforce_statistics(self, dataset_id: str) -> Dict[str, Any]:
+    async def _get_workforce_statistics(self, dataset_id: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
         """Get comprehensive workforce statistics (cached)."""
-        return await get_cached_workforce_statistics(self.db, dataset_id)
+        return await get_cached_workforce_statistics(db or self.db, dataset_id)
 
-    async def _get_company_overview(self, dataset_id: str) -> Dict[str, Any]:
+    async def _get_company_overview(self, dataset_id: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
         """Aggregate company-level metrics scoped to dataset (cached)."""
-        return await get_cached_company_overview(self.db, dataset_id)
+        return await get_cached_company_overview(db or self.db, dataset_id)
 
-    async def _get_manager_team_summary(self, manager_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_manager_team_summary(self, manager_id: str, dataset_id: str, db: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
         """Summarize team under a manager with risk/cost/tenure aggregates (cached)."""
-        return await get_cached_manager_team_summary(self.db, dataset_id, manager_id)
+        return await get_cached_manager_team_summary(db or self.db, dataset_id, manager_id)
 
-    async def _get_department_snapshot(self, department: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_department_snapshot(self, department: str, dataset_id: str, db: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
         """Return key stats for a department to enrich responses (cached)."""
-        return await get_cached_department_snapshot(self.db, dataset_id, department)
+        return await get_cached_department_snapshot(db or self.db, dataset_id, department)
 
-    async def _get_eltv_data(self, hr_code: str) -> Optional[Dict[str, Any]]:
+    async def _get_eltv_data(self, hr_code: str, db: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
         """Fetch ELTV (Employee Lifetime Value) data for business impact context."""
         query = select(ELTVOutput).where(ELTVOutput.hr_code == hr_code)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         eltv = result.scalar_one_or_none()
 
         if not eltv:
@@ -707,12 +786,12 @@ class IntelligentChatbotService:
             "model_version": eltv.model_version
         }
 
-    async def _get_interview_insights(self, hr_code: str, dataset_id: str) -> List[Dict[str, Any]]:
+    async def _get_interview_insights(self, hr_code: str, dataset_id: str, db: Optional[AsyncSession] = None) -> List[Dict[str, Any]]:
         """Fetch interview data (exit/stay interviews) for this employee."""
         query = select(InterviewData).where(
             InterviewData.hr_code == hr_code
         ).order_by(desc(InterviewData.interview_date)).limit(5)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         interviews = result.scalars().all()
 
         return [
@@ -726,7 +805,7 @@ class IntelligentChatbotService:
             for i in interviews
         ]
 
-    async def _get_similar_employee_interview_patterns(self, position: str, department: str, dataset_id: str) -> Dict[str, Any]:
+    async def _get_similar_employee_interview_patterns(self, position: str, department: str, dataset_id: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
         """Analyze exit interview patterns from similar employees who left."""
         # Get exit interviews from terminated employees in same position/department
         query = select(InterviewData, HRDataInput).join(
@@ -743,7 +822,7 @@ class IntelligentChatbotService:
             )
         ).limit(20)
 
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         interviews = result.all()
 
         if not interviews:
@@ -778,12 +857,12 @@ class IntelligentChatbotService:
             "total_analyzed": len(interviews)
         }
 
-    async def _get_treatment_history(self, hr_code: str) -> List[Dict[str, Any]]:
+    async def _get_treatment_history(self, hr_code: str, db: Optional[AsyncSession] = None) -> List[Dict[str, Any]]:
         """Fetch treatment application history for this employee."""
         query = select(TreatmentApplication).where(
             TreatmentApplication.hr_code == hr_code
         ).order_by(desc(TreatmentApplication.applied_date)).limit(10)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         treatments = result.scalars().all()
 
         return [
@@ -823,13 +902,13 @@ class IntelligentChatbotService:
             print(f"[RAG] Error retrieving context: {e}", flush=True)
             return {"documents": [], "custom_rules": [], "sources": []}
 
-    async def _get_behavioral_stage_details(self, stage_name: str) -> Optional[Dict[str, Any]]:
+    async def _get_behavioral_stage_details(self, stage_name: str, db: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
         """Get detailed behavioral stage information."""
         query = select(BehavioralStage).where(
             BehavioralStage.stage_name == stage_name,
             BehavioralStage.is_active == 1
         )
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         stage = result.scalar_one_or_none()
 
         if not stage:
@@ -844,10 +923,10 @@ class IntelligentChatbotService:
             "base_risk_score": float(stage.base_risk_score) if stage.base_risk_score else 0
         }
 
-    async def _get_company_context(self) -> Optional[Dict[str, Any]]:
+    async def _get_company_context(self, db: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
         """Fetch company context from KnowledgeBaseSettings for AI personalization."""
         query = select(KnowledgeBaseSettings).limit(1)
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         settings_record = result.scalar_one_or_none()
 
         if not settings_record:
@@ -869,7 +948,7 @@ class IntelligentChatbotService:
             "company_description": settings_record.company_description,
         }
 
-    async def _get_department_analysis(self, department: str, dataset_id: str) -> Dict[str, Any]:
+    async def _get_department_analysis(self, department: str, dataset_id: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
         """Get detailed analysis for a specific department"""
         query = select(HRDataInput, ChurnReasoning).outerjoin(
             ChurnReasoning,
@@ -882,7 +961,7 @@ class IntelligentChatbotService:
             )
         )
 
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         employees = result.all()
 
         if not employees:
@@ -915,7 +994,7 @@ class IntelligentChatbotService:
             "avgCost": sum(float(e.employee_cost) for e, r in employees if e.employee_cost) / total if total else 0
         }
 
-    async def _get_all_departments_overview(self, dataset_id: str) -> List[Dict[str, Any]]:
+    async def _get_all_departments_overview(self, dataset_id: str, db: Optional[AsyncSession] = None) -> List[Dict[str, Any]]:
         """Get overview of all departments"""
         query = select(HRDataInput, ChurnReasoning).outerjoin(
             ChurnReasoning,
@@ -923,7 +1002,7 @@ class IntelligentChatbotService:
         ).where(func.lower(HRDataInput.status) == "active")
         query = query.where(HRDataInput.dataset_id == dataset_id)
 
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         employees = result.all()
 
         dept_data = {}
@@ -949,7 +1028,7 @@ class IntelligentChatbotService:
 
         return sorted(departments, key=lambda x: x["avgRisk"], reverse=True)
 
-    async def _analyze_exit_patterns_enhanced(self, dataset_id: str) -> Dict[str, Any]:
+    async def _analyze_exit_patterns_enhanced(self, dataset_id: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
         """Comprehensive exit pattern analysis"""
         # Get terminated employees with reasoning (case-insensitive)
         query = select(HRDataInput, ChurnReasoning).outerjoin(
@@ -958,7 +1037,7 @@ class IntelligentChatbotService:
         ).where(func.lower(HRDataInput.status) == "terminated")
         query = query.where(HRDataInput.dataset_id == dataset_id)
 
-        result = await self.db.execute(query)
+        result = await (db or self.db).execute(query)
         resigned = result.all()
 
         total = len(resigned)
@@ -1772,6 +1851,62 @@ Best regards,
         context: Dict[str, Any]
     ) -> str:
         """Generate general response using LLM with COMPREHENSIVE context from ALL sources."""
+        messages, model, max_tokens = await self._build_general_request(message, context)
+
+        try:
+            response, _ = await self.chatbot_service._get_llm_response(
+                messages=messages,
+                model=model,
+                temperature=0.7,
+                max_tokens=max_tokens
+            )
+            print(f"[GENERAL_RESPONSE] LLM response length: {len(response) if response else 0}", flush=True)
+            if response and response.strip():
+                return response
+            raise ValueError("LLM returned empty response")
+        except Exception as e:
+            print(f"[GENERAL_RESPONSE] LLM call failed: {e}", flush=True)
+            return self._general_fallback_response(context)
+
+    async def _stream_general_response(
+        self,
+        message: str,
+        context: Dict[str, Any]
+    ) -> AsyncGenerator[str, None]:
+        """
+        Streaming counterpart of _generate_general_response.
+
+        Yields text deltas as the provider generates them. If the LLM fails or
+        returns nothing before any text was sent, the data-driven fallback is
+        yielded instead; a failure mid-answer is re-raised.
+        """
+        messages, model, max_tokens = await self._build_general_request(message, context)
+
+        streamed = False
+        try:
+            async for delta in self.chatbot_service.stream_llm_response(
+                messages=messages,
+                model=model,
+                temperature=0.7,
+                max_tokens=max_tokens
+            ):
+                if delta:
+                    streamed = streamed or bool(delta.strip())
+                    yield delta
+        except Exception as e:
+            print(f"[GENERAL_RESPONSE] LLM stream failed: {e}", flush=True)
+            if streamed:
+                raise
+
+        if not streamed:
+            yield self._general_fallback_response(context)
+
+    async def _build_general_request(
+        self,
+        message: str,
+        context: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, str]], str, int]:
+        """Build the LLM messages for a general chat answer. Returns (messages, model, max_tokens)."""
         print(f"[GENERAL_RESPONSE] === Generating general LLM response with FULL context ===", flush=True)
 
         # Extract all context sources
@@ -2100,49 +2235,44 @@ Answer directly and concisely."""
         # Set max_tokens based on provider (limited for local Ollama, high for cloud)
         max_tokens = 1024 if runtime_provider == "ollama" else 8192
 
-        try:
-            response, _ = await self.chatbot_service._get_llm_response(
-                messages=messages,
-                model=model,
-                temperature=0.7,
-                max_tokens=max_tokens
-            )
-            print(f"[GENERAL_RESPONSE] LLM response length: {len(response) if response else 0}", flush=True)
-            if response and response.strip():
-                return response
-            raise ValueError("LLM returned empty response")
-        except Exception as e:
-            print(f"[GENERAL_RESPONSE] LLM call failed: {e}", flush=True)
+        return messages, model, max_tokens
 
-            # Return comprehensive fallback with available data
-            if employee:
-                risk = churn.get("resign_proba", reasoning.get("churn_risk", 0))
-                risk_level = "High" if risk >= 0.6 else "Medium" if risk >= 0.3 else "Low"
-                fallback = (
-                    f"**{employee.get('full_name', 'Employee')}** ({employee.get('hr_code', 'N/A')})\n\n"
-                    f"**Risk Assessment:** {risk:.0%} churn probability ({risk_level} priority)\n"
-                    f"**Position:** {employee.get('position', 'N/A')} in {employee.get('structure_name', 'N/A')}\n"
-                    f"**Tenure:** {employee.get('tenure', 0):.1f} years\n\n"
-                )
-                if eltv_data:
-                    fallback += f"**Business Impact:** ${eltv_data.get('eltv_pre_treatment', 0):,.0f} employee lifetime value\n\n"
-                if ml_contributors:
-                    fallback += "**Top Risk Factors:**\n"
-                    for contrib in ml_contributors[:3]:
-                        if isinstance(contrib, dict):
-                            fallback += f"- {contrib.get('feature', 'Unknown')}: {contrib.get('value', 'N/A')}\n"
-                return fallback
-
-            # Generic fallback
-            stats = context.get("workforce_stats", {}) or {}
-            return (
-                f"Hi! I'm your ChurnVision AI Assistant with comprehensive analytics capabilities.\n\n"
-                f"**Workforce Overview:**\n"
-                f"- Total Employees: {stats.get('totalEmployees', 0)}\n"
-                f"- High Risk: {stats.get('highRisk', 0)}\n"
-                f"- Medium Risk: {stats.get('mediumRisk', 0)}\n\n"
-                "How can I help you with employee retention today?"
+    def _general_fallback_response(self, context: Dict[str, Any]) -> str:
+        """Answer built from the gathered data alone, for when the LLM is unavailable."""
+        employee = context.get("employee")
+        churn = context.get("churn", {})
+        reasoning = context.get("reasoning", {})
+        eltv_data = context.get("eltv", {})
+
+        if employee:
+            ml_contributors = reasoning.get('ml_contributors', [])
+            risk = churn.get("resign_proba", reasoning.get("churn_risk", 0))
+            risk_level = "High" if risk >= 0.6 else "Medium" if risk >= 0.3 else "Low"
+            fallback = (
+                f"**{employee.get('full_name', 'Employee')}** ({employee.get('hr_code', 'N/A')})\n\n"
+                f"**Risk Assessment:** {risk:.0%} churn probability ({risk_level} priority)\n"
+                f"**Position:** {employee.get('position', 'N/A')} in {employee.get('structure_name', 'N/A')}\n"
+                f"**Tenure:** {employee.get('tenure', 0):.1f} years\n\n"
             )
+            if eltv_data:
+                fallback += f"**Business Impact:** ${eltv_data.get('eltv_pre_treatment', 0):,.0f} employee lifetime value\n\n"
+            if ml_contributors:
+                fallback += "**Top Risk Factors:**\n"
+                for contrib in ml_contributors[:3]:
+                    if isinstance(contrib, dict):
+                        fallback += f"- {contrib.get('feature', 'Unknown')}: {contrib.get('value', 'N/A')}\n"
+            return fallback
+
+        # Generic fallback
+        stats = context.get("workforce_stats", {}) or {}
+        return (
+            f"Hi! I'm your ChurnVision AI Assistant with comprehensive analytics capabilities.\n\n"
+            f"**Workforce Overview:**\n"
+            f"- Total Employees: {stats.get('totalEmployees', 0)}\n"
+            f"- High Risk: {stats.get('highRisk', 0)}\n"
+            f"- Medium Risk: {stats.get('mediumRisk', 0)}\n\n"
+            "How can I help you with employee retention today?"
+        )
 
     async def chat(
         self,
@@ -2270,7 +2400,8 @@ Answer directly and concisely."""
             provider=provider,
             dataset_id=dataset_id,
             employee_context=employee_context,
-            chatbot_service=self.chatbot_service
+            chatbot_service=self.chatbot_service,
+            session_factory=self.session_factory
         )
 
         # Run the agent
@@ -2331,6 +2462,7 @@ Answer directly and concisely."""
             {"type": "state", "state": "thinking"}
             {"type": "tool_call", "tool": "count_employees", "arguments": {...}}
             {"type": "tool_result", "tool": "count_employees", "success": true, "preview": "..."}
+            {"type": "tool_batch", "tools": 3, "parallel": true, "wall_time_ms": 120, "serial_time_ms": 310}
             {"type": "token", "content": "word "}
             {"type": "done", "full_response": "..."}
         """
@@ -2363,7 +2495,8 @@ Answer directly and concisely."""
             provider=provider,
             dataset_id=dataset_id,
             employee_context=employee_context,
-            chatbot_service=self.chatbot_service
+            chatbot_service=self.chatbot_service,
+            session_factory=self.session_factory
         )
 
         # Stream events
@@ -2465,33 +2598,23 @@ When answering, be direct and data-driven. Include relevant numbers from the too
         dataset_id: Optional[str] = None,
     ) -> AsyncGenerator[str, None]:
         """
-        Stream chat response token by token for WebSocket delivery.
+        Stream an LLM chat response for WebSocket delivery.
 
-        This method wraps the standard chat method and simulates streaming
-        by yielding words from the full response. For true token-level streaming,
-        the underlying LLM provider would need to support streaming APIs.
+        Context is gathered as in chat() (LLM mode), then the answer is yielded
+        delta by delta as the provider generates it, with PII placeholders
+        restored on the fly for cloud providers. The user's message is saved
+        before streaming starts, so the turn stays in the history even if the
+        stream fails; the answer is saved once the stream has finished.
         """
-        import re
-
-        # Get the full response using the standard chat method
-        result = await self.chat(
-            message=message,
-            session_id=session_id,
-            employee_id=employee_id,
-            dataset_id=dataset_id,
-            action_type=None  # Always use LLM mode for streaming
-        )
-
-        response_text = result.get("response", "")
+        dataset_id = await self._resolve_dataset_id(dataset_id)
+        entities = {"hr_code": employee_id, "original_message": message} if employee_id else {"original_message": message}
 
-        if not response_text:
-            yield "I'm sorry, I couldn't generate a response."
-            return
+        context = await self.gather_context(PatternType.GENERAL_CHAT, entities, dataset_id)
+        await self._save_message(session_id, employee_id, message, "user")
 
-        # Split by words and markdown elements to provide natural streaming
-        # This regex splits on spaces while preserving markdown formatting
-        tokens = re.split(r'(\s+|(?<=[.!?])\s+)', response_text)
+        parts: List[str] = []
+        async for delta in self._stream_general_response(message, context):
+            parts.append(delta)
+            yield delta
 
-        for token in tokens:
-            if token:  # Skip empty tokens
-                yield token
+        await self._save_message(session_id, employee_id, "".join(parts), "assistant")
@@ -0,0 +1,227 @@
+"""
+Long-lived LLM provider clients for ChurnVision Enterprise.
+
+Provider SDK clients used to be built for every call, so each chat turn paid
+a new TCP/TLS handshake and nothing bounded how many generations reached a
+single local Ollama instance. LLMClientManager keeps:
+
+- one client per provider and credential (and base URL), reused across calls
+  so its connection pool keeps connections alive
+- a concurrency limit per provider (LLM_MAX_CONCURRENCY_<PROVIDER>); calls
+  beyond it queue, and the wait is exported as
+  churnvision_llm_queue_wait_seconds{provider}
+- one retry policy for transient failures (connection errors, 408/429/5xx):
+  exponential backoff with full jitter. SDK-level retries are turned off so
+  retries never multiply.
+
+    client = llm_clients.client("ollama")
+    response = await llm_clients.call("ollama", lambda: client.chat(...))
+
+Streams hold their slot until they finish and are only retried before the
+first chunk, so callers never see a repeated prefix.
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import LLM_ACTIVE, LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT_SECONDS, LLM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Connection-level failures (the request never reached the model); read
+# timeouts are not retried, a slow generation would only run again
+RETRYABLE_ERRORS = {"APIConnectionError", "ConnectError", "ConnectTimeout", "RemoteProtocolError", "PoolTimeout"}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an SDK error is worth retrying."""
+    if isinstance(error, ConnectionError):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+def _concurrency_limit(provider: str) -> int:
+    limits = {
+        "ollama": settings.LLM_MAX_CONCURRENCY_OLLAMA,
+        "openai": settings.LLM_MAX_CONCURRENCY_OPENAI,
+        "anthropic": settings.LLM_MAX_CONCURRENCY_ANTHROPIC,
+        "google": settings.LLM_MAX_CONCURRENCY_GOOGLE,
+    }
+    return max(1, limits.get(provider, settings.LLM_MAX_CONCURRENCY_OLLAMA))
+
+
+def _create_client(provider: str, api_key: Optional[str], base_url: Optional[str]) -> Any:
+    if provider == "openai":
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=settings.LLM_REQUEST_TIMEOUT,
+            max_retries=0,
+        )
+    if provider == "anthropic":
+        from anthropic import AsyncAnthropic
+
+        return AsyncAnthropic(api_key=api_key, timeout=settings.LLM_REQUEST_TIMEOUT, max_retries=0)
+    if provider == "google":
+        from google import genai
+
+        return genai.Client(api_key=api_key)
+
+    import httpx
+    from ollama import AsyncClient
+
+    return AsyncClient(
+        host=base_url,
+        limits=httpx.Limits(keepalive_expiry=settings.LLM_KEEPALIVE_SECONDS),
+    )
+
+
+async def _close_client(client: Any) -> None:
+    aio = getattr(client, "aio", None)  # google-genai keeps its async transport here
+    close = getattr(aio, "aclose", None) or getattr(client, "close", None)
+    if close is None:
+        return
+    result = close()
+    if inspect.isawaitable(result):
+        await result
+
+
+class LLMClientManager:
+    """Pooled provider clients with per-provider concurrency limits and retries."""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        backoff_max_seconds: Optional[float] = None,
+    ):
+        self.max_retries = max_retries if max_retries is not None else settings.LLM_MAX_RETRIES
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings.LLM_RETRY_BACKOFF_SECONDS
+        self.backoff_max_seconds = (
+            backoff_max_seconds if backoff_max_seconds is not None else settings.LLM_RETRY_BACKOFF_MAX_SECONDS
+        )
+        self._clients: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connection pools and semaphores belong to the loop that created them
+            self._loop = loop
+            self._clients.clear()
+            self._semaphores.clear()
+
+    def client(self, provider: str, api_key: Optional[str] = None) -> Any:
+        """The shared SDK client for provider (created on first use)."""
+        self._bind_loop()
+        if provider == "ollama":
+            base_url = settings.OLLAMA_BASE_URL
+        elif provider == "openai":
+            base_url = settings.OPENAI_BASE_URL
+        else:
+            base_url = None
+        key = (provider, api_key, base_url)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = _create_client(provider, api_key, base_url)
+        return client
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """Hold one of provider's concurrency slots."""
+        self._bind_loop()
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(_concurrency_limit(provider))
+
+        queued = LLM_QUEUE_DEPTH.labels(provider=provider)
+        active = LLM_ACTIVE.labels(provider=provider)
+        queued.inc()
+        submitted = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            queued.dec()
+        LLM_QUEUE_WAIT_SECONDS.labels(provider=provider).observe(time.perf_counter() - submitted)
+        active.inc()
+        try:
+            yield
+        finally:
+            active.dec()
+            semaphore.release()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt (1-based)."""
+        ceiling = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    async def _before_retry(self, provider: str, attempt: int, error: BaseException) -> None:
+        delay = self.backoff(attempt)
+        LLM_RETRIES.labels(provider=provider).inc()
+        logger.warning(
+            f"LLM call to {provider} failed ({type(error).__name__}: {error}); "
+            f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+        )
+        await asyncio.sleep(delay)
+
+    async def call(self, provider: str, request: Callable[[], Awaitable[T]]) -> T:
+        """Run request() in one of provider's slots, retrying transient failures."""
+        attempt = 0
+        while True:
+            try:
+                async with self.slot(provider):
+                    return await request()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                attempt += 1
+                await self._before_retry(provider, attempt, e)
+
+    async def stream(self, provider: str, open_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Re-yield open_stream() while holding one of provider's slots.
+
+        Failures before the first item are retried like call(); once an item
+        has been yielded, errors propagate.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self.slot(provider):
+                    async for item in open_stream():
+                        started = True
+                        yield item
+                return
+            except Exception as e:
+                if started or attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                attempt += 1
+                await self._before_retry(provider, attempt, e)
+
+    async def aclose(self) -> None:
+        """Close every pooled client (shutdown callback)."""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await _close_client(client)
+            except Exception as e:
+                logger.warning(f"Error closing LLM client {type(client).__name__}: {e}")
+
+
+llm_clients = LLMClientManager()
@@ -18,6 +18,8 @@ from sqlalchemy import select, update, delete
 from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
+from app.core.executors import run_io
+from app.core.spans import span
 from app.models.rag import RAGDocument, RAGChunk, CustomHRRule, KnowledgeBaseSettings
 from app.services.ai.document_processor_service import DocumentProcessor
 from app.services.ai.vector_store_service import get_vector_store, VectorStoreService
@@ -197,14 +199,17 @@ class RAGService:
                 min_similarity = min_similarity or settings.RAG_SIMILARITY_THRESHOLD
                 top_k = top_k or settings.RAG_TOP_K
 
-        # Semantic search in vector store
-        search_results = self.vector_store.search(
-            query=query,
-            top_k=top_k,
-            project_id=project_id,
-            document_types=document_types,
-            min_similarity=min_similarity,
-        )
+        # Semantic search in vector store (embedding the query and the
+        # ChromaDB lookup both block, so they run on the I/O pool)
+        with span("retrieval"):
+            search_results = await run_io(
+                self.vector_store.search,
+                query=query,
+                top_k=top_k,
+                project_id=project_id,
+                document_types=document_types,
+                min_similarity=min_similarity,
+            )
 
         # Fetch custom rules if enabled
         custom_rules = []
@@ -13,6 +13,7 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.ai.base_generation_service import BaseAIGenerationService
+from app.services.ai.generation_cache import GenerationScope
 from app.services.utils.json_helpers import parse_json_response, safe_json_loads
 from app.models.hr_data import HRDataInput
 from app.models.churn import ChurnOutput, ChurnReasoning
@@ -20,6 +21,10 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Bump when the treatment prompts or system messages change, so cached
+# generations from the old prompts are not reused
+TREATMENT_PROMPT_VERSION = "1"
+
 
 class TreatmentGenerationService(BaseAIGenerationService):
     """
@@ -109,7 +114,15 @@ class TreatmentGenerationService(BaseAIGenerationService):
                 ],
                 model=effective_model,
                 temperature=0.7 if rag_context else 0.8,
-                max_tokens=2048
+                max_tokens=2048,
+                cache_scope=GenerationScope(
+                    kind="treatments",
+                    template_version=TREATMENT_PROMPT_VERSION,
+                    dataset_id=employee.dataset_id,
+                    hr_code=hr_code,
+                    model_version=churn_data.model_version if churn_data else None,
+                    expect_json="array",
+                ),
             )
 
             # 5. Parse Response
@@ -18,6 +18,10 @@ from sqlalchemy import select, func
 logger = logging.getLogger(__name__)
 
 
+# Risk level labels indexed by the codes returned from get_risk_level_codes
+RISK_LEVEL_ORDER = ('low', 'medium', 'high')
+
+
 @dataclass
 class DatasetThresholds:
     """All thresholds computed from a specific dataset."""
@@ -110,6 +114,10 @@ class DataDrivenThresholdsService:
             return self._thresholds_cache.get(dataset_id or "default")
         return None
 
+    def store_thresholds(self, thresholds: DatasetThresholds) -> None:
+        """Cache thresholds computed elsewhere (e.g. in a training worker process)."""
+        self._thresholds_cache[thresholds.dataset_id or "default"] = thresholds
+
     def compute_thresholds_from_dataframe(
         self,
         df: pd.DataFrame,
@@ -356,6 +364,22 @@ class DataDrivenThresholdsService:
             return 'medium'
         return 'low'
 
+    def get_risk_level_codes(
+        self,
+        churn_probabilities: np.ndarray,
+        dataset_id: Optional[str] = None
+    ) -> np.ndarray:
+        """Vectorized get_risk_level: 0 = low, 1 = medium, 2 = high (see RISK_LEVEL_ORDER)."""
+        thresholds = self.get_cached_thresholds(dataset_id)
+        probabilities = np.asarray(churn_probabilities, dtype=float)
+
+        if not thresholds or thresholds.risk_high_threshold == 0:
+            medium, high = 0.33, 0.67
+        else:
+            medium, high = thresholds.risk_medium_threshold, thresholds.risk_high_threshold
+
+        return (probabilities >= medium).astype(np.int8) + (probabilities >= high).astype(np.int8)
+
     def get_feature_percentile(
         self,
         feature_name: str,
@@ -388,6 +412,30 @@ class DataDrivenThresholdsService:
         else:
             return min(100.0, 90.0 + 10.0 * (value - ranges['p90']) / (ranges['max'] - ranges['p90'] + 0.0001))
 
+    def get_feature_percentiles(
+        self,
+        feature_name: str,
+        values: np.ndarray,
+        dataset_id: Optional[str] = None
+    ) -> np.ndarray:
+        """Vectorized get_feature_percentile over an array of values."""
+        values = np.asarray(values, dtype=float)
+        thresholds = self.get_cached_thresholds(dataset_id)
+
+        if not thresholds or feature_name not in thresholds.feature_ranges:
+            return np.full(values.shape, 50.0)
+
+        r = thresholds.feature_ranges[feature_name]
+        # Same piecewise-linear interpolation between known percentiles as get_feature_percentile
+        knots = [('min', 'p10', 0.0, 10.0), ('p10', 'p25', 10.0, 15.0), ('p25', 'p50', 25.0, 25.0),
+                 ('p50', 'p75', 50.0, 25.0), ('p75', 'p90', 75.0, 15.0), ('p90', 'max', 90.0, 10.0)]
+        conditions = [values <= r['p10'], values <= r['p25'], values <= r['p50'], values <= r['p75'], values <= r['p90']]
+        choices = [
+            base + span * (values - r[lo]) / (r[hi] - r[lo] + 0.0001)
+            for lo, hi, base, span in knots
+        ]
+        return np.select(conditions, choices[:-1], default=np.minimum(100.0, choices[-1]))
+
     def is_feature_anomalous(
         self,
         feature_name: str,
@@ -17,11 +17,13 @@ References:
 - DCF (Discounted Cash Flow) methodology for value calculation
 """
 
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Sequence, Tuple
 from dataclasses import dataclass
 from functools import lru_cache
 import math
 
+import numpy as np
+
 from app.services.analytics.data_driven_thresholds_service import data_driven_thresholds_service
 
 
@@ -47,14 +49,7 @@ class SurvivalCurveParams:
         # Clamp churn probability to valid range
         churn_prob = max(0.01, min(0.99, annual_churn_prob))
 
-        # Shape parameter - slight increase in hazard over time
-        # Modified based on tenure to account for different risk profiles
-        if tenure_years < 1:
-            k = 0.8  # New employees have decreasing hazard after initial period
-        elif tenure_years < 3:
-            k = 1.0  # Mid-tenure employees have constant hazard
-        else:
-            k = 1.2  # Longer-tenure employees may have increasing hazard
+        k = cls.shape_for_tenure(tenure_years)
 
         # Derive scale parameter from annual churn probability
         # S(1) = exp(-(λ×1)^k) = 1 - churn_prob
@@ -64,6 +59,16 @@ class SurvivalCurveParams:
 
         return cls(scale=scale, shape=k)
 
+    @staticmethod
+    def shape_for_tenure(tenure_years: float) -> float:
+        """Shape parameter - slight increase in hazard over time, modified by tenure."""
+        if tenure_years < 1:
+            return 0.8  # New employees have decreasing hazard after initial period
+        elif tenure_years < 3:
+            return 1.0  # Mid-tenure employees have constant hazard
+        else:
+            return 1.2  # Longer-tenure employees may have increasing hazard
+
 
 @dataclass
 class ELTVResult:
@@ -88,6 +93,52 @@ class ELTVResult:
         }
 
 
+@dataclass
+class ELTVBatchResult:
+    """
+    ELTV for many employees, stored column-wise.
+
+    Survival curves are kept as one float32 (n_employees x horizon) matrix;
+    the legacy month-keyed dicts are only built per employee on request.
+    """
+    eltv: np.ndarray                    # (n,)
+    expected_tenure_months: np.ndarray  # (n,)
+    replacement_cost: np.ndarray        # (n,)
+    revenue_multiplier: np.ndarray      # (n,)
+    survival: np.ndarray                # (n, horizon) float32, column t = month t + 1
+    survival_36: np.ndarray             # (n,) float32, legacy 36-month point
+    discount_rate: float
+    horizon_months: int
+
+    def __len__(self) -> int:
+        return len(self.eltv)
+
+    def survival_at(self, month: int) -> np.ndarray:
+        """Survival probability of every employee at a month (1-based)."""
+        return self.survival[:, month - 1]
+
+    def survival_probabilities(self, i: int) -> Dict[str, float]:
+        """Month-keyed survival dict for one employee (same keys as calculate_eltv)."""
+        row = self.survival[i].tolist()
+        survival_probs = {f"month_{month}": value for month, value in enumerate(row, start=1)}
+        survival_probs["12"] = survival_probs.get("month_12", 0.5)
+        survival_probs["24"] = survival_probs.get("month_24", 0.25)
+        survival_probs["36"] = float(self.survival_36[i])
+        return survival_probs
+
+    def result(self, i: int) -> ELTVResult:
+        """Single-employee ELTVResult for row i."""
+        return ELTVResult(
+            eltv=float(self.eltv[i]),
+            survival_probabilities=self.survival_probabilities(i),
+            expected_tenure_months=float(self.expected_tenure_months[i]),
+            replacement_cost=float(self.replacement_cost[i]),
+            revenue_multiplier=float(self.revenue_multiplier[i]),
+            discount_rate=self.discount_rate,
+            horizon_months=self.horizon_months
+        )
+
+
 class ELTVService:
     """
     Service for calculating Employee Lifetime Value using Weibull survival curves.
@@ -127,6 +178,16 @@ class ELTVService:
 
         # LRU cache for performance
         self._survival_cache: Dict[Tuple[float, float, int], float] = {}
+        # Discount factors per horizon, shared by every batch calculation
+        self._discount_vectors: Dict[int, np.ndarray] = {}
+
+    def _discount_vector(self, horizon: int) -> np.ndarray:
+        """Monthly discount factors 1 / (1 + r)^t for t = 1..horizon."""
+        vector = self._discount_vectors.get(horizon)
+        if vector is None:
+            vector = 1.0 / ((1 + self.monthly_discount_rate) ** np.arange(1, horizon + 1))
+            self._discount_vectors[horizon] = vector
+        return vector
 
     def calculate_survival_probability(
         self,
@@ -220,6 +281,30 @@ class ELTVService:
         else:  # Bottom 25%
             return self.REVENUE_MULTIPLIERS['entry']
 
+    def get_revenue_multipliers(
+        self,
+        annual_salaries: np.ndarray,
+        position_levels: Optional[Sequence[Optional[str]]] = None,
+        dataset_id: Optional[str] = None
+    ) -> np.ndarray:
+        """Vectorized get_revenue_multiplier over arrays of salaries and position levels."""
+        annual_salaries = np.asarray(annual_salaries, dtype=float)
+        salary_percentiles = self.thresholds_service.get_feature_percentiles(
+            'employee_cost', annual_salaries, dataset_id
+        )
+        multipliers = np.select(
+            [salary_percentiles >= 75, salary_percentiles >= 50, salary_percentiles >= 25],
+            [self.REVENUE_MULTIPLIERS['executive'], self.REVENUE_MULTIPLIERS['senior'], self.REVENUE_MULTIPLIERS['mid']],
+            default=self.REVENUE_MULTIPLIERS['entry']
+        )
+        if position_levels is not None:
+            known = [
+                self.REVENUE_MULTIPLIERS.get(level.lower(), np.nan) if level else np.nan
+                for level in position_levels
+            ]
+            multipliers = np.where(np.isnan(known), multipliers, known)
+        return multipliers
+
     def calculate_replacement_cost(self, annual_salary: float) -> float:
         """
         Calculate the cost to replace an employee.
@@ -315,6 +400,90 @@ class ELTVService:
             horizon_months=horizon
         )
 
+    def calculate_eltv_batch(
+        self,
+        annual_salaries: Sequence[float],
+        churn_probabilities: Sequence[float],
+        tenure_years: Sequence[float],
+        position_levels: Optional[Sequence[Optional[str]]] = None,
+        horizon_months: Optional[int] = None,
+        dataset_id: Optional[str] = None
+    ) -> ELTVBatchResult:
+        """
+        Calculate ELTV for many employees at once.
+
+        Same formula as calculate_eltv, evaluated on an (n_employees x horizon)
+        Weibull survival matrix against a precomputed discount vector. Scalar
+        arguments are broadcast, so one salary/tenure can be paired with many
+        churn probabilities.
+
+        Args:
+            annual_salaries: Annual salary per employee
+            churn_probabilities: Annual churn probability per employee (0-1)
+            tenure_years: Current tenure in years per employee
+            position_levels: Optional position level per employee (None = from salary)
+            horizon_months: Prediction horizon (default: 24 months)
+            dataset_id: Dataset whose salary percentiles set revenue multipliers
+
+        Returns:
+            ELTVBatchResult with one entry per employee
+        """
+        horizon = horizon_months or self.horizon_months
+        churn_probs = np.clip(np.atleast_1d(np.asarray(churn_probabilities, dtype=float)), 0.01, 0.99)
+        n = churn_probs.shape[0]
+        salaries = np.broadcast_to(np.asarray(annual_salaries, dtype=float), (n,))
+        tenures = np.broadcast_to(np.asarray(tenure_years, dtype=float), (n,))
+        if isinstance(position_levels, str) or position_levels is None:
+            position_levels = [position_levels] * n
+
+        # Weibull parameters per employee (see SurvivalCurveParams.from_churn_probability)
+        shape = np.select([tenures < 1, tenures < 3], [0.8, 1.0], default=1.2)
+        scale = (-np.log(1.0 - churn_probs)) ** (1.0 / shape)
+
+        years = np.arange(1, horizon + 1) / 12.0
+        survival = np.clip(np.exp(-((scale[:, None] * years) ** shape[:, None])), 0.0, 1.0)
+        survival_36 = np.clip(np.exp(-((scale * 3.0) ** shape)), 0.0, 1.0)
+
+        revenue_multiplier = self.get_revenue_multipliers(salaries, position_levels, dataset_id)
+        monthly_revenue = (salaries * revenue_multiplier) / 12
+        replacement_cost = salaries * self.replacement_cost_ratio
+        replacement_discount_factor = 1.0 / ((1 + self.monthly_discount_rate) ** (horizon / 2))
+
+        eltv = monthly_revenue * (survival @ self._discount_vector(horizon))
+        eltv -= replacement_cost * (1.0 - survival[:, -1]) * replacement_discount_factor
+
+        return ELTVBatchResult(
+            eltv=np.maximum(0.0, eltv),  # ELTV cannot be negative
+            expected_tenure_months=survival.sum(axis=1),
+            replacement_cost=replacement_cost,
+            revenue_multiplier=revenue_multiplier,
+            survival=survival.astype(np.float32),
+            survival_36=survival_36.astype(np.float32),
+            discount_rate=self.annual_discount_rate,
+            horizon_months=horizon
+        )
+
+    def calculate_eltv_for_probabilities(
+        self,
+        annual_salary: float,
+        churn_probabilities: Sequence[float],
+        tenure_years: float = 0,
+        position_level: Optional[str] = None,
+        horizon_months: Optional[int] = None
+    ) -> List[ELTVResult]:
+        """
+        Calculate ELTV for several churn probabilities of the same employee.
+
+        Counterfactual baselines and scenarios share salary, tenure and position,
+        so they are evaluated as one batch.
+        """
+        if len(churn_probabilities) == 0:
+            return []
+        batch = self.calculate_eltv_batch(
+            annual_salary, churn_probabilities, tenure_years, position_level, horizon_months
+        )
+        return [batch.result(i) for i in range(len(batch))]
+
     def calculate_eltv_with_treatment(
         self,
         annual_salary: float,
@@ -469,6 +638,39 @@ class ELTVService:
         # Default to mid level
         return 'mid'
 
+    def estimate_position_levels(
+        self,
+        positions: Sequence[Optional[str]],
+        salaries: Sequence[Optional[float]],
+        dataset_id: Optional[str] = None
+    ) -> List[str]:
+        """Vectorized estimate_position_level: titles first, then salary percentiles."""
+        salary_array = np.array([s if s else np.nan for s in salaries], dtype=float)
+        salary_percentiles = self.thresholds_service.get_feature_percentiles(
+            'employee_cost', np.nan_to_num(salary_array), dataset_id
+        )
+        by_salary = np.select(
+            [np.isnan(salary_array), salary_percentiles >= 75, salary_percentiles >= 50, salary_percentiles >= 25],
+            ['mid', 'executive', 'senior', 'mid'],
+            default='entry'
+        ).tolist()
+
+        levels = []
+        for position, salary_level in zip(positions, by_salary):
+            if position:
+                position_lower = position.lower()
+                if any(x in position_lower for x in ['director', 'vp', 'chief', 'head', 'executive']):
+                    levels.append('executive')
+                    continue
+                elif any(x in position_lower for x in ['senior', 'lead', 'principal', 'staff']):
+                    levels.append('senior')
+                    continue
+                elif any(x in position_lower for x in ['junior', 'associate', 'entry', 'intern']):
+                    levels.append('entry')
+                    continue
+            levels.append(salary_level)
+        return levels
+
 
 # Singleton instance for use across the application
 eltv_service = ELTVService()
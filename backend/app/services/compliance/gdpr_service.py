@@ -282,6 +282,10 @@ class GDPRService:
 
         if not dry_run:
             await db.commit()
+            # Cached LLM generations (treatments, retention emails) name the employee;
+            # imported here to keep the AI package out of the compliance import chain
+            from app.services.ai.generation_cache import purge_employee_generations
+            await purge_employee_generations(hr_code)
 
         # Generate verification hash
         verification_hash = hashlib.sha256(
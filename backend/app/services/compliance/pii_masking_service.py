@@ -277,6 +277,10 @@ class PIIMaskingService:
 
         return unmasked_text
 
+    def stream_unmasker(self, context: MaskingContext) -> "StreamUnmasker":
+        """Incremental unmask_text for an LLM response that arrives in chunks."""
+        return StreamUnmasker(self, context)
+
     def mask_context_for_llm(
         self,
         context_dict: Dict[str, Any],
@@ -407,6 +411,50 @@ class PIIMaskingService:
         )
 
 
+class StreamUnmasker:
+    """
+    Restores original PII in a streamed LLM response.
+
+    A placeholder can be split across chunks ("[EMPLOY" + "EE_001]"), so a
+    trailing fragment that could still grow into one is held back until the
+    next chunk completes it or rules it out.
+
+    Usage:
+        unmasker = masker.stream_unmasker(context)
+        async for chunk in llm_stream:
+            yield unmasker.feed(chunk)
+        yield unmasker.flush()
+    """
+
+    def __init__(self, service: PIIMaskingService, context: MaskingContext):
+        self._service = service
+        self._context = context
+        self._placeholders = list(context.reverse_name_map) + list(context.reverse_id_map)
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; returns the unmasked text that is safe to emit now."""
+        text = self._pending + chunk
+        split = self._safe_length(text)
+        self._pending = text[split:]
+        return self._service.unmask_text(text[:split], self._context)
+
+    def flush(self) -> str:
+        """Unmask and return whatever is still held back (end of stream)."""
+        text, self._pending = self._pending, ""
+        return self._service.unmask_text(text, self._context)
+
+    def _safe_length(self, text: str) -> int:
+        # Placeholders never contain "[", so only the last one can be open
+        start = text.rfind("[")
+        if start == -1:
+            return len(text)
+        tail = text[start:]
+        if any(len(p) > len(tail) and p.startswith(tail) for p in self._placeholders):
+            return start
+        return len(text)
+
+
 # Singleton instance for convenience
 _default_masking_service: Optional[PIIMaskingService] = None
 
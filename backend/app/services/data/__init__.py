@@ -3,6 +3,7 @@
 
 from app.services.data.dataset_service import get_active_dataset, get_active_dataset_id, get_active_dataset_entry
 from app.services.data.data_quality_service import assess_data_quality, DataQualityReport
+from app.services.data.columnar_cache import load_dataset_frame, read_dataset_frame, build_columnar_cache
 from app.services.data import cached_queries_service
 from app.services.data.project_service import get_active_project, ensure_default_project
 
@@ -14,6 +15,10 @@ __all__ = [
     # Data Quality
     "assess_data_quality",
     "DataQualityReport",
+    # Columnar Cache
+    "load_dataset_frame",
+    "read_dataset_frame",
+    "build_columnar_cache",
     # Cached Queries (module with helper functions)
     "cached_queries_service",
     # Project
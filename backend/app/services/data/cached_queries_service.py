@@ -3,20 +3,22 @@ Cached query helpers for ChurnVision Enterprise.
 
 Provides cached versions of expensive aggregation queries used by the chatbot
 and other services. Uses Redis when available, falls back to in-memory cache.
+Concurrent misses share one query, and expired results are served while a
+background refresh recomputes them. Keys embed the dataset's cache version,
+so bump_dataset_version (after retraining, prediction writes or uploads)
+retires every cached result for a dataset at once.
 
 All risk thresholds are retrieved from the data-driven thresholds service,
 computed from user's actual data distribution - no hardcoded values.
 """
 
-import hashlib
-import json
 import logging
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from sqlalchemy import select, func, case, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import get_cache, CacheTTL
+from app.core.cache import bump_dataset_version, dataset_cache_key, get_cache, CacheTTL
 from app.models.hr_data import HRDataInput
 from app.models.churn import ChurnOutput, ChurnReasoning
 from app.services.utils.risk_helpers import get_risk_thresholds
@@ -34,33 +36,26 @@ def _get_risk_thresholds(dataset_id: str) -> Tuple[float, float]:
     return get_risk_thresholds(dataset_id)
 
 
-def _make_cache_key(prefix: str, *args) -> str:
-    """Generate a cache key from prefix and arguments."""
-    key_data = json.dumps(args, sort_keys=True, default=str)
-    hash_suffix = hashlib.md5(key_data.encode()).hexdigest()[:12]
-    return f"{prefix}:{hash_suffix}"
-
-
-async def get_cached_company_overview(
-    db: AsyncSession,
-    dataset_id: str,
-    ttl: int = CacheTTL.SHORT
-) -> Dict[str, Any]:
+def _in_new_session(compute: Callable[..., Awaitable[Any]], *args) -> Callable[[], Awaitable[Any]]:
     """
-    Get cached company-level metrics scoped to dataset.
-    Cache TTL: 60 seconds (SHORT)
+    Loader that runs compute on its own session.
+
+    Background refreshes outlive the request that triggered them, so they
+    cannot use the request's session.
     """
-    cache = await get_cache()
-    cache_key = _make_cache_key("company_overview", dataset_id)
+    async def load() -> Any:
+        from app.db.session import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            return await compute(db, *args)
+    return load
 
-    # Try cache first
-    cached = await cache.get(cache_key)
-    if cached:
-        try:
-            return json.loads(cached)
-        except json.JSONDecodeError:
-            pass
 
+async def _compute_company_overview(
+    db: AsyncSession,
+    dataset_id: str
+) -> Dict[str, Any]:
+    """Company-level metrics scoped to dataset."""
     # Get data-driven risk thresholds
     high_thresh, medium_thresh = _get_risk_thresholds(dataset_id)
 
@@ -98,33 +93,14 @@ async def get_cached_company_overview(
         }
     }
 
-    # Cache the result
-    await cache.set(cache_key, json.dumps(overview), ttl)
-    logger.debug(f"Cached company overview for dataset {dataset_id}")
-
     return overview
 
 
-async def get_cached_workforce_statistics(
+async def _compute_workforce_statistics(
     db: AsyncSession,
-    dataset_id: str,
-    ttl: int = CacheTTL.SHORT
+    dataset_id: str
 ) -> Dict[str, Any]:
-    """
-    Get cached comprehensive workforce statistics.
-    Cache TTL: 60 seconds (SHORT)
-    """
-    cache = await get_cache()
-    cache_key = _make_cache_key("workforce_stats", dataset_id)
-
-    # Try cache first
-    cached = await cache.get(cache_key)
-    if cached:
-        try:
-            return json.loads(cached)
-        except json.JSONDecodeError:
-            pass
-
+    """Comprehensive workforce statistics."""
     # Execute query - get all active employees with reasoning data
     query = select(HRDataInput, ChurnReasoning).outerjoin(
         ChurnReasoning,
@@ -208,37 +184,15 @@ async def get_cached_workforce_statistics(
         }
     }
 
-    # Cache the result
-    await cache.set(cache_key, json.dumps(stats_result), ttl)
-    logger.debug(f"Cached workforce statistics for dataset {dataset_id}")
-
     return stats_result
 
 
-async def get_cached_department_snapshot(
+async def _compute_department_snapshot(
     db: AsyncSession,
     dataset_id: str,
-    department: str,
-    ttl: int = CacheTTL.SHORT
+    department: str
 ) -> Optional[Dict[str, Any]]:
-    """
-    Get cached department snapshot.
-    Cache TTL: 60 seconds (SHORT)
-    """
-    if not department:
-        return None
-
-    cache = await get_cache()
-    cache_key = _make_cache_key("dept_snapshot", dataset_id, department)
-
-    # Try cache first
-    cached = await cache.get(cache_key)
-    if cached:
-        try:
-            return json.loads(cached)
-        except json.JSONDecodeError:
-            pass
-
+    """Department snapshot."""
     # Get data-driven risk thresholds
     high_thresh, _ = _get_risk_thresholds(dataset_id)
 
@@ -272,37 +226,15 @@ async def get_cached_department_snapshot(
         "highRiskCount": int(row.high_risk or 0),
     }
 
-    # Cache the result
-    await cache.set(cache_key, json.dumps(snapshot), ttl)
-    logger.debug(f"Cached department snapshot for {department} in dataset {dataset_id}")
-
     return snapshot
 
 
-async def get_cached_manager_team_summary(
+async def _compute_manager_team_summary(
     db: AsyncSession,
     dataset_id: str,
-    manager_id: str,
-    ttl: int = CacheTTL.SHORT
+    manager_id: str
 ) -> Optional[Dict[str, Any]]:
-    """
-    Get cached manager team summary.
-    Cache TTL: 60 seconds (SHORT)
-    """
-    if not manager_id:
-        return None
-
-    cache = await get_cache()
-    cache_key = _make_cache_key("manager_team", dataset_id, manager_id)
-
-    # Try cache first
-    cached = await cache.get(cache_key)
-    if cached:
-        try:
-            return json.loads(cached)
-        except json.JSONDecodeError:
-            pass
-
+    """Manager team summary."""
     # Get data-driven risk thresholds
     high_thresh, _ = _get_risk_thresholds(dataset_id)
 
@@ -336,24 +268,105 @@ async def get_cached_manager_team_summary(
         "highRiskCount": int(row.high_risk or 0),
     }
 
-    # Cache the result
-    await cache.set(cache_key, json.dumps(summary), ttl)
-    logger.debug(f"Cached manager team summary for {manager_id} in dataset {dataset_id}")
-
     return summary
 
 
-async def invalidate_dataset_cache(dataset_id: str) -> int:
-    """Invalidate all cached data for a dataset."""
+async def get_cached_company_overview(
+    db: AsyncSession,
+    dataset_id: str,
+    ttl: int = CacheTTL.SHORT,
+    stale_ttl: int = CacheTTL.MEDIUM,
+) -> Dict[str, Any]:
+    """
+    Get cached company-level metrics scoped to dataset.
+    Cache TTL: 60 seconds (SHORT), then served stale for up to 5 minutes
+    (MEDIUM) while it refreshes in the background.
+    """
     cache = await get_cache()
-    patterns = [
-        f"company_overview:*{dataset_id}*",
-        f"workforce_stats:*{dataset_id}*",
-        f"dept_snapshot:*{dataset_id}*",
-        f"manager_team:*{dataset_id}*",
-    ]
-    total = 0
-    for pattern in patterns:
-        total += await cache.clear_pattern(pattern)
-    logger.info(f"Invalidated {total} cache entries for dataset {dataset_id}")
-    return total
+    return await cache.get_or_compute(
+        await dataset_cache_key("company_overview", dataset_id),
+        lambda: _compute_company_overview(db, dataset_id),
+        ttl,
+        stale_ttl=stale_ttl,
+        refresh_loader=_in_new_session(_compute_company_overview, dataset_id),
+    )
+
+
+async def get_cached_workforce_statistics(
+    db: AsyncSession,
+    dataset_id: str,
+    ttl: int = CacheTTL.SHORT,
+    stale_ttl: int = CacheTTL.MEDIUM,
+) -> Dict[str, Any]:
+    """
+    Get cached comprehensive workforce statistics.
+    Cache TTL: 60 seconds (SHORT), then served stale for up to 5 minutes
+    (MEDIUM) while it refreshes in the background.
+    """
+    cache = await get_cache()
+    return await cache.get_or_compute(
+        await dataset_cache_key("workforce_stats", dataset_id),
+        lambda: _compute_workforce_statistics(db, dataset_id),
+        ttl,
+        stale_ttl=stale_ttl,
+        refresh_loader=_in_new_session(_compute_workforce_statistics, dataset_id),
+    )
+
+
+async def get_cached_department_snapshot(
+    db: AsyncSession,
+    dataset_id: str,
+    department: str,
+    ttl: int = CacheTTL.SHORT,
+    stale_ttl: int = CacheTTL.MEDIUM,
+) -> Optional[Dict[str, Any]]:
+    """
+    Get cached department snapshot.
+    Cache TTL: 60 seconds (SHORT), then served stale for up to 5 minutes
+    (MEDIUM) while it refreshes in the background.
+    """
+    if not department:
+        return None
+
+    cache = await get_cache()
+    return await cache.get_or_compute(
+        await dataset_cache_key("dept_snapshot", dataset_id, department),
+        lambda: _compute_department_snapshot(db, dataset_id, department),
+        ttl,
+        stale_ttl=stale_ttl,
+        refresh_loader=_in_new_session(_compute_department_snapshot, dataset_id, department),
+    )
+
+
+async def get_cached_manager_team_summary(
+    db: AsyncSession,
+    dataset_id: str,
+    manager_id: str,
+    ttl: int = CacheTTL.SHORT,
+    stale_ttl: int = CacheTTL.MEDIUM,
+) -> Optional[Dict[str, Any]]:
+    """
+    Get cached manager team summary.
+    Cache TTL: 60 seconds (SHORT), then served stale for up to 5 minutes
+    (MEDIUM) while it refreshes in the background.
+    """
+    if not manager_id:
+        return None
+
+    cache = await get_cache()
+    return await cache.get_or_compute(
+        await dataset_cache_key("manager_team", dataset_id, manager_id),
+        lambda: _compute_manager_team_summary(db, dataset_id, manager_id),
+        ttl,
+        stale_ttl=stale_ttl,
+        refresh_loader=_in_new_session(_compute_manager_team_summary, dataset_id, manager_id),
+    )
+
+
+async def invalidate_dataset_cache(dataset_id: str) -> int:
+    """
+    Invalidate all cached data for a dataset by bumping its cache version.
+
+    Returns the new version.
+    """
+    return await bump_dataset_version(dataset_id)
@@ -0,0 +1,212 @@
+"""
+Columnar Dataset Cache.
+
+Uploaded datasets are parsed once into a typed Parquet sidecar stored next to
+the original file (employees.csv -> employees.csv.parquet). Every later read
+memory-maps the sidecar instead of re-parsing the CSV/Excel source.
+
+The sidecar records the source file's size and mtime; a sidecar that no
+longer matches its source, or a dataset uploaded before sidecars existed, is
+rebuilt on first read. If a frame cannot be stored as Parquet (mixed-type
+object columns, pyarrow unavailable), readers fall back to parsing the source.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from fastapi import UploadFile
+
+from app.core.executors import run_cpu, run_io
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from an UploadFile per write
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+SIDECAR_SUFFIX = ".parquet"
+
+# Bump when the sidecar layout changes so old sidecars are rebuilt
+SIDECAR_FORMAT_VERSION = "1"
+
+_META_PREFIX = b"churnvision."
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class ColumnarCacheInfo:
+    """Row count and schema of a dataset's columnar copy."""
+    row_count: int
+    columns: List[str]
+    dtypes: Dict[str, str] = field(default_factory=dict)
+    sidecar_path: Optional[Path] = None
+
+
+def sidecar_path(source: PathLike) -> Path:
+    """Location of the Parquet sidecar for a dataset file."""
+    source = Path(source)
+    return source.with_name(source.name + SIDECAR_SUFFIX)
+
+
+def _source_signature(source: Path) -> Dict[str, str]:
+    stat = source.stat()
+    return {
+        "format_version": SIDECAR_FORMAT_VERSION,
+        "source_size": str(stat.st_size),
+        "source_mtime_ns": str(stat.st_mtime_ns),
+    }
+
+
+def read_source_frame(source: PathLike) -> pd.DataFrame:
+    """Parse the original CSV/Excel file (the slow path)."""
+    source = Path(source)
+    if source.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(source)
+    return pd.read_csv(source)
+
+
+def write_sidecar(source: PathLike, df: pd.DataFrame) -> Optional[ColumnarCacheInfo]:
+    """
+    Store df as the Parquet sidecar of source.
+
+    Returns None (and leaves no sidecar behind) if the frame cannot be
+    represented in Parquet.
+    """
+    source = Path(source)
+    target = sidecar_path(source)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata.update({
+            _META_PREFIX + key.encode(): value.encode()
+            for key, value in _source_signature(source).items()
+        })
+        table = table.replace_schema_metadata(metadata)
+
+        # Write then rename so readers never see a partial file
+        tmp = target.with_name(target.name + ".tmp")
+        pq.write_table(table, tmp)
+        tmp.replace(target)
+    except Exception as e:
+        logger.warning(f"Could not build columnar cache for {source.name}: {e}")
+        target.unlink(missing_ok=True)
+        return None
+
+    return ColumnarCacheInfo(
+        row_count=len(df),
+        columns=[str(c) for c in df.columns],
+        dtypes={str(c): str(t) for c, t in df.dtypes.items()},
+        sidecar_path=target,
+    )
+
+
+def _fresh_sidecar_metadata(source: Path) -> Optional[Any]:
+    """Parquet metadata of source's sidecar if it is up to date, else None."""
+    target = sidecar_path(source)
+    if not target.exists():
+        return None
+    try:
+        import pyarrow.parquet as pq
+
+        metadata = pq.read_metadata(target)
+    except Exception as e:
+        logger.warning(f"Unreadable columnar cache {target.name}: {e}")
+        return None
+
+    stored = metadata.metadata or {}
+    for key, value in _source_signature(source).items():
+        if stored.get(_META_PREFIX + key.encode()) != value.encode():
+            return None
+    return metadata
+
+
+def build_columnar_cache(source: PathLike) -> Tuple[pd.DataFrame, Optional[ColumnarCacheInfo]]:
+    """Parse source once and write its sidecar. Returns the parsed frame too."""
+    df = read_source_frame(source)
+    return df, write_sidecar(source, df)
+
+
+def read_dataset_frame(source: PathLike) -> pd.DataFrame:
+    """
+    Load a dataset as a DataFrame, preferring its columnar sidecar.
+
+    A missing or stale sidecar is rebuilt from the source. Parse errors from
+    the source propagate unchanged (pd.errors.ParserError etc.).
+    """
+    source = Path(source)
+    if _fresh_sidecar_metadata(source) is not None:
+        try:
+            import pyarrow.parquet as pq
+
+            df = pq.read_table(sidecar_path(source), memory_map=True).to_pandas()
+            # Arrow nulls come back as None in object columns; read_csv gives NaN
+            object_columns = df.columns[df.dtypes == object]
+            if len(object_columns):
+                df[object_columns] = df[object_columns].where(df[object_columns].notna(), np.nan)
+            return df
+        except Exception as e:
+            logger.warning(f"Falling back to parsing {source.name}: {e}")
+
+    df, _ = build_columnar_cache(source)
+    return df
+
+
+def read_cache_info(source: PathLike) -> Optional[ColumnarCacheInfo]:
+    """Row count and schema from the sidecar footer, without reading any data."""
+    source = Path(source)
+    metadata = _fresh_sidecar_metadata(source)
+    if metadata is None:
+        return None
+    schema = metadata.schema.to_arrow_schema()
+    return ColumnarCacheInfo(
+        row_count=metadata.num_rows,
+        columns=list(schema.names),
+        dtypes={f.name: str(f.type) for f in schema},
+        sidecar_path=sidecar_path(source),
+    )
+
+
+def remove_columnar_cache(source: PathLike) -> None:
+    """Delete the sidecar of a dataset file, if any."""
+    sidecar_path(source).unlink(missing_ok=True)
+
+
+async def load_dataset_frame(source: PathLike) -> pd.DataFrame:
+    """Async wrapper around read_dataset_frame that keeps parsing off the event loop."""
+    return await run_cpu(read_dataset_frame, source)
+
+
+async def stream_upload_to_disk(
+    upload: UploadFile,
+    dest: PathLike,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> int:
+    """
+    Copy an upload to dest in fixed-size chunks and return the bytes written.
+
+    The file is written under a temporary name and renamed on success, so a
+    failed upload never leaves a truncated dataset behind.
+    """
+    dest = Path(dest)
+    tmp = dest.with_name(dest.name + ".part")
+    size = 0
+    try:
+        with open(tmp, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                await run_io(out.write, chunk)
+                size += len(chunk)
+        tmp.replace(dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return size
@@ -0,0 +1,334 @@
+"""
+HR Data Bulk Loader.
+
+Hydrates hr_data_input from a dataset file as a tracked background job.
+
+Column mapping, type coercion and date parsing are done on whole pandas
+columns. On PostgreSQL the rows are streamed with asyncpg's binary COPY into
+a temporary staging table and merged with a single
+INSERT ... SELECT ... ON CONFLICT DO NOTHING; other dialects fall back to
+chunked multi-row inserts.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import bump_dataset_version
+from app.models.hr_data import HRDataInput
+
+logger = logging.getLogger(__name__)
+
+# Rows per COPY call; progress is reported between calls
+COPY_CHUNK_SIZE = 20000
+
+# Rows per INSERT on dialects without COPY (12 columns x 500 rows of binds)
+INSERT_CHUNK_SIZE = 500
+
+HR_DATA_COLUMNS = (
+    "hr_code", "dataset_id", "full_name", "structure_name", "position", "status",
+    "manager_id", "tenure", "employee_cost", "report_date", "termination_date",
+    "additional_data",
+)
+
+CANONICAL_FIELDS = (
+    "hr_code", "full_name", "structure_name", "position", "status",
+    "manager_id", "tenure", "employee_cost", "termination_date",
+)
+
+REQUIRED_FIELDS = {"hr_code", "full_name", "structure_name", "position", "status", "manager_id", "tenure"}
+
+STAGING_TABLE = "hr_data_input_staging"
+
+
+class HRDataMappingError(ValueError):
+    """The dataset is missing columns required by hr_data_input."""
+
+
+def _object_column(series: pd.Series) -> pd.Series:
+    """Object column with missing values as None."""
+    values = series.astype(object)
+    return values.where(series.notna(), None)
+
+
+def _parse_dates(series: pd.Series) -> pd.Series:
+    """YYYY-MM-DD strings or datetimes to date objects; anything else to None."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+    elif pd.api.types.is_numeric_dtype(series):
+        parsed = pd.Series(pd.NaT, index=series.index)
+    else:
+        parsed = pd.to_datetime(series, format="%Y-%m-%d", errors="coerce")
+    return parsed.dt.date.astype(object).where(parsed.notna(), None)
+
+
+def prepare_hr_records(
+    df: pd.DataFrame,
+    mapping: Optional[Dict[str, Any]],
+    dataset_id: str,
+) -> pd.DataFrame:
+    """
+    Map a dataset frame onto hr_data_input columns, one column at a time.
+
+    Duplicate hr_codes keep their first row, as the row-by-row
+    ON CONFLICT DO NOTHING insert did.
+
+    Raises:
+        HRDataMappingError: If required columns are missing
+    """
+    mapping = mapping or {}
+    rename_map = {}
+    for target in CANONICAL_FIELDS:
+        source_col = mapping.get(target) or target
+        if source_col in df.columns:
+            rename_map[source_col] = target
+
+    missing = [f for f in REQUIRED_FIELDS if f not in rename_map.values()]
+    if missing:
+        raise HRDataMappingError(f"Active dataset is missing required columns: {missing}")
+
+    df = df.rename(columns=rename_map)
+    n = len(df)
+    today = datetime.utcnow().date()
+
+    if "report_date" in df.columns:
+        report_date = _parse_dates(df["report_date"]).fillna(today)
+    else:
+        report_date = pd.Series([today] * n, index=df.index, dtype=object)
+
+    if "termination_date" in df.columns:
+        termination_date = _parse_dates(df["termination_date"])
+    else:
+        termination_date = pd.Series([None] * n, index=df.index, dtype=object)
+
+    if "employee_cost" in df.columns:
+        employee_cost = _object_column(pd.to_numeric(df["employee_cost"], errors="coerce"))
+    else:
+        employee_cost = pd.Series([None] * n, index=df.index, dtype=object)
+
+    if "additional_data" in df.columns:
+        additional_data = df["additional_data"].map(lambda v: v if isinstance(v, dict) else None)
+    else:
+        additional_data = pd.Series([None] * n, index=df.index, dtype=object)
+
+    manager_id = df["manager_id"]
+    records = pd.DataFrame({
+        "hr_code": df["hr_code"].astype(str),
+        "dataset_id": dataset_id,
+        "full_name": _object_column(df["full_name"]),
+        "structure_name": _object_column(df["structure_name"]),
+        "position": _object_column(df["position"]),
+        "status": _object_column(df["status"].fillna("Active")),
+        "manager_id": manager_id.astype(str).astype(object).where(manager_id.notna(), None),
+        "tenure": pd.to_numeric(df["tenure"], errors="coerce").fillna(0).astype(float),
+        "employee_cost": employee_cost,
+        "report_date": report_date,
+        "termination_date": termination_date,
+        "additional_data": additional_data,
+    }, columns=list(HR_DATA_COLUMNS))
+
+    return records.drop_duplicates(subset="hr_code", keep="first").reset_index(drop=True)
+
+
+def _record_tuples(records: pd.DataFrame, start: int, stop: int, encode_json: bool = True) -> List[tuple]:
+    """Rows start:stop as tuples in HR_DATA_COLUMNS order."""
+    chunk = records.iloc[start:stop]
+    columns = [chunk[c].tolist() for c in HR_DATA_COLUMNS]
+    if encode_json:
+        # JSON goes over COPY as text
+        columns[-1] = [json.dumps(v) if v is not None else None for v in columns[-1]]
+    return list(zip(*columns))
+
+
+ProgressCallback = Callable[[int, int], None]
+
+
+async def _copy_into_postgres(
+    db: AsyncSession,
+    records: pd.DataFrame,
+    chunk_size: int,
+    progress_callback: Optional[ProgressCallback],
+) -> int:
+    """COPY into a transaction-scoped staging table, then merge in one statement."""
+    total = len(records)
+    await db.execute(text(
+        f"CREATE TEMP TABLE {STAGING_TABLE} "
+        f"(LIKE {HRDataInput.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection
+
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        await driver.copy_records_to_table(
+            STAGING_TABLE,
+            records=_record_tuples(records, start, stop),
+            columns=list(HR_DATA_COLUMNS),
+        )
+        if progress_callback:
+            progress_callback(stop, total)
+
+    column_list = ", ".join(HR_DATA_COLUMNS)
+    result = await db.execute(text(
+        f"INSERT INTO {HRDataInput.__tablename__} ({column_list}) "
+        f"SELECT {column_list} FROM {STAGING_TABLE} "
+        f"ON CONFLICT (hr_code, dataset_id) DO NOTHING"
+    ))
+    return max(result.rowcount or 0, 0)
+
+
+async def _insert_in_chunks(
+    db: AsyncSession,
+    records: pd.DataFrame,
+    chunk_size: int,
+    progress_callback: Optional[ProgressCallback],
+) -> int:
+    """Multi-row INSERT ... ON CONFLICT DO NOTHING for dialects without COPY."""
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+
+    total = len(records)
+    inserted = 0
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        rows = [
+            dict(zip(HR_DATA_COLUMNS, row))
+            for row in _record_tuples(records, start, stop, encode_json=False)
+        ]
+        stmt = insert(HRDataInput).values(rows).on_conflict_do_nothing(index_elements=["hr_code", "dataset_id"])
+        result = await db.execute(stmt)
+        inserted += max(result.rowcount or 0, 0)
+        if progress_callback:
+            progress_callback(stop, total)
+        await asyncio.sleep(0)
+    return inserted
+
+
+async def bulk_load_hr_data(
+    db: AsyncSession,
+    records: pd.DataFrame,
+    progress_callback: Optional[ProgressCallback] = None,
+    chunk_size: Optional[int] = None,
+) -> int:
+    """
+    Insert prepared records into hr_data_input, skipping existing keys.
+
+    Returns the number of rows inserted. The caller commits.
+    """
+    if records.empty:
+        return 0
+    if db.get_bind().dialect.driver == "asyncpg":
+        return await _copy_into_postgres(db, records, chunk_size or COPY_CHUNK_SIZE, progress_callback)
+    return await _insert_in_chunks(db, records, chunk_size or INSERT_CHUNK_SIZE, progress_callback)
+
+
+@dataclass
+class HydrationJob:
+    """Progress of one dataset's hr_data_input hydration."""
+    dataset_id: str
+    status: str = "queued"
+    progress: int = 0
+    rows_total: int = 0
+    rows_loaded: int = 0
+    rows_inserted: int = 0
+    message: str = "Queued"
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self.status in ("queued", "in_progress")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dataset_id": self.dataset_id,
+            "status": self.status,
+            "progress": self.progress,
+            "rows_total": self.rows_total,
+            "rows_loaded": self.rows_loaded,
+            "rows_inserted": self.rows_inserted,
+            "message": self.message,
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class HRDataHydrationService:
+    """
+    Runs at most one hydration job per dataset and tracks its progress in
+    memory for polling endpoints.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self._session_factory = session_factory
+        self.jobs: Dict[str, HydrationJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.db.session import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    def get_job(self, dataset_id: str) -> Optional[HydrationJob]:
+        return self.jobs.get(dataset_id)
+
+    def start(self, dataset_id: str, records: pd.DataFrame) -> HydrationJob:
+        """Start hydrating dataset_id unless a job for it is already running."""
+        job = self.jobs.get(dataset_id)
+        if job and job.running:
+            return job
+
+        job = HydrationJob(dataset_id=dataset_id, rows_total=len(records))
+        self.jobs[dataset_id] = job
+        self._tasks[dataset_id] = asyncio.create_task(self._run(job, records))
+        return job
+
+    async def wait(self, dataset_id: str) -> Optional[HydrationJob]:
+        """Wait for a dataset's job to finish (tests and scripts)."""
+        task = self._tasks.get(dataset_id)
+        if task:
+            await asyncio.shield(task)
+        return self.jobs.get(dataset_id)
+
+    async def _run(self, job: HydrationJob, records: pd.DataFrame) -> None:
+        def on_progress(loaded: int, total: int) -> None:
+            job.rows_loaded = loaded
+            job.progress = int((loaded / max(total, 1)) * 95)
+            job.message = f"Loading employees ({loaded}/{total})"
+
+        job.status = "in_progress"
+        job.message = "Loading employees"
+        try:
+            async with self._new_session() as db:
+                job.rows_inserted = await bulk_load_hr_data(db, records, progress_callback=on_progress)
+                await db.commit()
+            if job.rows_inserted:
+                await bump_dataset_version(job.dataset_id)
+            job.status = "complete"
+            job.progress = 100
+            job.message = f"Loaded {job.rows_inserted} employees"
+            logger.info(f"Hydrated {job.rows_inserted} hr_data_input rows for dataset {job.dataset_id}")
+        except Exception as e:
+            job.status = "error"
+            job.error = str(e)
+            job.message = "Hydration failed"
+            logger.error(f"hr_data_input hydration failed for dataset {job.dataset_id}: {e}")
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._tasks.pop(job.dataset_id, None)
+
+
+hr_data_hydration_service = HRDataHydrationService()
@@ -1,33 +1,22 @@
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Callable, TYPE_CHECKING
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 import pickle
 import logging
+import time
 
 import numpy as np
 import pandas as pd
-import xgboost as xgb
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    roc_auc_score, average_precision_score, brier_score_loss,
-    precision_recall_curve
-)
-from sklearn.calibration import CalibratedClassifierCV
-from sklearn.inspection import permutation_importance
-from sklearn.model_selection import StratifiedKFold, RandomizedSearchCV
-
-# SMOTE for handling class imbalance
-try:
-    from imblearn.over_sampling import SMOTE, ADASYN
-    from imblearn.combine import SMOTETomek
-    SMOTE_AVAILABLE = True
-except ImportError:
-    SMOTE_AVAILABLE = False
+
+# xgboost, scikit-learn, imbalanced-learn and SHAP take seconds to import, so
+# they are imported where they are used (training, default bundles, model
+# loading) instead of when every worker starts
+if TYPE_CHECKING:
+    import xgboost as xgb
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
@@ -45,6 +34,8 @@ from app.schemas.churn import (
 from app.core.config import settings
 from app.models.hr_data import HRDataInput
 from app.core.artifact_crypto import encrypt_blob, decrypt_blob, ArtifactCryptoError
+from app.core.executors import run_cpu
+from app.core.spans import span
 
 # Import model routing services
 from app.services.ml.dataset_profiler_service import DatasetProfilerService, DatasetProfile
@@ -53,16 +44,31 @@ from app.services.ml.tabpfn_service import TabPFNWrapper, is_tabpfn_available, c
 from app.services.ml.ensemble_service import EnsembleService, EnsembleConfig
 from app.services.analytics.data_driven_thresholds_service import data_driven_thresholds_service, DatasetThresholds
 from app.services.ml.model_drift_service import model_drift_service
+from app.services.ml.model_registry import (
+    ModelArtifactsMissingError,
+    ModelBundle,
+    ModelRegistry,
+    bundle_key,
+    is_model_fitted,
+    model_registry,
+)
+from app.services.ml.training_executor import TrainingOutcome, training_executor
+from app.services.ml.explanation_engine import native_contributions, select_top_factors, impact_codes
+from app.services.ml.confidence_engine import combine_confidence, tree_agreement_batch
+from app.services.ml.columnar_predictions import ColumnarPredictions, recommendation_flags, recommendation_texts
 
 logger = logging.getLogger(__name__)
 
-# Try to import SHAP (optional but recommended)
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
-    logger.warning("SHAP not available - using rule-based explanations")
+
+@lru_cache(maxsize=None)
+def _load_shap() -> Any:
+    """The shap module (optional but recommended), or None if it isn't installed."""
+    try:
+        import shap
+        return shap
+    except ImportError:
+        logger.warning("SHAP not available - using rule-based explanations")
+        return None
 
 
 # =============================================================================
@@ -125,6 +131,16 @@ class CounterfactualResult:
     prediction_method: str = "model"  # 'model' or 'heuristic'
 
 
+@dataclass
+class CounterfactualCase:
+    """One employee's baseline features and the scenarios to simulate against them."""
+    employee_id: str
+    base_features: Dict[str, Any]
+    scenarios: List[Dict[str, Any]]  # each: name, id, modifications
+    annual_salary: Optional[float] = None
+    position: Optional[str] = None  # For ELTV position level; defaults to a generic employee
+
+
 class ChurnPredictionService:
     """Service for employee churn prediction using ML models"""
 
@@ -144,10 +160,13 @@ class ChurnPredictionService:
     ]
     SALARY_CATEGORIES = ['low', 'medium', 'high']
 
-    def __init__(self):
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        # Resident per-dataset model bundles (shared across service instances by default)
+        self.registry = registry if registry is not None else model_registry
+
         self.model = None
         self.calibrated_model = None  # For probability calibration
-        self.scaler = StandardScaler()
+        self.scaler = None
         self.label_encoders = {}
         self.feature_importance = {}
         self.feature_importance_by_dataset: Dict[str, Dict[str, float]] = {}
@@ -188,8 +207,15 @@ class ChurnPredictionService:
         # Ensure models directory exists
         self.model_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Load existing model if available (default/global)
-        self._load_model_for_dataset(None)
+    def warmup(self) -> bool:
+        """
+        Load and bind the default (global) model bundle.
+
+        Called once from the startup warmup phase rather than from __init__, so
+        importing this module stays cheap. Returns True if trained artifacts
+        were found.
+        """
+        return self._load_model_for_dataset(None)
 
     def _artifact_paths(self, dataset_id: Optional[str]) -> tuple[Path, Path, Path]:
         """Return paths for model artifacts, scoped by dataset when provided."""
@@ -203,57 +229,110 @@ class ChurnPredictionService:
             )
         return self.model_path, self.scaler_path, self.encoders_path
 
-    def _load_model_for_dataset(self, dataset_id: Optional[str]) -> bool:
-        """Load saved model, scaler, encoders, and optimal threshold for a dataset."""
+    def _artifact_mtime(self, dataset_id: Optional[str]) -> Optional[float]:
+        """Modification time of the dataset's model artifact, or None if missing."""
+        model_path, _, _ = self._artifact_paths(dataset_id)
+        try:
+            return model_path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _build_shap_explainer(self, model: Any) -> Any:
+        """Create a TreeExplainer for tree-based models (None otherwise)."""
+        shap = _load_shap()
+        if shap is None or model is None or isinstance(model, TabPFNWrapper):
+            return None
+        if type(model).__name__ not in ('XGBClassifier', 'RandomForestClassifier', 'LGBMClassifier', 'CatBoostClassifier'):
+            return None
+        if not is_model_fitted(model):
+            return None
+        try:
+            return shap.TreeExplainer(model)
+        except Exception as e:
+            logger.warning(f"Failed to initialize SHAP explainer for loaded model: {e}")
+            return None
+
+    def _read_bundle(self, dataset_id: Optional[str]) -> ModelBundle:
+        """Read, decrypt and unpickle the persisted artifacts for a dataset."""
         model_path, scaler_path, encoders_path = self._artifact_paths(dataset_id)
+        source_mtime = model_path.stat().st_mtime
+
+        with open(model_path, 'rb') as f:
+            raw_model = f.read()
+            loaded_data = pickle.loads(decrypt_blob(raw_model))
+
+        # Handle both old format (just model) and new format (model bundle)
+        if isinstance(loaded_data, dict) and 'model' in loaded_data:
+            model = loaded_data['model']
+            optimal_threshold = loaded_data.get('optimal_threshold', 0.5)
+            calibrated_model = loaded_data.get('calibrated_model', None)
+            logger.info(f"Loaded model bundle with optimal_threshold={optimal_threshold:.3f}")
+        else:
+            # Legacy format - model saved directly
+            model = loaded_data
+            optimal_threshold = 0.5
+            calibrated_model = None
+            logger.info("Loaded legacy model format, using default threshold=0.5")
+
+        with open(scaler_path, 'rb') as f:
+            raw_scaler = f.read()
+            scaler = pickle.loads(decrypt_blob(raw_scaler))
+
+        with open(encoders_path, 'rb') as f:
+            raw_encoders = f.read()
+            label_encoders = pickle.loads(decrypt_blob(raw_encoders))
+
+        # Restore cached threshold if training in this process recorded one
+        cache_key = dataset_id or "default"
+        optimal_threshold = self.optimal_threshold_by_dataset.get(cache_key, optimal_threshold)
+
+        return ModelBundle(
+            dataset_id=dataset_id,
+            model=model,
+            scaler=scaler,
+            label_encoders=label_encoders,
+            calibrated_model=calibrated_model,
+            optimal_threshold=optimal_threshold,
+            version=model_path.stem,
+            shap_explainer=self._build_shap_explainer(model),
+            size_bytes=len(raw_model) + len(raw_scaler) + len(raw_encoders),
+            source_mtime=source_mtime,
+        )
+
+    def _default_bundle(self, dataset_id: Optional[str]) -> ModelBundle:
+        """Untrained default bundle used in development when no artifacts exist."""
+        import xgboost as xgb
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+        return ModelBundle(
+            dataset_id=dataset_id,
+            model=xgb.XGBClassifier(
+                n_estimators=100,
+                max_depth=5,
+                learning_rate=0.1,
+                random_state=42
+            ),
+            scaler=StandardScaler(),
+            # Encoders are NOT pre-fitted - they learn categories from training data
+            label_encoders={
+                'department': LabelEncoder(),
+                'salary_level': LabelEncoder()
+            },
+            version="dev-default",
+            is_default=True,
+        )
+
+    def _load_bundle(self, dataset_id: Optional[str]) -> ModelBundle:
+        """Registry loader: persisted artifacts, or a default bundle outside production."""
+        model_path, _, _ = self._artifact_paths(dataset_id)
         try:
             if model_path.exists():
-                with open(model_path, 'rb') as f:
-                    model_bytes = decrypt_blob(f.read())
-                    loaded_data = pickle.loads(model_bytes)
-
-                # Handle both old format (just model) and new format (model bundle)
-                if isinstance(loaded_data, dict) and 'model' in loaded_data:
-                    self.model = loaded_data['model']
-                    self.optimal_threshold = loaded_data.get('optimal_threshold', 0.5)
-                    self.calibrated_model = loaded_data.get('calibrated_model', None)
-                    logger.info(f"Loaded model bundle with optimal_threshold={self.optimal_threshold:.3f}")
-                else:
-                    # Legacy format - model saved directly
-                    self.model = loaded_data
-                    self.optimal_threshold = 0.5
-                    self.calibrated_model = None
-                    logger.info("Loaded legacy model format, using default threshold=0.5")
-
-                with open(scaler_path, 'rb') as f:
-                    scaler_bytes = decrypt_blob(f.read())
-                    self.scaler = pickle.loads(scaler_bytes)
-
-                with open(encoders_path, 'rb') as f:
-                    encoders_bytes = decrypt_blob(f.read())
-                    self.label_encoders = pickle.loads(encoders_bytes)
-
-                self.active_version = model_path.stem
-                self.active_dataset_id = dataset_id
-
-                # Restore cached metrics and threshold if we have them
-                cache_key = dataset_id or "default"
-                if cache_key in self.model_metrics_by_dataset:
-                    self.model_metrics = self.model_metrics_by_dataset[cache_key]
-                if cache_key in self.feature_importance_by_dataset:
-                    self.feature_importance = self.feature_importance_by_dataset[cache_key]
-                if cache_key in self.optimal_threshold_by_dataset:
-                    self.optimal_threshold = self.optimal_threshold_by_dataset[cache_key]
-                return True
-            else:
-                if settings.ENVIRONMENT == "production" and dataset_id:
-                    # If dataset-specific artifacts are missing in prod, fail fast
-                    raise RuntimeError(f"Model artifacts missing for dataset {dataset_id}. Train the model first.")
-                # In development or when no dataset provided, initialize default model
-                self._initialize_default_model()
-                self.active_version = "dev-default"
-                self.active_dataset_id = dataset_id
-                return False
+                return self._read_bundle(dataset_id)
+            if settings.ENVIRONMENT == "production" and dataset_id:
+                # If dataset-specific artifacts are missing in prod, fail fast
+                raise ModelArtifactsMissingError(f"Model artifacts missing for dataset {dataset_id}. Train the model first.")
+            # In development or when no dataset provided, use the default model
+            return self._default_bundle(dataset_id)
         except Exception as e:
             if isinstance(e, ArtifactCryptoError):
                 logger.error(f"Artifact decryption failed for dataset {dataset_id}: {e}")
@@ -261,68 +340,109 @@ class ChurnPredictionService:
                 logger.warning(f"Error loading model for dataset {dataset_id}: {e}")
             if settings.ENVIRONMENT == "production":
                 raise
-            self._initialize_default_model()
-            self.active_version = "dev-default"
-            self.active_dataset_id = dataset_id
-            return False
+            # Stamp the fallback with the artifact's mtime so it is not seen as stale
+            # (and re-read, re-decrypted, re-failed) on every request; a rewritten
+            # artifact still triggers a reload.
+            return replace(self._default_bundle(dataset_id), source_mtime=self._artifact_mtime(dataset_id))
 
-    def _initialize_default_model(self):
-        """Initialize a default XGBoost model with typical parameters"""
-        self.model = xgb.XGBClassifier(
-            n_estimators=100,
-            max_depth=5,
-            learning_rate=0.1,
-            random_state=42
-        )
+    def get_model_bundle(self, dataset_id: Optional[str]) -> ModelBundle:
+        """
+        Return the resident model bundle for a dataset, loading it on first use.
 
-        # Initialize empty label encoders for categorical features
-        # These will be fitted dynamically during training with user's actual data
-        self.label_encoders = {
-            'department': LabelEncoder(),
-            'salary_level': LabelEncoder()
-        }
-        # Note: Encoders are NOT pre-fitted - they will learn categories from training data
-        self.model_metrics = {}
+        Bundles are reloaded when the artifact on disk changes (e.g. a model was
+        retrained by another worker) so every worker converges on the latest model.
+        """
+        target_dataset = dataset_id or None
+        return self.registry.get_or_load(
+            target_dataset,
+            loader=lambda: self._load_bundle(target_dataset),
+            is_stale=lambda bundle: bundle.source_mtime != self._artifact_mtime(target_dataset),
+        )
 
-    def _is_model_fitted(self) -> bool:
-        """Check if the model is actually trained and ready for predictions."""
-        if self.model is None:
-            return False
+    def _bind_bundle(self, bundle: ModelBundle) -> None:
+        """Mirror a bundle onto the legacy service attributes read by status endpoints."""
+        self.model = bundle.model
+        self.scaler = bundle.scaler
+        self.label_encoders = bundle.label_encoders
+        self.calibrated_model = bundle.calibrated_model
+        self.optimal_threshold = bundle.optimal_threshold
+        self.shap_explainer = bundle.shap_explainer
+        self.active_version = bundle.version
+        self.active_dataset_id = bundle.dataset_id
+
+        # Restore cached metrics if we have them
+        cache_key = bundle.key
+        if bundle.is_default:
+            self.model_metrics = {}
+        if cache_key in self.model_metrics_by_dataset:
+            self.model_metrics = self.model_metrics_by_dataset[cache_key]
+        if cache_key in self.feature_importance_by_dataset:
+            self.feature_importance = self.feature_importance_by_dataset[cache_key]
+
+    def _attribute_bundle(self) -> ModelBundle:
+        """Transient bundle view of the service attributes (for callers that set them directly)."""
+        return ModelBundle(
+            dataset_id=self.active_dataset_id,
+            model=self.model,
+            scaler=self.scaler,
+            label_encoders=self.label_encoders,
+            calibrated_model=self.calibrated_model,
+            optimal_threshold=self.optimal_threshold,
+            version=self.active_version or "dev-default",
+            shap_explainer=self.shap_explainer,
+        )
 
-        # For XGBoost, check if booster exists (indicates model is fitted)
-        if isinstance(self.model, xgb.XGBClassifier):
+    def _publish_trained_bundle(self, dataset_id: Optional[str], model_id: str) -> ModelBundle:
+        """Publish the freshly trained artifacts to the registry as a new immutable bundle."""
+        size_bytes = 0
+        for path in self._artifact_paths(dataset_id):
             try:
-                # XGBoost models have a booster after fitting
-                _ = self.model.get_booster()
-                return True
-            except Exception:
-                return False
+                size_bytes += path.stat().st_size
+            except OSError:
+                pass
 
-        # For scikit-learn models, check for classes_ attribute
-        if hasattr(self.model, 'classes_'):
-            return True
+        bundle = ModelBundle(
+            dataset_id=dataset_id,
+            model=self.model,
+            scaler=self.scaler,
+            label_encoders=self.label_encoders,
+            calibrated_model=self.calibrated_model,
+            optimal_threshold=self.optimal_threshold,
+            version=model_id,
+            shap_explainer=self.shap_explainer,
+            size_bytes=size_bytes,
+            source_mtime=self._artifact_mtime(dataset_id),
+        )
+        self.registry.put(bundle)
+        return bundle
 
-        # For calibrated models
-        if isinstance(self.model, CalibratedClassifierCV):
-            return hasattr(self.model, 'calibrated_classifiers_')
+    def _load_model_for_dataset(self, dataset_id: Optional[str]) -> bool:
+        """Load (or reuse) the bundle for a dataset and bind it. Returns True if trained artifacts were found."""
+        bundle = self.get_model_bundle(dataset_id)
+        self._bind_bundle(bundle)
+        return not bundle.is_default
 
-        # Default: assume fitted if model exists
-        return True
+    def _initialize_default_model(self):
+        """Initialize a default XGBoost model with typical parameters"""
+        bundle = self._default_bundle(self.active_dataset_id)
+        self.model = bundle.model
+        self.calibrated_model = None
+        self.scaler = bundle.scaler
 
-    def ensure_model_for_dataset(self, dataset_id: Optional[str]) -> None:
-        """Load the appropriate model artifacts for the given dataset if needed."""
-        target_dataset = dataset_id or None
+        # Initialize empty label encoders for categorical features
+        # These will be fitted dynamically during training with user's actual data
+        self.label_encoders = bundle.label_encoders
+        self.model_metrics = {}
 
-        # If already loaded for this dataset, nothing to do
-        if self.model is not None and self.active_dataset_id == target_dataset:
-            return
+    def _is_model_fitted(self) -> bool:
+        """Check if the model is actually trained and ready for predictions."""
+        return is_model_fitted(self.model)
 
-        # Try loading dataset-scoped artifacts; fallback to default if missing
-        loaded = self._load_model_for_dataset(target_dataset)
-        if not loaded and settings.ENVIRONMENT != "production":
-            # In dev, ensure we at least have a default model ready
-            self._initialize_default_model()
-            self.active_dataset_id = target_dataset
+    def ensure_model_for_dataset(self, dataset_id: Optional[str]) -> ModelBundle:
+        """Make the dataset's bundle resident and bind it to the service attributes."""
+        bundle = self.get_model_bundle(dataset_id)
+        self._bind_bundle(bundle)
+        return bundle
 
     def update_training_progress(self, dataset_id: str, status: str, progress: int, message: str, job_id: Optional[int] = None):
         """Track training progress in memory for polling endpoints."""
@@ -334,6 +454,94 @@ class ChurnPredictionService:
             "updated_at": datetime.utcnow(),
         }
 
+    async def train_model_isolated(
+        self,
+        request: ModelTrainingRequest,
+        training_data: pd.DataFrame,
+        dataset_id: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+    ) -> ModelTrainingResponse:
+        """
+        Train in the dedicated training process pool and adopt the result.
+
+        The event loop stays responsive while the worker trains; progress is
+        forwarded to progress_callback as the worker reports it.
+        """
+        if not settings.TRAINING_USE_PROCESS_POOL:
+            return await self.train_model(request, training_data, dataset_id, progress_callback=progress_callback)
+
+        outcome = await training_executor.run(request, training_data, dataset_id, progress_callback)
+        self.apply_training_outcome(outcome)
+        return outcome.response
+
+    def export_training_outcome(self, response: ModelTrainingResponse, dataset_id: Optional[str]) -> TrainingOutcome:
+        """Collect the metadata a training worker hands back (model objects stay on disk)."""
+        cache_key = bundle_key(dataset_id)
+        model_path, _, _ = self._artifact_paths(dataset_id)
+        return TrainingOutcome(
+            response=response,
+            dataset_id=dataset_id,
+            model_path=str(model_path),
+            model_metrics=self.model_metrics_by_dataset.get(cache_key, {}),
+            feature_importance=self.feature_importance_by_dataset.get(cache_key, {}),
+            optimal_threshold=self.optimal_threshold,
+            thresholds=self.thresholds_service.get_cached_thresholds(dataset_id),
+            routing_decision=self.last_routing_decision,
+            dataset_profile=self.last_dataset_profile,
+            drift_reference_path=self._save_drift_reference(dataset_id),
+        )
+
+    def _drift_reference_path(self, dataset_id: Optional[str]) -> Path:
+        model_path, _, _ = self._artifact_paths(dataset_id)
+        return model_path.with_name("drift_reference.npz")
+
+    def _save_drift_reference(self, dataset_id: Optional[str]) -> Optional[str]:
+        """Write the drift reference data next to the model artifacts; returns its path."""
+        data = model_drift_service.dump_reference()
+        if data is None:
+            return None
+        path = self._drift_reference_path(dataset_id)
+        try:
+            with open(path, 'wb') as f:
+                f.write(encrypt_blob(data))
+        except Exception as e:
+            logger.warning(f"Failed to save drift reference data to {path}: {e}")
+            return None
+        return str(path)
+
+    def _load_drift_reference(self, path: str) -> None:
+        try:
+            with open(path, 'rb') as f:
+                model_drift_service.load_reference(decrypt_blob(f.read()))
+        except Exception as e:
+            logger.warning(f"Failed to load drift reference data from {path}: {e}")
+
+    def apply_training_outcome(self, outcome: TrainingOutcome) -> ModelBundle:
+        """Adopt a worker's training result: restore metadata and load the bundle from its artifact path."""
+        dataset_id = outcome.dataset_id
+        cache_key = bundle_key(dataset_id)
+
+        if not Path(outcome.model_path).exists():
+            raise RuntimeError(f"Training finished but model artifact is missing: {outcome.model_path}")
+
+        self.optimal_threshold_by_dataset[cache_key] = outcome.optimal_threshold
+        self.model_metrics_by_dataset[cache_key] = outcome.model_metrics
+        self.feature_importance_by_dataset[cache_key] = outcome.feature_importance
+        self.last_routing_decision = outcome.routing_decision
+        self.last_dataset_profile = outcome.dataset_profile
+        if outcome.thresholds is not None:
+            self.thresholds_service.store_thresholds(outcome.thresholds)
+        if outcome.drift_reference_path is not None:
+            self._load_drift_reference(outcome.drift_reference_path)
+
+        try:
+            bundle = replace(self._read_bundle(dataset_id), version=outcome.response.model_id)
+        except Exception as e:
+            raise RuntimeError(f"Training finished but model artifacts could not be loaded from {outcome.model_path}: {e}") from e
+        self.registry.put(bundle)
+        self._bind_bundle(bundle)
+        return bundle
+
     def _save_model(self, dataset_id: Optional[str] = None):
         """Save model, scaler, encoders, and optimal threshold to disk (scoped per dataset)."""
         model_path, scaler_path, encoders_path = self._artifact_paths(dataset_id)
@@ -359,17 +567,20 @@ class ChurnPredictionService:
             if settings.ENVIRONMENT == "production":
                 raise
 
-    def _prepare_features(self, features: EmployeeChurnFeatures) -> np.ndarray:
+    def _prepare_features(self, features: EmployeeChurnFeatures, bundle: Optional[ModelBundle] = None) -> np.ndarray:
         """Convert employee features to model input format"""
+        bundle = bundle or self._attribute_bundle()
+        scaler = bundle.scaler
+
         # Encode categorical variables with fallback for unfitted encoders
         department_encoded = self._safe_encode_single(
             features.department,
-            self.label_encoders['department'],
+            bundle.label_encoders['department'],
             self.DEPARTMENT_CATEGORIES
         )
         salary_encoded = self._safe_encode_single(
             features.salary_level,
-            self.label_encoders['salary_level'],
+            bundle.label_encoders['salary_level'],
             self.SALARY_CATEGORIES
         )
 
@@ -387,19 +598,19 @@ class ChurnPredictionService:
         ]])
 
         # Scale features with fallback for unfitted scaler
-        if not hasattr(self.scaler, 'mean_') or self.scaler.mean_ is None:
+        if not hasattr(scaler, 'mean_') or scaler.mean_ is None:
             # Scaler not fitted - use reasonable defaults based on typical HR data ranges
             # This is a fallback for counterfactual simulations when model isn't trained
             default_means = np.array([0.6, 0.7, 4.0, 200.0, 3.5, 0.15, 0.02, 4.0, 1.0])
             default_scales = np.array([0.25, 0.2, 1.5, 50.0, 2.0, 0.35, 0.14, 3.0, 0.8])
-            self.scaler.mean_ = default_means
-            self.scaler.scale_ = default_scales
-            self.scaler.var_ = default_scales ** 2
-            self.scaler.n_features_in_ = 9
-            self.scaler.n_samples_seen_ = 1
+            scaler.mean_ = default_means
+            scaler.scale_ = default_scales
+            scaler.var_ = default_scales ** 2
+            scaler.n_features_in_ = 9
+            scaler.n_samples_seen_ = 1
             logger.debug("Using default scaler parameters for unfitted scaler")
 
-        feature_array_scaled = self.scaler.transform(feature_array)
+        feature_array_scaled = scaler.transform(feature_array)
 
         return feature_array_scaled
 
@@ -415,7 +626,7 @@ class ChurnPredictionService:
         else:
             return ChurnRiskLevel.LOW
 
-    def _safe_encode_single(self, value: str, encoder: LabelEncoder, default_categories: List[str]) -> int:
+    def _safe_encode_single(self, value: str, encoder: "LabelEncoder", default_categories: List[str]) -> int:
         """
         Encode a single categorical value with fallback for unfitted encoders.
 
@@ -458,62 +669,57 @@ class ChurnPredictionService:
         )
         return int(encoder.transform([matching_class])[0])
 
-    def _safe_encode_series(self, series: pd.Series, encoder: LabelEncoder) -> np.ndarray:
+    def _safe_encode_series(self, series: pd.Series, encoder: "LabelEncoder") -> np.ndarray:
         """Encode categorical series with fallback for unseen values."""
         if not hasattr(encoder, "classes_") or len(encoder.classes_) == 0:
             return encoder.fit_transform(series.fillna("unknown").astype(str))
 
-        fallback = encoder.classes_[0]
-        known = set(encoder.classes_.tolist())
+        classes = encoder.classes_.tolist()
+        fallback = classes[0]
+        known = set(classes)
+        # Case-insensitive like _safe_encode_single; exact matches win
+        by_lowercase: Dict[str, Any] = {}
+        for cls in classes:
+            by_lowercase.setdefault(str(cls).lower(), cls)
         normalized = [
-            val if val in known else fallback
+            val if val in known else by_lowercase.get(val.lower().strip(), fallback)
             for val in series.fillna(fallback).astype(str)
         ]
         return encoder.transform(normalized)
 
-    def _get_shap_values_batch(self, features_array: np.ndarray):
-        """Return SHAP values for a batch or None on failure."""
-        if not SHAP_AVAILABLE or self.shap_explainer is None:
+    def _get_contributions_batch(self, features_array: np.ndarray, bundle: ModelBundle) -> Optional[np.ndarray]:
+        """
+        Per-feature contributions for a whole matrix, or None if unavailable.
+
+        Uses the booster's native TreeSHAP output (one call for the matrix) for
+        XGBoost/LightGBM/CatBoost, falling back to the bundle's SHAP explainer.
+        XGBoost batches only use approximate contributions when BATCH_APPROX_CONTRIBS_MIN_ROWS opts in.
+        """
+        approximate = 0 < settings.BATCH_APPROX_CONTRIBS_MIN_ROWS <= len(features_array)
+        contributions = native_contributions(bundle.model, features_array, approximate=approximate)
+        if contributions is not None:
+            return contributions
+
+        if _load_shap() is None or bundle.shap_explainer is None:
             return None
         try:
-            shap_values = self.shap_explainer.shap_values(features_array)
+            shap_values = bundle.shap_explainer.shap_values(features_array)
             if isinstance(shap_values, list):
                 shap_values = shap_values[1]
+            shap_values = np.asarray(shap_values)
+            if shap_values.ndim == 3:
+                # (samples, features, classes) - keep the positive class
+                shap_values = shap_values[:, :, 1]
             return shap_values
         except Exception as e:
             logger.warning(f"SHAP batch explanation failed: {e}")
             return None
 
-    def _build_factors_from_shap_row(self, shap_row: np.ndarray, feature_values: List[Any]) -> List[Dict[str, Any]]:
-        """Create contributing factors list from a single SHAP row."""
-        factors: List[Dict[str, Any]] = []
-        for name, value, shap_val in zip(self.FEATURE_NAMES, feature_values, shap_row):
-            # Ensure shap_val is a scalar (not an array)
-            if hasattr(shap_val, 'item'):
-                shap_val = shap_val.item()
-            elif isinstance(shap_val, np.ndarray):
-                shap_val = float(shap_val.flatten()[0])
-            else:
-                shap_val = float(shap_val)
-
-            abs_impact = abs(shap_val)
-            if abs_impact <= 0.01:
-                continue
-            factors.append({
-                "feature": name,
-                "value": value,
-                "shap_value": float(shap_val),
-                "impact": self._shap_to_impact_level(shap_val),
-                "direction": "increases_risk" if shap_val > 0 else "decreases_risk",
-                "message": self._generate_shap_message(name, value, shap_val)
-            })
-        factors.sort(key=lambda x: abs(x["shap_value"]), reverse=True)
-        return factors[:5]
-
     def calculate_prediction_confidence(
         self,
         features_array: np.ndarray,
-        probability: float
+        probability: float,
+        bundle: Optional[ModelBundle] = None
     ) -> Tuple[float, Dict[str, float]]:
         """
         Calculate model confidence based on:
@@ -523,6 +729,7 @@ class ChurnPredictionService:
         Returns:
             Tuple of (confidence_score, breakdown_dict)
         """
+        model = bundle.model if bundle is not None else self.model
         breakdown = {}
 
         # Component 1: Prediction Margin
@@ -532,27 +739,17 @@ class ChurnPredictionService:
 
         # Component 2: Tree Agreement
         # Measure variance across individual tree predictions
-        tree_agreement = self._calculate_tree_agreement(features_array)
+        tree_agreement = self._calculate_tree_agreement(features_array, model)
         breakdown['tree_agreement'] = tree_agreement
 
         # Final confidence: weighted combination
         # Weights are adaptive based on model type - tree-based models weight agreement more
-        if isinstance(self.model, (xgb.XGBClassifier, RandomForestClassifier)):
-            # Tree-based models: tree agreement is more informative
-            tree_weight = 0.6
-        else:
-            # Non-tree models: rely more on prediction margin
-            tree_weight = 0.4
-        margin_weight = 1.0 - tree_weight
-        confidence = (tree_weight * tree_agreement) + (margin_weight * margin)
-
-        # Ensure bounds
-        confidence = max(0.0, min(1.0, confidence))
+        confidence = float(combine_confidence(model, np.array([probability]), np.array([tree_agreement]))[0])
         breakdown['final_confidence'] = confidence
 
         return confidence, breakdown
 
-    def _calculate_tree_agreement(self, features_array: np.ndarray) -> float:
+    def _calculate_tree_agreement(self, features_array: np.ndarray, model: Any = None) -> float:
         """
         Calculate how much individual trees in the ensemble agree.
 
@@ -563,104 +760,23 @@ class ChurnPredictionService:
         Low variance = high agreement = high confidence
         High variance = trees disagree = low confidence
         """
-        if self.model is None:
-            return 0.5  # No model, moderate confidence
-
-        try:
-            if isinstance(self.model, xgb.XGBClassifier):
-                return self._xgboost_tree_agreement(features_array)
-            elif isinstance(self.model, RandomForestClassifier):
-                return self._random_forest_tree_agreement(features_array)
-            else:
-                # For other models (LogisticRegression, etc.), use prediction margin only
-                return 0.7  # Default moderate-high confidence
-        except Exception as e:
-            print(f"Error calculating tree agreement: {e}")
-            return 0.5
-
-    def _xgboost_tree_agreement(self, features_array: np.ndarray) -> float:
-        """
-        Calculate tree agreement for XGBoost by getting predictions
-        at different boosting iterations and measuring variance.
-        """
-        try:
-            booster = self.model.get_booster()
-            n_trees = booster.num_boosted_rounds()
-
-            if n_trees <= 1:
-                return 0.7  # Single tree, can't measure agreement
-
-            # Sample predictions at different iteration checkpoints
-            # Use ~10 checkpoints for efficiency
-            n_checkpoints = min(10, n_trees)
-            checkpoint_indices = [int(x) for x in np.linspace(1, n_trees, n_checkpoints)]
-
-            # Convert to DMatrix for booster prediction
-            dmatrix = xgb.DMatrix(features_array)
-
-            predictions = []
-            for n_iter in checkpoint_indices:
-                # Get prediction using first n_iter trees
-                pred = booster.predict(dmatrix, iteration_range=(0, int(n_iter)))
-                predictions.append(float(pred[0]))
-
-            # Calculate standard deviation of predictions
-            predictions = np.array(predictions)
-            std_dev = float(np.std(predictions))
-
-            # Convert std to agreement score
-            # Lower std = higher agreement
-            # Scale: std of 0.25 or more = 0 confidence, std of 0 = 1.0 confidence
-            agreement = 1.0 - min(std_dev * 4, 1.0)
-
-            return max(0.0, min(1.0, agreement))
-
-        except Exception as e:
-            print(f"XGBoost tree agreement error: {e}")
-            return 0.5
-
-    def _random_forest_tree_agreement(self, features_array: np.ndarray) -> float:
-        """
-        Calculate tree agreement for RandomForest by getting predictions
-        from individual trees and measuring variance.
-        """
-        try:
-            n_trees = len(self.model.estimators_)
-
-            if n_trees <= 1:
-                return 0.7
-
-            # Get predictions from each tree
-            predictions = []
-            for tree in self.model.estimators_:
-                pred = tree.predict_proba(features_array)[0][1]
-                predictions.append(pred)
-
-            # Calculate standard deviation
-            predictions = np.array(predictions)
-            std_dev = np.std(predictions)
-
-            # Convert std to agreement score
-            agreement = 1.0 - min(std_dev * 4, 1.0)
-
-            return max(0.0, min(1.0, agreement))
-
-        except Exception as e:
-            print(f"RandomForest tree agreement error: {e}")
-            return 0.5
+        model = model if model is not None else self.model
+        return float(tree_agreement_batch(model, features_array)[0])
 
     def _get_shap_contributing_factors(
         self,
         features_array: np.ndarray,
-        features: EmployeeChurnFeatures
+        features: EmployeeChurnFeatures,
+        bundle: Optional[ModelBundle] = None
     ) -> List[Dict[str, Any]]:
         """Get contributing factors using SHAP values for true model interpretability."""
-        if not SHAP_AVAILABLE or self.shap_explainer is None:
+        explainer = bundle.shap_explainer if bundle is not None else self.shap_explainer
+        if _load_shap() is None or explainer is None:
             return self._get_heuristic_contributing_factors(features)
 
         try:
             # Get SHAP values for this prediction
-            shap_values = self.shap_explainer.shap_values(features_array)
+            shap_values = explainer.shap_values(features_array)
 
             # Handle different SHAP output formats
             if isinstance(shap_values, list):
@@ -865,64 +981,29 @@ class ChurnPredictionService:
 
         Uses percentile-based analysis to determine what's anomalous for this dataset.
         """
-        recommendations = []
-
-        # Check satisfaction against data distribution
-        sat_percentile = self.thresholds_service.get_feature_percentile(
-            'satisfaction_level', features.satisfaction_level, dataset_id
-        )
-        if sat_percentile < 25:  # Bottom 25%
-            recommendations.append("Schedule immediate one-on-one meeting to discuss employee satisfaction and concerns")
-
-        # Check workload against data distribution
-        hours_percentile = self.thresholds_service.get_feature_percentile(
-            'average_monthly_hours', features.average_monthly_hours, dataset_id
-        )
-        if hours_percentile > 75:  # Top 25% - potential overwork
-            recommendations.append("Review current workload and consider redistributing projects to reduce overtime")
-
-        # Check project count against data distribution
-        projects_percentile = self.thresholds_service.get_feature_percentile(
-            'number_project', float(features.number_project), dataset_id
-        )
-        if projects_percentile > 75:  # Top 25%
-            recommendations.append("Evaluate project assignments and potentially reduce workload")
-        elif projects_percentile < 25:  # Bottom 25%
-            recommendations.append("Consider increasing project involvement to boost engagement")
-
-        # Check tenure for promotion consideration
-        tenure_percentile = self.thresholds_service.get_feature_percentile(
-            'time_spend_company', float(features.time_spend_company), dataset_id
-        )
-        if not features.promotion_last_5years and tenure_percentile > 50:  # Above median tenure
-            recommendations.append("Discuss career development opportunities and potential promotion path")
-
-        # Note: salary_level recommendations based on actual tier, not hardcoded values
-        # The tier itself is already data-driven
-
-        # Check evaluation against data distribution
-        eval_percentile = self.thresholds_service.get_feature_percentile(
-            'last_evaluation', features.last_evaluation, dataset_id
+        flags = recommendation_flags(
+            self.thresholds_service,
+            satisfaction=np.array([features.satisfaction_level]),
+            monthly_hours=np.array([features.average_monthly_hours]),
+            projects=np.array([float(features.number_project)]),
+            tenure=np.array([float(features.time_spend_company)]),
+            promoted=np.array([features.promotion_last_5years]),
+            evaluation=np.array([features.last_evaluation]),
+            dataset_id=dataset_id,
         )
-        if eval_percentile < 25:  # Bottom 25%
-            recommendations.append("Provide additional training and performance improvement support")
-
-        if not recommendations:
-            recommendations.append("Continue regular check-ins and maintain positive work environment")
-
-        return recommendations[:5]  # Return top 5 recommendations
+        return recommendation_texts(flags[0])
 
     async def predict_churn(self, request: ChurnPredictionRequest, dataset_id: Optional[str] = None) -> ChurnPredictionResponse:
         """Predict churn probability for a single employee"""
 
-        # Ensure the correct model is loaded for this dataset
-        self.ensure_model_for_dataset(dataset_id)
+        # Resolve the dataset's resident model bundle (never mutates service state)
+        bundle = self.get_model_bundle(dataset_id)
 
         # Prepare features
-        features_array = self._prepare_features(request.features)
+        features_array = self._prepare_features(request.features, bundle)
 
         # Get prediction - check if model is actually fitted, not just initialized
-        if not self._is_model_fitted():
+        if not bundle.is_fitted:
             if settings.ENVIRONMENT == "production":
                 raise RuntimeError("No trained model loaded. Train a model before serving predictions.")
             # If no trained model, use heuristic-based prediction
@@ -939,22 +1020,9 @@ class ChurnPredictionService:
             # Use heuristic factors for untrained model
             contributing_factors = self._get_heuristic_contributing_factors(request.features, dataset_id)
         else:
-            # Use calibrated model if available for better probability estimates
-            if self.calibrated_model is not None:
-                probability = float(self.calibrated_model.predict_proba(features_array)[0][1])
-                confidence_breakdown_method = 'calibrated'
-            else:
-                probability = float(self.model.predict_proba(features_array)[0][1])
-                confidence_breakdown_method = 'raw'
-
-            # Calculate real confidence using tree agreement + margin
-            confidence_score, confidence_breakdown = self.calculate_prediction_confidence(
-                features_array, probability
+            probability, confidence_score, confidence_breakdown, contributing_factors = await run_cpu(
+                self._score_fitted, features_array, request.features, bundle
             )
-            confidence_breakdown['method'] = confidence_breakdown_method
-
-            # Use SHAP-based factors if available, otherwise heuristic
-            contributing_factors = self._get_shap_contributing_factors(features_array, request.features)
 
         # Determine risk level using data-driven thresholds
         risk_level = self._determine_risk_level(probability, dataset_id)
@@ -973,6 +1041,30 @@ class ChurnPredictionService:
             predicted_at=datetime.utcnow()
         )
 
+    def _score_fitted(
+        self,
+        features_array: np.ndarray,
+        features: EmployeeChurnFeatures,
+        bundle: ModelBundle,
+    ) -> Tuple[float, float, Dict[str, Any], List[Dict[str, Any]]]:
+        """Model scoring and SHAP for one employee (runs on the CPU pool)."""
+        with span("inference"):
+            # Use calibrated model if available for better probability estimates
+            probability = float(bundle.prediction_model.predict_proba(features_array)[0][1])
+            confidence_breakdown_method = 'calibrated' if bundle.calibrated_model is not None else 'raw'
+
+            # Calculate real confidence using tree agreement + margin
+            confidence_score, confidence_breakdown = self.calculate_prediction_confidence(
+                features_array, probability, bundle
+            )
+            confidence_breakdown['method'] = confidence_breakdown_method
+
+        # Use SHAP-based factors if available, otherwise heuristic
+        with span("shap"):
+            contributing_factors = self._get_shap_contributing_factors(features_array, features, bundle)
+
+        return probability, confidence_score, confidence_breakdown, contributing_factors
+
     def _heuristic_prediction(
         self,
         features: EmployeeChurnFeatures,
@@ -1052,165 +1144,187 @@ class ChurnPredictionService:
         hr_codes: Optional[List[str]] = None,
         batch_size: int = 256,
     ) -> List[ChurnPredictionResponse]:
+        """Batch churn prediction returning one response object per row."""
+        columnar = await self.predict_frame_columnar(feature_frame, dataset_id, hr_codes, batch_size)
+        return columnar.to_responses()
+
+    @staticmethod
+    def _row_to_features(row: Any) -> EmployeeChurnFeatures:
+        """Build EmployeeChurnFeatures from an itertuples row of FEATURE_NAMES columns."""
+        return EmployeeChurnFeatures(
+            satisfaction_level=float(row.satisfaction_level),
+            last_evaluation=float(row.last_evaluation),
+            number_project=int(float(row.number_project)),
+            average_monthly_hours=float(row.average_monthly_hours),
+            time_spend_company=int(float(row.time_spend_company)),
+            work_accident=bool(int(float(row.work_accident))),
+            promotion_last_5years=bool(int(float(row.promotion_last_5years))),
+            department=row.department,
+            salary_level=row.salary_level,
+        )
+
+    @staticmethod
+    def _predict_matrix(bundle: ModelBundle, scaled_matrix: np.ndarray, batch_size: int) -> np.ndarray:
+        if not len(scaled_matrix):
+            return np.empty(0)
+        return np.concatenate([
+            bundle.prediction_model.predict_proba(scaled_matrix[start:start + batch_size])[:, 1]
+            for start in range(0, len(scaled_matrix), batch_size)
+        ])
+
+    async def predict_frame_columnar(
+        self,
+        feature_frame: pd.DataFrame,
+        dataset_id: Optional[str] = None,
+        hr_codes: Optional[List[str]] = None,
+        batch_size: int = 4096,
+    ) -> ColumnarPredictions:
         """
         Vectorized churn prediction for a feature DataFrame.
 
-        Preserves SHAP-based explanations by default while avoiding per-row loops.
+        Returns a struct-of-arrays result (probabilities, risk codes, top factor
+        indices, recommendation flags); per-employee objects are built lazily by
+        the caller. Preserves SHAP-based explanations without per-row loops.
         """
-        self.ensure_model_for_dataset(dataset_id)
-
-        feature_columns = [
-            'satisfaction_level', 'last_evaluation', 'number_project',
-            'average_monthly_hours', 'time_spend_company', 'work_accident',
-            'promotion_last_5years', 'department', 'salary_level'
-        ]
+        bundle = self.get_model_bundle(dataset_id)
 
-        # Fallback for untrained model: use heuristic path row-by-row (rare)
-        if not self._is_model_fitted():
-            results: List[ChurnPredictionResponse] = []
-            for idx, row in feature_frame.iterrows():
-                features_obj = EmployeeChurnFeatures(
-                    satisfaction_level=float(row.get("satisfaction_level", 0.5)),
-                    last_evaluation=float(row.get("last_evaluation", 0.5)),
-                    number_project=int(float(row.get("number_project", 3))),
-                    average_monthly_hours=float(row.get("average_monthly_hours", 160)),
-                    time_spend_company=int(float(row.get("time_spend_company", 3))),
-                    work_accident=bool(int(float(row.get("work_accident", 0)))),
-                    promotion_last_5years=bool(int(float(row.get("promotion_last_5years", 0)))),
-                    department=str(row.get("department", "general")),
-                    salary_level=str(row.get("salary_level", "medium")),
-                )
-                prob = self._heuristic_prediction(features_obj)
-                margin = abs(prob - 0.5) * 2
-                factors = self._get_heuristic_contributing_factors(features_obj)
-                results.append(ChurnPredictionResponse(
-                    employee_id=hr_codes[idx] if hr_codes and idx < len(hr_codes) else None,
-                    churn_probability=prob,
-                    confidence_score=margin,
-                    confidence_breakdown={
-                        "prediction_margin": margin,
-                        "tree_agreement": 0.5,
-                        "final_confidence": margin,
-                        "method": "heuristic-batch"
-                    },
-                    risk_level=self._determine_risk_level(prob, dataset_id),
-                    contributing_factors=factors,
-                    recommendations=self._get_recommendations(features_obj, factors),
-                    predicted_at=datetime.utcnow()
-                ))
-            return results
-
-        # Prepare numeric matrix
+        feature_columns = self.FEATURE_NAMES
         base_df = feature_frame[feature_columns].copy()
         base_df['department'] = base_df['department'].fillna("unknown").astype(str)
         base_df['salary_level'] = base_df['salary_level'].fillna("medium").astype(str)
+        raw_features = base_df.to_numpy(dtype=object)
 
-        dept_encoded = self._safe_encode_series(base_df['department'], self.label_encoders['department'])
-        salary_encoded = self._safe_encode_series(base_df['salary_level'], self.label_encoders['salary_level'])
-
-        feature_matrix = np.column_stack([
-            base_df['satisfaction_level'].astype(float).values,
-            base_df['last_evaluation'].astype(float).values,
-            base_df['number_project'].astype(float).values,
-            base_df['average_monthly_hours'].astype(float).values,
-            base_df['time_spend_company'].astype(float).values,
-            base_df['work_accident'].astype(float).values,
-            base_df['promotion_last_5years'].astype(float).values,
-            dept_encoded,
-            salary_encoded
-        ])
-
-        scaled_matrix = self.scaler.transform(feature_matrix)
-        results: List[ChurnPredictionResponse] = []
+        numeric = {
+            name: pd.to_numeric(base_df[name], errors='coerce').to_numpy(dtype=float)
+            for name in feature_columns[:7]
+        }
 
-        for start in range(0, len(scaled_matrix), batch_size):
-            end = start + batch_size
-            batch_scaled = scaled_matrix[start:end]
-            batch_slice_df = base_df.iloc[start:end]
-            batch_hr_codes = hr_codes[start:end] if hr_codes else None
+        flags = recommendation_flags(
+            self.thresholds_service,
+            satisfaction=numeric['satisfaction_level'],
+            monthly_hours=numeric['average_monthly_hours'],
+            projects=numeric['number_project'],
+            tenure=numeric['time_spend_company'],
+            promoted=np.nan_to_num(numeric['promotion_last_5years']) != 0,
+            evaluation=numeric['last_evaluation'],
+            dataset_id=dataset_id,
+        )
 
-            if self.calibrated_model is not None:
-                batch_proba = self.calibrated_model.predict_proba(batch_scaled)[:, 1]
-                confidence_method = "calibrated-batch"
+        n_rows = len(base_df)
+        top_k = 5
+        factor_indices = np.full((n_rows, top_k), -1, dtype=np.int16)
+        factor_values = np.zeros((n_rows, top_k), dtype=float)
+        factor_impacts = np.zeros((n_rows, top_k), dtype=np.int8)
+        precomputed_factors: Optional[List[List[Dict[str, Any]]]] = None
+
+        # Fallback for untrained model: heuristic scoring row-by-row (rare)
+        if not bundle.is_fitted:
+            probabilities = np.empty(n_rows)
+            precomputed_factors = []
+            for idx, row in enumerate(base_df.itertuples(index=False)):
+                features_obj = self._row_to_features(row)
+                probabilities[idx] = self._heuristic_prediction(features_obj, dataset_id)
+                precomputed_factors.append(self._get_heuristic_contributing_factors(features_obj, dataset_id))
+            method = "heuristic-batch"
+        else:
+            dept_encoded = self._safe_encode_series(base_df['department'], bundle.label_encoders['department'])
+            salary_encoded = self._safe_encode_series(base_df['salary_level'], bundle.label_encoders['salary_level'])
+            feature_matrix = np.column_stack(
+                [numeric[name] for name in feature_columns[:7]] + [dept_encoded, salary_encoded]
+            )
+            scaled_matrix = bundle.scaler.transform(feature_matrix)
+
+            with span("inference"):
+                probabilities = await run_cpu(self._predict_matrix, bundle, scaled_matrix, batch_size)
+            method = "calibrated-batch" if bundle.calibrated_model is not None else "raw-batch"
+
+            # Explain the whole matrix at once; top-k factors and impact levels are vectorized
+            with span("shap"):
+                contributions = await run_cpu(self._get_contributions_batch, scaled_matrix, bundle)
+            if contributions is not None:
+                top_idx, top_vals = select_top_factors(contributions, top_k)
+                k = top_idx.shape[1]
+                factor_indices[:, :k] = top_idx
+                factor_values[:, :k] = top_vals
+                factor_impacts[:, :k] = impact_codes(top_vals, self.thresholds_service.get_shap_thresholds(dataset_id))
             else:
-                batch_proba = self.model.predict_proba(batch_scaled)[:, 1]
-                confidence_method = "raw-batch"
-
-            shap_values = self._get_shap_values_batch(batch_scaled)
-
-            for row_idx, prob in enumerate(batch_proba):
-                margin = abs(prob - 0.5) * 2
-                idx_global = start + row_idx
-                feature_row = batch_slice_df.iloc[row_idx]
-
-                if shap_values is not None:
-                    factors = self._build_factors_from_shap_row(
-                        shap_values[row_idx],
-                        [
-                            feature_row['satisfaction_level'],
-                            feature_row['last_evaluation'],
-                            feature_row['number_project'],
-                            feature_row['average_monthly_hours'],
-                            feature_row['time_spend_company'],
-                            feature_row['work_accident'],
-                            feature_row['promotion_last_5years'],
-                            feature_row['department'],
-                            feature_row['salary_level'],
-                        ]
-                    )
-                else:
-                    features_obj = EmployeeChurnFeatures(
-                        satisfaction_level=float(feature_row.get("satisfaction_level", 0.5)),
-                        last_evaluation=float(feature_row.get("last_evaluation", 0.5)),
-                        number_project=int(float(feature_row.get("number_project", 3))),
-                        average_monthly_hours=float(feature_row.get("average_monthly_hours", 160)),
-                        time_spend_company=int(float(feature_row.get("time_spend_company", 3))),
-                        work_accident=bool(int(float(feature_row.get("work_accident", 0)))),
-                        promotion_last_5years=bool(int(float(feature_row.get("promotion_last_5years", 0)))),
-                        department=str(feature_row.get("department", "general")),
-                        salary_level=str(feature_row.get("salary_level", "medium")),
-                    )
-                    factors = self._get_heuristic_contributing_factors(features_obj)
-
-                confidence_breakdown = {
-                    "prediction_margin": margin,
-                    "tree_agreement": 0.5,  # skip expensive per-row agreement in batch mode
-                    "final_confidence": margin,
-                    "method": confidence_method,
-                }
-
-                results.append(ChurnPredictionResponse(
-                    employee_id=batch_hr_codes[row_idx] if batch_hr_codes is not None else None,
-                    churn_probability=float(prob),
-                    confidence_score=margin,
-                    confidence_breakdown=confidence_breakdown,
-                    risk_level=self._determine_risk_level(float(prob), dataset_id),
-                    contributing_factors=factors,
-                    recommendations=self._get_recommendations(
-                        EmployeeChurnFeatures(
-                            satisfaction_level=float(feature_row.get("satisfaction_level", 0.5)),
-                            last_evaluation=float(feature_row.get("last_evaluation", 0.5)),
-                            number_project=int(float(feature_row.get("number_project", 3))),
-                            average_monthly_hours=float(feature_row.get("average_monthly_hours", 160)),
-                            time_spend_company=int(float(feature_row.get("time_spend_company", 3))),
-                            work_accident=bool(int(float(feature_row.get("work_accident", 0)))),
-                            promotion_last_5years=bool(int(float(feature_row.get("promotion_last_5years", 0)))),
-                            department=str(feature_row.get("department", "general")),
-                            salary_level=str(feature_row.get("salary_level", "medium")),
-                        ),
-                        factors,
-                    ),
-                    predicted_at=datetime.utcnow()
-                ))
+                precomputed_factors = [
+                    self._get_heuristic_contributing_factors(self._row_to_features(row), dataset_id)
+                    for row in base_df.itertuples(index=False)
+                ]
+
+        if bundle.is_fitted:
+            # One pass per tree/checkpoint over the whole matrix
+            with span("inference"):
+                tree_agreement = await run_cpu(tree_agreement_batch, bundle.model, scaled_matrix)
+                confidence = combine_confidence(bundle.model, probabilities, tree_agreement)
+        else:
+            # Heuristic scores have no ensemble to agree, so confidence is the margin
+            tree_agreement = None
+            confidence = np.abs(probabilities - 0.5) * 2
+
+        return ColumnarPredictions(
+            probabilities=probabilities,
+            confidence=confidence,
+            risk_codes=self.thresholds_service.get_risk_level_codes(probabilities, dataset_id),
+            factor_indices=factor_indices,
+            factor_values=factor_values,
+            factor_impacts=factor_impacts,
+            recommendation_flags=flags,
+            raw_features=raw_features,
+            feature_names=feature_columns,
+            message_fn=self._generate_shap_message,
+            dataset_id=dataset_id,
+            employee_ids=hr_codes,
+            method=method,
+            tree_agreement=tree_agreement,
+            precomputed_factors=precomputed_factors,
+        )
+
+    async def train_model(
+        self,
+        request: ModelTrainingRequest,
+        training_data: pd.DataFrame,
+        dataset_id: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+    ) -> ModelTrainingResponse:
+        """
+        Train a new churn prediction model with intelligent routing and automatic model selection.
 
-        return results
+        progress_callback receives (percent, message) at each training stage. It may
+        raise to abort training (the process-pool worker uses this for cancellation).
+        """
+        from sklearn.calibration import CalibratedClassifierCV
+        from sklearn.metrics import (
+            accuracy_score, precision_score, recall_score, f1_score,
+            roc_auc_score, average_precision_score, brier_score_loss,
+        )
+        from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
 
-    async def train_model(self, request: ModelTrainingRequest, training_data: pd.DataFrame, dataset_id: Optional[str] = None) -> ModelTrainingResponse:
-        """Train a new churn prediction model with intelligent routing and automatic model selection."""
+        # SMOTE for handling class imbalance
+        try:
+            from imblearn.over_sampling import SMOTE
+            from imblearn.combine import SMOTETomek
+            smote_available = True
+        except ImportError:
+            smote_available = False
+
+        shap = _load_shap()
+        report = progress_callback or (lambda progress, message: None)
 
         # Remember which dataset this model belongs to
         self.active_dataset_id = dataset_id
 
+        # Fit into fresh preprocessing objects so resident bundles are never mutated mid-training
+        self.scaler = StandardScaler()
+        self.label_encoders = {
+            'department': LabelEncoder(),
+            'salary_level': LabelEncoder()
+        }
+        self.calibrated_model = None
+        self.shap_explainer = None
+
         # Prepare training data
         X, y = self._prepare_training_data(training_data)
 
@@ -1225,6 +1339,7 @@ class ChurnPredictionService:
             salary_column='employee_cost' if 'employee_cost' in training_data.columns else 'salary',
             tenure_column='time_spend_company' if 'time_spend_company' in training_data.columns else 'tenure',
         )
+        report(10, "Computed data-driven thresholds")
 
         # === NEW: Profile dataset for intelligent model routing ===
         logger.info("Profiling dataset for model routing...")
@@ -1252,6 +1367,7 @@ class ChurnPredictionService:
             f"(confidence: {self.last_routing_decision.confidence:.2f}, "
             f"ensemble: {use_ensemble})"
         )
+        report(20, f"Selected {selected_model_type} model")
 
         # === IMPROVEMENT 1: Proper Train/Test Split ===
         # Use stratified split to maintain class balance
@@ -1275,7 +1391,7 @@ class ChurnPredictionService:
         X_train_resampled, y_train_resampled = X_train, y_train
         smote_applied = False
 
-        if SMOTE_AVAILABLE and class_imbalance_ratio > 2.0 and len(X_train) >= 50:
+        if smote_available and class_imbalance_ratio > 2.0 and len(X_train) >= 50:
             try:
                 # Use SMOTETomek for better results (combines oversampling + undersampling)
                 if class_imbalance_ratio > 5.0:
@@ -1308,14 +1424,15 @@ class ChurnPredictionService:
             except Exception as e:
                 logger.warning(f"SMOTE failed, using original data: {e}")
                 X_train_resampled, y_train_resampled = X_train, y_train
-        elif not SMOTE_AVAILABLE:
+        elif not smote_available:
             logger.warning("SMOTE not available - install imbalanced-learn for better performance")
+        report(30, "Training data prepared")
 
         # === NEW: Handle ensemble training ===
         if use_ensemble:
             return await self._train_ensemble_model(
                 X_train_resampled, X_test, y_train_resampled, y_test, X, y,
-                class_imbalance_ratio, dataset_id, smote_applied
+                class_imbalance_ratio, dataset_id, smote_applied, report
             )
 
         # Fit scaler on resampled training data
@@ -1343,6 +1460,7 @@ class ChurnPredictionService:
                 selected_model_type, class_imbalance_ratio, request.hyperparameters
             )
             self.model.fit(X_train_scaled, y_train_resampled)
+        report(55, "Model fitted, evaluating")
 
         # === IMPROVEMENT 3: Proper Validation Metrics (on TEST set) ===
         y_proba_test = self.model.predict_proba(X_test_scaled)[:, 1]
@@ -1401,6 +1519,8 @@ class ChurnPredictionService:
                 metrics['cv_roc_auc_mean'] = metrics.get('roc_auc', 0.5)
                 metrics['cv_roc_auc_std'] = 0.0
 
+        report(65, "Cross-validation complete")
+
         # Training set metrics (for reference - check for overfitting)
         y_proba_train = self.model.predict_proba(X_train_scaled)[:, 1]
         y_pred_train = (y_proba_train >= optimal_threshold).astype(int)
@@ -1416,7 +1536,7 @@ class ChurnPredictionService:
             # TabPFN uses permutation importance instead of SHAP
             self.shap_explainer = None
             logger.info("TabPFN model - will use permutation importance for explanations")
-        elif SHAP_AVAILABLE:
+        elif shap is not None:
             try:
                 # Check if model supports TreeExplainer (XGBoost, RF, LightGBM, CatBoost)
                 model_type_name = type(self.model).__name__
@@ -1437,7 +1557,7 @@ class ChurnPredictionService:
                 self.shap_explainer = None
 
         # === NEW: Compute SHAP thresholds from training data ===
-        if self.shap_explainer is not None and SHAP_AVAILABLE:
+        if self.shap_explainer is not None and shap is not None:
             try:
                 # Compute SHAP values on a sample of training data
                 shap_sample_size = min(500, len(X_train_scaled))
@@ -1459,6 +1579,8 @@ class ChurnPredictionService:
             except Exception as e:
                 logger.warning(f"Failed to compute SHAP thresholds: {e}")
 
+        report(75, "Explainer initialized")
+
         # === NEW: Compute optimal classification threshold ===
         optimal_threshold = self.thresholds_service.compute_optimal_classification_threshold(
             y_test, y_proba_test, dataset_id, method="f1"
@@ -1484,6 +1606,8 @@ class ChurnPredictionService:
             self.calibrated_model = None
             metrics['calibrated'] = False
 
+        report(85, "Probabilities calibrated")
+
         # === IMPROVEMENT 7: Data-Driven Risk Thresholds from Predictions ===
         # Compute risk thresholds from actual prediction distribution (percentile-based)
         high_threshold, medium_threshold = self.thresholds_service.compute_risk_thresholds_from_predictions(
@@ -1547,9 +1671,11 @@ class ChurnPredictionService:
         self.feature_importance_by_dataset[cache_key] = self.feature_importance
 
         # Save model artifacts in dataset-scoped location
+        report(95, "Saving model artifacts")
         self._save_model(dataset_id)
 
         self.active_version = model_id
+        self._publish_trained_bundle(dataset_id, model_id)
 
         # === NEW: Set reference data for drift detection ===
         try:
@@ -1600,6 +1726,8 @@ class ChurnPredictionService:
 
     def _optimize_thresholds(self, y_true: np.ndarray, y_proba: np.ndarray) -> Dict[str, float]:
         """Optimize risk thresholds based on precision-recall trade-offs."""
+        from sklearn.metrics import precision_recall_curve
+
         try:
             precision, recall, thresholds = precision_recall_curve(y_true, y_proba)
 
@@ -1654,6 +1782,10 @@ class ChurnPredictionService:
         Returns:
             Model instance ready for fitting
         """
+        import xgboost as xgb
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.linear_model import LogisticRegression
+
         if model_type == "tabpfn":
             return TabPFNWrapper()
 
@@ -1754,11 +1886,14 @@ class ChurnPredictionService:
         X_train: np.ndarray,
         y_train: np.ndarray,
         class_imbalance_ratio: float
-    ) -> xgb.XGBClassifier:
+    ) -> "xgb.XGBClassifier":
         """
         Tune XGBoost hyperparameters using RandomizedSearchCV with stratified K-fold.
         Optimizes for F1 score which is more appropriate for imbalanced churn data.
         """
+        import xgboost as xgb
+        from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold
+
         # Define search space - focused on most impactful parameters
         param_distributions = {
             'n_estimators': [100, 200, 300, 400],
@@ -1810,10 +1945,13 @@ class ChurnPredictionService:
         self,
         X_train: np.ndarray,
         y_train: np.ndarray
-    ) -> RandomForestClassifier:
+    ) -> "RandomForestClassifier":
         """
         Tune Random Forest hyperparameters using RandomizedSearchCV.
         """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold
+
         param_distributions = {
             'n_estimators': [100, 200, 300, 400, 500],
             'max_depth': [8, 10, 12, 15, 20, None],
@@ -1869,7 +2007,7 @@ class ChurnPredictionService:
         Returns:
             Tuple of (optimal_threshold, metrics_at_threshold)
         """
-        from sklearn.metrics import f1_score as f1_metric, fbeta_score
+        from sklearn.metrics import f1_score as f1_metric, fbeta_score, precision_score, recall_score
 
         thresholds = np.arange(0.1, 0.9, 0.01)
         best_threshold = 0.5
@@ -1926,13 +2064,20 @@ class ChurnPredictionService:
         y_all: np.ndarray,
         class_imbalance_ratio: float,
         dataset_id: Optional[str],
-        smote_applied: bool = False
+        smote_applied: bool = False,
+        report: Optional[Callable[[int, str], None]] = None,
     ) -> ModelTrainingResponse:
         """
         Train an ensemble of models when routing recommends it.
 
         Uses the ensemble_service to create a weighted voting or stacking ensemble.
         """
+        from sklearn.metrics import (
+            accuracy_score, precision_score, recall_score, f1_score,
+            roc_auc_score, average_precision_score, brier_score_loss,
+        )
+
+        report = report or (lambda progress, message: None)
         recommendation = self.last_routing_decision
         cache_key = dataset_id or "default"
 
@@ -1957,6 +2102,8 @@ class ChurnPredictionService:
             class_imbalance_ratio=class_imbalance_ratio,
         )
 
+        report(60, "Ensemble fitted, evaluating")
+
         # Use the primary model for single predictions (first in ensemble)
         primary_model_name = recommendation.ensemble_models[0]
         self.model = self.ensemble_config.base_models.get(primary_model_name)
@@ -2030,6 +2177,7 @@ class ChurnPredictionService:
         )
 
         # Also save scaler and encoders
+        report(95, "Saving model artifacts")
         self._save_model(dataset_id)
 
         # Store metrics
@@ -2045,6 +2193,7 @@ class ChurnPredictionService:
         self.model_metrics_by_dataset[cache_key] = metrics_payload
         self.model_metrics = metrics_payload
         self.active_version = model_id
+        self._publish_trained_bundle(dataset_id, model_id)
 
         logger.info(
             f"Ensemble trained: accuracy={metrics['accuracy']:.3f}, "
@@ -2429,16 +2578,6 @@ class ChurnPredictionService:
             salary_level=str(modified['salary_level']),
         )
 
-    def _get_counterfactual_risk_level(
-        self,
-        probability: float,
-        dataset_id: Optional[str] = None
-    ) -> str:
-        """Determine risk level from probability using data-driven thresholds."""
-        risk_level = self.thresholds_service.get_risk_level(probability, dataset_id)
-        # Capitalize for display
-        return risk_level.capitalize()
-
     async def simulate_counterfactual(
         self,
         employee_id: str,
@@ -2452,99 +2591,19 @@ class ChurnPredictionService:
         """
         Run TRUE counterfactual simulation using ML model perturbation.
 
-        This calls the actual ChurnPredictionService with both baseline
-        and modified features to get real model predictions.
+        This scores the baseline and modified features with the actual model
+        to get real model predictions.
         """
-        # Import here to avoid circular dependency
-        from app.services.analytics.eltv_service import eltv_service
-
-        scenario_id = scenario_id or f"counterfactual_{datetime.utcnow().timestamp()}"
-        scenario_name = scenario_name or f"Scenario: {', '.join(modifications.keys())}"
-
-        # Create EmployeeChurnFeatures for baseline
-        base_churn_features = self._apply_counterfactual_modifications(base_features, {})
-
-        # Create EmployeeChurnFeatures with modifications
-        modified_churn_features = self._apply_counterfactual_modifications(base_features, modifications)
-
-        # Get REAL model predictions
-        baseline_prediction = await self.predict_churn(
-            ChurnPredictionRequest(features=base_churn_features),
-            dataset_id=dataset_id
-        )
-
-        scenario_prediction = await self.predict_churn(
-            ChurnPredictionRequest(features=modified_churn_features),
-            dataset_id=dataset_id
-        )
-
-        # Calculate ELTV for both scenarios
-        salary = annual_salary or 70000.0  # Default salary for ELTV
-        tenure = base_features.get('time_spend_company', 3)
-
-        # Estimate position level for ELTV
-        position_level = eltv_service.estimate_position_level(
-            position="Employee",
-            salary=salary,
-            tenure=tenure
-        )
-
-        baseline_eltv_result = eltv_service.calculate_eltv(
-            annual_salary=salary,
-            churn_probability=baseline_prediction.churn_probability,
-            tenure_years=tenure,
-            position_level=position_level
-        )
-
-        scenario_eltv_result = eltv_service.calculate_eltv(
-            annual_salary=salary,
-            churn_probability=scenario_prediction.churn_probability,
-            tenure_years=tenure,
-            position_level=position_level
-        )
-
-        # Calculate deltas
-        churn_delta = scenario_prediction.churn_probability - baseline_prediction.churn_probability
-        eltv_delta = scenario_eltv_result.eltv - baseline_eltv_result.eltv
-
-        # Calculate modification cost
-        modification_cost = self._calculate_counterfactual_cost(modifications, base_features)
-
-        # Calculate ROI
-        if modification_cost > 0:
-            implied_roi = ((eltv_delta - modification_cost) / modification_cost) * 100
-        else:
-            implied_roi = float('inf') if eltv_delta > 0 else 0
-
-        return CounterfactualResult(
-            scenario_name=scenario_name,
-            scenario_id=scenario_id,
-            # Baseline (from actual model)
-            baseline_churn_prob=baseline_prediction.churn_probability,
-            baseline_risk_level=self._get_counterfactual_risk_level(baseline_prediction.churn_probability, dataset_id),
-            baseline_eltv=baseline_eltv_result.eltv,
-            baseline_confidence=baseline_prediction.confidence_score,
-            baseline_factors=baseline_prediction.contributing_factors,
-            # Scenario (from actual model)
-            scenario_churn_prob=scenario_prediction.churn_probability,
-            scenario_risk_level=self._get_counterfactual_risk_level(scenario_prediction.churn_probability, dataset_id),
-            scenario_eltv=scenario_eltv_result.eltv,
-            scenario_confidence=scenario_prediction.confidence_score,
-            scenario_factors=scenario_prediction.contributing_factors,
-            # Deltas
-            churn_delta=churn_delta,
-            eltv_delta=eltv_delta,
-            # ROI
-            implied_annual_cost=modification_cost,
-            implied_roi=min(999.99, max(-999.99, implied_roi)),
-            # Survival
-            baseline_survival_probs=baseline_eltv_result.survival_probabilities,
-            scenario_survival_probs=scenario_eltv_result.survival_probabilities,
-            # Modifications
-            modifications=modifications,
-            simulated_at=datetime.utcnow(),
-            prediction_method="model"
+        scenario = {
+            'id': scenario_id or f"counterfactual_{datetime.utcnow().timestamp()}",
+            'name': scenario_name or f"Scenario: {', '.join(modifications.keys())}",
+            'modifications': modifications,
+        }
+        results = await self.run_counterfactual_cases(
+            [CounterfactualCase(employee_id, base_features, [scenario], annual_salary)],
+            dataset_id=dataset_id,
         )
+        return results[0][0]
 
     async def batch_counterfactuals(
         self,
@@ -2561,26 +2620,141 @@ class ChurnPredictionService:
         - name: Display name
         - modifications: Dict of feature modifications
         """
-        results = []
-
-        for idx, scenario in enumerate(scenarios):
-            modifications = scenario.get('modifications', {})
-            name = scenario.get('name', f"Scenario {idx + 1}")
-            scenario_id = scenario.get('id', f"scenario_{idx}")
-
-            result = await self.simulate_counterfactual(
-                employee_id=employee_id,
-                base_features=base_features,
-                modifications=modifications,
-                dataset_id=dataset_id,
-                scenario_name=name,
-                scenario_id=scenario_id,
-                annual_salary=annual_salary
+        results = await self.run_counterfactual_cases(
+            [CounterfactualCase(employee_id, base_features, scenarios, annual_salary)],
+            dataset_id=dataset_id,
+        )
+        return results[0]
+
+    async def run_counterfactual_cases(
+        self,
+        cases: List[CounterfactualCase],
+        dataset_id: Optional[str] = None
+    ) -> List[List[CounterfactualResult]]:
+        """
+        Score every baseline and scenario of one or more employees in one pass.
+
+        All rows (each case's baseline followed by its scenarios) are stacked into
+        a single feature frame, scored and explained by predict_frame_columnar,
+        and the ELTV of each case's rows is evaluated as one survival matrix.
+        Returns one result list per case, in scenario order.
+        """
+        # Import here to avoid circular dependency
+        from app.services.analytics.eltv_service import eltv_service
+
+        bundle = self.get_model_bundle(dataset_id)
+        if not bundle.is_fitted and settings.ENVIRONMENT == "production":
+            raise RuntimeError("No trained model loaded. Train a model before serving predictions.")
+
+        rows = []
+        for case in cases:
+            rows.append(self._apply_counterfactual_modifications(case.base_features, {}).model_dump())
+            for scenario in case.scenarios:
+                modified = self._apply_counterfactual_modifications(
+                    case.base_features, scenario.get('modifications', {})
+                )
+                rows.append(modified.model_dump())
+        if not rows:
+            return [[] for _ in cases]
+
+        batch = await self.predict_frame_columnar(
+            pd.DataFrame(rows, columns=self.FEATURE_NAMES), dataset_id=dataset_id
+        )
+        probabilities = batch.probabilities.tolist()
+        confidences = batch.confidence.tolist()
+        prediction_method = "model" if bundle.is_fitted else "heuristic"
+        simulated_at = datetime.utcnow()
+
+        all_results = []
+        offset = 0
+        for case in cases:
+            base = offset
+            offset += 1 + len(case.scenarios)
+
+            # ELTV for the baseline and all scenarios of this employee together
+            salary = case.annual_salary or 70000.0  # Default salary for ELTV
+            tenure = case.base_features.get('time_spend_company', 3)
+            position_level = eltv_service.estimate_position_level(
+                position=case.position or "Employee",
+                salary=salary,
+                tenure=tenure
+            )
+            eltv_results = eltv_service.calculate_eltv_for_probabilities(
+                annual_salary=salary,
+                churn_probabilities=probabilities[base:offset],
+                tenure_years=tenure,
+                position_level=position_level
             )
-            results.append(result)
+            baseline_eltv = eltv_results[0]
+            baseline_prob = probabilities[base]
+            baseline_risk = batch.risk_level(base).value.capitalize()
+            baseline_factors = batch.factors(base)
+
+            case_results = []
+            for idx, scenario in enumerate(case.scenarios):
+                row = base + 1 + idx
+                modifications = scenario.get('modifications', {})
+                scenario_eltv = eltv_results[1 + idx]
+
+                # Calculate deltas
+                churn_delta = probabilities[row] - baseline_prob
+                eltv_delta = scenario_eltv.eltv - baseline_eltv.eltv
+
+                # Calculate modification cost and ROI
+                modification_cost = self._calculate_counterfactual_cost(modifications, case.base_features)
+                if modification_cost > 0:
+                    implied_roi = ((eltv_delta - modification_cost) / modification_cost) * 100
+                else:
+                    implied_roi = float('inf') if eltv_delta > 0 else 0
+
+                case_results.append(CounterfactualResult(
+                    scenario_name=scenario.get('name', f"Scenario {idx + 1}"),
+                    scenario_id=scenario.get('id', f"scenario_{idx}"),
+                    # Baseline (from actual model)
+                    baseline_churn_prob=baseline_prob,
+                    baseline_risk_level=baseline_risk,
+                    baseline_eltv=baseline_eltv.eltv,
+                    baseline_confidence=confidences[base],
+                    baseline_factors=baseline_factors,
+                    # Scenario (from actual model)
+                    scenario_churn_prob=probabilities[row],
+                    scenario_risk_level=batch.risk_level(row).value.capitalize(),
+                    scenario_eltv=scenario_eltv.eltv,
+                    scenario_confidence=confidences[row],
+                    scenario_factors=batch.factors(row),
+                    # Deltas
+                    churn_delta=churn_delta,
+                    eltv_delta=eltv_delta,
+                    # ROI
+                    implied_annual_cost=modification_cost,
+                    implied_roi=min(999.99, max(-999.99, implied_roi)),
+                    # Survival
+                    baseline_survival_probs=baseline_eltv.survival_probabilities,
+                    scenario_survival_probs=scenario_eltv.survival_probabilities,
+                    # Modifications
+                    modifications=modifications,
+                    simulated_at=simulated_at,
+                    prediction_method=prediction_method
+                ))
+            all_results.append(case_results)
 
-        return results
+        return all_results
 
 
 # Singleton instance for dependency injection
 churn_prediction_service = ChurnPredictionService()
+
+
+async def warmup_models() -> None:
+    """Startup warmup phase: import the ML stack and bind the default churn model off the loop."""
+    started = time.perf_counter()
+    try:
+        trained = await run_cpu(churn_prediction_service.warmup)
+    except Exception as e:
+        # Predictions load the model on demand, so a failed warmup isn't fatal
+        logger.error(f"Model warmup failed: {e}")
+        return
+    logger.info(
+        f"Model warmup finished in {time.perf_counter() - started:.2f}s "
+        f"({'trained model' if trained else 'default model, no trained artifacts'})"
+    )
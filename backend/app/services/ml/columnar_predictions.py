@@ -0,0 +1,148 @@
+"""
+Columnar Predictions
+
+Struct-of-arrays result for batch churn scoring. Probabilities, risk-level
+codes, top factor indices and recommendation flags are computed for the whole
+population with NumPy; per-employee dicts and Pydantic responses are only
+built on demand at the API edge.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+from app.schemas.churn import ChurnPredictionResponse, ChurnRiskLevel
+from app.services.ml.explanation_engine import factors_for_row
+
+logger = logging.getLogger(__name__)
+
+# Indexed by the codes from DataDrivenThresholdsService.get_risk_level_codes
+RISK_LEVELS = (ChurnRiskLevel.LOW, ChurnRiskLevel.MEDIUM, ChurnRiskLevel.HIGH)
+
+# Recommendation texts indexed by recommendation flag column (in priority order)
+RECOMMENDATIONS = (
+    "Schedule immediate one-on-one meeting to discuss employee satisfaction and concerns",
+    "Review current workload and consider redistributing projects to reduce overtime",
+    "Evaluate project assignments and potentially reduce workload",
+    "Consider increasing project involvement to boost engagement",
+    "Discuss career development opportunities and potential promotion path",
+    "Provide additional training and performance improvement support",
+)
+DEFAULT_RECOMMENDATION = "Continue regular check-ins and maintain positive work environment"
+
+
+def recommendation_flags(
+    thresholds_service: Any,
+    satisfaction: np.ndarray,
+    monthly_hours: np.ndarray,
+    projects: np.ndarray,
+    tenure: np.ndarray,
+    promoted: np.ndarray,
+    evaluation: np.ndarray,
+    dataset_id: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Boolean (n, len(RECOMMENDATIONS)) matrix of triggered recommendations.
+
+    Uses percentile-based analysis so what counts as anomalous is specific to
+    the dataset's own distribution.
+    """
+    def percentile(name: str, values: np.ndarray) -> np.ndarray:
+        return thresholds_service.get_feature_percentiles(name, values, dataset_id)
+
+    projects_pct = percentile('number_project', projects)
+    return np.column_stack([
+        percentile('satisfaction_level', satisfaction) < 25,      # Bottom 25%
+        percentile('average_monthly_hours', monthly_hours) > 75,  # Top 25% - potential overwork
+        projects_pct > 75,
+        projects_pct < 25,
+        ~np.asarray(promoted, dtype=bool) & (percentile('time_spend_company', tenure) > 50),
+        percentile('last_evaluation', evaluation) < 25,
+    ])
+
+
+def recommendation_texts(flags: np.ndarray, limit: int = 5) -> List[str]:
+    """Recommendation strings for one row of recommendation flags."""
+    texts = [RECOMMENDATIONS[i] for i in np.flatnonzero(flags)]
+    return texts[:limit] if texts else [DEFAULT_RECOMMENDATION]
+
+
+@dataclass
+class ColumnarPredictions:
+    """Batch scoring result stored column-wise (one array per output field)."""
+
+    probabilities: np.ndarray          # (n,) churn probability
+    confidence: np.ndarray             # (n,) confidence score
+    risk_codes: np.ndarray             # (n,) int8 index into RISK_LEVELS
+    factor_indices: np.ndarray         # (n, k) feature index per top factor, -1 = none
+    factor_values: np.ndarray          # (n, k) contribution per top factor
+    factor_impacts: np.ndarray         # (n, k) int8 impact code per top factor
+    recommendation_flags: np.ndarray   # (n, len(RECOMMENDATIONS)) bool
+    raw_features: np.ndarray           # (n, n_features) unscaled values (object) for messages
+    feature_names: Sequence[str]
+    message_fn: Callable[[str, Any, float], str]
+    dataset_id: Optional[str] = None
+    employee_ids: Optional[Sequence[Any]] = None
+    method: str = "raw-batch"
+    tree_agreement: Optional[np.ndarray] = None
+    # Factors computed outside the contribution matrix (heuristic fallback)
+    precomputed_factors: Optional[List[List[Dict[str, Any]]]] = None
+    predicted_at: datetime = field(default_factory=datetime.utcnow)
+
+    def __len__(self) -> int:
+        return len(self.probabilities)
+
+    def feature_column(self, name: str) -> np.ndarray:
+        """Unscaled values of one input feature for all rows."""
+        return self.raw_features[:, list(self.feature_names).index(name)]
+
+    def risk_level(self, i: int) -> ChurnRiskLevel:
+        return RISK_LEVELS[int(self.risk_codes[i])]
+
+    def risk_counts(self) -> Dict[ChurnRiskLevel, int]:
+        counts = np.bincount(self.risk_codes.astype(np.intp), minlength=len(RISK_LEVELS))
+        return {level: int(counts[code]) for code, level in enumerate(RISK_LEVELS)}
+
+    def factors(self, i: int) -> List[Dict[str, Any]]:
+        if self.precomputed_factors is not None:
+            return self.precomputed_factors[i]
+        return factors_for_row(
+            self.factor_indices[i],
+            self.factor_values[i],
+            self.factor_impacts[i],
+            self.raw_features[i],
+            self.feature_names,
+            self.message_fn,
+        )
+
+    def recommendations(self, i: int) -> List[str]:
+        return recommendation_texts(self.recommendation_flags[i])
+
+    def confidence_breakdown(self, i: int) -> Dict[str, Any]:
+        margin = float(abs(self.probabilities[i] - 0.5) * 2)
+        return {
+            "prediction_margin": margin,
+            "tree_agreement": float(self.tree_agreement[i]) if self.tree_agreement is not None else 0.5,
+            "final_confidence": float(self.confidence[i]),
+            "method": self.method,
+        }
+
+    def to_response(self, i: int) -> ChurnPredictionResponse:
+        """Build the API response for one row."""
+        factors = self.factors(i)
+        return ChurnPredictionResponse(
+            employee_id=self.employee_ids[i] if self.employee_ids is not None else None,
+            churn_probability=float(self.probabilities[i]),
+            confidence_score=float(self.confidence[i]),
+            confidence_breakdown=self.confidence_breakdown(i),
+            risk_level=self.risk_level(i),
+            contributing_factors=factors,
+            recommendations=self.recommendations(i),
+            predicted_at=self.predicted_at,
+        )
+
+    def to_responses(self) -> List[ChurnPredictionResponse]:
+        return [self.to_response(i) for i in range(len(self))]
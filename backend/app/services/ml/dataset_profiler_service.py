@@ -9,7 +9,6 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional, Any
 import numpy as np
 import pandas as pd
-from scipy import stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -269,6 +268,7 @@ class DatasetProfilerService:
 
                 # Skewness and kurtosis (require enough samples)
                 if len(col_data) >= 8:
+                    from scipy import stats
                     col_stats["skewness"] = float(stats.skew(col_data))
                     col_stats["kurtosis"] = float(stats.kurtosis(col_data))
                 else:
@@ -13,12 +13,6 @@ import json
 from pathlib import Path
 import logging
 
-from sklearn.model_selection import cross_val_predict, StratifiedKFold
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.calibration import CalibratedClassifierCV
-import xgboost as xgb
-
 logger = logging.getLogger(__name__)
 
 
@@ -276,6 +270,9 @@ class EnsembleService:
         cv_folds: int
     ) -> Any:
         """Train meta-learner for stacking ensemble."""
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import cross_val_predict, StratifiedKFold
+
         logger.info("Training stacking meta-learner")
 
         # Generate out-of-fold predictions for meta-features
@@ -321,8 +318,9 @@ class EnsembleService:
             raise ValueError(f"Unknown model type: {model_name}")
         return factory(class_imbalance_ratio)
 
-    def _create_xgboost(self, class_imbalance_ratio: float) -> xgb.XGBClassifier:
+    def _create_xgboost(self, class_imbalance_ratio: float) -> Any:
         """Create XGBoost classifier."""
+        import xgboost as xgb
         return xgb.XGBClassifier(
             n_estimators=100,
             max_depth=5,
@@ -359,8 +357,9 @@ class EnsembleService:
             allow_writing_files=False,  # Don't write temp files
         )
 
-    def _create_random_forest(self, class_imbalance_ratio: float) -> RandomForestClassifier:
+    def _create_random_forest(self, class_imbalance_ratio: float) -> Any:
         """Create Random Forest classifier."""
+        from sklearn.ensemble import RandomForestClassifier
         return RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
@@ -369,8 +368,9 @@ class EnsembleService:
             n_jobs=-1,
         )
 
-    def _create_logistic(self, class_imbalance_ratio: float) -> LogisticRegression:
+    def _create_logistic(self, class_imbalance_ratio: float) -> Any:
         """Create Logistic Regression classifier."""
+        from sklearn.linear_model import LogisticRegression
         return LogisticRegression(
             random_state=42,
             max_iter=1000,
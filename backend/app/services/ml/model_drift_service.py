@@ -9,12 +9,11 @@ and Population Stability Index (PSI) for categorical features.
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
+import io
 import numpy as np
 import logging
 from enum import Enum
 
-from scipy import stats
-
 logger = logging.getLogger(__name__)
 
 
@@ -146,6 +145,30 @@ class ModelDriftService:
             f"{X.shape[1]} features, model version: {model_version}"
         )
 
+    def dump_reference(self) -> Optional[bytes]:
+        """Serialize the reference data as an .npz archive (no pickle), or None if unset."""
+        if self._reference_data is None:
+            return None
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            X=self._reference_data,
+            feature_names=np.array(self._reference_feature_names, dtype=str),
+            categorical_features=np.array(self._categorical_features or [], dtype=str),
+            model_version=np.array(self._model_version or "unknown"),
+        )
+        return buffer.getvalue()
+
+    def load_reference(self, data: bytes) -> None:
+        """Restore reference data written by dump_reference (e.g. by a training worker)."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            self.set_reference_data(
+                X=archive["X"],
+                feature_names=archive["feature_names"].tolist(),
+                categorical_features=archive["categorical_features"].tolist(),
+                model_version=str(archive["model_version"]),
+            )
+
     def detect_drift(
         self,
         X_current: np.ndarray,
@@ -250,6 +273,7 @@ class ModelDriftService:
             )
 
         # Perform KS test
+        from scipy import stats
         statistic, p_value = stats.ks_2samp(ref_clean, curr_clean)
 
         # Determine severity based on KS statistic
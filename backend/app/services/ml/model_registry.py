@@ -0,0 +1,281 @@
+"""
+Model Registry
+
+Keeps several per-dataset model bundles resident in memory at once instead of
+swapping a single model slot whenever a request targets a different dataset.
+
+Bundles are immutable once published: training publishes a brand new bundle
+rather than mutating the one currently serving predictions, so concurrent
+requests for different datasets never observe half-swapped state.
+Residency is bounded by a model count and a memory budget with LRU eviction.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+import logging
+import sys
+import threading
+import time
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+logger = logging.getLogger(__name__)
+
+
+def bundle_key(dataset_id: Optional[str]) -> str:
+    """Registry key for a dataset (the global model uses 'default')."""
+    return dataset_id or "default"
+
+
+def is_model_fitted(model: Any) -> bool:
+    """Check if a model is actually trained and ready for predictions."""
+    if model is None:
+        return False
+
+    # XGBoost models have a booster after fitting
+    if hasattr(model, "get_booster"):
+        try:
+            model.get_booster()
+            return True
+        except Exception:
+            return False
+
+    # For scikit-learn models, check for classes_ attribute
+    if hasattr(model, "classes_"):
+        return True
+
+    # For calibrated models (sklearn is necessarily loaded if one exists)
+    calibration = sys.modules.get("sklearn.calibration")
+    if calibration is not None and isinstance(model, calibration.CalibratedClassifierCV):
+        return hasattr(model, "calibrated_classifiers_")
+
+    # Default: assume fitted if model exists
+    return True
+
+
+class ModelArtifactsMissingError(RuntimeError):
+    """No trained artifacts exist for a dataset (raised in production instead of a default model)."""
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Immutable set of artifacts needed to score one dataset."""
+
+    dataset_id: Optional[str]
+    model: Any
+    scaler: "StandardScaler"
+    label_encoders: Dict[str, "LabelEncoder"]
+    calibrated_model: Any = None
+    optimal_threshold: float = 0.5
+    version: str = "dev-default"
+    shap_explainer: Any = None
+    is_default: bool = False  # True when no trained artifacts exist for the dataset
+    size_bytes: int = 0
+    source_mtime: Optional[float] = None  # mtime of the model artifact this bundle was read from
+    loaded_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def key(self) -> str:
+        return bundle_key(self.dataset_id)
+
+    @property
+    def is_fitted(self) -> bool:
+        return is_model_fitted(self.model)
+
+    @property
+    def prediction_model(self) -> Any:
+        """Calibrated model when available, otherwise the raw model."""
+        return self.calibrated_model if self.calibrated_model is not None else self.model
+
+
+@dataclass
+class RegistryStats:
+    """Counters describing registry effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_failures: int = 0
+    evictions: int = 0
+    reloads: int = 0  # stale bundles replaced after artifacts changed on disk
+    load_seconds_total: float = 0.0
+    last_load_seconds: float = 0.0
+
+
+class ModelRegistry:
+    """
+    LRU registry of resident model bundles keyed by dataset.
+
+    Thread-safe: lookups take a short registry lock, and loads for the same
+    dataset are coalesced behind a per-dataset lock so concurrent misses only
+    decrypt and unpickle the artifacts once.
+    """
+
+    def __init__(self, max_models: int = 8, max_memory_bytes: int = 1024 * 1024 * 1024):
+        self.max_models = max(1, max_models)
+        self.max_memory_bytes = max_memory_bytes
+        self._bundles: "OrderedDict[str, ModelBundle]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._stats = RegistryStats()
+
+    def _load_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._load_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._load_locks[key] = lock
+            return lock
+
+    def _lookup(self, key: str, is_stale: Optional[Callable[[ModelBundle], bool]]) -> Optional[ModelBundle]:
+        with self._lock:
+            bundle = self._bundles.get(key)
+            if bundle is None:
+                return None
+            if is_stale is not None and is_stale(bundle):
+                self._stats.reloads += 1
+                self._remove(key)
+                return None
+            self._bundles.move_to_end(key)
+            return bundle
+
+    def get(self, dataset_id: Optional[str]) -> Optional[ModelBundle]:
+        """Return the resident bundle for a dataset without loading it."""
+        return self._lookup(bundle_key(dataset_id), None)
+
+    def get_or_load(
+        self,
+        dataset_id: Optional[str],
+        loader: Callable[[], ModelBundle],
+        is_stale: Optional[Callable[[ModelBundle], bool]] = None,
+    ) -> ModelBundle:
+        """
+        Return the bundle for a dataset, loading it on a miss.
+
+        Args:
+            dataset_id: Dataset the bundle belongs to (None = global model)
+            loader: Builds the bundle from persisted artifacts
+            is_stale: Optional check that forces a reload (e.g. artifacts retrained elsewhere)
+        """
+        key = bundle_key(dataset_id)
+
+        bundle = self._lookup(key, is_stale)
+        if bundle is not None:
+            with self._lock:
+                self._stats.hits += 1
+            return bundle
+
+        with self._load_lock(key):
+            # Another caller may have finished loading while we waited
+            bundle = self._lookup(key, is_stale)
+            if bundle is not None:
+                with self._lock:
+                    self._stats.hits += 1
+                return bundle
+
+            with self._lock:
+                self._stats.misses += 1
+
+            started = time.perf_counter()
+            try:
+                bundle = loader()
+            except Exception:
+                with self._lock:
+                    self._stats.load_failures += 1
+                raise
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self._stats.loads += 1
+                self._stats.load_seconds_total += elapsed
+                self._stats.last_load_seconds = elapsed
+
+            logger.info(f"Loaded model bundle '{key}' ({bundle.version}) in {elapsed * 1000:.0f}ms")
+            self.put(bundle)
+            return bundle
+
+    def put(self, bundle: ModelBundle) -> None:
+        """Publish a bundle, replacing any resident bundle for the same dataset."""
+        with self._lock:
+            self._bundles[bundle.key] = bundle
+            self._bundles.move_to_end(bundle.key)
+            self._evict(keep=bundle.key)
+
+    def invalidate(self, dataset_id: Optional[str]) -> bool:
+        """Drop the resident bundle for a dataset. Returns True if one was resident."""
+        with self._lock:
+            return self._remove(bundle_key(dataset_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bundles.clear()
+
+    def _remove(self, key: str) -> bool:
+        return self._bundles.pop(key, None) is not None
+
+    def _resident_bytes(self) -> int:
+        return sum(b.size_bytes for b in self._bundles.values())
+
+    def _evict(self, keep: str) -> None:
+        """Evict least recently used bundles until within the count and memory budgets."""
+        while len(self._bundles) > 1 and (
+            len(self._bundles) > self.max_models
+            or self._resident_bytes() > self.max_memory_bytes
+        ):
+            victim = next(iter(self._bundles))
+            if victim == keep:
+                # The newest bundle alone exceeds the budget; keep it resident anyway
+                break
+            evicted = self._bundles.pop(victim)
+            self._stats.evictions += 1
+            logger.info(f"Evicted model bundle '{victim}' ({evicted.size_bytes} bytes) from registry")
+
+    def __contains__(self, dataset_id: Optional[str]) -> bool:
+        with self._lock:
+            return bundle_key(dataset_id) in self._bundles
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._bundles)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of registry metrics for health/monitoring endpoints."""
+        with self._lock:
+            lookups = self._stats.hits + self._stats.misses
+            return {
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_ratio": round(self._stats.hits / lookups, 4) if lookups else 0.0,
+                "loads": self._stats.loads,
+                "load_failures": self._stats.load_failures,
+                "reloads": self._stats.reloads,
+                "evictions": self._stats.evictions,
+                "load_seconds_total": round(self._stats.load_seconds_total, 4),
+                "last_load_seconds": round(self._stats.last_load_seconds, 4),
+                "resident_models": len(self._bundles),
+                "resident_bytes": self._resident_bytes(),
+                "max_models": self.max_models,
+                "max_memory_bytes": self.max_memory_bytes,
+                "resident": [
+                    {
+                        "dataset_id": b.dataset_id,
+                        "version": b.version,
+                        "size_bytes": b.size_bytes,
+                        "is_default": b.is_default,
+                        "loaded_at": b.loaded_at.isoformat(),
+                    }
+                    for b in self._bundles.values()
+                ],
+            }
+
+
+# Shared registry so every ChurnPredictionService instance reuses resident bundles
+model_registry = ModelRegistry(
+    max_models=settings.MODEL_REGISTRY_MAX_MODELS,
+    max_memory_bytes=settings.MODEL_REGISTRY_MAX_MEMORY_MB * 1024 * 1024,
+)
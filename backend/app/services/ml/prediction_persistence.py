@@ -0,0 +1,171 @@
+"""
+Prediction Persistence
+
+Bulk writer for batch scoring results. churn_output and churn_reasoning rows
+are built straight from a ColumnarPredictions result as plain dicts and
+upserted in fixed-size chunks with INSERT ... ON CONFLICT DO UPDATE, so no
+existing rows are preloaded and no ORM objects are created.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.churn import ChurnOutput, ChurnReasoning
+from app.services.ml.columnar_predictions import ColumnarPredictions
+
+logger = logging.getLogger(__name__)
+
+# Rows per statement: 11 reasoning columns x 2000 rows stays well under
+# PostgreSQL's 32,767 bind-parameter limit
+PERSIST_CHUNK_SIZE = 2000
+
+OUTPUT_UPDATE_COLUMNS = ("resign_proba", "shap_values", "model_version", "generated_at", "confidence_score")
+REASONING_UPDATE_COLUMNS = (
+    "churn_risk", "stage", "stage_score", "ml_score", "heuristic_score", "ml_contributors",
+    "heuristic_alerts", "reasoning", "recommendations", "confidence_level", "updated_at",
+)
+
+
+@dataclass
+class PersistenceSummary:
+    """Row counts written by persist_predictions."""
+    predictions_written: int = 0
+    reasoning_written: int = 0
+
+
+def determine_stage(tenure: float) -> str:
+    """Determine behavioral stage based on tenure."""
+    if tenure < 1:
+        return "Onboarding"
+    elif tenure < 2:
+        return "Growth"
+    elif tenure < 4:
+        return "Established"
+    elif tenure < 7:
+        return "Senior"
+    else:
+        return "Veteran"
+
+
+def _upsert(db: AsyncSession, model: Any, rows: List[Dict[str, Any]], key: Sequence[str], update: Sequence[str]):
+    """INSERT ... ON CONFLICT (key) DO UPDATE for the session's dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    stmt = insert(model).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={column: stmt.excluded[column] for column in update},
+    )
+
+
+def build_prediction_rows(
+    batch: ColumnarPredictions,
+    positions: Sequence[int],
+    hr_codes: Sequence[str],
+    dataset_id: str,
+    model_version: str,
+    generated_at: datetime,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """churn_output and churn_reasoning row dicts for the given batch positions."""
+    probabilities = batch.probabilities[positions].tolist()
+    confidences = batch.confidence[positions].tolist()
+    tenures = batch.feature_column("time_spend_company")[positions].tolist()
+
+    outputs = []
+    reasonings = []
+    for i, position in enumerate(positions):
+        hr_code = hr_codes[position]
+        probability = probabilities[i]
+        confidence = confidences[i]
+        factors = batch.factors(position)
+
+        outputs.append({
+            "hr_code": hr_code,
+            "dataset_id": dataset_id,
+            "resign_proba": probability,
+            "shap_values": {f.get("feature", "unknown"): f.get("impact", 0) for f in factors},
+            "model_version": model_version,
+            "generated_at": generated_at,
+            "confidence_score": confidence * 100,
+        })
+
+        reasoning_parts = [
+            f"{f.get('feature', 'unknown')}: {f.get('description', f.get('impact', ''))}"
+            for f in factors[:3]
+        ]
+        ml_contributors = [
+            {
+                "feature": f.get("feature", "unknown"),
+                "value": f.get("value"),
+                "importance": f.get("impact", 0) if isinstance(f.get("impact"), (int, float)) else 0.5,
+                "message": f.get("message", ""),
+            }
+            for f in factors
+        ]
+        reasonings.append({
+            "hr_code": hr_code,
+            "churn_risk": probability,
+            "stage": determine_stage(float(tenures[i])),
+            "stage_score": 0.5,
+            "ml_score": probability,
+            "heuristic_score": 0.0,
+            "ml_contributors": json.dumps(ml_contributors, default=str),
+            "heuristic_alerts": "[]",
+            "reasoning": "; ".join(reasoning_parts) if reasoning_parts else "No significant factors identified.",
+            "recommendations": "; ".join(batch.recommendations(position)[:3]),
+            "confidence_level": confidence,
+            "updated_at": generated_at,
+        })
+    return outputs, reasonings
+
+
+async def persist_predictions(
+    db: AsyncSession,
+    batch: ColumnarPredictions,
+    hr_codes: Sequence[str],
+    dataset_id: str,
+    model_version: str,
+    chunk_size: int = PERSIST_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> PersistenceSummary:
+    """
+    Upsert batch predictions and reasoning for a dataset, chunk by chunk.
+
+    Duplicate hr_codes keep their last occurrence (a single upsert statement
+    cannot touch the same row twice). progress_callback receives
+    (rows_written, total_rows) after every chunk. The caller commits.
+    """
+    # Row position of the last occurrence of every hr_code
+    positions = sorted({hr_code: position for position, hr_code in enumerate(hr_codes)}.values())
+    total = len(positions)
+    generated_at = datetime.utcnow()
+    summary = PersistenceSummary()
+
+    for start in range(0, total, chunk_size):
+        chunk = positions[start:start + chunk_size]
+        outputs, reasonings = build_prediction_rows(
+            batch, chunk, hr_codes, dataset_id, model_version, generated_at
+        )
+        await db.execute(_upsert(db, ChurnOutput, outputs, ("hr_code", "dataset_id"), OUTPUT_UPDATE_COLUMNS))
+        await db.execute(_upsert(db, ChurnReasoning, reasonings, ("hr_code",), REASONING_UPDATE_COLUMNS))
+        summary.predictions_written += len(outputs)
+        summary.reasoning_written += len(reasonings)
+
+        if progress_callback:
+            progress_callback(summary.predictions_written, total)
+        # Let other requests run between chunks
+        await asyncio.sleep(0)
+
+    logger.info(
+        f"Persisted {summary.predictions_written} predictions and "
+        f"{summary.reasoning_written} reasoning rows for dataset {dataset_id}"
+    )
+    return summary
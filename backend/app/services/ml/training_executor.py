@@ -0,0 +1,206 @@
+"""
+Training Executor
+
+Runs model training in a dedicated process pool so the CPU-bound work
+(SMOTE, hyperparameter search, calibration, SHAP setup) never blocks the
+asyncio event loop serving other requests.
+
+The worker streams progress back over a manager queue and checks a shared
+cancellation event at every progress checkpoint. Trained models are not
+pickled back across the process boundary: the worker saves the encrypted
+artifacts as usual and returns only their path plus small metadata, and the
+parent re-reads the bundle from disk into the model registry.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+
+import pandas as pd
+
+from app.core.config import settings
+from app.schemas.churn import ModelTrainingRequest, ModelTrainingResponse
+from app.services.ml.model_registry import ModelRegistry, bundle_key
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, str], None]
+
+# How often the parent drains progress messages while a job runs
+PROGRESS_POLL_SECONDS = 0.25
+
+
+class TrainingCancelledError(Exception):
+    """Raised when a training job is cancelled before it finishes."""
+
+
+class TrainingInProgressError(Exception):
+    """Raised when a dataset already has a training job running."""
+
+
+@dataclass
+class TrainingOutcome:
+    """Lightweight result handed back from the worker (no model objects)."""
+
+    response: ModelTrainingResponse
+    dataset_id: Optional[str]
+    model_path: str
+    model_metrics: Dict[str, Any]
+    feature_importance: Dict[str, float]
+    optimal_threshold: float
+    thresholds: Any = None  # DatasetThresholds computed in the worker
+    routing_decision: Any = None
+    dataset_profile: Any = None
+    drift_reference_path: Optional[str] = None  # encrypted drift reference saved next to the model
+
+
+def _run_training_job(
+    request: ModelTrainingRequest,
+    training_data: pd.DataFrame,
+    dataset_id: Optional[str],
+    progress_queue: Any,
+    cancel_event: Any,
+) -> TrainingOutcome:
+    """Worker entry point: train, save artifacts, return metadata only."""
+    # Imported here so the parent does not import the service module twice
+    from app.services.ml.churn_prediction_service import ChurnPredictionService
+
+    def report(progress: int, message: str) -> None:
+        if cancel_event.is_set():
+            raise TrainingCancelledError("Training cancelled")
+        progress_queue.put((progress, message))
+
+    # Private registry: the worker only needs the bundle it is training
+    service = ChurnPredictionService(registry=ModelRegistry(max_models=1))
+    response = asyncio.run(
+        service.train_model(request, training_data, dataset_id, progress_callback=report)
+    )
+    return service.export_training_outcome(response, dataset_id)
+
+
+def _drain(progress_queue: Any) -> List[Tuple[int, str]]:
+    messages = []
+    while True:
+        try:
+            messages.append(progress_queue.get_nowait())
+        except queue.Empty:
+            return messages
+
+
+class TrainingExecutor:
+    """
+    Process pool dedicated to model training.
+
+    The pool and its manager are started lazily on first use so importing the
+    API does not spawn processes. Only one job per dataset may run at a time.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._cancel_events: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn avoids forking a process that holds event loop and DB pool threads
+                context = multiprocessing.get_context("spawn")
+                self._manager = context.Manager()
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                logger.info(f"Training process pool started ({self.max_workers} worker(s))")
+            return self._pool, self._manager
+
+    def _reset_pool(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def is_running(self, dataset_id: Optional[str]) -> bool:
+        return bundle_key(dataset_id) in self._cancel_events
+
+    def cancel(self, dataset_id: Optional[str]) -> bool:
+        """Request cancellation of a running job. Returns True if one was running."""
+        event = self._cancel_events.get(bundle_key(dataset_id))
+        if event is None:
+            return False
+        event.set()
+        logger.info(f"Cancellation requested for training of dataset {dataset_id}")
+        return True
+
+    async def run(
+        self,
+        request: ModelTrainingRequest,
+        training_data: pd.DataFrame,
+        dataset_id: Optional[str],
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> TrainingOutcome:
+        """
+        Train in a worker process, forwarding progress to progress_callback.
+
+        Raises:
+            TrainingInProgressError: if the dataset already has a running job
+            TrainingCancelledError: if the job was cancelled
+        """
+        key = bundle_key(dataset_id)
+        if key in self._cancel_events:
+            raise TrainingInProgressError(f"Training already running for dataset {dataset_id}")
+
+        pool, manager = self._ensure_started()
+        progress_queue = manager.Queue()
+        cancel_event = manager.Event()
+        self._cancel_events[key] = cancel_event
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            pool, _run_training_job, request, training_data, dataset_id, progress_queue, cancel_event
+        )
+
+        def forward(messages: List[Tuple[int, str]]) -> None:
+            if progress_callback is None:
+                return
+            for progress, message in messages:
+                progress_callback(progress, message)
+
+        try:
+            while not future.done():
+                await asyncio.wait({future}, timeout=PROGRESS_POLL_SECONDS)
+                forward(await asyncio.to_thread(_drain, progress_queue))
+            forward(await asyncio.to_thread(_drain, progress_queue))
+            return future.result()
+        except asyncio.CancelledError:
+            # The awaiting task was cancelled (e.g. shutdown); stop the worker at its next checkpoint
+            cancel_event.set()
+            raise
+        except BrokenProcessPool:
+            logger.error("Training worker process died; restarting pool on next job")
+            self._reset_pool()
+            raise
+        finally:
+            self._cancel_events.pop(key, None)
+
+    def shutdown(self) -> None:
+        """Cancel running jobs and stop the pool (registered as a shutdown callback)."""
+        for event in list(self._cancel_events.values()):
+            try:
+                event.set()
+            except Exception:
+                pass
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+
+training_executor = TrainingExecutor(max_workers=settings.TRAINING_PROCESS_POOL_WORKERS)
@@ -27,6 +27,7 @@ from app.services.analytics.behavioral_stage_service import behavioral_stage_ser
 from app.services.treatments.business_rule_service import business_rule_service, HeuristicResult
 from app.services.reasoning.interview_insight_service import interview_insight_service, InterviewAnalysisResult
 from app.services.analytics.peer_statistics_service import peer_statistics_service, RiskThresholds
+from app.services.ai.generation_cache import invalidate_employee_generations
 
 
 @dataclass
@@ -604,6 +605,8 @@ class ChurnReasoningOrchestrator:
                 db.add(reasoning)
 
             await db.commit()
+            # Generations built from the old reasoning must not be served again
+            await invalidate_employee_generations(result.hr_code)
 
         except Exception as e:
             print(f"Error saving to cache: {e}")
@@ -11,13 +11,14 @@ Supports both native function calling (OpenAI/Azure) and
 simulated tool calling (Ollama/Qwen/IBM) via prompt injection.
 """
 
-from typing import Dict, Any, List, Optional, AsyncGenerator
+from typing import Dict, Any, List, Optional, AsyncGenerator, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import re
 import logging
 import asyncio
+import time
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -47,6 +48,8 @@ class AgentContext:
     messages: List[Dict[str, Any]] = field(default_factory=list)
     tool_calls: List[ToolCall] = field(default_factory=list)
     tool_results: List[ToolResult] = field(default_factory=list)
+    # Timing of each iteration's tool calls (see _execute_tools)
+    tool_batches: List[Dict[str, Any]] = field(default_factory=list)
     iteration: int = 0
     total_tokens_used: int = 0
     dataset_id: Optional[str] = None
@@ -68,6 +71,10 @@ class ToolCallingAgent:
     - OpenAI/Azure (native function calling)
     - Ollama/Qwen/IBM (simulated via prompt injection)
 
+    The tools requested in one iteration are independent read-only queries,
+    so they run concurrently (at most AGENT_TOOL_MAX_PARALLEL at a time),
+    each on its own pooled session; results keep the order of the calls.
+
     Usage:
         agent = ToolCallingAgent(db, model, provider, dataset_id)
         result = await agent.run("How many employees in Engineering?")
@@ -84,7 +91,8 @@ class ToolCallingAgent:
         provider: str,
         dataset_id: str,
         employee_context: Optional[Dict[str, Any]] = None,
-        chatbot_service: Optional[Any] = None
+        chatbot_service: Optional[Any] = None,
+        session_factory: Optional[Callable[[], Any]] = None
     ):
         """
         Initialize the tool calling agent.
@@ -96,11 +104,14 @@ class ToolCallingAgent:
             dataset_id: Current dataset ID
             employee_context: Optional selected employee context
             chatbot_service: Optional ChatbotService instance (created if not provided)
+            session_factory: Opens the sessions of concurrent tool calls
+                (defaults to AsyncSessionLocal)
         """
         self.db = db
         self.model = model
         self.provider = provider.lower()
         self.dataset_id = dataset_id
+        self._session_factory = session_factory
 
         # Initialize services
         self.tool_executor = ToolExecutor(db, dataset_id, employee_context)
@@ -210,6 +221,7 @@ class ToolCallingAgent:
             {"type": "state", "state": "thinking"}
             {"type": "tool_call", "tool": "count_employees", "arguments": {...}}
             {"type": "tool_result", "tool": "count_employees", "success": true, "preview": "..."}
+            {"type": "tool_batch", "tools": 3, "parallel": true, "wall_time_ms": 120, "serial_time_ms": 310}
             {"type": "token", "content": "word "}
             {"type": "done", "full_response": "..."}
         """
@@ -256,6 +268,8 @@ class ToolCallingAgent:
                         "execution_time_ms": result.execution_time_ms
                     }
 
+                yield {"type": "tool_batch", **self.context.tool_batches[-1]}
+
                 self._append_tool_results(tool_calls, results)
                 continue
 
@@ -473,18 +487,67 @@ When the user asks questions about "this employee" or uses similar references, t
 
         return None
 
+    def _sessions(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from app.db.session import AsyncSessionLocal
+
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
     async def _execute_tools(self, tool_calls: List[ToolCall]) -> List[ToolResult]:
-        """Execute tool calls and return results"""
-        # Limit concurrent tool calls
-        tool_calls = tool_calls[:self.MAX_TOOL_CALLS_PER_ITERATION]
-        results = []
+        """
+        Execute tool calls and return results in the order of the calls.
 
-        for tc in tool_calls:
-            self.context.tool_calls.append(tc)
-            result = await self.tool_executor.execute(tc.name, tc.arguments)
-            results.append(result)
-            self.context.tool_results.append(result)
+        Several calls run concurrently, each on its own session, since one
+        AsyncSession cannot be used by more than one task at a time. A
+        single call (or AGENT_TOOL_MAX_PARALLEL of 1) runs on the agent's
+        session. The iteration's wall time and the sum of the calls' own
+        times are recorded in context.tool_batches.
+        """
+        # Limit tool calls per iteration
+        tool_calls = tool_calls[:self.MAX_TOOL_CALLS_PER_ITERATION]
+        max_parallel = max(1, settings.AGENT_TOOL_MAX_PARALLEL)
+        parallel = len(tool_calls) > 1 and max_parallel > 1
+        started = time.perf_counter()
+
+        if parallel:
+            slots = asyncio.Semaphore(max_parallel)
+
+            async def execute(tc: ToolCall) -> ToolResult:
+                async with slots:
+                    try:
+                        async with self._sessions()() as db:
+                            return await self.tool_executor.execute(tc.name, tc.arguments, db=db)
+                    except Exception as e:
+                        logger.exception(f"Tool {tc.name} could not get a session: {e}")
+                        return ToolResult(
+                            tool_call_id=f"error_{tc.name}",
+                            tool_name=tc.name,
+                            success=False,
+                            error=str(e)
+                        )
+
+            results = list(await asyncio.gather(*(execute(tc) for tc in tool_calls)))
+        else:
+            results = []
+            for tc in tool_calls:
+                results.append(await self.tool_executor.execute(tc.name, tc.arguments))
+
+        batch = {
+            "iteration": self.context.iteration,
+            "tools": len(tool_calls),
+            "parallel": parallel,
+            "wall_time_ms": int((time.perf_counter() - started) * 1000),
+            "serial_time_ms": sum(r.execution_time_ms for r in results),
+        }
+        logger.info(
+            f"Ran {batch['tools']} tool call(s) in {batch['wall_time_ms']}ms "
+            f"({batch['serial_time_ms']}ms one after another)"
+        )
 
+        self.context.tool_calls.extend(tool_calls)
+        self.context.tool_results.extend(results)
+        self.context.tool_batches.append(batch)
         return results
 
     def _append_tool_results(
@@ -17,6 +17,7 @@ from functools import lru_cache
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.query_monitor import tool_context
 from app.services.tools.registry import tool_registry
 from app.services.tools.schema import ToolResult
 
@@ -82,7 +83,8 @@ class ToolExecutor:
         self,
         tool_name: str,
         arguments: Dict[str, Any],
-        timeout_ms: Optional[int] = None
+        timeout_ms: Optional[int] = None,
+        db: Optional[AsyncSession] = None
     ) -> ToolResult:
         """
         Execute a tool with the given arguments.
@@ -91,6 +93,8 @@ class ToolExecutor:
             tool_name: Name of the tool to execute
             arguments: Arguments to pass to the tool
             timeout_ms: Optional timeout override in milliseconds
+            db: Session to run the tool on instead of the executor's own
+                (tool calls that run concurrently must not share one)
 
         Returns:
             ToolResult with success status and data or error
@@ -156,15 +160,16 @@ class ToolExecutor:
         timeout_seconds = timeout / 1000
 
         try:
-            result = await asyncio.wait_for(
-                handler(
-                    db=self.db,
-                    dataset_id=self.dataset_id,
-                    employee_context=self.employee_context,
-                    **arguments
-                ),
-                timeout=timeout_seconds
-            )
+            with tool_context(tool_name):
+                result = await asyncio.wait_for(
+                    handler(
+                        db=db or self.db,
+                        dataset_id=self.dataset_id,
+                        employee_context=self.employee_context,
+                        **arguments
+                    ),
+                    timeout=timeout_seconds
+                )
 
             execution_time_ms = int((time.time() - start_time) * 1000)
 
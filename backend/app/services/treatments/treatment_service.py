@@ -20,7 +20,11 @@ from app.models.treatment import TreatmentDefinition, TreatmentApplication
 from app.models.hr_data import HRDataInput
 from app.models.churn import ChurnOutput
 from app.services.analytics.eltv_service import ELTVService, eltv_service
-from app.services.treatments.treatment_mapping_service import treatment_mapping_service, TreatmentMappingService
+from app.services.treatments.treatment_mapping_service import (
+    TreatmentFeatureMapping,
+    TreatmentMappingService,
+    treatment_mapping_service,
+)
 
 
 @dataclass
@@ -626,8 +630,8 @@ class TreatmentValidationService:
         Simulate applying a treatment using the REAL ML model (counterfactual analysis).
 
         This method uses the TreatmentMappingService to translate the treatment
-        into ML feature modifications, then calls simulate_counterfactual() for
-        actual model predictions instead of heuristic estimates.
+        into ML feature modifications, then runs the counterfactual scenario
+        engine for actual model predictions instead of heuristic estimates.
 
         Args:
             db: Database session
@@ -638,8 +642,36 @@ class TreatmentValidationService:
         Returns:
             Dict with ML-based simulation results including real churn predictions
         """
+        results = await self.compare_treatments_ml(
+            db=db,
+            employee_hr_code=employee_hr_code,
+            treatment_ids=[treatment_id],
+            custom_modifications=custom_modifications
+        )
+        result = results[0]
+        if 'error' in result:
+            raise ValueError(result['error'])
+        return result
+
+    async def compare_treatments_ml(
+        self,
+        db: AsyncSession,
+        employee_hr_code: str,
+        treatment_ids: List[int],
+        custom_modifications: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Simulate several treatments for one employee with a single model pass.
+
+        The baseline and every treatment scenario are scored together by the
+        counterfactual scenario engine, so the baseline is predicted once no
+        matter how many treatments are compared.
+
+        Returns one result dict per treatment id, in order. Unknown treatments
+        get an {'treatment_id', 'error'} entry instead of failing the comparison.
+        """
         # Import here to avoid circular dependency
-        from app.services.ml.churn_prediction_service import churn_prediction_service
+        from app.services.ml.churn_prediction_service import CounterfactualCase, churn_prediction_service
 
         # 1. Get employee data
         query = select(HRDataInput).where(
@@ -651,97 +683,101 @@ class TreatmentValidationService:
         if not employee:
             raise ValueError(f"Employee {employee_hr_code} not found")
 
-        # 2. Get treatment definition and its feature mapping
-        treatment_mapping = await treatment_mapping_service.get_treatment_feature_mapping(
-            db=db,
-            treatment_id=treatment_id
-        )
+        # 2. Get each treatment definition and its feature mapping
+        mappings: Dict[int, TreatmentFeatureMapping] = {}
+        for treatment_id in treatment_ids:
+            try:
+                mappings[treatment_id] = await treatment_mapping_service.get_treatment_feature_mapping(
+                    db=db,
+                    treatment_id=treatment_id
+                )
+            except ValueError:
+                continue
 
         # 3. Build base ML features from employee data
         # Map HR data fields to the 9 EmployeeChurnFeatures
         salary = float(employee.employee_cost) if employee.employee_cost else 50000
-        tenure = float(employee.tenure) if employee.tenure else 0
-
         base_features = {
             'satisfaction_level': 0.6,  # Default if not in data
             'last_evaluation': 0.7,
             'number_project': 3,
             'average_monthly_hours': 160,
-            'time_spend_company': int(tenure),
+            'time_spend_company': int(float(employee.tenure) if employee.tenure else 0),
             'work_accident': False,
             'promotion_last_5years': False,
             'department': employee.structure_name or 'sales',
             'salary_level': self._estimate_salary_level(salary),
         }
 
-        # 4. Get feature modifications from treatment mapping
-        modifications = treatment_mapping.feature_modifications.copy()
-
-        # 5. Apply custom modifications if provided (user fine-tuning)
-        if custom_modifications:
-            modifications.update(custom_modifications)
-
-        # 6. Call the REAL ML model via counterfactual simulation
-        counterfactual_result = await churn_prediction_service.simulate_counterfactual(
-            employee_id=employee_hr_code,
-            base_features=base_features,
-            modifications=modifications,
-            scenario_name=f"Treatment: {treatment_mapping.treatment_name}",
-            scenario_id=f"treatment_{treatment_id}",
-            annual_salary=salary
-        )
-
-        # 7. Calculate ELTV with both scenarios
-        position_level = eltv_service.estimate_position_level(
-            position=employee.position,
-            salary=salary,
-            tenure=tenure
-        )
-
-        pre_eltv_result = eltv_service.calculate_eltv(
-            annual_salary=salary,
-            churn_probability=counterfactual_result.baseline_churn_probability,
-            tenure_years=tenure,
-            position_level=position_level
-        )
-
-        post_eltv_result = eltv_service.calculate_eltv(
-            annual_salary=salary,
-            churn_probability=counterfactual_result.scenario_churn_probability,
-            tenure_years=tenure,
-            position_level=position_level
-        )
-
-        # 8. Calculate ROI with treatment cost
-        treatment_cost = treatment_mapping.estimated_cost
-        eltv_gain = post_eltv_result.eltv - pre_eltv_result.eltv
-        net_benefit = eltv_gain - treatment_cost
-        roi = (net_benefit / treatment_cost * 100) if treatment_cost > 0 else (999.99 if eltv_gain > 0 else 0)
-
-        return {
-            'employee_id': employee_hr_code,
-            'treatment_id': treatment_id,
-            'treatment_name': treatment_mapping.treatment_name,
-            'treatment_cost': treatment_cost,
-            'feature_modifications': modifications,
-            'pre_churn_probability': counterfactual_result.baseline_churn_probability,
-            'post_churn_probability': counterfactual_result.scenario_churn_probability,
-            'churn_delta': counterfactual_result.churn_probability_delta,
-            'eltv_pre_treatment': pre_eltv_result.eltv,
-            'eltv_post_treatment': post_eltv_result.eltv,
-            'treatment_effect_eltv': eltv_gain,
-            'net_benefit': net_benefit,
-            'roi': min(999.99, max(-999.99, roi)),
-            'new_survival_probabilities': post_eltv_result.survival_probabilities,
-            'ml_model_used': True,
-            'applied_treatment': {
-                'id': treatment_id,
-                'name': treatment_mapping.treatment_name,
-                'cost': treatment_cost,
-                'description': treatment_mapping.description,
-                'affected_features': list(modifications.keys())
-            }
-        }
+        # 4. Feature modifications per treatment (plus optional user fine-tuning)
+        scenarios = []
+        for treatment_id, mapping in mappings.items():
+            modifications = mapping.feature_modifications.copy()
+            if custom_modifications:
+                modifications.update(custom_modifications)
+            scenarios.append({
+                'id': f"treatment_{treatment_id}",
+                'name': f"Treatment: {mapping.treatment_name}",
+                'modifications': modifications,
+            })
+
+        # 5. Score the baseline and all treatments with the REAL ML model in one pass
+        counterfactuals = {}
+        if scenarios:
+            case_results = await churn_prediction_service.run_counterfactual_cases([
+                CounterfactualCase(
+                    employee_id=employee_hr_code,
+                    base_features=base_features,
+                    scenarios=scenarios,
+                    annual_salary=salary,
+                    position=employee.position,
+                )
+            ])
+            counterfactuals = dict(zip(mappings, case_results[0]))
+
+        # 6. Calculate ROI with each treatment's cost
+        results = []
+        for treatment_id in treatment_ids:
+            if treatment_id not in mappings:
+                results.append({
+                    'treatment_id': treatment_id,
+                    'error': f"Treatment {treatment_id} not found"
+                })
+                continue
+
+            mapping = mappings[treatment_id]
+            counterfactual = counterfactuals[treatment_id]
+            treatment_cost = mapping.estimated_cost
+            eltv_gain = counterfactual.scenario_eltv - counterfactual.baseline_eltv
+            net_benefit = eltv_gain - treatment_cost
+            roi = (net_benefit / treatment_cost * 100) if treatment_cost > 0 else (999.99 if eltv_gain > 0 else 0)
+
+            results.append({
+                'employee_id': employee_hr_code,
+                'treatment_id': treatment_id,
+                'treatment_name': mapping.treatment_name,
+                'treatment_cost': treatment_cost,
+                'feature_modifications': counterfactual.modifications,
+                'pre_churn_probability': counterfactual.baseline_churn_prob,
+                'post_churn_probability': counterfactual.scenario_churn_prob,
+                'churn_delta': counterfactual.churn_delta,
+                'eltv_pre_treatment': counterfactual.baseline_eltv,
+                'eltv_post_treatment': counterfactual.scenario_eltv,
+                'treatment_effect_eltv': eltv_gain,
+                'net_benefit': net_benefit,
+                'roi': min(999.99, max(-999.99, roi)),
+                'new_survival_probabilities': counterfactual.scenario_survival_probs,
+                'ml_model_used': counterfactual.prediction_method == 'model',
+                'applied_treatment': {
+                    'id': treatment_id,
+                    'name': mapping.treatment_name,
+                    'cost': treatment_cost,
+                    'description': mapping.description,
+                    'affected_features': list(counterfactual.modifications.keys())
+                }
+            })
+
+        return results
 
     def _estimate_salary_level(self, salary: float) -> str:
         """
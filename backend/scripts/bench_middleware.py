@@ -0,0 +1,98 @@
+"""
+Micro-benchmark of per-request middleware overhead.
+
+Drives a trivial JSON endpoint directly through ASGI (no server, no HTTP
+client) behind:
+
+- bare:   no middleware
+- before: the previous stack shape - three BaseHTTPMiddleware layers (security
+          headers, CSRF, size limit) plus the pure-ASGI request tracking and
+          request logging middlewares
+- after:  EdgeMiddleware alone
+
+and prints the mean microseconds per request and the overhead over bare.
+
+Usage (from backend/):
+    python -m scripts.bench_middleware [requests]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.http_middleware import EdgeMiddleware
+from app.core.logging_config import RequestLoggingMiddleware
+from app.core.shutdown import RequestTrackingMiddleware
+
+
+class _HeaderLayer(BaseHTTPMiddleware):
+    """Stand-in for one of the removed BaseHTTPMiddleware layers."""
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["x-bench"] = "1"
+        return response
+
+
+async def _ping(request):
+    return JSONResponse({"ok": True})
+
+
+def _build(stack: str) -> Starlette:
+    app = Starlette(routes=[Route("/ping", _ping)])
+    if stack == "before":
+        for layer in (_HeaderLayer, _HeaderLayer, _HeaderLayer, RequestTrackingMiddleware, RequestLoggingMiddleware):
+            app.add_middleware(layer)
+    elif stack == "after":
+        app.add_middleware(EdgeMiddleware)
+    return app
+
+
+async def _run(app: Starlette, n: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"cookie", b"csrf_token=x")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm up
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def main(n: int) -> None:
+    # Measure middleware work, not log formatting
+    logging.disable(logging.CRITICAL)
+    results = {stack: await _run(_build(stack), n) for stack in ("bare", "before", "after")}
+    bare = results["bare"]
+    for stack, micros in results.items():
+        print(f"{stack:>6}: {micros:8.1f} us/request  (+{micros - bare:.1f} us middleware)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
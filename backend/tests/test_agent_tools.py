@@ -0,0 +1,116 @@
+"""
+Tests for app/services/tools/agent.py - Concurrent execution of an iteration's tool calls.
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.config import settings
+from app.services.tools.agent import ToolCallingAgent
+from app.services.tools.registry import tool_registry
+from app.services.tools.schema import ToolCall, ToolDefinition, ToolSchema
+from tests.utils.fake_sessions import FakeSessions
+
+
+@pytest.fixture
+def slow_tools():
+    """Three uncached tools that sleep and report the session they ran on."""
+    names = {"slow_overview": 0.15, "slow_department_stats": 0.1, "slow_query": 0.05}
+    for name, seconds in names.items():
+        async def handler(db, dataset_id, employee_context, seconds=seconds, name=name):
+            await asyncio.sleep(seconds)
+            return {"tool": name, "db": db}
+
+        definition = ToolDefinition(tool_schema=ToolSchema(name=name, description=name), cacheable=False)
+        tool_registry.register_tool(definition, handler)
+    yield list(names)
+    for name in names:
+        tool_registry._tools.pop(name, None)
+
+
+def make_agent(sessions) -> ToolCallingAgent:
+    return ToolCallingAgent(
+        MagicMock(name="agent_db"), "gpt-5-mini", "openai", "ds-1",
+        chatbot_service=MagicMock(), session_factory=sessions,
+    )
+
+
+def calls(names):
+    return [ToolCall(id=f"call_{i}", name=name) for i, name in enumerate(names)]
+
+
+class TestExecuteTools:
+    """Test scheduling, ordering and sessions of one iteration's tool calls."""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_concurrently_in_order_on_their_own_sessions(self, slow_tools):
+        sessions = FakeSessions()
+        agent = make_agent(sessions)
+
+        started = time.perf_counter()
+        results = await agent._execute_tools(calls(slow_tools))
+
+        assert time.perf_counter() - started < 0.25
+        assert [r.data["tool"] for r in results] == slow_tools
+        assert [r.data["db"] for r in results] == sessions.opened
+        assert sessions.max_open == 3 and sessions.open == 0
+        batch = agent.context.tool_batches[-1]
+        assert batch["parallel"] is True and batch["tools"] == 3
+        assert batch["serial_time_ms"] >= 290
+        assert batch["wall_time_ms"] < batch["serial_time_ms"]
+
+    @pytest.mark.asyncio
+    async def test_parallelism_is_bounded(self, monkeypatch, slow_tools):
+        monkeypatch.setattr(settings, "AGENT_TOOL_MAX_PARALLEL", 2)
+        sessions = FakeSessions()
+
+        results = await make_agent(sessions)._execute_tools(calls(slow_tools))
+
+        assert sessions.max_open == 2
+        assert [r.data["tool"] for r in results] == slow_tools
+
+    @pytest.mark.asyncio
+    async def test_serial_setting_and_single_calls_use_the_agent_session(self, monkeypatch, slow_tools):
+        sessions = FakeSessions()
+        agent = make_agent(sessions)
+
+        await agent._execute_tools(calls(slow_tools[:1]))
+        monkeypatch.setattr(settings, "AGENT_TOOL_MAX_PARALLEL", 1)
+        results = await agent._execute_tools(calls(slow_tools))
+
+        assert sessions.opened == []
+        assert all(r.data["db"] is agent.db for r in results)
+        assert [b["parallel"] for b in agent.context.tool_batches] == [False, False]
+        assert len(agent.context.tool_results) == 4
+
+    @pytest.mark.asyncio
+    async def test_session_failure_fails_only_the_call(self, slow_tools):
+        results = await make_agent(FakeSessions(fail=True))._execute_tools(calls(slow_tools[:2]))
+
+        assert [r.success for r in results] == [False, False]
+        assert [r.tool_name for r in results] == slow_tools[:2]
+        assert results[0].error == "pool exhausted"
+
+
+class TestRunStreaming:
+    """Test the tool telemetry streamed to /ws-tools."""
+
+    @pytest.mark.asyncio
+    async def test_tool_batch_follows_the_results(self, slow_tools):
+        agent = make_agent(FakeSessions())
+        agent._get_llm_response = AsyncMock(side_effect=[
+            {"content": "", "tool_calls": calls(slow_tools)},
+            {"content": "Done."},
+        ])
+
+        events = [event async for event in agent.run_streaming("Compare departments")]
+
+        types = [e["type"] for e in events]
+        assert types.count("tool_result") == 3
+        batch = events[types.index("tool_batch")]
+        assert types.index("tool_batch") == max(i for i, t in enumerate(types) if t == "tool_result") + 1
+        assert batch["iteration"] == 1 and batch["parallel"] is True
+        assert batch["wall_time_ms"] < batch["serial_time_ms"]
+        assert events[-1]["type"] == "done"
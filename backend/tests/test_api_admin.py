@@ -963,6 +963,59 @@ class TestListAuditLogs:
         assert len(result.logs) == 0
 
 
+# ============ Test Slow Query Endpoints ============
+
+class TestListSlowQueries:
+    """Test the slow query log endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_list_slow_queries(self, mock_db_session, mock_legacy_user, mock_admin_user):
+        """Admin should see recorded slow statements, newest first."""
+        from app.api.v1.admin import list_slow_queries
+        from app.core.query_monitor import QueryMonitor, SlowQuery
+
+        monitor = QueryMonitor(threshold_ms=100, buffer_size=10, explain=False)
+        for i in (1, 2):
+            monitor._slow.append(SlowQuery(
+                id=i,
+                recorded_at=datetime.utcnow(),
+                statement="SELECT * FROM hr_data_input WHERE dataset_id = ?",
+                fingerprint="abc123",
+                params_fingerprint="def456",
+                duration_ms=250.0 * i,
+                rows=10,
+                endpoint="/api/v1/employees",
+                tool=None,
+            ))
+
+        mock_admin_result = MagicMock()
+        mock_admin_result.scalar_one_or_none.return_value = mock_admin_user
+        mock_db_session.execute = AsyncMock(return_value=mock_admin_result)
+
+        with patch("app.api.v1.admin.get_user_permissions_by_id", return_value={"admin:access"}), \
+                patch("app.api.v1.admin.query_monitor", monitor):
+            result = await list_slow_queries(limit=50, db=mock_db_session, current_user=mock_legacy_user)
+
+        assert result.threshold_ms == 100
+        assert [q.id for q in result.queries] == [2, 1]
+        assert result.queries[0].endpoint == "/api/v1/employees"
+
+    @pytest.mark.asyncio
+    async def test_list_slow_queries_requires_admin(self, mock_db_session, mock_legacy_user, mock_regular_user):
+        """Users without admin:access should be rejected."""
+        from app.api.v1.admin import list_slow_queries
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = mock_regular_user
+        mock_db_session.execute = AsyncMock(return_value=mock_result)
+
+        with patch("app.api.v1.admin.get_user_permissions_by_id", return_value=set()):
+            with pytest.raises(HTTPException) as exc_info:
+                await list_slow_queries(limit=50, db=mock_db_session, current_user=mock_legacy_user)
+
+        assert exc_info.value.status_code == 403
+
+
 # ============ Test Password Validation ============
 
 class TestPasswordValidation:
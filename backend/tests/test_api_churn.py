@@ -121,6 +121,29 @@ class TestBatchPredictEndpoint:
         assert result.total_processed == 3
 
 
+class TestPredictAllEndpoint:
+    """Test bulk predictions for the active dataset."""
+
+    @pytest.mark.asyncio
+    async def test_missing_artifacts_is_not_trained(self, mock_db_session, mock_user):
+        """Missing artifacts (production) should be a 400, not a 500."""
+        from app.api.v1.churn import predict_all_employees
+        from app.services.ml.model_registry import ModelArtifactsMissingError
+
+        mock_dataset = MagicMock()
+        mock_dataset.dataset_id = "test-dataset"
+
+        with patch("app.api.v1.churn.get_active_dataset", new_callable=AsyncMock, return_value=mock_dataset):
+            with patch("app.api.v1.churn.churn_service") as mock_service:
+                mock_service.ensure_model_for_dataset.side_effect = ModelArtifactsMissingError("missing")
+
+                with pytest.raises(HTTPException) as exc_info:
+                    await predict_all_employees(current_user=mock_user, db=mock_db_session)
+
+        assert exc_info.value.status_code == 400
+        mock_service.ensure_model_for_dataset.assert_called_once_with("test-dataset")
+
+
 class TestHealthEndpoint:
     """Test churn service health endpoint."""
 
@@ -132,12 +155,29 @@ class TestHealthEndpoint:
         with patch("app.api.v1.churn.churn_service") as mock_service:
             mock_service.model = MagicMock()
             mock_service.active_version = "v1.0"
+            mock_service.registry.stats.return_value = {
+                "resident": [{"dataset_id": "ds-1", "is_default": False}],
+            }
 
             result = await churn_service_health()
 
         assert result["status"] == "healthy"
         assert result["model_loaded"] is True
 
+    @pytest.mark.asyncio
+    async def test_health_ignores_default_bundles(self):
+        """Only trained bundles resident in the registry count as a loaded model."""
+        from app.api.v1.churn import churn_service_health
+
+        with patch("app.api.v1.churn.churn_service") as mock_service:
+            mock_service.registry.stats.return_value = {
+                "resident": [{"dataset_id": None, "is_default": True}],
+            }
+
+            result = await churn_service_health()
+
+        assert result["model_loaded"] is False
+
 
 class TestSchemaValidation:
     """Test Pydantic schema validation."""
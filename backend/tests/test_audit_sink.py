@@ -0,0 +1,153 @@
+"""
+Tests for app/core/audit_sink.py - Batched background audit writes.
+"""
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.audit import AuditLog, AuditLogger
+from app.core.audit_sink import AuditSink
+
+AUDIT_TABLE = AuditLog.__table__
+
+
+def row(action: str = "predict") -> dict:
+    return {"timestamp": datetime(2024, 5, 1, 12, 0), "action": action, "username": "ann", "metadata": None}
+
+
+@pytest.fixture
+async def session_factory():
+    """In-memory SQLite sessions with only audit_logs."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: AUDIT_TABLE.metadata.create_all(sync_conn, tables=[AUDIT_TABLE]))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def count_rows(session_factory) -> int:
+    async with session_factory() as db:
+        return (await db.execute(select(func.count()).select_from(AUDIT_TABLE))).scalar_one()
+
+
+def make_sink(session_factory, tmp_path, **kwargs) -> AuditSink:
+    options = dict(batch_size=2, flush_interval=0.05, enqueue_timeout=0.01, spill_path=str(tmp_path / "spill.jsonl"))
+    options.update(kwargs)
+    return AuditSink(session_factory=session_factory, **options)
+
+
+class TestAuditSink:
+    """Test batching, overflow and replay."""
+
+    @pytest.mark.asyncio
+    async def test_close_writes_everything_in_batches(self, session_factory, tmp_path):
+        """Rows are inserted in batch_size chunks and nothing queued is lost on close."""
+        sink = make_sink(session_factory, tmp_path, flush_interval=10)
+        sink.start()
+        flushed = []
+        original = sink._flush
+
+        async def spy(batch, outcome="written"):
+            flushed.append(len(batch))
+            return await original(batch, outcome)
+
+        sink._flush = spy
+        for i in range(5):
+            assert await sink.submit(row(f"action-{i}"))
+        await sink.close()
+
+        assert await count_rows(session_factory) == 5
+        assert flushed == [2, 2, 1]
+        assert not sink.running
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_interval(self, session_factory, tmp_path):
+        """A lone event is written after flush_interval without waiting for a full batch."""
+        sink = make_sink(session_factory, tmp_path, batch_size=100)
+        sink.start()
+        await sink.submit(row())
+
+        await asyncio.sleep(0.2)
+
+        assert await count_rows(session_factory) == 1
+        await sink.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_spills_after_backpressure(self, session_factory, tmp_path):
+        """When the writer can't keep up, callers wait briefly and then the event is spilled."""
+        release = asyncio.Event()
+
+        def slow_factory():
+            session = session_factory()
+            execute = session.execute
+
+            async def gated_execute(*args, **kwargs):
+                await release.wait()
+                return await execute(*args, **kwargs)
+
+            session.execute = gated_execute
+            return session
+
+        sink = make_sink(slow_factory, tmp_path, max_queue=1, batch_size=1)
+        sink.start()
+        await sink.submit(row("in-flight"))
+        await asyncio.sleep(0.01)
+        await sink.submit(row("queued"))
+
+        assert await sink.submit(row("overflow")) is False
+        spilled = (tmp_path / "spill.jsonl").read_text().splitlines()
+        assert [json.loads(line)["action"] for line in spilled] == ["overflow"]
+
+        release.set()
+        await sink.close()
+        assert await count_rows(session_factory) == 2
+
+    @pytest.mark.asyncio
+    async def test_drop_policy(self, tmp_path):
+        """Failed batches are discarded rather than spilled under the drop policy."""
+        failing = MagicMock(side_effect=RuntimeError("db down"))
+        sink = make_sink(failing, tmp_path, overflow_policy="drop")
+        sink.start()
+        await sink.submit(row())
+        await sink.close()
+
+        assert not (tmp_path / "spill.jsonl").exists()
+
+    @pytest.mark.asyncio
+    async def test_spill_file_replayed_on_start(self, session_factory, tmp_path):
+        spill = tmp_path / "spill.jsonl"
+        spill.write_text("\n".join(json.dumps({**row(), "timestamp": "2024-05-01T12:00:00"}) for _ in range(3)) + "\n")
+
+        sink = make_sink(session_factory, tmp_path)
+        sink.start()
+        await sink.close()
+
+        assert await count_rows(session_factory) == 3
+        assert not spill.exists()
+        assert not (tmp_path / "spill.jsonl.replay").exists()
+
+
+class TestAuditLoggerWithSink:
+    """Test that AuditLogger routes through a running sink."""
+
+    @pytest.mark.asyncio
+    async def test_log_queues_instead_of_committing(self, mock_db_session):
+        """The caller's session must not be touched while the sink is running."""
+        sink = MagicMock(running=True, submit=AsyncMock(return_value=True))
+
+        with patch("app.core.audit.audit_sink", sink):
+            entry = await AuditLogger.log(
+                db=mock_db_session, action="upload", user_id=1, metadata={"rows": 10}
+            )
+
+        mock_db_session.add.assert_not_called()
+        mock_db_session.commit.assert_not_called()
+        queued = sink.submit.await_args.args[0]
+        assert queued["action"] == "upload"
+        assert queued["metadata"] == json.dumps({"rows": 10})
+        assert queued["timestamp"] == entry.timestamp
@@ -0,0 +1,115 @@
+"""
+Tests for app/services/data/columnar_cache.py - Parquet dataset sidecars.
+"""
+import io
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from fastapi import UploadFile
+
+from app.services.data.columnar_cache import (
+    build_columnar_cache,
+    read_cache_info,
+    read_dataset_frame,
+    remove_columnar_cache,
+    sidecar_path,
+    stream_upload_to_disk,
+)
+
+CSV = (
+    "hr_code,full_name,tenure,employee_cost,termination_date\n"
+    "E1,Ann,1.5,50000,\n"
+    "E2,Bob,7,,2024-01-31\n"
+    "E3,Cy,3,72000.5,\n"
+)
+
+
+@pytest.fixture
+def dataset_file(tmp_path):
+    path = tmp_path / "employees.csv"
+    path.write_text(CSV)
+    return path
+
+
+class TestColumnarCache:
+    """Test building and reading the Parquet sidecar."""
+
+    def test_sidecar_round_trips_csv_types(self, dataset_file):
+        """The sidecar should give back exactly what pandas parses from the CSV."""
+        df, info = build_columnar_cache(dataset_file)
+
+        assert sidecar_path(dataset_file).exists()
+        assert info.row_count == 3
+        assert info.columns == list(df.columns)
+        with patch("pandas.read_csv", side_effect=AssertionError("CSV re-parsed")):
+            cached = read_dataset_frame(dataset_file)
+        expected = pd.read_csv(dataset_file)
+        pd.testing.assert_frame_equal(cached, expected)
+        assert cached["termination_date"].isna().tolist() == [True, False, True]
+        assert isinstance(cached["termination_date"][0], float)
+
+    def test_footer_metadata_without_reading_rows(self, dataset_file):
+        """Row count and schema come from the Parquet footer."""
+        build_columnar_cache(dataset_file)
+
+        info = read_cache_info(dataset_file)
+
+        assert info.row_count == 3
+        assert info.columns[:3] == ["hr_code", "full_name", "tenure"]
+        assert info.dtypes["employee_cost"] == "double"
+
+    def test_missing_sidecar_built_on_first_read(self, dataset_file):
+        """Datasets uploaded before sidecars existed get one lazily."""
+        assert read_cache_info(dataset_file) is None
+
+        df = read_dataset_frame(dataset_file)
+
+        assert len(df) == 3
+        assert read_cache_info(dataset_file).row_count == 3
+
+    def test_stale_sidecar_rebuilt(self, dataset_file):
+        """Replacing the source file should invalidate its sidecar."""
+        build_columnar_cache(dataset_file)
+        dataset_file.write_text(CSV + "E4,Dee,2,41000,\n")
+        stat = dataset_file.stat()
+        os.utime(dataset_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert read_cache_info(dataset_file) is None
+        assert len(read_dataset_frame(dataset_file)) == 4
+
+    def test_unstorable_frame_falls_back_to_source(self, dataset_file):
+        """Mixed-type object columns can't go to Parquet; readers still work."""
+        mixed = pd.DataFrame({"hr_code": ["E1", 2, 3.5]})
+        with patch("app.services.data.columnar_cache.read_source_frame", return_value=mixed):
+            df, info = build_columnar_cache(dataset_file)
+
+        assert info is None
+        assert not sidecar_path(dataset_file).exists()
+        assert df is mixed
+
+    def test_remove_columnar_cache(self, dataset_file):
+        build_columnar_cache(dataset_file)
+
+        remove_columnar_cache(dataset_file)
+
+        assert not sidecar_path(dataset_file).exists()
+
+
+class TestStreamUpload:
+    """Test chunked upload writes."""
+
+    @pytest.mark.asyncio
+    async def test_streams_in_chunks(self, tmp_path):
+        """The upload should be copied chunk by chunk with its byte size returned."""
+        upload = UploadFile(file=io.BytesIO(CSV.encode()), filename="employees.csv")
+        dest = tmp_path / "employees.csv"
+
+        with patch.object(upload, "read", wraps=upload.read) as read:
+            size = await stream_upload_to_disk(upload, dest, chunk_size=16)
+
+        assert size == len(CSV)
+        assert dest.read_text() == CSV
+        assert all(call.args == (16,) for call in read.call_args_list)
+        assert not (tmp_path / "employees.csv.part").exists()
@@ -0,0 +1,139 @@
+"""
+Tests for app/services/ml/columnar_predictions.py - Struct-of-arrays batch scoring.
+"""
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.schemas.churn import ChurnRiskLevel
+from app.services.analytics.data_driven_thresholds_service import DataDrivenThresholdsService
+from app.services.ml.columnar_predictions import (
+    DEFAULT_RECOMMENDATION,
+    RECOMMENDATIONS,
+    ColumnarPredictions,
+    recommendation_flags,
+    recommendation_texts,
+)
+from app.services.ml.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def feature_frame():
+    rng = np.random.default_rng(3)
+    n = 60
+    return pd.DataFrame({
+        "satisfaction_level": rng.random(n),
+        "last_evaluation": rng.random(n),
+        "number_project": rng.integers(2, 7, n),
+        "average_monthly_hours": rng.integers(120, 300, n),
+        "time_spend_company": rng.integers(1, 10, n),
+        "work_accident": rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+        "department": rng.choice(["sales", "IT"], n),
+        "salary_level": rng.choice(["low", "high"], n),
+    })
+
+
+def _make_columnar(n=3):
+    return ColumnarPredictions(
+        probabilities=np.array([0.9, 0.2, 0.5])[:n],
+        confidence=np.array([0.8, 0.6, 0.0])[:n],
+        risk_codes=np.array([2, 0, 1], dtype=np.int8)[:n],
+        factor_indices=np.array([[0, -1], [1, 0], [-1, -1]])[:n],
+        factor_values=np.array([[0.4, 0.0], [-0.2, 0.05], [0.0, 0.0]])[:n],
+        factor_impacts=np.array([[4, 0], [3, 1], [0, 0]], dtype=np.int8)[:n],
+        recommendation_flags=np.array([
+            [True, False, False, False, False, True],
+            [False] * 6,
+            [False, True, False, False, False, False],
+        ])[:n],
+        raw_features=np.array([[0.1, 5], [0.7, 3], [0.5, 4]], dtype=object)[:n],
+        feature_names=["satisfaction_level", "time_spend_company"],
+        message_fn=lambda name, value, shap_val: f"{name}={value}",
+        employee_ids=["E1", "E2", "E3"][:n],
+    )
+
+
+class TestRecommendationFlags:
+    """Test vectorized recommendation selection."""
+
+    def test_flags_match_scalar_rules(self, feature_frame):
+        """Each row's recommendations should match the single-employee path."""
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        service = cp.ChurnPredictionService(registry=ModelRegistry(max_models=1))
+
+        flags = recommendation_flags(
+            service.thresholds_service,
+            satisfaction=feature_frame["satisfaction_level"].to_numpy(float),
+            monthly_hours=feature_frame["average_monthly_hours"].to_numpy(float),
+            projects=feature_frame["number_project"].to_numpy(float),
+            tenure=feature_frame["time_spend_company"].to_numpy(float),
+            promoted=feature_frame["promotion_last_5years"].to_numpy() != 0,
+            evaluation=feature_frame["last_evaluation"].to_numpy(float),
+        )
+
+        assert flags.shape == (len(feature_frame), len(RECOMMENDATIONS))
+        for i, row in enumerate(feature_frame.itertuples(index=False)):
+            features = service._row_to_features(row)
+            assert recommendation_texts(flags[i]) == service._get_recommendations(features, [])
+
+    def test_no_flags_returns_default(self):
+        """Rows with no triggered rule should get the default recommendation."""
+        assert recommendation_texts(np.zeros(len(RECOMMENDATIONS), dtype=bool)) == [DEFAULT_RECOMMENDATION]
+
+
+class TestRiskLevelCodes:
+    """Test vectorized risk-level assignment."""
+
+    def test_codes_match_scalar_risk_levels(self):
+        """Risk codes should agree with get_risk_level for every probability."""
+        service = DataDrivenThresholdsService()
+        probs = np.linspace(0, 1, 101)
+
+        codes = service.get_risk_level_codes(probs)
+
+        assert [("low", "medium", "high")[c] for c in codes] == [service.get_risk_level(p) for p in probs]
+
+
+class TestColumnarPredictions:
+    """Test lazy per-row materialization."""
+
+    def test_to_response_builds_row(self):
+        """Responses should be built from the column arrays for the requested row."""
+        batch = _make_columnar()
+
+        response = batch.to_response(0)
+
+        assert response.employee_id == "E1"
+        assert response.risk_level == ChurnRiskLevel.HIGH
+        assert [f["feature"] for f in response.contributing_factors] == ["satisfaction_level"]
+        assert response.contributing_factors[0]["impact"] == "critical"
+        assert response.recommendations == [RECOMMENDATIONS[0], RECOMMENDATIONS[5]]
+
+    def test_risk_counts_and_feature_column(self):
+        """Aggregates should come straight from the arrays."""
+        batch = _make_columnar()
+
+        assert batch.risk_counts() == {
+            ChurnRiskLevel.LOW: 1, ChurnRiskLevel.MEDIUM: 1, ChurnRiskLevel.HIGH: 1,
+        }
+        assert batch.feature_column("time_spend_company").tolist() == [5, 3, 4]
+        assert batch.factors(2) == []
+
+    @pytest.mark.asyncio
+    async def test_unfitted_model_uses_heuristic_factors(self, tmp_path, monkeypatch, feature_frame):
+        """Without a trained model the batch should match single heuristic predictions."""
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+        service = cp.ChurnPredictionService(registry=ModelRegistry(max_models=1))
+
+        batch = await service.predict_frame_columnar(feature_frame, dataset_id="ds-none")
+
+        assert len(batch) == len(feature_frame)
+        assert batch.method == "heuristic-batch"
+        first = service._row_to_features(next(feature_frame.itertuples(index=False)))
+        assert batch.probabilities[0] == pytest.approx(service._heuristic_prediction(first))
+        assert batch.factors(0) == service._get_heuristic_contributing_factors(first)
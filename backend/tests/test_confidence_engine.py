@@ -0,0 +1,142 @@
+"""
+Tests for app/services/ml/confidence_engine.py - Vectorized tree agreement.
+"""
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from app.services.ml.confidence_engine import (
+    DEFAULT_AGREEMENT,
+    combine_confidence,
+    tree_agreement_batch,
+    xgboost_checkpoints,
+)
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.random((400, 5))
+    y = (X[:, 0] + 0.4 * rng.random(400) > 0.7).astype(int)
+    return X, y
+
+
+def _checkpoint_agreement(model, row):
+    """Reference: one truncated prediction per checkpoint for a single row."""
+    booster = model.get_booster()
+    dmatrix = xgb.DMatrix(row)
+    preds = [
+        booster.predict(dmatrix, iteration_range=(0, int(n)))[0]
+        for n in xgboost_checkpoints(booster.num_boosted_rounds())
+    ]
+    return max(0.0, 1.0 - min(float(np.std(preds)) * 4, 1.0))
+
+
+class TestTreeAgreementBatch:
+    """Test batch agreement against the per-row definition."""
+
+    @pytest.mark.parametrize("n_estimators", [7, 43])
+    def test_xgboost_matches_per_row_checkpoints(self, training_data, n_estimators):
+        """Chained base margins should reproduce truncated per-row predictions."""
+        X, y = training_data
+        model = xgb.XGBClassifier(n_estimators=n_estimators, max_depth=3).fit(X, y)
+
+        batch = tree_agreement_batch(model, X[:50])
+
+        expected = [_checkpoint_agreement(model, X[i:i + 1]) for i in range(50)]
+        np.testing.assert_allclose(batch, expected, atol=1e-5)
+
+    def test_random_forest_matches_per_tree_std(self, training_data):
+        """RF agreement should use the std of individual tree probabilities."""
+        X, y = training_data
+        model = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+
+        batch = tree_agreement_batch(model, X)
+
+        per_tree = np.stack([tree.predict_proba(X)[:, 1] for tree in model.estimators_])
+        expected = np.clip(1.0 - per_tree.std(axis=0) * 4, 0.0, 1.0)
+        np.testing.assert_allclose(batch, expected, atol=1e-9)
+
+    def test_non_tree_model_gets_default(self, training_data):
+        """Models without trees should get the default moderate agreement."""
+        X, y = training_data
+        model = LogisticRegression().fit(X, y)
+
+        assert tree_agreement_batch(model, X).tolist() == [DEFAULT_AGREEMENT] * len(X)
+        assert tree_agreement_batch(None, X[:3]).tolist() == [0.5] * 3
+
+
+class TestCombineConfidence:
+    """Test the weighted agreement/margin blend."""
+
+    def test_tree_models_weight_agreement_more(self):
+        """Tree models use 60% agreement, others 40%."""
+        probs = np.array([0.9, 0.5])
+        agreement = np.array([1.0, 0.0])
+
+        tree = combine_confidence(RandomForestClassifier(), probs, agreement)
+        linear = combine_confidence(LogisticRegression(), probs, agreement)
+
+        np.testing.assert_allclose(tree, [0.6 + 0.4 * 0.8, 0.0])
+        np.testing.assert_allclose(linear, [0.4 + 0.6 * 0.8, 0.0])
+
+    @pytest.mark.asyncio
+    async def test_frame_batch_confidence_matches_single_prediction(self, tmp_path, monkeypatch):
+        """Batch confidence should equal the single-employee confidence breakdown."""
+        import importlib
+
+        import pandas as pd
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+        from app.schemas.churn import ChurnPredictionRequest
+        from app.services.ml.model_registry import ModelBundle, ModelRegistry
+
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+
+        rng = np.random.default_rng(4)
+        n = 80
+        frame = pd.DataFrame({
+            "satisfaction_level": rng.random(n),
+            "last_evaluation": rng.random(n),
+            "number_project": rng.integers(2, 7, n),
+            "average_monthly_hours": rng.integers(120, 300, n),
+            "time_spend_company": rng.integers(1, 10, n),
+            "work_accident": rng.integers(0, 2, n),
+            "promotion_last_5years": rng.integers(0, 2, n),
+            "department": rng.choice(["sales", "IT"], n),
+            "salary_level": rng.choice(["low", "high"], n),
+        })
+        encoders = {
+            "department": LabelEncoder().fit(["sales", "IT", "unknown"]),
+            "salary_level": LabelEncoder().fit(["low", "medium", "high"]),
+        }
+        matrix = np.column_stack([
+            frame[c].astype(float).values for c in frame.columns[:7]
+        ] + [
+            encoders["department"].transform(frame["department"]),
+            encoders["salary_level"].transform(frame["salary_level"]),
+        ])
+        scaler = StandardScaler().fit(matrix)
+        y = (frame["satisfaction_level"] < 0.4).astype(int).values
+        model = xgb.XGBClassifier(n_estimators=25, max_depth=3).fit(scaler.transform(matrix), y)
+
+        service = cp.ChurnPredictionService(registry=ModelRegistry(max_models=2))
+        service.registry.put(ModelBundle(
+            dataset_id="ds-1", model=model, scaler=scaler, label_encoders=encoders, version="test",
+        ))
+
+        batch = await service.predict_frame_columnar(frame, dataset_id="ds-1")
+        first = service._row_to_features(next(frame.itertuples(index=False)))
+        single = await service.predict_churn(
+            ChurnPredictionRequest(employee_id=1, features=first), dataset_id="ds-1"
+        )
+
+        assert batch.tree_agreement is not None
+        assert batch.confidence[0] == pytest.approx(single.confidence_score, abs=1e-5)
+        assert batch.confidence_breakdown(0)["tree_agreement"] == pytest.approx(
+            single.confidence_breakdown["tree_agreement"], abs=1e-5
+        )
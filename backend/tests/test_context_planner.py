@@ -0,0 +1,193 @@
+"""
+Tests for app/services/ai/context_planner.py - Concurrent chat context assembly.
+"""
+import asyncio
+import json
+import time
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Register every model so that the User mapper (and its relationships) can configure
+import app.models.agent_memory  # noqa: F401
+from app.core import cache as cache_module
+from app.core.cache import InMemoryCache
+from app.core.metrics import CHAT_CONTEXT_DROPPED
+from app.db.base import Base
+from app.models.churn import ChurnOutput, ChurnReasoning
+from app.models.hr_data import HRDataInput
+from app.models.treatment import TreatmentDefinition
+from app.services.ai.context_planner import ContextPlan
+from app.services.ai.intelligent_chatbot import IntelligentChatbotService, PatternType
+from tests.utils.fake_sessions import FakeSessions
+
+
+def sleeper(seconds: float, value=True):
+    async def load(db, found):
+        await asyncio.sleep(seconds)
+        return value
+    return load
+
+
+def dropped(piece: str, reason: str) -> float:
+    return CHAT_CONTEXT_DROPPED.labels(piece=piece, reason=reason)._value.get()
+
+
+class TestContextPlan:
+    """Test scheduling, dependencies and dropping of optional pieces."""
+
+    @pytest.mark.asyncio
+    async def test_independent_pieces_run_concurrently(self):
+        sessions = FakeSessions()
+        plan = ContextPlan(budget=0, max_sessions=8, session_factory=sessions)
+        for name in ("overview", "churn", "reasoning", "eltv"):
+            plan.add(name, sleeper(0.1, name))
+
+        started = time.perf_counter()
+        found = await plan.run()
+
+        assert time.perf_counter() - started < 0.3
+        assert found == {"overview": "overview", "churn": "churn", "reasoning": "reasoning", "eltv": "eltv"}
+        assert sessions.max_open == 4
+
+    @pytest.mark.asyncio
+    async def test_requirements_run_first_and_absent_ones_skip_dependents(self):
+        plan = ContextPlan(budget=0, session_factory=FakeSessions())
+        plan.add("employee", sleeper(0.02, {"hr_code": "EMP001"}))
+        plan.add("churn", lambda db, found: sleeper(0, found["employee"]["hr_code"])(db, found), requires=("employee",))
+        plan.add("reasoning", sleeper(0, None))
+        plan.add("stage_details", sleeper(0, "stage"), requires=("reasoning",))
+
+        found = await plan.run()
+
+        assert found["churn"] == "EMP001"
+        assert "reasoning" not in found and "stage_details" not in found
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_bounded(self):
+        sessions = FakeSessions()
+        plan = ContextPlan(budget=0, max_sessions=2, session_factory=sessions)
+        for i in range(6):
+            plan.add(f"piece{i}", sleeper(0.01))
+
+        await plan.run()
+
+        assert sessions.max_open == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_optional_piece_is_dropped_at_its_timeout(self):
+        before = dropped("rag_context", "timeout")
+        plan = ContextPlan(budget=0, piece_timeout=0.05, session_factory=FakeSessions())
+        plan.add("company_overview", sleeper(0.1))
+        plan.add("rag_context", sleeper(5), optional=True, uses_db=False)
+
+        started = time.perf_counter()
+        found = await plan.run()
+
+        assert time.perf_counter() - started < 1
+        assert found == {"company_overview": True}
+        assert plan.dropped == {"rag_context": "timeout"}
+        assert dropped("rag_context", "timeout") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_optional_pieces_but_not_required_ones(self):
+        plan = ContextPlan(budget=0.05, piece_timeout=10, session_factory=FakeSessions())
+        plan.add("employee", sleeper(0.15))
+        plan.add("exit_interview_patterns", sleeper(0.01), requires=("employee",), optional=True)
+
+        found = await plan.run()
+
+        assert found == {"employee": True}
+        assert plan.dropped == {"exit_interview_patterns": "timeout"}
+
+    @pytest.mark.asyncio
+    async def test_failures(self):
+        async def broken(db, found):
+            raise RuntimeError("boom")
+
+        optional = ContextPlan(budget=0, session_factory=FakeSessions())
+        optional.add("rag_context", broken, optional=True)
+        assert await optional.run() == {}
+        assert optional.dropped == {"rag_context": "error"}
+
+        required = ContextPlan(budget=0, session_factory=FakeSessions())
+        required.add("employee", broken)
+        required.add("churn", sleeper(0), requires=("employee",))
+        with pytest.raises(RuntimeError, match="boom"):
+            await required.run()
+
+    def test_requirements_must_be_planned_first(self):
+        plan = ContextPlan(session_factory=FakeSessions())
+
+        with pytest.raises(ValueError, match="unplanned"):
+            plan.add("churn", sleeper(0), requires=("employee",))
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    """Sessions on a seeded SQLite database shared by every piece."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        db.add_all([
+            HRDataInput(
+                hr_code="EMP001", dataset_id="ds-1", full_name="Ada Park", structure_name="Sales",
+                position="Account Executive", status="Active", manager_id="MGR1", tenure=2.5,
+                employee_cost=60000, report_date=date(2026, 9, 1), additional_data={"performance_rating": 4},
+            ),
+            ChurnOutput(hr_code="EMP001", dataset_id="ds-1", resign_proba=0.71, model_version="v3"),
+            ChurnReasoning(
+                hr_code="EMP001", churn_risk=0.71, stage="Disengaged",
+                ml_contributors=json.dumps([{"feature": "overtime", "importance": 0.3}]),
+            ),
+            TreatmentDefinition(name="Flexible hours", base_cost=0, is_active=1, targeted_variables_json='["overtime"]'),
+            TreatmentDefinition(name="Bonus", base_cost=5000, is_active=1, targeted_variables_json='["salary"]'),
+        ])
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+
+class TestGatherContext:
+    """Test IntelligentChatbotService.gather_context on a real database."""
+
+    @pytest.fixture
+    def service(self, monkeypatch, sessions) -> IntelligentChatbotService:
+        # The RAG service (vector store) is replaced by a slow stand-in
+        monkeypatch.setattr("app.services.ai.intelligent_chatbot.RAGService", MagicMock())
+        service = IntelligentChatbotService(MagicMock(), session_factory=sessions)
+
+        async def slow_retrieval(**kwargs):
+            await asyncio.sleep(5)
+
+        service.rag_service.retrieve_context = AsyncMock(side_effect=slow_retrieval)
+        with patch.object(cache_module, "_cache", InMemoryCache()):
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_retention_plan_context(self, monkeypatch, service):
+        monkeypatch.setattr("app.core.config.settings.CHAT_CONTEXT_PIECE_TIMEOUT_SECONDS", 0.1)
+
+        started = time.perf_counter()
+        context = await service.gather_context(PatternType.RETENTION_PLAN, {"hr_code": "EMP001"}, "ds-1")
+
+        assert time.perf_counter() - started < 2
+        assert context["employee"]["full_name"] == "Ada Park"
+        assert context["additional_data"] == {"performance_rating": 4}
+        assert context["churn"]["model_version"] == "v3"
+        assert context["reasoning"]["stage"] == "Disengaged"
+        assert [t["name"] for t in context["treatments"]] == ["Flexible hours", "Bonus"]
+        assert context["treatments"][0]["relevance_score"] == 1.0
+        assert context["company_overview"] is not None
+        assert "rag_context" not in context
+
+    @pytest.mark.asyncio
+    async def test_unknown_employee_has_no_employee_context(self, service):
+        context = await service.gather_context(PatternType.EMPLOYEE_INFO, {"hr_code": "NOPE01"}, "ds-1")
+
+        assert "employee" not in context
+        assert "churn" not in context and "reasoning" not in context
@@ -0,0 +1,258 @@
+"""
+Tests for app/core/cache.py - In-memory LRU/TTL cache and single-flight loading.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import (
+    InMemoryCache,
+    RedisCache,
+    bump_dataset_version,
+    cached,
+    dataset_cache_key,
+)
+
+
+class FakeClock:
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drive both monotonic (entry TTL) and wall time (freshness) by hand."""
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=fake, time=fake))
+    return fake
+
+
+class TestInMemoryCache:
+    """Test LRU and TTL behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """Reading a key should protect it from eviction."""
+        cache = InMemoryCache(max_size=3, shards=1)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key)
+
+        await cache.get("a")
+        await cache.set("d", "d")
+
+        assert await cache.get("b") is None
+        assert [await cache.get(k) for k in ("a", "c", "d")] == ["a", "c", "d"]
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, clock):
+        """Expired keys should be unreadable and purged on later writes."""
+        cache = InMemoryCache(max_size=10, shards=1)
+        await cache.set("short", "1", ttl=5)
+        await cache.set("long", "2", ttl=50)
+
+        clock.now += 10
+        assert await cache.get("short") is None
+        assert await cache.get("long") == "2"
+
+        await cache.set("short-again", "3", ttl=5)
+        clock.now += 6
+        await cache.set("other", "4")
+        assert len(cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_rewritten_key_keeps_new_ttl(self, clock):
+        """A stale heap entry from an earlier set must not expire the new value."""
+        cache = InMemoryCache(max_size=10, shards=1)
+        await cache.set("k", "old", ttl=5)
+        await cache.set("k", "new", ttl=100)
+
+        clock.now += 10
+        await cache.set("other", "x")
+
+        assert await cache.get("k") == "new"
+
+    @pytest.mark.asyncio
+    async def test_clear_pattern_uses_glob(self):
+        cache = InMemoryCache()
+        await cache.set("permissions:user:1", "a")
+        await cache.set("permissions:user:2", "b")
+        await cache.set("dashboard:1", "c")
+
+        assert await cache.clear_pattern("permissions:user:*") == 2
+        assert await cache.exists("dashboard:1")
+
+    @pytest.mark.asyncio
+    async def test_counters_survive_eviction(self):
+        """incr counters must stay monotonic however full the LRU gets."""
+        cache = InMemoryCache(max_size=2, shards=1)
+        assert await cache.incr("version") == 1
+        for i in range(10):
+            await cache.set(f"k{i}", "x")
+
+        assert await cache.get("version") == "1"
+        assert await cache.incr("version") == 2
+
+
+class TestGetOrCompute:
+    """Test single-flight loading and stale-while-revalidate."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        """N concurrent misses should run the loader once."""
+        cache = InMemoryCache()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        results = await asyncio.gather(*[cache.get_or_compute("k", loader, ttl=60) for _ in range(20)])
+
+        assert calls == 1
+        assert results == [{"value": 42}] * 20
+        assert await cache.get_or_compute("k", loader, ttl=60) == {"value": 42}
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self, clock):
+        """After ttl the old value is returned at once and refreshed in the background."""
+        cache = InMemoryCache()
+        versions = iter([1, 2])
+        refreshed = asyncio.Event()
+
+        async def loader():
+            return next(versions)
+
+        async def refresh():
+            value = await loader()
+            refreshed.set()
+            return value
+
+        assert await cache.get_or_compute("k", loader, ttl=10, stale_ttl=60) == 1
+        clock.now += 20
+
+        assert await cache.get_or_compute("k", loader, ttl=10, stale_ttl=60, refresh_loader=refresh) == 1
+        await asyncio.wait_for(refreshed.wait(), 1)
+        await asyncio.sleep(0)
+        assert await cache.get_or_compute("k", loader, ttl=10, stale_ttl=60) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_load_propagates_and_is_not_cached(self):
+        cache = InMemoryCache()
+
+        async def failing():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", failing, ttl=60)
+        assert await cache.get("k") is None
+
+
+class TestCachedDecorator:
+    """Test the @cached decorator."""
+
+    @pytest.mark.asyncio
+    async def test_decorator_coalesces_concurrent_calls(self):
+        """Concurrent calls with the same arguments should execute once."""
+        backend = InMemoryCache()
+        calls = []
+
+        @cached(ttl=60, prefix="test")
+        async def expensive(x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            return {"x": x}
+
+        with patch.object(cache_module, "_cache", backend):
+            results = await asyncio.gather(expensive(1), expensive(1), expensive(2))
+
+        assert sorted(calls) == [1, 2]
+        assert results == [{"x": 1}, {"x": 1}, {"x": 2}]
+        stored = await backend.get(f"test:expensive:{cache_module.cache_key(1)}")
+        assert json.loads(stored)["v"] == {"x": 1}
+
+
+class TestDatasetVersions:
+    """Test dataset-versioned keys."""
+
+    @pytest.mark.asyncio
+    async def test_bump_retires_every_key_for_the_dataset(self):
+        """After a bump, keys resolve to a new namespace; other datasets are untouched."""
+        backend = InMemoryCache()
+        with patch.object(cache_module, "_cache", backend):
+            overview = await dataset_cache_key("company_overview", "ds-1")
+            snapshot = await dataset_cache_key("dept_snapshot", "ds-1", "Sales")
+            other = await dataset_cache_key("company_overview", "ds-2")
+            await backend.set(overview, "old")
+
+            assert await bump_dataset_version("ds-1") == 1
+
+            assert await dataset_cache_key("company_overview", "ds-1") != overview
+            assert await dataset_cache_key("dept_snapshot", "ds-1", "Sales") != snapshot
+            assert await dataset_cache_key("company_overview", "ds-2") == other
+            assert await backend.get(await dataset_cache_key("company_overview", "ds-1")) is None
+
+
+class TestLRUIndex:
+    """Test capped LRU indexes over cache keys."""
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_touched_keys(self):
+        cache = InMemoryCache()
+        for key in ("a", "b", "c"):
+            await cache.set(key, key)
+            await cache.lru_touch("index", key)
+        await cache.lru_touch("index", "a")
+
+        assert await cache.lru_evict("index", 2) == ["b"]
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "a"
+        assert await cache.lru_evict("index", 2) == []
+
+    @pytest.mark.asyncio
+    async def test_redis_pops_the_coldest_keys(self):
+        client = MagicMock()
+        client.zcard = AsyncMock(return_value=5)
+        client.zpopmin = AsyncMock(return_value=[("k1", 1.0), ("k2", 2.0)])
+        client.unlink = AsyncMock(return_value=2)
+        cache = RedisCache("redis://unused")
+        cache._redis, cache._connected = client, True
+
+        assert await cache.lru_evict("index", 3) == ["k1", "k2"]
+        client.zpopmin.assert_awaited_once_with("index", 2)
+        client.unlink.assert_awaited_once_with("k1", "k2")
+
+
+class TestRedisClearPattern:
+    """Test pattern deletes against a mocked client."""
+
+    @pytest.mark.asyncio
+    async def test_uses_scan_and_unlink_in_batches(self):
+        """KEYS must never be called; matches are unlinked in pages."""
+        keys = [f"dashboard:{i}" for i in range(5)]
+
+        async def scan_iter(match, count):
+            for key in keys:
+                yield key
+
+        client = MagicMock()
+        client.scan_iter = scan_iter
+        client.unlink = AsyncMock(side_effect=lambda *batch: len(batch))
+        client.keys = AsyncMock(side_effect=AssertionError("KEYS used"))
+        cache = RedisCache("redis://unused")
+        cache._redis, cache._connected = client, True
+
+        with patch.object(cache_module, "SCAN_BATCH_SIZE", 2):
+            removed = await cache.clear_pattern("dashboard:*")
+
+        assert removed == 5
+        assert [len(call.args) for call in client.unlink.await_args_list] == [2, 2, 1]
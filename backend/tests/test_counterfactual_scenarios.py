@@ -0,0 +1,214 @@
+"""
+Tests for the single-matrix counterfactual scenario engine.
+"""
+import importlib
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from app.schemas.churn import ChurnPredictionRequest
+from app.services.analytics.eltv_service import ELTVService
+from app.services.ml.model_registry import ModelBundle, ModelRegistry
+from app.services.treatments.treatment_mapping_service import TreatmentFeatureMapping
+
+BASE_FEATURES = {
+    "satisfaction_level": 0.35,
+    "last_evaluation": 0.7,
+    "number_project": 5,
+    "average_monthly_hours": 240,
+    "time_spend_company": 4,
+    "work_accident": False,
+    "promotion_last_5years": False,
+    "department": "sales",
+    "salary_level": "low",
+}
+
+SCENARIOS = [
+    {"name": "Improve Satisfaction", "modifications": {"satisfaction_level": 0.8}},
+    {"name": "Reduce Workload", "modifications": {"average_monthly_hours": 160}},
+    {"name": "Promote", "modifications": {"promotion_last_5years": True, "salary_level": "high"}},
+]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Churn service with a small fitted XGBoost bundle for dataset ds-1."""
+    cp = importlib.import_module("app.services.ml.churn_prediction_service")
+    monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+    monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+
+    rng = np.random.default_rng(5)
+    n = 300
+    frame = pd.DataFrame({
+        "satisfaction_level": rng.random(n),
+        "last_evaluation": rng.random(n),
+        "number_project": rng.integers(2, 7, n),
+        "average_monthly_hours": rng.integers(120, 300, n),
+        "time_spend_company": rng.integers(1, 10, n),
+        "work_accident": rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+        "department": rng.choice(["sales", "IT"], n),
+        "salary_level": rng.choice(["low", "medium", "high"], n),
+    })
+    encoders = {
+        "department": LabelEncoder().fit(["sales", "IT", "unknown"]),
+        "salary_level": LabelEncoder().fit(["low", "medium", "high"]),
+    }
+    matrix = np.column_stack([
+        frame[c].astype(float).values for c in frame.columns[:7]
+    ] + [
+        encoders["department"].transform(frame["department"]),
+        encoders["salary_level"].transform(frame["salary_level"]),
+    ])
+    scaler = StandardScaler().fit(matrix)
+    y = ((frame["satisfaction_level"] < 0.45) | (frame["average_monthly_hours"] > 260)).astype(int).values
+    model = xgb.XGBClassifier(n_estimators=30, max_depth=3).fit(scaler.transform(matrix), y)
+
+    svc = cp.ChurnPredictionService(registry=ModelRegistry(max_models=2))
+    svc.registry.put(ModelBundle(
+        dataset_id="ds-1", model=model, scaler=scaler, label_encoders=encoders, version="test",
+    ))
+    return svc
+
+
+class TestEltvForProbabilities:
+    """Test the multi-probability ELTV helper."""
+
+    @pytest.mark.parametrize("tenure", [0.5, 2, 6])
+    def test_matches_scalar_eltv(self, tenure):
+        """Each row should reproduce calculate_eltv for the same probability."""
+        eltv = ELTVService()
+        probs = [0.0, 0.2, 0.55, 0.99]
+
+        batch = eltv.calculate_eltv_for_probabilities(90000, probs, tenure, "senior")
+
+        for prob, result in zip(probs, batch):
+            expected = eltv.calculate_eltv(90000, prob, tenure, "senior")
+            assert result.eltv == pytest.approx(expected.eltv)
+            assert result.expected_tenure_months == pytest.approx(expected.expected_tenure_months)
+            assert result.survival_probabilities == pytest.approx(expected.survival_probabilities)
+
+
+class TestCounterfactualScenarioEngine:
+    """Test that all scenarios are scored together and match single predictions."""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_predictions(self, service):
+        """Scenario probabilities and ELTV deltas should match per-row predict_churn."""
+        results = await service.batch_counterfactuals(
+            "E1", BASE_FEATURES, SCENARIOS, dataset_id="ds-1", annual_salary=60000
+        )
+
+        baseline = await service.predict_churn(
+            ChurnPredictionRequest(features=service._apply_counterfactual_modifications(BASE_FEATURES, {})),
+            dataset_id="ds-1",
+        )
+        assert [r.scenario_name for r in results] == [s["name"] for s in SCENARIOS]
+        for result, scenario in zip(results, SCENARIOS):
+            single = await service.predict_churn(
+                ChurnPredictionRequest(features=service._apply_counterfactual_modifications(
+                    BASE_FEATURES, scenario["modifications"]
+                )),
+                dataset_id="ds-1",
+            )
+            assert result.baseline_churn_prob == pytest.approx(baseline.churn_probability, abs=1e-6)
+            assert result.scenario_churn_prob == pytest.approx(single.churn_probability, abs=1e-6)
+            assert result.scenario_confidence == pytest.approx(single.confidence_score, abs=1e-5)
+            assert result.churn_delta == pytest.approx(single.churn_probability - baseline.churn_probability, abs=1e-6)
+            assert result.prediction_method == "model"
+            assert result.scenario_factors
+
+    @pytest.mark.asyncio
+    async def test_category_case_does_not_change_the_score(self, service):
+        """Categories are matched case-insensitively, as in single-row scoring."""
+        scenarios = [
+            {"name": "lower", "modifications": {"department": "it", "salary_level": "high"}},
+            {"name": "mixed", "modifications": {"department": "It", "salary_level": "HIGH"}},
+        ]
+        lower, mixed = await service.batch_counterfactuals(
+            "E1", BASE_FEATURES, scenarios, dataset_id="ds-1", annual_salary=60000
+        )
+        single = await service.predict_churn(
+            ChurnPredictionRequest(features=service._apply_counterfactual_modifications(
+                BASE_FEATURES, scenarios[1]["modifications"]
+            )),
+            dataset_id="ds-1",
+        )
+
+        assert mixed.scenario_churn_prob == pytest.approx(lower.scenario_churn_prob, abs=1e-9)
+        assert mixed.scenario_churn_prob == pytest.approx(single.churn_probability, abs=1e-6)
+
+    @pytest.mark.asyncio
+    async def test_predicts_all_rows_in_one_call(self, service, monkeypatch):
+        """Baselines and scenarios for several employees should be one scoring call."""
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        calls = []
+        original = service.predict_frame_columnar
+
+        async def recording(frame, *args, **kwargs):
+            calls.append(len(frame))
+            return await original(frame, *args, **kwargs)
+
+        monkeypatch.setattr(service, "predict_frame_columnar", recording)
+        other = dict(BASE_FEATURES, satisfaction_level=0.9, average_monthly_hours=150)
+
+        results = await service.run_counterfactual_cases([
+            cp.CounterfactualCase("E1", BASE_FEATURES, SCENARIOS, 60000),
+            cp.CounterfactualCase("E2", other, SCENARIOS[:1], 90000),
+        ], dataset_id="ds-1")
+
+        assert calls == [4 + 2]
+        assert [len(r) for r in results] == [3, 1]
+        single = await service.simulate_counterfactual(
+            "E2", other, SCENARIOS[0]["modifications"], dataset_id="ds-1", annual_salary=90000
+        )
+        assert results[1][0].scenario_churn_prob == pytest.approx(single.scenario_churn_prob)
+        assert results[1][0].eltv_delta == pytest.approx(single.eltv_delta)
+
+
+class TestCompareTreatmentsMl:
+    """Test multi-treatment comparison through the scenario engine."""
+
+    @pytest.mark.asyncio
+    async def test_unknown_treatment_reported_and_known_scored(self, service, monkeypatch):
+        """Known treatments should be scored together; unknown ones get an error entry."""
+        from app.services.treatments import treatment_service as ts
+
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp, "churn_prediction_service", service)
+
+        async def get_mapping(db, treatment_id):
+            if treatment_id == 99:
+                raise ValueError("Treatment 99 not found")
+            return TreatmentFeatureMapping(
+                treatment_id=treatment_id,
+                treatment_name=f"T{treatment_id}",
+                feature_modifications={"satisfaction_level": 0.5 + 0.1 * treatment_id},
+                estimated_cost=1000.0,
+                description="",
+            )
+
+        monkeypatch.setattr(ts.treatment_mapping_service, "get_treatment_feature_mapping", get_mapping)
+        employee = SimpleNamespace(
+            hr_code="E1", employee_cost=60000, tenure=4, structure_name="sales", position="Analyst",
+        )
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(scalar_one_or_none=MagicMock(return_value=employee)))
+        engine = AsyncMock(wraps=service.run_counterfactual_cases)
+        monkeypatch.setattr(service, "run_counterfactual_cases", engine)
+
+        results = await ts.treatment_validation_service.compare_treatments_ml(db, "E1", [1, 99, 3])
+
+        assert engine.await_count == 1
+        assert [r["treatment_id"] for r in results] == [1, 99, 3]
+        assert "error" in results[1]
+        assert results[0]["pre_churn_probability"] == results[2]["pre_churn_probability"]
+        assert results[2]["feature_modifications"] == {"satisfaction_level": pytest.approx(0.8)}
+        assert results[0]["treatment_effect_eltv"] == pytest.approx(
+            results[0]["eltv_post_treatment"] - results[0]["eltv_pre_treatment"]
+        )
@@ -0,0 +1,95 @@
+"""
+Tests for vectorized workforce ELTV in app/services/analytics/eltv_service.py.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.analytics.eltv_service import ELTVService
+
+SALARY_RANGES = {
+    "min": 30000, "p10": 38000, "p25": 45000, "p50": 60000,
+    "p75": 80000, "p90": 110000, "max": 200000,
+}
+
+
+@pytest.fixture
+def eltv(monkeypatch):
+    """ELTV service whose thresholds know the employee_cost distribution."""
+    service = ELTVService()
+    thresholds = SimpleNamespace(feature_ranges={"employee_cost": SALARY_RANGES})
+    monkeypatch.setattr(service.thresholds_service, "get_cached_thresholds", lambda dataset_id=None: thresholds)
+    return service
+
+
+@pytest.fixture
+def workforce():
+    rng = np.random.default_rng(7)
+    n = 200
+    return {
+        "salaries": rng.uniform(30000, 180000, n),
+        "churn": rng.random(n),
+        "tenures": rng.uniform(0, 10, n),
+        "positions": rng.choice(["Senior Engineer", "Intern", "Head of Sales", "Analyst", None], n).tolist(),
+    }
+
+
+class TestCalculateEltvBatch:
+    """Test the batch ELTV API against the scalar calculation."""
+
+    def test_matches_scalar_eltv(self, eltv, workforce):
+        """Every row should reproduce calculate_eltv for the same inputs."""
+        levels = [None, "senior", "Employee", "executive"] * 50
+
+        batch = eltv.calculate_eltv_batch(
+            workforce["salaries"], workforce["churn"], workforce["tenures"], levels
+        )
+
+        for i in range(len(batch)):
+            expected = eltv.calculate_eltv(
+                workforce["salaries"][i], workforce["churn"][i], workforce["tenures"][i], levels[i]
+            )
+            assert batch.eltv[i] == pytest.approx(expected.eltv)
+            assert batch.expected_tenure_months[i] == pytest.approx(expected.expected_tenure_months)
+            assert batch.replacement_cost[i] == pytest.approx(expected.replacement_cost)
+            assert batch.revenue_multiplier[i] == expected.revenue_multiplier
+
+    def test_survival_stored_as_float32(self, eltv, workforce):
+        """Curves are a compact float32 matrix; dicts are built on demand."""
+        batch = eltv.calculate_eltv_batch(workforce["salaries"], workforce["churn"], workforce["tenures"])
+
+        assert batch.survival.dtype == np.float32
+        assert batch.survival.shape == (len(workforce["churn"]), eltv.horizon_months)
+        expected = eltv.calculate_eltv(workforce["salaries"][3], workforce["churn"][3], workforce["tenures"][3])
+        assert batch.survival_probabilities(3) == pytest.approx(expected.survival_probabilities, rel=1e-6)
+
+    def test_scalars_broadcast(self, eltv):
+        """A single salary/tenure should pair with many probabilities."""
+        batch = eltv.calculate_eltv_batch(70000, [0.1, 0.5], 2, "mid")
+
+        assert len(batch) == 2
+        assert batch.eltv[0] > batch.eltv[1]
+
+    def test_empty_workforce(self, eltv):
+        """No employees should give empty arrays."""
+        batch = eltv.calculate_eltv_batch([], [], [])
+
+        assert len(batch) == 0
+        assert batch.survival.shape == (0, eltv.horizon_months)
+
+
+class TestEstimatePositionLevels:
+    """Test vectorized position level estimation."""
+
+    def test_matches_scalar_estimate(self, eltv, workforce):
+        """Titles win over salary percentiles, as in estimate_position_level."""
+        salaries = workforce["salaries"].tolist()
+        salaries[0] = None
+
+        levels = eltv.estimate_position_levels(workforce["positions"], salaries)
+
+        assert levels == [
+            eltv.estimate_position_level(position, salary, None)
+            for position, salary in zip(workforce["positions"], salaries)
+        ]
@@ -0,0 +1,62 @@
+"""
+Tests for app/core/executors.py - Shared off-loop executors.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executors import OffloadPool, run_cpu
+from app.core.metrics import EXECUTOR_QUEUE_DEPTH
+from app.core.spans import end_request, span, start_request
+
+
+class TestOffloadPool:
+    """Test running blocking calls on the shared pools."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_loop_thread(self):
+        loop_thread = threading.get_ident()
+
+        worker_thread = await run_cpu(threading.get_ident)
+
+        assert worker_thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_keeps_request_context(self):
+        """Spans recorded on the pool count towards the calling request."""
+        def work():
+            with span("offloaded"):
+                return 42
+
+        timings, token = start_request({"path": "/x", "route": None})
+        try:
+            assert await run_cpu(work) == 42
+        finally:
+            end_request(token)
+
+        assert timings.stages["offloaded"][1] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_tracks_waiting_jobs(self):
+        pool = OffloadPool("test-depth", max_workers=1)
+        gate = threading.Event()
+        depth = EXECUTOR_QUEUE_DEPTH.labels(pool="test-depth")
+
+        first = asyncio.ensure_future(pool.run(gate.wait))
+        second = asyncio.ensure_future(pool.run(gate.wait))
+        await asyncio.sleep(0.05)
+        assert depth._value.get() == 1
+
+        gate.set()
+        await asyncio.gather(first, second)
+        assert depth._value.get() == 0
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self):
+        def fail():
+            raise ValueError("bad input")
+
+        with pytest.raises(ValueError, match="bad input"):
+            await run_cpu(fail)
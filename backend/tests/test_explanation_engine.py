@@ -0,0 +1,159 @@
+"""
+Tests for app/services/ml/explanation_engine.py - Vectorized batch explanations.
+"""
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from app.services.ml.explanation_engine import (
+    factors_for_row,
+    impact_codes,
+    impact_levels,
+    native_contributions,
+    select_top_factors,
+)
+
+THRESHOLDS = {"critical": 0.3, "high": 0.15, "medium": 0.05, "low": 0.02}
+
+
+@pytest.fixture(scope="module")
+def xgb_model_and_data():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 4))
+    y = (X[:, 0] + 0.5 * X[:, 2] + 0.2 * rng.random(300) > 0.9).astype(int)
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+    return model, X
+
+
+class TestNativeContributions:
+    """Test booster-native contribution extraction."""
+
+    def test_xgboost_contributions_match_margin(self, xgb_model_and_data):
+        """Contributions plus bias should reproduce the model's log-odds margin."""
+        model, X = xgb_model_and_data
+        contributions = native_contributions(model, X)
+
+        assert contributions.shape == X.shape
+        margin = model.get_booster().predict(xgb.DMatrix(X), output_margin=True)
+        full = model.get_booster().predict(xgb.DMatrix(X), pred_contribs=True)
+        np.testing.assert_allclose(contributions.sum(axis=1) + full[:, -1], margin, rtol=1e-4, atol=1e-4)
+
+    def test_approximate_contributions_same_shape(self, xgb_model_and_data):
+        """Approximate contributions should share the exact layout."""
+        model, X = xgb_model_and_data
+        approx = native_contributions(model, X, approximate=True)
+
+        assert approx.shape == X.shape
+
+    def test_logistic_contributions_are_linear_shap(self):
+        """Logistic regression contributions should be coef * standardized input."""
+        X = np.random.default_rng(1).standard_normal((50, 3))
+        model = LogisticRegression().fit(X, (X[:, 0] > 0).astype(int))
+
+        np.testing.assert_allclose(native_contributions(model, X), X * model.coef_[0])
+
+    def test_unsupported_model_returns_none(self):
+        """Models without native contributions should fall back to SHAP."""
+        X = np.random.default_rng(1).random((50, 3))
+        model = RandomForestClassifier(n_estimators=5).fit(X, (X[:, 0] > 0.5).astype(int))
+
+        assert native_contributions(model, X) is None
+
+
+class TestVectorizedFactors:
+    """Test top-k selection and impact levels."""
+
+    def test_select_top_factors_orders_by_magnitude(self):
+        """Top factors should be ordered by descending absolute contribution."""
+        contributions = np.array([
+            [0.1, -0.5, 0.3, 0.0],
+            [0.0, 0.02, -0.01, 0.9],
+        ])
+        idx, vals = select_top_factors(contributions, k=2)
+
+        assert idx.tolist() == [[1, 2], [3, 1]]
+        np.testing.assert_allclose(vals, [[-0.5, 0.3], [0.9, 0.02]])
+
+    def test_impact_levels_match_scalar_thresholds(self):
+        """searchsorted levels should match the thresholds service's boundaries."""
+        values = np.array([0.5, -0.3, 0.2, 0.05, -0.03, 0.001])
+        levels = impact_levels(values, THRESHOLDS)
+
+        assert levels.tolist() == ["critical", "critical", "high", "medium", "low", "minimal"]
+
+    def test_factors_for_row_skips_negligible_and_padding(self):
+        """Contributions at or below 0.01 and padded slots should not be reported."""
+        indices = np.array([0, 2, 1, -1])
+        values = np.array([0.4, -0.2, -0.005, 0.0])
+        raw_row = np.array([0.1, 3, "sales"], dtype=object)
+
+        factors = factors_for_row(
+            indices, values, impact_codes(values, THRESHOLDS), raw_row,
+            ["satisfaction_level", "number_project", "department"],
+            lambda name, value, shap_val: f"{name}={value}",
+        )
+
+        assert [f["feature"] for f in factors] == ["satisfaction_level", "department"]
+        assert factors[1]["direction"] == "decreases_risk"
+        assert factors[1]["impact"] == "high"
+        assert factors[1]["message"] == "department=sales"
+
+
+class TestFrameBatchExplanations:
+    """Test that predict_frame_batch uses the vectorized explanation path."""
+
+    @pytest.mark.asyncio
+    async def test_frame_batch_factors_from_native_contributions(self, tmp_path, monkeypatch):
+        """Batch factors should match per-row contributions from the booster."""
+        import importlib
+
+        import pandas as pd
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+        from app.services.ml.model_registry import ModelBundle, ModelRegistry
+
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+
+        rng = np.random.default_rng(2)
+        n = 200
+        frame = pd.DataFrame({
+            "satisfaction_level": rng.random(n),
+            "last_evaluation": rng.random(n),
+            "number_project": rng.integers(2, 7, n),
+            "average_monthly_hours": rng.integers(120, 300, n),
+            "time_spend_company": rng.integers(1, 10, n),
+            "work_accident": rng.integers(0, 2, n),
+            "promotion_last_5years": rng.integers(0, 2, n),
+            "department": rng.choice(["sales", "IT"], n),
+            "salary_level": rng.choice(["low", "high"], n),
+        })
+        encoders = {
+            "department": LabelEncoder().fit(["sales", "IT", "unknown"]),
+            "salary_level": LabelEncoder().fit(["low", "medium", "high"]),
+        }
+        matrix = np.column_stack([
+            frame[c].astype(float).values for c in frame.columns[:7]
+        ] + [
+            encoders["department"].transform(frame["department"]),
+            encoders["salary_level"].transform(frame["salary_level"]),
+        ])
+        scaler = StandardScaler().fit(matrix)
+        y = (frame["satisfaction_level"] < 0.4).astype(int).values
+        model = xgb.XGBClassifier(n_estimators=15, max_depth=3).fit(scaler.transform(matrix), y)
+
+        service = cp.ChurnPredictionService(registry=ModelRegistry(max_models=2))
+        service.registry.put(ModelBundle(
+            dataset_id="ds-1", model=model, scaler=scaler, label_encoders=encoders, version="test",
+        ))
+
+        results = await service.predict_frame_batch(frame, dataset_id="ds-1")
+
+        expected = native_contributions(model, scaler.transform(matrix))
+        top_feature = service.FEATURE_NAMES[int(np.argmax(np.abs(expected[0])))]
+        assert len(results) == n
+        assert results[0].contributing_factors[0]["feature"] == top_feature
+        assert len(results[0].contributing_factors) <= 5
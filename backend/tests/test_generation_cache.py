@@ -0,0 +1,161 @@
+"""
+Tests for app/services/ai/generation_cache.py - Cached one-off LLM generations.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import InMemoryCache, bump_dataset_version
+from app.core.config import settings
+from app.core.metrics import GENERATION_CACHE_REQUESTS
+from app.services.ai.chatbot_service import ChatbotService
+from app.services.ai.generation_cache import (
+    GenerationScope,
+    cached_generation,
+    generation_digest,
+    invalidate_employee_generations,
+    purge_employee_generations,
+)
+
+TREATMENTS = '[{"name": "Mentorship", "type": "non-material", "description": "Pair with a mentor."}]'
+SCOPE = GenerationScope("treatments", "1", dataset_id="ds-1", hr_code="EMP001", expect_json="array")
+
+
+def messages(risk: float = 0.72):
+    return [
+        {"role": "system", "content": "You are an HR strategist."},
+        {"role": "user", "content": f"Employee EMP001, churn risk {risk:.0%}. Suggest treatments."},
+    ]
+
+
+def requests(result: str) -> float:
+    return GENERATION_CACHE_REQUESTS.labels(kind="treatments", result=result)._value.get()
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    backend = InMemoryCache()
+    with patch.object(cache_module, "_cache", backend):
+        yield backend
+
+
+@pytest.fixture
+def service(monkeypatch) -> ChatbotService:
+    monkeypatch.setattr(settings, "PII_MASKING_ENABLED", False)
+    service = ChatbotService(MagicMock())
+    service._get_llm_response = AsyncMock(return_value=(TREATMENTS, {}))
+    return service
+
+
+async def generate(service: ChatbotService, scope: GenerationScope = SCOPE, risk: float = 0.72) -> str:
+    return await service.generate_response(
+        messages(risk), model="gemma3:4b", temperature=0.8, max_tokens=2048, cache_scope=scope
+    )
+
+
+class TestGenerateResponseCache:
+    """Test ChatbotService.generate_response with a cache scope."""
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_the_llm(self, service):
+        hits = requests("hit")
+
+        assert await generate(service) == TREATMENTS
+        assert await generate(service) == TREATMENTS
+
+        assert service._get_llm_response.await_count == 1
+        assert requests("hit") == hits + 1
+
+    @pytest.mark.asyncio
+    async def test_changed_prompt_inputs_miss(self, service):
+        await generate(service)
+        await generate(service, risk=0.35)
+        await generate(service, scope=GenerationScope("treatments", "2", "ds-1", "EMP001"))
+
+        assert service._get_llm_response.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_employee_and_dataset_invalidation(self, service):
+        await generate(service)
+        await invalidate_employee_generations("EMP001")
+        await generate(service)
+        await bump_dataset_version("ds-1")
+        await generate(service)
+        await generate(service)
+
+        assert service._get_llm_response.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unparseable_response_is_not_stored(self, service):
+        service._get_llm_response.return_value = ("Sorry, I cannot help with that.", {})
+
+        assert await generate(service) == "Sorry, I cannot help with that."
+        await generate(service)
+
+        assert service._get_llm_response.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_always_calls_the_llm(self, monkeypatch, service):
+        monkeypatch.setattr(settings, "GENERATION_CACHE_ENABLED", False)
+
+        await generate(service)
+        await generate(service)
+
+        assert service._get_llm_response.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cloud_key_covers_masked_messages(self, monkeypatch, service):
+        monkeypatch.setattr(settings, "PII_MASKING_ENABLED", True)
+        service._percentiles_loaded = True
+        seen = {}
+
+        async def fake_cached(scope, sent, model, temperature, max_tokens, produce):
+            seen["messages"] = sent
+            return await produce()
+
+        monkeypatch.setattr("app.services.ai.chatbot_service.cached_generation", fake_cached)
+        await service.generate_response(
+            [{"role": "user", "content": "Draft an email to employee EMP000123"}],
+            model="gpt-5-mini-2025-08-07",
+            cache_scope=SCOPE,
+        )
+
+        assert seen["messages"][0]["content"] == "Draft an email to employee [ID_001]"
+
+
+class TestCachedGeneration:
+    """Test keys and the LRU cap."""
+
+    def test_digest_is_canonical(self):
+        reordered = [{"content": m["content"], "role": m["role"]} for m in messages()]
+
+        assert generation_digest(SCOPE, messages(), "m", 0.7, 100) == generation_digest(SCOPE, reordered, "m", 0.7, 100)
+        assert generation_digest(SCOPE, messages(), "m", 0.7, 100) != generation_digest(SCOPE, messages(), "m", 0.8, 100)
+
+    @pytest.mark.asyncio
+    async def test_purge_deletes_only_that_employees_generations(self, cache):
+        produce = AsyncMock(return_value=TREATMENTS)
+        for hr_code in ("EMP001", "EMP002"):
+            scope = GenerationScope("treatments", "1", "ds-1", hr_code)
+            await cached_generation(scope, messages(), "gemma3:4b", 0.8, 2048, produce)
+
+        assert await purge_employee_generations("EMP001") == 1
+
+        remaining = [k for shard in cache._shards for k in shard.entries if k.startswith("generation:")]
+        assert len(remaining) == 1 and ":EMP002:" in remaining[0]
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entries_are_evicted(self, monkeypatch):
+        monkeypatch.setattr(settings, "GENERATION_CACHE_MAX_ENTRIES", 2)
+        produce = AsyncMock(return_value=TREATMENTS)
+
+        for hr_code in ("EMP001", "EMP002", "EMP001", "EMP003"):
+            scope = GenerationScope("treatments", "1", "ds-1", hr_code)
+            await cached_generation(scope, messages(), "gemma3:4b", 0.8, 2048, produce)
+        assert produce.await_count == 3
+
+        # EMP002 was the coldest when EMP003 arrived
+        await cached_generation(GenerationScope("treatments", "1", "ds-1", "EMP001"), messages(), "gemma3:4b", 0.8, 2048, produce)
+        await cached_generation(GenerationScope("treatments", "1", "ds-1", "EMP002"), messages(), "gemma3:4b", 0.8, 2048, produce)
+        assert produce.await_count == 4
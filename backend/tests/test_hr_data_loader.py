@@ -0,0 +1,155 @@
+"""
+Tests for app/services/data/hr_data_loader.py - Bulk hr_data_input hydration.
+"""
+import json
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.hr_data import HRDataInput
+from app.services.data.hr_data_loader import (
+    HR_DATA_COLUMNS,
+    STAGING_TABLE,
+    HRDataHydrationService,
+    HRDataMappingError,
+    _copy_into_postgres,
+    bulk_load_hr_data,
+    prepare_hr_records,
+)
+
+HR_TABLE = HRDataInput.__table__
+
+
+@pytest.fixture
+def dataset_frame():
+    return pd.DataFrame({
+        "Employee ID": ["E1", "E2", "E3", "E1"],
+        "full_name": ["Ann", "Bob", "Cy", "Ann again"],
+        "structure_name": ["Sales", "IT", "IT", "Sales"],
+        "position": ["Rep", "Dev", "Dev", "Rep"],
+        "status": ["Active", None, "Resigned", "Active"],
+        "manager_id": [7.0, None, 7.0, 7.0],
+        "tenure": [1.5, None, 3, 1.5],
+        "employee_cost": [50000, None, "n/a", 50000],
+        "report_date": ["2024-03-31", "31/03/2024", None, "2024-03-31"],
+        "termination_date": [None, None, "2024-02-29", None],
+    })
+
+
+@pytest.fixture
+async def session_factory():
+    """In-memory SQLite sessions with only hr_data_input."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: HR_TABLE.metadata.create_all(sync_conn, tables=[HR_TABLE]))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestPrepareHrRecords:
+    """Test vectorized mapping and coercion."""
+
+    def test_maps_and_coerces_columns(self, dataset_frame):
+        """Values should match the old row-by-row conversion."""
+        records = prepare_hr_records(dataset_frame, {"hr_code": "Employee ID"}, "ds-1")
+
+        assert list(records.columns) == list(HR_DATA_COLUMNS)
+        assert records["hr_code"].tolist() == ["E1", "E2", "E3"]
+        assert records["full_name"].tolist() == ["Ann", "Bob", "Cy"]
+        assert records["status"].tolist() == ["Active", "Active", "Resigned"]
+        assert records["manager_id"].tolist() == ["7.0", None, "7.0"]
+        assert records["tenure"].tolist() == [1.5, 0.0, 3.0]
+        assert records["employee_cost"].tolist() == [50000.0, None, None]
+        assert records["termination_date"].tolist() == [None, None, date(2024, 2, 29)]
+        assert records["additional_data"].tolist() == [None, None, None]
+
+    def test_unparseable_report_dates_default_to_today(self, dataset_frame):
+        """Only YYYY-MM-DD parses; other report dates fall back to today."""
+        records = prepare_hr_records(dataset_frame, {"hr_code": "Employee ID"}, "ds-1")
+
+        today = pd.Timestamp.utcnow().date()
+        assert records["report_date"].tolist() == [date(2024, 3, 31), today, today]
+
+    def test_missing_required_columns(self, dataset_frame):
+        with pytest.raises(HRDataMappingError, match="hr_code"):
+            prepare_hr_records(dataset_frame, {}, "ds-1")
+
+
+class TestBulkLoad:
+    """Test the load paths."""
+
+    @pytest.mark.asyncio
+    async def test_insert_fallback_skips_existing_rows(self, dataset_frame, session_factory):
+        """Re-running a load should not duplicate or overwrite rows."""
+        records = prepare_hr_records(dataset_frame, {"hr_code": "Employee ID"}, "ds-1")
+        progress = []
+
+        async with session_factory() as db:
+            first = await bulk_load_hr_data(
+                db, records, chunk_size=2, progress_callback=lambda done, total: progress.append(done)
+            )
+            second = await bulk_load_hr_data(db, records)
+            await db.commit()
+            count = (await db.execute(select(func.count()).select_from(HR_TABLE))).scalar_one()
+
+        assert (first, second, count) == (3, 0, 3)
+        assert progress == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_postgres_copies_into_staging_then_merges(self, dataset_frame):
+        """asyncpg path should COPY every chunk and merge with one INSERT ... SELECT."""
+        records = prepare_hr_records(dataset_frame, {"hr_code": "Employee ID"}, "ds-1")
+        records["additional_data"] = [{"level": 3}, None, None]
+        driver = MagicMock(copy_records_to_table=AsyncMock())
+        connection = MagicMock(get_raw_connection=AsyncMock(return_value=MagicMock(driver_connection=driver)))
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(rowcount=3))
+        db.connection = AsyncMock(return_value=connection)
+
+        inserted = await _copy_into_postgres(db, records, chunk_size=2, progress_callback=None)
+
+        assert inserted == 3
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert statements[0].startswith(f"CREATE TEMP TABLE {STAGING_TABLE}")
+        assert "ON CONFLICT (hr_code, dataset_id) DO NOTHING" in statements[1]
+        copies = driver.copy_records_to_table.await_args_list
+        assert [len(call.kwargs["records"]) for call in copies] == [2, 1]
+        first_row = copies[0].kwargs["records"][0]
+        assert first_row[0] == "E1"
+        assert json.loads(first_row[-1]) == {"level": 3}
+
+
+class TestHydrationJobs:
+    """Test background job tracking."""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_once_and_reports_progress(self, dataset_frame, session_factory):
+        """A running job should be reused; completion should be visible to pollers."""
+        service = HRDataHydrationService(session_factory=session_factory)
+        records = prepare_hr_records(dataset_frame, {"hr_code": "Employee ID"}, "ds-1")
+
+        job = service.start("ds-1", records)
+        assert service.start("ds-1", records) is job
+
+        finished = await service.wait("ds-1")
+        assert finished.status == "complete"
+        assert finished.to_dict()["rows_inserted"] == 3
+        assert finished.progress == 100
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_error(self, dataset_frame, session_factory):
+        """Database errors should end the job in an error state, not raise."""
+        service = HRDataHydrationService(session_factory=session_factory)
+        records = prepare_hr_records(dataset_frame, {"hr_code": "Employee ID"}, "ds-1")
+        records["full_name"] = None
+
+        job = service.start("ds-1", records)
+        await service.wait("ds-1")
+
+        assert job.status == "error"
+        assert job.error
+        assert not job.running
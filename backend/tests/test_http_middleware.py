@@ -0,0 +1,178 @@
+"""
+Tests for app/core/http_middleware.py - Fused pure-ASGI edge middleware.
+"""
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import Body, FastAPI, File, UploadFile
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.csrf import CSRF_COOKIE_NAME, CSRF_HEADER_NAME
+from app.core.http_middleware import EdgeMiddleware
+from app.core.shutdown import get_shutdown_manager
+
+
+async def echo(request):
+    body = await request.body()
+    return JSONResponse({"size": len(body), "request_id": request.scope["state"]["request_id"]})
+
+
+async def page(request):
+    return HTMLResponse("<p>hi</p>")
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f"chunk{i}\n".encode()
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[
+        Route("/echo", echo, methods=["GET", "POST"]),
+        Route("/page", page),
+        Route("/stream", stream),
+    ])
+    app.add_middleware(EdgeMiddleware, max_size=64)
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.fixture
+def fastapi_client():
+    app = FastAPI()
+
+    @app.post("/json")
+    async def json_body(payload: dict = Body(...)):
+        return {"keys": len(payload)}
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(EdgeMiddleware, max_size=100)
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+class TestEdgeMiddleware:
+    """Test the checks and header rewriting done in one pass."""
+
+    @pytest.mark.asyncio
+    async def test_safe_request_gets_headers_and_csrf_cookie(self, client):
+        async with client:
+            response = await client.get("/echo")
+
+        assert response.status_code == 200
+        assert response.headers["x-frame-options"] == "DENY"
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert "content-security-policy" not in response.headers
+        assert CSRF_COOKIE_NAME in response.cookies
+        assert response.json()["request_id"]
+
+    @pytest.mark.asyncio
+    async def test_html_gets_csp_and_existing_cookie_is_kept(self, client):
+        async with client:
+            response = await client.get("/page", headers={"cookie": f"{CSRF_COOKIE_NAME}=abc"})
+
+        assert "default-src 'self'" in response.headers["content-security-policy"]
+        assert "set-cookie" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_csrf_enforced_on_state_changing_requests(self, client):
+        """Missing or mismatched tokens get a 403; matching or bearer requests pass."""
+        async with client:
+            missing = await client.post("/echo", content=b"x")
+            mismatched = await client.post(
+                "/echo", content=b"x",
+                headers={"cookie": f"{CSRF_COOKIE_NAME}=abc", CSRF_HEADER_NAME: "xyz"},
+            )
+            matching = await client.post(
+                "/echo", content=b"x",
+                headers={"cookie": f"{CSRF_COOKIE_NAME}=abc", CSRF_HEADER_NAME: "abc"},
+            )
+            bearer = await client.post("/echo", content=b"x", headers={"authorization": "Bearer t"})
+
+        assert (missing.status_code, mismatched.status_code) == (403, 403)
+        assert missing.json() == {"detail": "CSRF token validation failed"}
+        assert missing.headers["x-frame-options"] == "DENY"
+        assert (matching.status_code, bearer.status_code) == (200, 200)
+
+    @pytest.mark.asyncio
+    async def test_body_limit_from_content_length_and_stream(self, client):
+        """Oversized bodies are refused whether or not Content-Length is sent."""
+        headers = {"authorization": "Bearer t"}
+
+        async def chunked():
+            for _ in range(10):
+                yield b"0123456789"
+
+        async with client:
+            declared = await client.post("/echo", content=b"x" * 100, headers=headers)
+            streamed = await client.post("/echo", content=chunked(), headers=headers)
+
+        assert declared.status_code == 413
+        assert streamed.status_code == 413
+        assert "Maximum size" in streamed.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_streamed_body_limit_on_fastapi_routes(self, fastapi_client):
+        """FastAPI's body parsing must not turn the overflow into a 400."""
+        headers = {"authorization": "Bearer t"}
+
+        async def chunked():
+            for _ in range(10):
+                yield b'{"k": "' + b"x" * 40 + b'"}'
+
+        multipart = (
+            b"--b\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="a.csv"\r\n'
+            b"Content-Type: text/csv\r\n\r\n"
+            + b"x" * 500
+            + b"\r\n--b--\r\n"
+        )
+
+        async def multipart_chunks():
+            for i in range(0, len(multipart), 50):
+                yield multipart[i:i + 50]
+
+        async with fastapi_client as client:
+            json_response = await client.post("/json", content=chunked(), headers=headers)
+            upload_response = await client.post(
+                "/upload",
+                content=multipart_chunks(),
+                headers={**headers, "content-type": "multipart/form-data; boundary=b"},
+            )
+
+        assert json_response.status_code == 413
+        assert "Maximum size" in json_response.json()["detail"]
+        assert upload_response.status_code == 413
+        assert upload_response.headers["x-frame-options"] == "DENY"
+
+    @pytest.mark.asyncio
+    async def test_streaming_response_passes_through(self, client):
+        async with client:
+            async with client.stream("GET", "/stream") as response:
+                chunks = [chunk async for chunk in response.aiter_bytes()]
+
+        assert b"".join(chunks) == b"chunk0\nchunk1\nchunk2\n"
+        assert response.headers["x-frame-options"] == "DENY"
+
+    @pytest.mark.asyncio
+    async def test_tracks_requests_and_refuses_during_shutdown(self, client):
+        manager = get_shutdown_manager()
+        before = manager.pending_requests
+
+        async with client:
+            await client.get("/echo")
+            assert manager.pending_requests == before
+            with patch.object(type(manager), "shutdown_requested", new=True):
+                response = await client.get("/echo")
+
+        assert response.status_code == 503
+        assert response.headers["connection"] == "close"
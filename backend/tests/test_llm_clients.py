@@ -0,0 +1,139 @@
+"""
+Tests for app/services/ai/llm_clients.py - Pooled LLM provider clients.
+
+Runs ChatbotService against the local stand-in server in tests/utils.
+"""
+import asyncio
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import LLM_RETRIES
+from app.services.ai.chatbot_service import ChatbotService
+from app.services.ai.llm_clients import LLMClientManager, is_retryable
+from tests.utils.llm_stand_in import LLMStandIn
+
+MESSAGES = [{"role": "user", "content": "Hello?"}]
+
+
+def retries(provider: str) -> float:
+    return LLM_RETRIES.labels(provider=provider)._value.get()
+
+
+@pytest.fixture
+def server():
+    with LLMStandIn(reply="Seven employees are at high risk.") as server:
+        yield server
+
+
+@pytest.fixture
+def clients(monkeypatch, server):
+    """Fresh client manager pointed at the stand-in server."""
+    monkeypatch.setattr(settings, "OLLAMA_BASE_URL", server.url)
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", server.url + "/v1")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "PII_MASKING_ENABLED", False)
+    manager = LLMClientManager(max_retries=2, backoff_seconds=0.01)
+    monkeypatch.setattr("app.services.ai.chatbot_service.llm_clients", manager)
+    return manager
+
+
+class TestPooledClients:
+    """Test connection reuse and concurrency limits."""
+
+    @pytest.mark.asyncio
+    async def test_ollama_calls_reuse_one_connection(self, server, clients):
+        service = ChatbotService(MagicMock())
+
+        for _ in range(3):
+            content, usage = await service._call_ollama(MESSAGES, "gemma3:4b", 0.7, None)
+            assert content == "Seven employees are at high risk."
+        await clients.aclose()
+
+        assert server.requests == 3
+        assert len(server.connections) == 1
+        assert usage["completion_tokens"] == 6
+
+    @pytest.mark.asyncio
+    async def test_concurrent_streams_are_bounded_per_provider(self, monkeypatch, server, clients):
+        monkeypatch.setattr(settings, "LLM_MAX_CONCURRENCY_OLLAMA", 2)
+        server.chunk_delay = 0.02
+        service = ChatbotService(MagicMock())
+
+        async def stream_one() -> str:
+            return "".join([d async for d in service.stream_llm_response(MESSAGES, "gemma3:4b")])
+
+        replies = await asyncio.gather(*(stream_one() for _ in range(5)))
+        await clients.aclose()
+
+        assert replies == ["Seven employees are at high risk."] * 5
+        assert server.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_openai_stream_through_stand_in(self, server, clients):
+        service = ChatbotService(MagicMock())
+        metadata = {}
+
+        deltas = [
+            d async for d in service.stream_llm_response(MESSAGES, "gpt-5-mini-2025-08-07", metadata=metadata)
+        ]
+        await clients.aclose()
+
+        assert len(deltas) == 6
+        assert "".join(deltas) == "Seven employees are at high risk."
+        assert metadata["completion_tokens"] == 6
+
+
+class TestRetries:
+    """Test retries of transient provider failures."""
+
+    @pytest.mark.asyncio
+    async def test_transient_failures_are_retried(self, server, clients):
+        server.fail_next(2, status=503)
+        before = retries("ollama")
+
+        content, _ = await ChatbotService(MagicMock())._call_ollama(MESSAGES, "gemma3:4b", 0.7, None)
+        await clients.aclose()
+
+        assert content == "Seven employees are at high risk."
+        assert server.requests == 3
+        assert retries("ollama") == before + 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, server, clients):
+        server.fail_next(3, status=503)
+
+        with pytest.raises(Exception):
+            await ChatbotService(MagicMock())._call_ollama(MESSAGES, "gemma3:4b", 0.7, None)
+        await clients.aclose()
+
+        assert server.requests == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, server, clients):
+        server.fail_next(1, status=400)
+
+        with pytest.raises(Exception):
+            await ChatbotService(MagicMock())._call_ollama(MESSAGES, "gemma3:4b", 0.7, None)
+        await clients.aclose()
+
+        assert server.requests == 1
+
+    def test_is_retryable(self):
+        request = httpx.Request("POST", "http://llm")
+
+        assert is_retryable(ConnectionError("refused"))
+        assert is_retryable(httpx.ConnectError("refused", request=request))
+        assert not is_retryable(httpx.ReadTimeout("slow", request=request))
+        assert not is_retryable(asyncio.TimeoutError())
+        assert not is_retryable(ValueError("bad request"))
+
+    def test_backoff_has_full_jitter_and_a_ceiling(self):
+        manager = LLMClientManager(backoff_seconds=0.5, backoff_max_seconds=2.0)
+
+        delays = [manager.backoff(attempt) for attempt in range(1, 8) for _ in range(20)]
+
+        assert all(0 <= delay <= 2.0 for delay in delays)
+        assert max(manager.backoff(1) for _ in range(50)) <= 0.5
@@ -0,0 +1,159 @@
+"""
+Tests for token-level LLM streaming and incremental PII unmasking.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.config import settings
+from app.services.ai.chatbot_service import ChatbotService
+from app.services.ai.intelligent_chatbot import IntelligentChatbotService
+from app.services.compliance.pii_masking_service import MaskingContext, PIIMaskingService
+
+
+def masking_context() -> MaskingContext:
+    context = MaskingContext()
+    PIIMaskingService().mask_employee_data({"full_name": "John Smith", "hr_code": "EMP000123"}, context)
+    return context
+
+
+class TestStreamUnmasker:
+    """Test StreamUnmasker on chunked responses."""
+
+    def test_placeholders_split_across_chunks(self):
+        unmasker = PIIMaskingService().stream_unmasker(masking_context())
+        chunks = ["Talk to [EMPLOY", "EE_001] (", "[ID_0", "01]) today."]
+
+        emitted = [unmasker.feed(chunk) for chunk in chunks] + [unmasker.flush()]
+
+        assert "".join(emitted) == "Talk to John Smith (EMP000123) today."
+        assert emitted[0] == "Talk to "
+        assert not any("[" in part for part in emitted)
+
+    def test_unrelated_brackets_are_not_held(self):
+        unmasker = PIIMaskingService().stream_unmasker(masking_context())
+
+        assert unmasker.feed("see [1] and [") == "see [1] and "
+        assert unmasker.feed("note]") == "[note]"
+        assert unmasker.flush() == ""
+
+    def test_flush_emits_incomplete_placeholder(self):
+        unmasker = PIIMaskingService().stream_unmasker(masking_context())
+
+        assert unmasker.feed("Ends with [EMP") == "Ends with "
+        assert unmasker.flush() == "[EMP"
+
+
+class TestStreamLLMResponse:
+    """Test ChatbotService.stream_llm_response."""
+
+    @pytest.mark.asyncio
+    async def test_cloud_stream_is_masked_and_unmasked_incrementally(self, monkeypatch):
+        monkeypatch.setattr(settings, "PII_MASKING_ENABLED", True)
+        service = ChatbotService(MagicMock())
+        service._percentiles_loaded = True
+        sent = {}
+
+        async def fake_stream(messages, model, temperature, max_tokens, usage):
+            sent["messages"] = messages
+            for chunk in ["[EMPLOYEE", "_001] is", " at risk"]:
+                yield chunk
+            usage.update({"tokens_used": 12, "prompt_tokens": 9, "completion_tokens": 3})
+
+        service._stream_openai = fake_stream
+        metadata = {}
+        deltas = [
+            delta async for delta in service.stream_llm_response(
+                messages=[{"role": "user", "content": "How is John Smith doing?"}],
+                model="gpt-5-mini-2025-08-07",
+                masking_context=masking_context(),
+                metadata=metadata,
+            )
+        ]
+
+        assert "John Smith" not in sent["messages"][0]["content"]
+        assert "[EMPLOYEE_001]" in sent["messages"][0]["content"]
+        assert deltas == ["John Smith is", " at risk"]
+        assert metadata["provider"] == "openai"
+        assert metadata["pii_masked"] is True
+        assert metadata["tokens_used"] == 12
+
+    @pytest.mark.asyncio
+    async def test_stalled_stream_times_out(self, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_REQUEST_TIMEOUT", 0.05)
+        service = ChatbotService(MagicMock())
+
+        async def stalled_stream(messages, model, temperature, max_tokens, usage):
+            yield "Hello"
+            await asyncio.sleep(5)
+            yield "never"
+
+        service._stream_ollama = stalled_stream
+        deltas = []
+        with pytest.raises(Exception, match=r"LLM API error \(ollama\)"):
+            async for delta in service.stream_llm_response(
+                messages=[{"role": "user", "content": "hi"}], model="gemma3:4b"
+            ):
+                deltas.append(delta)
+
+        assert deltas == ["Hello"]
+
+
+class TestStreamChat:
+    """Test IntelligentChatbotService.stream_chat."""
+
+    @pytest.fixture
+    def service(self, monkeypatch) -> IntelligentChatbotService:
+        # The RAG service (vector store) is not involved when context gathering is stubbed
+        monkeypatch.setattr("app.services.ai.intelligent_chatbot.RAGService", MagicMock())
+        service = IntelligentChatbotService(MagicMock())
+        service._resolve_dataset_id = AsyncMock(return_value="ds-1")
+        service.gather_context = AsyncMock(return_value={"workforce_stats": {"totalEmployees": 7}})
+        service._build_general_request = AsyncMock(
+            return_value=([{"role": "user", "content": "hi"}], "gemma3:4b", 1024)
+        )
+        service._save_message = AsyncMock()
+        return service
+
+    @pytest.mark.asyncio
+    async def test_forwards_deltas_and_saves_once(self, service):
+        async def fake_stream(**kwargs):
+            for chunk in ["Seven ", "employees."]:
+                yield chunk
+
+        service.chatbot_service.stream_llm_response = fake_stream
+        deltas = [delta async for delta in service.stream_chat("How many?", "s-1")]
+
+        assert deltas == ["Seven ", "employees."]
+        saved = [call.args for call in service._save_message.await_args_list]
+        assert saved == [("s-1", None, "How many?", "user"), ("s-1", None, "Seven employees.", "assistant")]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_llm_fails_before_any_text(self, service):
+        async def failing_stream(**kwargs):
+            raise Exception("LLM API error (ollama): [ConnectError] refused")
+            yield
+
+        service.chatbot_service.stream_llm_response = failing_stream
+        deltas = [delta async for delta in service.stream_chat("How many?", "s-1")]
+
+        assert len(deltas) == 1
+        assert "Total Employees: 7" in deltas[0]
+        assert service._save_message.await_args_list[-1].args[2] == deltas[0]
+
+    @pytest.mark.asyncio
+    async def test_user_message_saved_when_stream_fails_midway(self, service):
+        async def broken_stream(**kwargs):
+            yield "Seven "
+            raise Exception("LLM API error (ollama): connection reset")
+
+        service.chatbot_service.stream_llm_response = broken_stream
+        deltas = []
+        with pytest.raises(Exception):
+            async for delta in service.stream_chat("How many?", "s-1"):
+                deltas.append(delta)
+
+        assert deltas == ["Seven "]
+        saved = [call.args for call in service._save_message.await_args_list]
+        assert saved == [("s-1", None, "How many?", "user")]
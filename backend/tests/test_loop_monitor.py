@@ -0,0 +1,71 @@
+"""
+Tests for app/core/loop_monitor.py - Event loop lag monitor.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core import shutdown
+from app.core.config import settings
+from app.core.loop_monitor import LoopLagMonitor, loop_monitor
+from app.core.metrics import LOOP_LAG_SECONDS
+
+
+def lag_samples() -> float:
+    for metric in LOOP_LAG_SECONDS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count"):
+                return sample.value
+    return 0.0
+
+
+def blocking_call(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+class TestLoopLagMonitor:
+    """Test heartbeat lag and blocked-loop stack capture."""
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_records_lag(self):
+        monitor = LoopLagMonitor(interval=0.01, block_threshold_ms=1000)
+        before = lag_samples()
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        assert lag_samples() > before
+        assert not monitor.running
+        assert monitor.blocks() == []
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_reported_with_its_stack(self):
+        monitor = LoopLagMonitor(interval=0.01, block_threshold_ms=50)
+        monitor.start()
+        await asyncio.sleep(0.03)
+
+        blocking_call(0.3)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        blocks = monitor.blocks()
+        assert len(blocks) == 1
+        assert blocks[0].blocked_ms >= 50
+        assert "blocking_call" in blocks[0].stack
+
+
+class TestLifespan:
+    """Test that the app lifespan owns the monitor."""
+
+    @pytest.mark.asyncio
+    async def test_lifespan_starts_and_stops_monitor(self, monkeypatch):
+        monkeypatch.setattr(settings, "LOOP_MONITOR_ENABLED", True)
+        monkeypatch.setattr(settings, "MODEL_WARMUP_ON_STARTUP", False)
+        monkeypatch.setattr(shutdown, "_shutdown_manager", None)
+        monkeypatch.setattr(shutdown, "setup_signal_handlers", lambda loop: None)
+
+        async with shutdown.lifespan_manager(None):
+            assert loop_monitor.running
+
+        assert not loop_monitor.running
@@ -0,0 +1,247 @@
+"""
+Tests for app/services/ml/model_registry.py - Multi-dataset model residency.
+"""
+import threading
+import time
+
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from app.services.ml.model_registry import ModelBundle, ModelRegistry, bundle_key
+
+
+def _bundle(dataset_id, size_bytes=100, version="v1", source_mtime=None):
+    return ModelBundle(
+        dataset_id=dataset_id,
+        model=None,
+        scaler=StandardScaler(),
+        label_encoders={},
+        version=version,
+        size_bytes=size_bytes,
+        source_mtime=source_mtime,
+    )
+
+
+class TestModelRegistryLookup:
+    """Test hit/miss behaviour and load coalescing."""
+
+    def test_bundle_key_defaults(self):
+        """Global model should map to the 'default' key."""
+        assert bundle_key(None) == "default"
+        assert bundle_key("ds-1") == "ds-1"
+
+    def test_miss_then_hit(self):
+        """First lookup loads, second lookup is served from memory."""
+        registry = ModelRegistry(max_models=4)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return _bundle("ds-1")
+
+        first = registry.get_or_load("ds-1", loader)
+        second = registry.get_or_load("ds-1", loader)
+
+        assert first is second
+        assert len(calls) == 1
+        stats = registry.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["loads"] == 1
+
+    def test_multiple_datasets_resident(self):
+        """Alternating datasets should not reload once both are resident."""
+        registry = ModelRegistry(max_models=4)
+        loads = {"a": 0, "b": 0}
+
+        def make_loader(name):
+            def loader():
+                loads[name] += 1
+                return _bundle(name)
+            return loader
+
+        for _ in range(5):
+            registry.get_or_load("a", make_loader("a"))
+            registry.get_or_load("b", make_loader("b"))
+
+        assert loads == {"a": 1, "b": 1}
+        assert len(registry) == 2
+
+    def test_concurrent_misses_load_once(self):
+        """Concurrent misses for the same dataset should share one load."""
+        registry = ModelRegistry(max_models=4)
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return _bundle("ds-1")
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get_or_load("ds-1", slow_loader)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+
+    def test_stale_bundle_is_reloaded(self):
+        """A bundle whose artifacts changed should be reloaded."""
+        registry = ModelRegistry(max_models=4)
+        current_mtime = {"value": 1.0}
+
+        def loader():
+            return _bundle("ds-1", source_mtime=current_mtime["value"])
+
+        def is_stale(bundle):
+            return bundle.source_mtime != current_mtime["value"]
+
+        first = registry.get_or_load("ds-1", loader, is_stale)
+        current_mtime["value"] = 2.0
+        second = registry.get_or_load("ds-1", loader, is_stale)
+
+        assert first is not second
+        assert second.source_mtime == 2.0
+        assert registry.stats()["reloads"] == 1
+
+    def test_failed_load_is_counted_and_not_cached(self):
+        """Loader errors should propagate without caching anything."""
+        registry = ModelRegistry(max_models=4)
+
+        def failing_loader():
+            raise RuntimeError("artifacts missing")
+
+        with pytest.raises(RuntimeError):
+            registry.get_or_load("ds-1", failing_loader)
+
+        assert "ds-1" not in registry
+        assert registry.stats()["load_failures"] == 1
+
+
+class TestModelRegistryEviction:
+    """Test LRU eviction under count and memory budgets."""
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Exceeding max_models should evict the least recently used bundle."""
+        registry = ModelRegistry(max_models=2)
+        registry.put(_bundle("a"))
+        registry.put(_bundle("b"))
+
+        # Touch "a" so "b" becomes least recently used
+        assert registry.get("a") is not None
+        registry.put(_bundle("c"))
+
+        assert "a" in registry
+        assert "c" in registry
+        assert "b" not in registry
+        assert registry.stats()["evictions"] == 1
+
+    def test_evicts_by_memory_budget(self):
+        """Exceeding the memory budget should evict older bundles."""
+        registry = ModelRegistry(max_models=10, max_memory_bytes=250)
+        registry.put(_bundle("a", size_bytes=100))
+        registry.put(_bundle("b", size_bytes=100))
+        registry.put(_bundle("c", size_bytes=100))
+
+        assert "a" not in registry
+        assert registry.stats()["resident_bytes"] == 200
+
+    def test_oversized_bundle_stays_resident(self):
+        """A single bundle larger than the budget should still be served."""
+        registry = ModelRegistry(max_models=10, max_memory_bytes=50)
+        registry.put(_bundle("a", size_bytes=100))
+
+        assert "a" in registry
+
+    def test_put_replaces_existing_bundle(self):
+        """Publishing a retrained bundle should replace the resident one."""
+        registry = ModelRegistry(max_models=2)
+        registry.put(_bundle("a", version="v1"))
+        registry.put(_bundle("a", version="v2"))
+
+        assert len(registry) == 1
+        assert registry.get("a").version == "v2"
+
+    def test_invalidate(self):
+        """Invalidation should drop the resident bundle."""
+        registry = ModelRegistry(max_models=2)
+        registry.put(_bundle("a"))
+
+        assert registry.invalidate("a") is True
+        assert registry.invalidate("a") is False
+
+
+class TestServiceBundleResolution:
+    """Test that ChurnPredictionService resolves per-dataset bundles."""
+
+    def test_injected_empty_registry_is_used(self):
+        """An empty registry is falsy (len 0) but must not fall back to the global one."""
+        import importlib
+
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        registry = ModelRegistry(max_models=1)
+
+        assert cp.ChurnPredictionService(registry=registry).registry is registry
+
+    @pytest.mark.asyncio
+    async def test_predict_uses_bundle_without_mutating_service(self, tmp_path, monkeypatch):
+        """Predictions for another dataset should not swap the service's bound model."""
+        import importlib
+
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+
+        service = cp.ChurnPredictionService(registry=ModelRegistry(max_models=4))
+        bound_model = service.model
+
+        request = cp.ChurnPredictionRequest(
+            employee_id=1,
+            features=cp.EmployeeChurnFeatures(
+                satisfaction_level=0.4,
+                last_evaluation=0.5,
+                number_project=3,
+                average_monthly_hours=180,
+                time_spend_company=3,
+                work_accident=False,
+                promotion_last_5years=False,
+                department="sales",
+                salary_level="low",
+            ),
+        )
+        await service.predict_churn(request, dataset_id="ds-a")
+        await service.predict_churn(request, dataset_id="ds-b")
+
+        assert service.model is bound_model
+        assert "ds-a" in service.registry
+        assert "ds-b" in service.registry
+        assert service.registry.get("ds-a").is_default
+
+    def test_unreadable_artifact_is_not_reloaded_every_request(self, tmp_path, monkeypatch):
+        """A corrupt artifact falls back to the default bundle once, until it changes on disk."""
+        import importlib
+        import os
+
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+
+        service = cp.ChurnPredictionService(registry=ModelRegistry(max_models=4))
+        model_path, _, _ = service._artifact_paths("ds-a")
+        model_path.write_bytes(b"not an encrypted model")
+
+        first = service.get_model_bundle("ds-a")
+        second = service.get_model_bundle("ds-a")
+
+        assert first.is_default
+        assert second is first
+        assert service.registry.stats()["loads"] == 1
+
+        stat = model_path.stat()
+        os.utime(model_path, (stat.st_atime, stat.st_mtime + 10))
+        assert service.get_model_bundle("ds-a") is not first
@@ -0,0 +1,136 @@
+"""
+Tests for app/services/ml/prediction_persistence.py - Chunked prediction upserts.
+"""
+import json
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.churn import ChurnOutput, ChurnReasoning
+from app.services.ml.columnar_predictions import ColumnarPredictions
+from app.services.ml.prediction_persistence import (
+    OUTPUT_UPDATE_COLUMNS,
+    _upsert,
+    determine_stage,
+    persist_predictions,
+)
+
+# Core tables, so queries don't need every ORM relationship configured
+OUTPUT = ChurnOutput.__table__
+REASONING = ChurnReasoning.__table__
+
+
+@pytest.fixture
+async def db():
+    """In-memory SQLite session with only the prediction tables."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: ChurnOutput.metadata.create_all(
+                sync_conn, tables=[OUTPUT, REASONING]
+            )
+        )
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+def _make_columnar(probabilities, tenures):
+    n = len(probabilities)
+    return ColumnarPredictions(
+        probabilities=np.asarray(probabilities, dtype=float),
+        confidence=np.full(n, 0.8),
+        risk_codes=np.zeros(n, dtype=np.int8),
+        factor_indices=np.tile([0, -1], (n, 1)),
+        factor_values=np.tile([0.3, 0.0], (n, 1)),
+        factor_impacts=np.tile(np.array([4, 0], dtype=np.int8), (n, 1)),
+        recommendation_flags=np.zeros((n, 6), dtype=bool),
+        raw_features=np.array([[0.2, t] for t in tenures], dtype=object),
+        feature_names=["satisfaction_level", "time_spend_company"],
+        message_fn=lambda name, value, shap_val: f"{name}={value}",
+    )
+
+
+class TestPersistPredictions:
+    """Test bulk upserts of churn_output and churn_reasoning."""
+
+    @pytest.mark.asyncio
+    async def test_inserts_then_updates_in_place(self, db):
+        """A second run should overwrite existing rows rather than duplicate them."""
+        await persist_predictions(db, _make_columnar([0.9, 0.2], [0.5, 8]), ["E1", "E2"], "ds-1", "v1")
+        await db.commit()
+
+        summary = await persist_predictions(db, _make_columnar([0.4, 0.6], [0.5, 8]), ["E1", "E2"], "ds-1", "v2")
+        await db.commit()
+
+        assert summary.predictions_written == 2
+        outputs = (await db.execute(select(OUTPUT).order_by(OUTPUT.c.hr_code))).all()
+        assert [(o.hr_code, float(o.resign_proba), o.model_version) for o in outputs] == [
+            ("E1", 0.4, "v2"), ("E2", 0.6, "v2"),
+        ]
+        reasonings = (await db.execute(select(REASONING).order_by(REASONING.c.hr_code))).all()
+        assert [(r.hr_code, r.stage) for r in reasonings] == [("E1", "Onboarding"), ("E2", "Veteran")]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_hr_codes_keep_last_row(self, db):
+        """Repeated hr_codes should be written once, from their last occurrence."""
+        summary = await persist_predictions(
+            db, _make_columnar([0.1, 0.2, 0.3], [1, 1, 1]), ["E1", "E2", "E1"], "ds-1", "v1"
+        )
+        await db.commit()
+
+        assert summary.predictions_written == 2
+        output = (await db.execute(select(OUTPUT).where(OUTPUT.c.hr_code == "E1"))).one()
+        assert float(output.resign_proba) == pytest.approx(0.3)
+
+    @pytest.mark.asyncio
+    async def test_chunks_report_progress(self, db):
+        """progress_callback should fire once per chunk with running totals."""
+        progress = []
+        hr_codes = [f"E{i}" for i in range(5)]
+
+        await persist_predictions(
+            db, _make_columnar([0.5] * 5, [3] * 5), hr_codes, "ds-1", "v1",
+            chunk_size=2, progress_callback=lambda done, total: progress.append((done, total)),
+        )
+
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+
+    @pytest.mark.asyncio
+    async def test_ml_contributors_stored_as_json_list(self, db):
+        """Contributors should use the feature/value/importance/message list format."""
+        await persist_predictions(db, _make_columnar([0.7], [3]), ["E1"], "ds-1", "v1")
+        await db.commit()
+
+        reasoning = (await db.execute(select(REASONING))).one()
+        contributors = json.loads(reasoning.ml_contributors)
+        assert contributors[0]["feature"] == "satisfaction_level"
+        assert contributors[0]["value"] == 0.2
+        assert set(contributors[0]) == {"feature", "value", "importance", "message"}
+
+
+class TestUpsertStatement:
+    """Test the PostgreSQL form of the upsert."""
+
+    def test_postgres_on_conflict_update(self):
+        """The production statement should update only the listed columns."""
+        class PostgresSession:
+            def get_bind(self):
+                return type("Bind", (), {"dialect": postgresql.dialect()})()
+
+        stmt = _upsert(
+            PostgresSession(), ChurnOutput, [{"hr_code": "E1", "dataset_id": "ds-1"}],
+            ("hr_code", "dataset_id"), OUTPUT_UPDATE_COLUMNS,
+        )
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert "ON CONFLICT (hr_code, dataset_id) DO UPDATE SET" in sql
+        assert "resign_proba = excluded.resign_proba" in sql
+        assert "counterfactuals = excluded" not in sql
+
+    @pytest.mark.parametrize("tenure,stage", [(0.5, "Onboarding"), (3, "Established"), (10, "Veteran")])
+    def test_determine_stage(self, tenure, stage):
+        assert determine_stage(tenure) == stage
@@ -0,0 +1,133 @@
+"""
+Tests for the principal cache in app/api/deps.py.
+"""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Register every model so that the User mapper (and its relationships) can configure
+import app.db.base  # noqa: F401
+import app.models.agent_memory  # noqa: F401
+import app.models.chatbot  # noqa: F401
+from app.api import deps
+from app.api.deps import (
+    Principal,
+    get_cached_user_permissions,
+    get_current_user,
+    get_user_role,
+    invalidate_user_principal,
+)
+from app.core import cache as cache_module
+from app.core.cache import InMemoryCache
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest.fixture
+def user():
+    return User(
+        id=7,
+        email="ann@example.com",
+        username="ann",
+        hashed_password="secret-hash",
+        full_name="Ann",
+        is_active=True,
+        is_superuser=False,
+        tenant_id="t1",
+        created_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    with patch.object(cache_module, "_cache", InMemoryCache()):
+        yield
+
+
+def db_returning(user):
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = user
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+def request():
+    req = MagicMock()
+    req.cookies = {}
+    return req
+
+
+class TestPrincipal:
+    """Test the cached value itself."""
+
+    def test_json_round_trip_drops_password_hash(self, user):
+        principal = Principal.from_user(user).with_access("analyst", ["data:read"])
+
+        restored = Principal.from_json(principal.to_json())
+
+        assert restored == Principal.from_json(restored.to_json())
+        assert "hashed_password" not in restored.user_fields
+        assert restored.user_fields["created_at"] == user.created_at
+        assert restored.permissions == frozenset({"data:read"})
+        with pytest.raises(TypeError):
+            restored.user_fields["username"] = "mallory"
+
+
+class TestGetCurrentUser:
+    """Test that cached principals avoid auth queries."""
+
+    @pytest.mark.asyncio
+    async def test_second_request_needs_no_query(self, user):
+        token = create_access_token(user.id)
+        db = db_returning(user)
+
+        first = await get_current_user(request=request(), db=db, token=token)
+        second = await get_current_user(request=request(), db=db, token=token)
+
+        assert first is user
+        assert db.execute.await_count == 1
+        assert second is not user
+        assert (second.id, second.username, second.tenant_id) == (7, "ann", "t1")
+        assert second.hashed_password is None
+
+    @pytest.mark.asyncio
+    async def test_permissions_cached_with_principal(self, user):
+        """Only the first permission check should query roles and permissions."""
+        token = create_access_token(user.id)
+        db = db_returning(user)
+        await get_current_user(request=request(), db=db, token=token)
+
+        with patch.object(deps, "_load_access", AsyncMock(return_value=("analyst", ["data:read"]))) as load:
+            assert await get_cached_user_permissions(db, user) == ["data:read"]
+            assert await get_cached_user_permissions(db, user) == ["data:read"]
+
+        assert load.await_count == 1
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_role_read_from_cached_principal(self, user):
+        """The role is loaded with the permissions and then served from the cache."""
+        db = db_returning(user)
+
+        with patch.object(deps, "_load_access", AsyncMock(return_value=("analyst", ["data:read"]))) as load:
+            assert await get_user_role(db, user) == "analyst"
+            assert await get_cached_user_permissions(db, user) == ["data:read"]
+            assert await get_user_role(db, user) == "analyst"
+
+        assert load.await_count == 1
+        assert db.execute.await_count == 0
+
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_reload(self, user):
+        """Deactivating a user must take effect on the next request."""
+        token = create_access_token(user.id)
+        await get_current_user(request=request(), db=db_returning(user), token=token)
+
+        user.is_active = False
+        await invalidate_user_principal(user.id)
+
+        with pytest.raises(Exception) as exc_info:
+            await get_current_user(request=request(), db=db_returning(user), token=token)
+        assert exc_info.value.status_code == 403
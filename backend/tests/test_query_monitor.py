@@ -0,0 +1,117 @@
+"""
+Tests for app/core/query_monitor.py - Statement timing and the slow query log.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.metrics import QUERY_SECONDS
+from app.core.query_monitor import (
+    OTHER_STATEMENT,
+    QueryMonitor,
+    fingerprint,
+    normalize_sql,
+    tool_context,
+)
+from app.core.spans import end_request, start_request
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE employees (hr_code TEXT, dept TEXT)"))
+        await conn.execute(text("INSERT INTO employees VALUES ('E1', 'Sales'), ('E2', 'IT')"))
+    yield engine
+    await engine.dispose()
+
+
+def routed_scope(path: str) -> dict:
+    return {"path": path, "route": SimpleNamespace(path=path), "path_params": {}}
+
+
+class TestNormalizeSql:
+    """Test statement normalization."""
+
+    def test_literals_and_placeholders_collapse(self):
+        a = normalize_sql("SELECT * FROM hr  WHERE id = $1 AND name = 'Ann'\n AND score > 0.5")
+        b = normalize_sql("SELECT * FROM hr WHERE id = :id_1 AND name = 'Bob' AND score > 7")
+
+        assert a == b == "SELECT * FROM hr WHERE id = ? AND name = ? AND score > ?"
+
+    def test_in_lists_and_values_rows_collapse(self):
+        assert normalize_sql("SELECT a FROM t WHERE x IN (?, ?, ?)") == "SELECT a FROM t WHERE x IN (?)"
+        assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == (
+            "INSERT INTO t (a, b) VALUES (?, ?), ..."
+        )
+
+    def test_casts_and_identifiers_are_kept(self):
+        assert normalize_sql("SELECT col1::text FROM t2") == "SELECT col1::text FROM t2"
+
+
+class TestQueryMonitor:
+    """Test timing, attribution and EXPLAIN capture."""
+
+    @pytest.mark.asyncio
+    async def test_slow_statements_are_attributed(self, engine):
+        monitor = QueryMonitor(threshold_ms=0, buffer_size=10, explain=False)
+        monitor.install(engine)
+
+        timings, token = start_request(routed_scope("/api/v1/employees"))
+        try:
+            async with engine.connect() as conn:
+                with tool_context("search_employees"):
+                    await conn.execute(text("SELECT * FROM employees WHERE dept = :d"), {"d": "Sales"})
+                await conn.execute(text("SELECT count(*) FROM employees"))
+        finally:
+            end_request(token)
+
+        newest, oldest = monitor.slow_queries()
+        assert oldest.statement == "SELECT * FROM employees WHERE dept = ?"
+        assert (oldest.endpoint, oldest.tool) == ("/api/v1/employees", "search_employees")
+        assert oldest.params_fingerprint and "Sales" not in oldest.params_fingerprint
+        assert newest.tool is None
+        assert newest.fingerprint == fingerprint(newest.statement)
+        assert timings.stages["db"][1] == 2
+
+    @pytest.mark.asyncio
+    async def test_fast_statements_only_reach_the_histogram(self, engine):
+        monitor = QueryMonitor(threshold_ms=60_000, buffer_size=10, explain=False)
+        monitor.install(engine)
+        label = fingerprint(normalize_sql("SELECT hr_code FROM employees"))
+        before = QUERY_SECONDS.labels(statement=label)._sum.get()
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT hr_code FROM employees"))
+
+        assert monitor.slow_queries() == []
+        assert QUERY_SECONDS.labels(statement=label)._sum.get() > before
+
+    def test_statement_labels_are_capped(self, monkeypatch):
+        monkeypatch.setattr("app.core.query_monitor.MAX_STATEMENT_LABELS", 2)
+        monitor = QueryMonitor(threshold_ms=100, buffer_size=10, explain=False)
+
+        labels = [monitor._label(statement_id) for statement_id in ("a", "b", "c", "a")]
+
+        assert labels == ["a", "b", OTHER_STATEMENT, "a"]
+
+    @pytest.mark.asyncio
+    async def test_explain_plan_fetched_once_per_statement(self, engine):
+        monitor = QueryMonitor(threshold_ms=0, buffer_size=10, explain=True)
+        monitor.install(engine)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT * FROM employees WHERE dept = :d"), {"d": "IT"})
+        await asyncio.gather(*monitor._explain_tasks)
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT * FROM employees WHERE dept = :d"), {"d": "Sales"})
+
+        newest, oldest = monitor.slow_queries()
+        assert "SCAN" in oldest.plan
+        assert newest.plan == oldest.plan
+        assert not monitor._explain_tasks
+        # The EXPLAIN statements themselves are not recorded
+        assert all(not q.statement.startswith("EXPLAIN") for q in monitor.slow_queries())
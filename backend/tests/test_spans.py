@@ -0,0 +1,145 @@
+"""
+Tests for app/core/spans.py - Per-request stage timings.
+"""
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.http_middleware import EdgeMiddleware
+from app.core.metrics import STAGE_SECONDS
+from app.core.query_monitor import QueryMonitor
+from app.core.spans import current_timings, end_request, span, start_request, timed
+
+
+def observed(stage: str, endpoint: str) -> float:
+    """Number of observations in one stage_seconds series."""
+    for metric in STAGE_SECONDS.collect():
+        for sample in metric.samples:
+            if (
+                sample.name.endswith("_count")
+                and sample.labels == {"stage": stage, "endpoint": endpoint}
+            ):
+                return sample.value
+    return 0.0
+
+
+@pytest.fixture
+def engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    QueryMonitor(threshold_ms=10_000).install(engine)
+    return engine
+
+
+def make_app(engine) -> FastAPI:
+    router = APIRouter()
+
+    @router.get("/employees/{hr_code}")
+    async def employee(hr_code: str):
+        with span("inference"):
+            pass
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        return {"hr_code": hr_code}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1/test-spans")
+    app.add_middleware(EdgeMiddleware, server_timing=True)
+    return app
+
+
+class TestSpans:
+    """Test span and timed outside of HTTP handling."""
+
+    @pytest.mark.asyncio
+    async def test_sync_async_and_decorated_spans_accumulate(self):
+        @timed("scoring")
+        def score():
+            return 1
+
+        @timed("scoring")
+        async def score_async():
+            return 2
+
+        timings, token = start_request({"path": "/x", "route": None})
+        try:
+            with span("prep"):
+                pass
+            async with span("prep"):
+                pass
+            assert score() == 1
+            assert await score_async() == 2
+        finally:
+            end_request(token)
+
+        assert timings.stages["prep"][1] == 2
+        assert timings.stages["scoring"][1] == 2
+        assert current_timings() is None
+
+    def test_spans_outside_a_request_are_background(self):
+        before = observed("test-bg", "background")
+        with span("test-bg"):
+            pass
+        assert observed("test-bg", "background") == before + 1
+
+    def test_server_timing_value(self):
+        timings, token = start_request({"path": "/x", "route": None})
+        end_request(token)
+        timings.add("db", 0.0125)
+        timings.add("db", 0.0025)
+
+        assert timings.server_timing(0.05) == 'db;dur=15.0;desc="2x", total;dur=50.0'
+
+
+class TestRequestSpans:
+    """Test stage timings collected by EdgeMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_server_timing_header_and_route_labels(self, engine):
+        endpoint = "/api/v1/test-spans/employees/{hr_code}"
+        db_before = observed("db", endpoint)
+        inference_before = observed("inference", endpoint)
+
+        transport = httpx.ASGITransport(app=make_app(engine))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/test-spans/employees/E42")
+        await engine.dispose()
+
+        assert response.json() == {"hr_code": "E42"}
+        header = response.headers["server-timing"]
+        assert 'db;dur=' in header and 'desc="2x"' in header
+        assert "inference;dur=" in header
+        assert "total;dur=" in header
+        assert observed("db", endpoint) == db_before + 2
+        assert observed("inference", endpoint) == inference_before + 1
+
+    @pytest.mark.asyncio
+    async def test_route_label_is_the_template(self, engine):
+        """A path param equal to a static segment must not leak into the label."""
+        endpoint = "/api/v1/test-spans/employees/{hr_code}"
+        before = observed("inference", endpoint)
+
+        transport = httpx.ASGITransport(app=make_app(engine))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/test-spans/employees/v1")
+        await engine.dispose()
+
+        assert response.json() == {"hr_code": "v1"}
+        assert observed("inference", endpoint) == before + 1
+        assert observed("inference", "/api/{hr_code}/test-spans/employees/{hr_code}") == 0
+
+    @pytest.mark.asyncio
+    async def test_header_is_opt_in(self, engine):
+        app = make_app(engine)
+        app.user_middleware.clear()
+        app.add_middleware(EdgeMiddleware, server_timing=False)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/test-spans/employees/E1")
+        await engine.dispose()
+
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
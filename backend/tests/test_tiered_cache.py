@@ -0,0 +1,184 @@
+"""
+Tests for TieredCache in app/core/cache.py - L1 in front of Redis with pub/sub invalidation.
+"""
+import asyncio
+import fnmatch
+
+import pytest
+
+from app.core.cache import CacheBackend, InMemoryCache, TieredCache
+
+
+class FakeBroker:
+    """Shared Redis keyspace and pub/sub fan-out for several workers."""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+
+
+class FakePubSub:
+    def __init__(self, broker: FakeBroker):
+        self._broker = broker
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self._broker.subscribers.append((channel, self._queue))
+
+    async def listen(self):
+        while True:
+            yield await self._queue.get()
+
+    async def aclose(self):
+        self._broker.subscribers = [s for s in self._broker.subscribers if s[1] is not self._queue]
+
+
+class FakeRedisCache(CacheBackend):
+    """The RedisCache surface TieredCache uses, backed by a FakeBroker."""
+
+    def __init__(self, broker: FakeBroker):
+        super().__init__()
+        self.broker = broker
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.broker.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.broker.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.broker.data.pop(key, None) is not None
+
+    async def exists(self, key):
+        return key in self.broker.data
+
+    async def clear_pattern(self, pattern):
+        keys = [k for k in self.broker.data if fnmatch.fnmatchcase(k, pattern)]
+        for key in keys:
+            del self.broker.data[key]
+        return len(keys)
+
+    async def incr(self, key):
+        value = int(self.broker.data.get(key, 0)) + 1
+        self.broker.data[key] = str(value)
+        return value
+
+    async def publish(self, channel, message):
+        for subscribed, queue in self.broker.subscribers:
+            if subscribed == channel:
+                queue.put_nowait({"type": "message", "data": message})
+        return True
+
+    async def pubsub(self):
+        return FakePubSub(self.broker)
+
+    async def close(self):
+        pass
+
+
+async def settle():
+    """Let listener tasks subscribe and drain their queues."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+async def workers():
+    broker = FakeBroker()
+    caches = [TieredCache(FakeRedisCache(broker), l1=InMemoryCache(max_size=100)) for _ in range(2)]
+    for cache in caches:
+        await cache.get("warmup")
+    await settle()
+    yield caches
+    for cache in caches:
+        await cache.close()
+
+
+class TestTieredCache:
+    """Test read-through, invalidation fan-out and hit metrics."""
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self, workers):
+        """A second read in the same worker should not touch L2."""
+        a, _ = workers
+        await a.set("k", "v", ttl=60)
+        gets = a.l2.gets
+
+        assert await a.get("k") == "v"
+        assert a.l2.gets == gets
+
+    @pytest.mark.asyncio
+    async def test_l2_hit_fills_l1(self, workers):
+        """A value written by another worker is read from L2 once, then from L1."""
+        a, b = workers
+        await a.set("k", "v", ttl=60)
+
+        assert await b.get("k") == "v"
+        assert await b.get("k") == "v"
+        assert b.l2_stats.hits == 1
+        assert b.l1_stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_fans_out_to_other_workers(self, workers):
+        """invalidate_user_permissions_cache-style deletes must drop every worker's L1 copy."""
+        a, b = workers
+        await a.set("permissions:user:1", "old", ttl=60)
+        assert await b.get("permissions:user:1") == "old"
+
+        await a.delete("permissions:user:1")
+        await settle()
+
+        assert await b.l1.get("permissions:user:1") is None
+        assert await b.get("permissions:user:1") is None
+
+    @pytest.mark.asyncio
+    async def test_pattern_clear_fans_out(self, workers):
+        """invalidate_cache patterns should clear matching L1 entries everywhere."""
+        a, b = workers
+        for key in ("dashboard:1", "dashboard:2", "other"):
+            await a.set(key, key, ttl=60)
+        await settle()
+        for key in ("dashboard:1", "dashboard:2", "other"):
+            await b.get(key)
+
+        await a.clear_pattern("dashboard:*")
+        await settle()
+
+        assert await b.l1.get("dashboard:1") is None
+        assert await b.l1.get("other") == "other"
+
+    @pytest.mark.asyncio
+    async def test_write_replaces_stale_l1_elsewhere(self, workers):
+        """Overwriting a key in one worker should stop others serving the old value."""
+        a, b = workers
+        await a.set("k", "v1", ttl=60)
+        assert await b.get("k") == "v1"
+
+        await a.set("k", "v2", ttl=60)
+        await settle()
+
+        assert await b.get("k") == "v2"
+
+    @pytest.mark.asyncio
+    async def test_own_messages_and_garbage_ignored(self, workers):
+        a, _ = workers
+        await a.set("k", "v", ttl=60)
+        await settle()
+        await a.apply_invalidation("not json")
+
+        assert await a.l1.get("k") == "v"
+
+    @pytest.mark.asyncio
+    async def test_version_bump_seen_by_other_workers(self, workers):
+        """A dataset version bump in one worker must not be masked by another's L1."""
+        a, b = workers
+        await a.incr("cache_version:dataset:ds-1")
+        assert await b.get("cache_version:dataset:ds-1") == "1"
+
+        assert await a.incr("cache_version:dataset:ds-1") == 2
+        await settle()
+
+        assert await b.get("cache_version:dataset:ds-1") == "2"
@@ -0,0 +1,180 @@
+"""
+Tests for app/services/ml/training_executor.py - Process-pool model training.
+"""
+import asyncio
+import importlib
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.schemas.churn import ModelTrainingRequest
+from app.services.ml import training_executor as te
+from app.services.ml.model_registry import ModelRegistry
+from app.services.ml.training_executor import (
+    TrainingCancelledError,
+    TrainingExecutor,
+    TrainingInProgressError,
+)
+
+
+def _thread_backed_executor():
+    """Executor whose pool/manager are thread-based so tests can patch the job function."""
+    executor = TrainingExecutor(max_workers=1)
+    executor._pool = ThreadPoolExecutor(max_workers=2)
+    executor._manager = SimpleNamespace(Queue=queue.Queue, Event=threading.Event)
+    return executor
+
+
+def _stepping_job(request, training_data, dataset_id, progress_queue, cancel_event):
+    for progress in (10, 50, 95):
+        if cancel_event.is_set():
+            raise TrainingCancelledError("Training cancelled")
+        progress_queue.put((progress, f"step {progress}"))
+        time.sleep(0.1)
+    return f"outcome-{dataset_id}"
+
+
+@pytest.fixture
+def training_frame():
+    rng = np.random.default_rng(0)
+    n = 120
+    return pd.DataFrame({
+        "satisfaction_level": rng.random(n),
+        "last_evaluation": rng.random(n),
+        "number_project": rng.integers(2, 7, n),
+        "average_monthly_hours": rng.integers(120, 300, n),
+        "time_spend_company": rng.integers(1, 10, n),
+        "work_accident": rng.integers(0, 2, n),
+        "promotion_last_5years": rng.integers(0, 2, n),
+        "department": rng.choice(["sales", "IT", "hr"], n),
+        "salary_level": rng.choice(["low", "medium", "high"], n),
+        "left": rng.integers(0, 2, n),
+    })
+
+
+class TestTrainingExecutor:
+    """Test progress streaming, cancellation and job exclusivity."""
+
+    @pytest.mark.asyncio
+    async def test_progress_is_forwarded(self, monkeypatch):
+        """Worker progress messages should reach the callback in order."""
+        monkeypatch.setattr(te, "_run_training_job", _stepping_job)
+        executor = _thread_backed_executor()
+        received = []
+
+        result = await executor.run(
+            ModelTrainingRequest(), pd.DataFrame(), "ds-1",
+            progress_callback=lambda progress, message: received.append(progress),
+        )
+
+        assert result == "outcome-ds-1"
+        assert received == [10, 50, 95]
+        assert not executor.is_running("ds-1")
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_job(self, monkeypatch):
+        """Cancelling should stop the worker at its next checkpoint."""
+        monkeypatch.setattr(te, "_run_training_job", _stepping_job)
+        executor = _thread_backed_executor()
+
+        task = asyncio.create_task(executor.run(ModelTrainingRequest(), pd.DataFrame(), "ds-1"))
+        await asyncio.sleep(0.05)
+        assert executor.cancel("ds-1") is True
+
+        with pytest.raises(TrainingCancelledError):
+            await task
+        assert executor.cancel("ds-1") is False
+
+    @pytest.mark.asyncio
+    async def test_rejects_concurrent_job_for_same_dataset(self, monkeypatch):
+        """Only one training job per dataset may run at a time."""
+        monkeypatch.setattr(te, "_run_training_job", _stepping_job)
+        executor = _thread_backed_executor()
+
+        first = asyncio.create_task(executor.run(ModelTrainingRequest(), pd.DataFrame(), "ds-1"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(TrainingInProgressError):
+            await executor.run(ModelTrainingRequest(), pd.DataFrame(), "ds-1")
+
+        assert await first == "outcome-ds-1"
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, monkeypatch):
+        """The event loop should keep serving other coroutines while training runs."""
+        monkeypatch.setattr(te, "_run_training_job", _stepping_job)
+        executor = _thread_backed_executor()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        await executor.run(ModelTrainingRequest(), pd.DataFrame(), "ds-1")
+        ticker_task.cancel()
+
+        assert ticks > 10
+
+
+class TestTrainingOutcomeHandoff:
+    """Test that the parent adopts a worker's result from the artifact path."""
+
+    @pytest.mark.asyncio
+    async def test_outcome_roundtrip_loads_bundle_from_disk(self, tmp_path, monkeypatch, training_frame):
+        """Applying an exported outcome should load the trained bundle into another service's registry."""
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+        monkeypatch.setenv("LICENSE_KEY", "dev-license-key")
+
+        # Plays the worker: trains and saves artifacts
+        worker = cp.ChurnPredictionService(registry=ModelRegistry(max_models=1))
+        progress = []
+        response = await worker.train_model(
+            ModelTrainingRequest(), training_frame, "ds-1",
+            progress_callback=lambda pct, message: progress.append(pct),
+        )
+        outcome = worker.export_training_outcome(response, "ds-1")
+
+        assert progress == sorted(progress)
+        assert progress[-1] == 95
+        # The drift reference travels by path, not as a pickled array
+        assert outcome.drift_reference_path == str(tmp_path / "ds-1" / "drift_reference.npz")
+
+        cp.model_drift_service.clear_reference_data()
+        parent = cp.ChurnPredictionService(registry=ModelRegistry(max_models=4))
+        bundle = parent.apply_training_outcome(outcome)
+
+        assert bundle.version == response.model_id
+        assert bundle.is_fitted
+        assert parent.registry.get("ds-1") is bundle
+        assert parent.model_metrics_by_dataset["ds-1"]["model_version"] == response.model_id
+        assert cp.model_drift_service.get_reference_info()["model_version"] == response.model_id
+
+    def test_missing_artifact_raises(self, tmp_path, monkeypatch):
+        """A worker that could not save artifacts should surface an error in the parent."""
+        cp = importlib.import_module("app.services.ml.churn_prediction_service")
+        monkeypatch.setattr(cp.settings, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(cp.settings, "ENVIRONMENT", "development")
+
+        service = cp.ChurnPredictionService(registry=ModelRegistry(max_models=1))
+        outcome = te.TrainingOutcome(
+            response=None,
+            dataset_id="ds-1",
+            model_path=str(tmp_path / "ds-1" / "churn_model.pkl"),
+            model_metrics={},
+            feature_importance={},
+            optimal_threshold=0.5,
+        )
+
+        with pytest.raises(RuntimeError):
+            service.apply_training_outcome(outcome)
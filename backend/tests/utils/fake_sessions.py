@@ -0,0 +1,38 @@
+"""
+Stand-in for an async_sessionmaker in concurrency tests.
+
+Each call hands out a new MagicMock session and records it, so tests can
+check which session work ran on and how many were open at the same time:
+
+    sessions = FakeSessions()
+    plan = ContextPlan(session_factory=sessions)
+    ...
+    assert sessions.max_open == 3
+"""
+
+from unittest.mock import MagicMock
+
+
+class FakeSessions:
+    """Session factory that hands out a new session per call and counts open ones."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.opened = []
+        self.open = 0
+        self.max_open = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        if self.fail:
+            raise ConnectionError("pool exhausted")
+        self.open += 1
+        self.max_open = max(self.max_open, self.open)
+        session = MagicMock(name=f"session{len(self.opened)}")
+        self.opened.append(session)
+        return session
+
+    async def __aexit__(self, *exc):
+        self.open -= 1
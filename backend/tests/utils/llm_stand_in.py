@@ -0,0 +1,199 @@
+"""
+Local stand-in for the LLM provider HTTP APIs.
+
+Serves the parts of the Ollama (/api/chat, /api/tags) and OpenAI
+(/v1/chat/completions) APIs that ChatbotService uses, streaming and not,
+answering every request with a canned reply split into word chunks. It
+records what a test needs to check client behaviour:
+
+- requests: number of generation requests received
+- connections: distinct client TCP connections (keep-alive reuse)
+- max_in_flight: most generations served at the same time
+
+and fail_next() makes the next requests fail with an HTTP status.
+
+    with LLMStandIn(reply="Hello there") as server:
+        settings.OLLAMA_BASE_URL = server.url
+        settings.OPENAI_BASE_URL = server.url + "/v1"
+
+Run it on its own for offline development:
+
+    python -m tests.utils.llm_stand_in --port 11434
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+
+class LLMStandIn:
+    """Fake Ollama/OpenAI server running on a background thread."""
+
+    def __init__(self, reply: str = "This is a stand-in reply.", chunk_delay: float = 0.0, port: int = 0):
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.port = port
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections: Set[Tuple[str, int]] = set()
+        self._failures: List[int] = []
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.app = Starlette(routes=[
+            Route("/api/chat", self._ollama_chat, methods=["POST"]),
+            Route("/api/tags", self._ollama_tags, methods=["GET"]),
+            Route("/v1/chat/completions", self._openai_chat, methods=["POST"]),
+        ])
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def fail_next(self, count: int, status: int = 503) -> None:
+        """Answer the next count generation requests with status."""
+        self._failures.extend([status] * count)
+
+    # -- lifecycle --------------------------------------------------------
+
+    def start(self) -> "LLMStandIn":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", self.port))
+        self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(self.app, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [sock]}, name="llm-stand-in", daemon=True
+        )
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("LLM stand-in server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+
+    def __enter__(self) -> "LLMStandIn":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # -- request handling ------------------------------------------------
+
+    def _chunks(self) -> List[str]:
+        words = self.reply.split(" ")
+        return [word + " " for word in words[:-1]] + [words[-1]]
+
+    def _begin(self, request: Request) -> Optional[Response]:
+        self.requests += 1
+        if request.client is not None:
+            self.connections.add((request.client.host, request.client.port))
+        if self._failures:
+            status = self._failures.pop(0)
+            return JSONResponse({"error": f"stand-in failure {status}"}, status_code=status)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return None
+
+    async def _generate(self) -> AsyncIterator[str]:
+        try:
+            for chunk in self._chunks():
+                if self.chunk_delay:
+                    await asyncio.sleep(self.chunk_delay)
+                yield chunk
+        finally:
+            self.in_flight -= 1
+
+    async def _ollama_tags(self, request: Request) -> Response:
+        return JSONResponse({"models": [{"name": "gemma3:4b", "model": "gemma3:4b"}]})
+
+    async def _ollama_chat(self, request: Request) -> Response:
+        body = await request.json()
+        failure = self._begin(request)
+        if failure is not None:
+            return failure
+        model = body.get("model", "")
+        usage = {"prompt_eval_count": 10, "eval_count": len(self._chunks())}
+
+        if not body.get("stream", True):
+            content = "".join([chunk async for chunk in self._generate()])
+            return JSONResponse({
+                "model": model,
+                "message": {"role": "assistant", "content": content},
+                "done": True,
+                "done_reason": "stop",
+                **usage,
+            })
+
+        async def lines() -> AsyncIterator[str]:
+            async for chunk in self._generate():
+                message = {"model": model, "message": {"role": "assistant", "content": chunk}, "done": False}
+                yield json.dumps(message) + "\n"
+            final = {"model": model, "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop", **usage}
+            yield json.dumps(final) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    async def _openai_chat(self, request: Request) -> Response:
+        body = await request.json()
+        failure = self._begin(request)
+        if failure is not None:
+            return failure
+        model = body.get("model", "")
+        completion_tokens = len(self._chunks())
+        usage = {"prompt_tokens": 10, "completion_tokens": completion_tokens, "total_tokens": 10 + completion_tokens}
+        base: Dict[str, Any] = {"id": "chatcmpl-stand-in", "created": int(time.time()), "model": model}
+
+        if not body.get("stream"):
+            content = "".join([chunk async for chunk in self._generate()])
+            return JSONResponse({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def events() -> AsyncIterator[str]:
+            async for chunk in self._generate():
+                delta = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+                yield f"data: {json.dumps(delta)}\n\n"
+            final = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the LLM stand-in server")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--reply", default="This is a stand-in reply.")
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = LLMStandIn(reply=args.reply, chunk_delay=args.chunk_delay, port=args.port).start()
+    print(f"LLM stand-in listening on {server.url} (Ollama) and {server.url}/v1 (OpenAI)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()